@@ -12,7 +12,6 @@ writes are required.
 
 from __future__ import annotations
 
-import json
 import os
 import re
 import shutil
@@ -27,6 +26,10 @@ from pathlib import Path
 import requests
 
 ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from whisperforge_core import serialization  # noqa: E402
+
 FIXTURE_PATH = ROOT / "tests" / "fixtures" / "browser_e2e_fresh_run.json"
 def _pick_port() -> int:
     explicit = os.getenv("BROWSER_E2E_FRESH_PORT")
@@ -102,7 +105,7 @@ def _latest_run_manifest(cache_dir: Path) -> tuple[str, dict]:
     if not manifests:
         raise AssertionError(f"No run manifests written under {runs_dir}.")
     path = manifests[-1]
-    return path.parent.name, json.loads(path.read_text())
+    return path.parent.name, serialization.read_json(path)
 
 
 def _run_browser_flow(cache_dir: Path) -> str:
@@ -213,8 +216,8 @@ def main() -> int:
         _wait_for_health(HEALTH_URL)
         run_id = _run_browser_flow(work_cache)
 
-        manifest = json.loads(
-            (work_cache / "runs" / run_id / "manifest.json").read_text()
+        manifest = serialization.read_json(
+            work_cache / "runs" / run_id / "manifest.json"
         )
         recipe = manifest.get("metadata", {}).get("recipe", {})
         if recipe.get("recipe_id") != "article_with_receipts":
@@ -11,7 +11,6 @@ Requirements:
 
 from __future__ import annotations
 
-import json
 import os
 import re
 import signal
@@ -26,6 +25,10 @@ from typing import Any
 import requests
 
 ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from whisperforge_core import serialization  # noqa: E402
+
 PORT = int(os.getenv("BROWSER_E2E_PORT", "8602"))
 BASE_URL = f"http://127.0.0.1:{PORT}"
 HEALTH_URL = f"{BASE_URL}/_stcore/health"
@@ -83,7 +86,7 @@ def _seeded_run_manifest() -> tuple[str, dict[str, Any]]:
     if not manifests:
         raise AssertionError("No seeded run manifests found under .cache/runs.")
     for path in reversed(manifests):
-        data = json.loads(path.read_text())
+        data = serialization.read_json(path)
         stage_names = [stage.get("stage") for stage in data.get("stages", [])]
         if "session_output" in stage_names:
             return path.parent.name, data
@@ -131,8 +134,8 @@ def main() -> int:
     try:
         _wait_for_health(HEALTH_URL)
         _run_browser_flow()
-        manifest = json.loads(
-            (work_cache / "runs" / seeded_run_id / "manifest.json").read_text()
+        manifest = serialization.read_json(
+            work_cache / "runs" / seeded_run_id / "manifest.json"
         )
         after_markdown = [item for item in manifest.get("exports", []) if item.get("kind") == "markdown"]
         if not after_markdown:
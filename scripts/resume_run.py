@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Resume a failed or interrupted WhisperForge run from its last checkpoint."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from whisperforge_core import pipeline, run_artifacts  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("run_id", nargs="?", help="Run to resume (default: latest unfinished run).")
+    args = parser.parse_args()
+    run_id = args.run_id
+    if not run_id:
+        unfinished = [
+            m for m in run_artifacts.list_manifests()
+            if m.get("status") in ("failed", "running")
+        ]
+        if not unfinished:
+            print("No failed or interrupted runs.", file=sys.stderr)
+            return 1
+        run_id = unfinished[0]["run_id"]
+
+    def progress(frac: float, label: str) -> None:
+        print(f"{frac:4.0%}  {label}", file=sys.stderr)
+
+    try:
+        result = pipeline.resume(run_id, progress=progress)
+    except Exception as e:
+        print(f"Resume failed: {e}", file=sys.stderr)
+        return 1
+    reused = ", ".join(result.reused_stages) or "none"
+    print(f"{run_id}: completed (reused: {reused})")
+    print(run_artifacts.run_dir(run_id))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+"""Cache microservice — one shared store for every services-mode replica.
+
+POST /entries/get     {"keys": [...]}                -> {"entries": {key: {...}}}
+POST /entries/put     {"entries": [{key, digest, ...}]} -> {"stored": n, "missing": [...]}
+POST /entries/delete  {"keys": [...]}                -> {"deleted": n}
+GET  /blobs/{digest}  raw bytes of one stored value
+GET  /stats           per-namespace counters
+POST /stats           {"deltas": {...}}  add counters reported by a client
+POST /prune           {"older_than_s", "max_bytes"}  -> {"removed", "freed"}
+POST /clear           -> {"removed": n}
+GET  /usage
+GET  /health
+
+Clients are ``cache_backends.HTTPBackend`` (``WHISPERFORGE_CACHE_BACKEND=http``).
+Values are content-addressed: a key maps to the sha256 of its serialized
+value and each value is stored once, so the same output cached under
+several keys (another model's key, another run) costs one blob. A put may
+name a digest without sending its bytes; if the blob is unknown the digest
+comes back in ``missing`` and the client sends it again with data.
+
+Blobs live in an ``SQLiteBackend`` (LRU byte budget, stats, batched
+pruning), with a ``refs`` table mapping keys to digests beside it.
+
+Auth: X-API-Key: SERVICE_TOKEN header.
+"""
+
+import base64
+import binascii
+from typing import Dict, List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field
+
+from shared.security import verify_service_token
+from whisperforge_core import cache_backends
+from whisperforge_core.config import CACHE_DIR
+from whisperforge_core.logging import get_logger
+
+logger = get_logger("cache")
+app = FastAPI(title="WhisperForge Cache Service")
+
+MAX_BATCH = 500
+
+
+class ContentStore(cache_backends.SQLiteBackend):
+    """``SQLiteBackend`` whose entries are blobs keyed by digest, plus a
+    ``refs`` table from cache keys to digests."""
+
+    def _db(self):
+        fresh = self._conn is None
+        conn = super()._db()
+        if fresh:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refs ("
+                " key TEXT PRIMARY KEY, digest TEXT NOT NULL, compute_s REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS refs_digest ON refs (digest)")
+        return conn
+
+    def fetch(self, keys: List[str]) -> Dict[str, tuple]:
+        """key -> (bytes, compute_s) for every key whose blob is present."""
+        with self._lock:
+            refs = {
+                key: (digest, compute_s)
+                for key in keys
+                for digest, compute_s in self._db().execute(
+                    "SELECT digest, compute_s FROM refs WHERE key = ?", (key,),
+                )
+            }
+        found, dangling = {}, []
+        for key, (digest, compute_s) in refs.items():
+            blob = self.get_entry(digest)
+            if blob is None:
+                dangling.append((key,))  # blob evicted under the budget
+            else:
+                found[key] = (blob[0], compute_s)
+        if dangling:
+            with self._lock:
+                self._db().executemany("DELETE FROM refs WHERE key = ?", dangling)
+        return found
+
+    def missing(self, digests: List[str]) -> set:
+        with self._lock:
+            db = self._db()
+            return {
+                digest for digest in set(digests)
+                if db.execute("SELECT 1 FROM entries WHERE key = ?", (digest,)).fetchone() is None
+            }
+
+    def link(self, refs: List[tuple]) -> None:
+        with self._lock:
+            self._db().executemany(
+                "INSERT OR REPLACE INTO refs (key, digest, compute_s) VALUES (?, ?, ?)", refs,
+            )
+
+    def unlink(self, keys: List[str]) -> int:
+        with self._lock:
+            cur = self._db().executemany("DELETE FROM refs WHERE key = ?", [(k,) for k in keys])
+        return max(cur.rowcount, 0)
+
+    def clear(self) -> int:
+        with self._lock:
+            cur = self._db().execute("DELETE FROM refs")
+        removed = max(cur.rowcount, 0)
+        super().clear()
+        return removed
+
+    def prune(self, **kwargs):
+        result = super().prune(**kwargs)
+        with self._lock:
+            self._db().execute("DELETE FROM refs WHERE digest NOT IN (SELECT key FROM entries)")
+        return result
+
+
+_store: Optional[ContentStore] = None
+
+
+def store() -> ContentStore:
+    global _store
+    if _store is None:
+        _store = ContentStore(CACHE_DIR)
+    return _store
+
+
+class GetRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    keys: List[str] = Field(max_length=MAX_BATCH)
+
+
+class PutEntry(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    key: str
+    digest: str
+    namespace: str = ""
+    compute_s: float = 0.0
+    data: Optional[str] = None  # base64; omitted to offer the digest only
+
+
+class PutRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    entries: List[PutEntry] = Field(max_length=MAX_BATCH)
+
+
+class StatsRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    deltas: Dict[str, Dict[str, float]]
+
+
+class PruneRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    older_than_s: Optional[float] = None
+    max_bytes: Optional[int] = None
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "service": "cache"}
+
+
+@app.post("/entries/get")
+def get_entries(req: GetRequest, _: str = Depends(verify_service_token)):
+    found = store().fetch(req.keys)
+    return {
+        "entries": {
+            key: {"data": base64.b64encode(data).decode("ascii"), "compute_s": compute_s}
+            for key, (data, compute_s) in found.items()
+        }
+    }
+
+
+@app.post("/entries/put")
+def put_entries(req: PutRequest, _: str = Depends(verify_service_token)):
+    s = store()
+    absent = s.missing([e.digest for e in req.entries])
+    blobs, refs, missing = [], [], set()
+    for entry in req.entries:
+        if entry.data is not None:
+            try:
+                data = base64.b64decode(entry.data, validate=True)
+            except (binascii.Error, ValueError):
+                raise HTTPException(status_code=400, detail=f"bad base64 for {entry.key[:8]}") from None
+            if cache_backends.blob_digest(data) != entry.digest:
+                raise HTTPException(status_code=400, detail=f"digest mismatch for {entry.key[:8]}")
+            if entry.digest in absent:
+                blobs.append((entry.digest, data, entry.namespace, entry.compute_s))
+                absent.discard(entry.digest)
+        elif entry.digest in absent:
+            missing.add(entry.digest)
+            continue
+        refs.append((entry.key, entry.digest, entry.compute_s))
+    s.put_many(blobs)
+    s.link(refs)
+    return {"stored": len(refs), "missing": sorted(missing)}
+
+
+@app.post("/entries/delete")
+def delete_entries(req: GetRequest, _: str = Depends(verify_service_token)):
+    return {"deleted": store().unlink(req.keys)}
+
+
+@app.get("/blobs/{digest}")
+def get_blob(digest: str, _: str = Depends(verify_service_token)):
+    blob = store().get_entry(digest)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="unknown blob")
+    return Response(content=blob[0], media_type="application/octet-stream")
+
+
+@app.get("/stats")
+def get_stats(_: str = Depends(verify_service_token)):
+    return {"namespaces": store().stats()}
+
+
+@app.post("/stats")
+def record_stats(req: StatsRequest, _: str = Depends(verify_service_token)):
+    store().record(req.deltas)
+    return {"ok": True}
+
+
+@app.post("/prune")
+def prune(req: PruneRequest, _: str = Depends(verify_service_token)):
+    removed, freed = store().prune(older_than_s=req.older_than_s, max_bytes=req.max_bytes)
+    return {"removed": removed, "freed": freed}
+
+
+@app.post("/clear")
+def clear(_: str = Depends(verify_service_token)):
+    return {"removed": store().clear()}
+
+
+@app.get("/usage")
+def usage(_: str = Depends(verify_service_token)):
+    return store().usage()
@@ -8,7 +8,7 @@ Auth: X-API-Key: SERVICE_TOKEN header.
 """
 
 from dataclasses import asdict
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional, Union
 
 from fastapi import Depends, FastAPI, HTTPException
 from pydantic import BaseModel, ConfigDict
@@ -43,7 +43,7 @@ class PipelineRequest(BaseModel):
     model: str
     prompts: Optional[Dict[str, str]] = None
     knowledge_base: Optional[Dict[str, str]] = None
-    cleanup: bool = True
+    cleanup: Union[bool, Literal["local"]] = True
     chapters: bool = True
     segments: Optional[List[dict]] = None
     agentic: bool = False
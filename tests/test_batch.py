@@ -0,0 +1,174 @@
+"""Tests for whisperforge_core.batch — wave scheduling across runs, result
+application, resume from run artifacts, and batch-discounted cost. The
+backend is a local fake, so no provider is contacted."""
+
+import pytest
+
+from whisperforge_core import batch, cost, run_artifacts
+
+
+class FakeBackend:
+    """Answers every request with "<stage>:<n>" after ``polls`` polls."""
+
+    def __init__(self, polls=1, fail=()):
+        self.polls = polls
+        self.fail = set(fail)
+        self.batches = {}
+        self.submitted = []
+
+    def submit(self, requests):
+        batch_id = f"fake-{len(self.batches)}"
+        self.batches[batch_id] = {"requests": requests, "polls": 0}
+        self.submitted.append([r.custom_id for r in requests])
+        return batch_id
+
+    def poll(self, batch_id):
+        entry = self.batches[batch_id]
+        entry["polls"] += 1
+        return "ended" if entry["polls"] >= self.polls else "running"
+
+    def results(self, batch_id):
+        out = []
+        for r in self.batches[batch_id]["requests"]:
+            stage = r.custom_id.split("-", 1)[1]
+            if stage in self.fail:
+                out.append(batch.BatchResult(r.custom_id, None, error="errored"))
+                continue
+            out.append(batch.BatchResult(
+                r.custom_id, f"{stage}:{r.custom_id[:6]}",
+                usage={"input_tokens": 1000, "output_tokens": 100},
+            ))
+        return out
+
+
+@pytest.fixture(autouse=True)
+def runs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_artifacts, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.delenv("WHISPERFORGE_CACHE", raising=False)
+    cost.reset()
+    yield
+    cost.reset()
+
+
+def _stages(backend):
+    return [sorted({cid.split("-", 1)[1] for cid in wave}) for wave in backend.submitted]
+
+
+def test_waves_follow_stage_dependencies_across_runs():
+    backend = FakeBackend()
+    job_id = batch.start(["one", "two", "three"], "Anthropic", "claude-haiku-4-5")
+
+    status = batch.wait(job_id, backend, sleep=lambda _s: None)
+
+    assert status.done and status.completed == 3
+    assert _stages(backend) == [
+        ["cleanup"], ["wisdom"], ["outline"],
+        ["article_draft", "image_prompts", "social"],
+    ]
+    # One request per run per wave.
+    assert [len(wave) for wave in backend.submitted] == [3, 3, 3, 9]
+    run_id = f"{job_id}-0001"
+    assert run_artifacts.load_stage_payload(run_id, "complete")["article"].startswith("article_draft:")
+    assert run_artifacts.load_manifest(run_id)["status"] == "completed"
+
+
+def test_requests_match_interactive_call_shape():
+    backend = FakeBackend()
+    job_id = batch.start(["hello world"], "Anthropic", "claude-haiku-4-5", cleanup=False)
+    batch.advance(job_id, backend)
+
+    (request,) = backend.batches["fake-0"]["requests"]
+    assert request.params["model"] == "claude-haiku-4-5"
+    content = request.params["messages"][0]["content"]
+    assert content[0]["text"] == "TRANSCRIPT:\nhello world"
+    assert content[0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_restart_resumes_in_flight_batch_without_resubmitting():
+    backend = FakeBackend(polls=2)
+    job_id = batch.start(["one"], "Anthropic", "claude-haiku-4-5")
+    first = batch.advance(job_id, backend)
+    assert first.pending_requests == 1
+
+    # Each advance starts from the files alone, like a fresh process.
+    second = batch.advance(job_id, backend)
+    assert len(backend.submitted) == 1  # still running: polled, not resubmitted
+    assert second.pending_requests == 1
+    third = batch.advance(job_id, backend)
+    assert third.batches == ["fake-0", "fake-1"]  # cleanup ended, wisdom submitted
+    payload = run_artifacts.load_stage_payload(f"{job_id}-0000", "cleanup")
+    assert payload["cleaned_transcript"].startswith("cleanup:")
+
+
+def test_failed_request_is_retried_then_finishes_empty_and_dependents_still_run():
+    backend = FakeBackend(fail={"wisdom"})
+    job_id = batch.start(["one"], "Anthropic", "claude-haiku-4-5", agentic=True)
+
+    status = batch.wait(job_id, backend, sleep=lambda _s: None)
+
+    assert status.done
+    assert _stages(backend).count(["wisdom"]) == batch.MAX_ATTEMPTS
+    assert run_artifacts.load_stage_payload(f"{job_id}-0000", "wisdom")["wisdom"] is None
+    assert ["article_critique"] in _stages(backend)
+    assert ["article_revision"] in _stages(backend)
+
+
+def test_failed_batch_requeues_its_stages():
+    backend = FakeBackend()
+    outcomes = iter(["failed"])
+    poll = backend.poll
+    backend.poll = lambda batch_id: next(outcomes, None) or poll(batch_id)
+    job_id = batch.start(["one"], "Anthropic", "claude-haiku-4-5", cleanup=False)
+
+    status = batch.wait(job_id, backend, sleep=lambda _s: None)
+
+    assert status.done
+    assert _stages(backend)[:2] == [["wisdom"], ["wisdom"]]
+    assert run_artifacts.load_stage_payload(f"{job_id}-0000", "wisdom")["wisdom"].startswith("wisdom:")
+
+
+def test_inline_backend_finishes_each_wave_within_one_advance():
+    from types import SimpleNamespace
+
+    def client():
+        def create(**params):
+            text = params["messages"][-1]["content"][:12]
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"ok {text}"))])
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    job_id = batch.start(["one"], "Ollama", "llama3", cleanup=False)
+    # A fresh backend per advance, as ``backend_for`` builds in a new process.
+    for _ in range(10):
+        status = batch.advance(job_id, batch.InlineBackend(client))
+        if status.done:
+            break
+
+    assert status.done and status.pending_requests == 0
+    complete = run_artifacts.load_stage_payload(f"{job_id}-0000", "complete")
+    assert complete["wisdom"].startswith("ok ") and complete["article"].startswith("ok ")
+
+
+def test_cache_hits_skip_the_batch(monkeypatch, tmp_path):
+    from whisperforge_core import cache
+    monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "cache")
+    backend = FakeBackend()
+    batch.wait(batch.start(["same"], "Anthropic", "claude-haiku-4-5"), backend, sleep=lambda _s: None)
+    waves = len(backend.submitted)
+
+    batch.wait(batch.start(["same"], "Anthropic", "claude-haiku-4-5"), backend, sleep=lambda _s: None)
+
+    assert len(backend.submitted) == waves
+
+
+def test_usage_is_billed_at_batch_discount():
+    backend = FakeBackend()
+    batch.wait(
+        batch.start(["one"], "Anthropic", "claude-haiku-4-5", cleanup=False),
+        backend, sleep=lambda _s: None,
+    )
+    b = cost.estimate_cost()
+    assert b.batch_calls == 5
+    assert all(entry.route == "batch" for entry in cost.ledger())
+    assert b.batch_savings_usd == pytest.approx(b.llm_usd)
+    assert b.hedge_calls == 0
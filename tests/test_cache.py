@@ -12,13 +12,14 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from whisperforge_core import cache
+from whisperforge_core import cache, hashing
 
 
 @pytest.fixture(autouse=True)
 def tmp_cache_dir(tmp_path, monkeypatch):
     """Isolate each test's cache so they don't stomp on each other."""
     monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(hashing, "CACHE_DIR", tmp_path)
 
 
 @pytest.fixture
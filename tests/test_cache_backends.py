@@ -0,0 +1,119 @@
+"""Tests for whisperforge_core.cache_backends — the SQLite store behind
+``cache`` and its LRU byte budget."""
+
+import pickle
+import threading
+
+import pytest
+
+from whisperforge_core import cache, cache_backends, serialization
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_backends, "time", lambda: now["t"])
+    return now
+
+
+def test_lru_entries_are_evicted_under_the_byte_budget(tmp_path, clock):
+    store = cache_backends.SQLiteBackend(tmp_path, budget=100)
+    store.put("a", b"x" * 40)
+    clock["t"] += 120
+    store.put("b", b"y" * 40)
+    clock["t"] += 120
+    assert store.get("a") == b"x" * 40  # refreshes a's last access
+
+    clock["t"] += 120
+    store.put("c", b"z" * 40)
+
+    assert store.get("b") is None
+    assert store.get("a") and store.get("c")
+    assert store.usage()["bytes"] == 80
+
+
+def test_unbounded_budget_never_evicts(tmp_path):
+    store = cache_backends.SQLiteBackend(tmp_path, budget=0)
+    for i in range(5):
+        store.put(str(i), b"x" * 1000)
+    assert store.usage()["entries"] == 5
+
+
+def test_legacy_pickle_files_move_into_the_store(tmp_path):
+    legacy = tmp_path / "k1.pkl"
+    legacy.write_bytes(pickle.dumps("old value"))
+    store = cache_backends.SQLiteBackend(tmp_path)
+
+    assert serialization.loads(store.get("k1")) == "old value"
+    assert not legacy.exists()
+    assert serialization.loads(store.get("k1")) == "old value"
+
+
+def test_separate_connections_write_concurrently(tmp_path):
+    stores = [cache_backends.SQLiteBackend(tmp_path, budget=0) for _ in range(4)]
+
+    def write(i, store):
+        for n in range(25):
+            store.put(f"{i}-{n}", f"value {i} {n}".encode())
+
+    threads = [threading.Thread(target=write, args=(i, s)) for i, s in enumerate(stores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stores[0].usage()["entries"] == 100
+    assert stores[3].get("0-24") == b"value 0 24"
+
+
+def test_cache_module_uses_the_configured_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_BACKEND", "files")
+    cache.put("k", {"v": 1})
+    cache.flush()
+    assert (tmp_path / "k.pkl").exists()
+
+    monkeypatch.setenv("WHISPERFORGE_CACHE_BACKEND", "sqlite")
+    assert cache.get("k") == {"v": 1}  # migrated on first read
+    assert (tmp_path / cache_backends.DB_NAME).exists()
+    assert not (tmp_path / "k.pkl").exists()
+
+
+class TestMemoryLayer:
+    def test_lru_is_bounded_by_bytes(self):
+        layer = cache_backends.MemoryLRU(budget=10)
+        layer.put("a", b"aaaa")
+        layer.put("b", b"bbbb")
+        layer.get("a")
+        layer.put("c", b"cccc")
+        assert layer.get("b") is None
+        assert layer.get("a") == b"aaaa" and layer.size == 8
+        layer.put("huge", b"x" * 11)
+        assert layer.get("huge") is None and len(layer) == 2
+
+    def test_repeat_reads_never_reach_the_disk_store(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+        cache.put("k", "value")
+        store = cache.backend()
+        monkeypatch.setattr(store, "get", lambda key: pytest.fail("disk read"))
+        assert cache.get("k") == "value"
+
+    def test_disk_hits_are_promoted(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+        cache.backend().put("k", serialization.dumps("from disk"))
+        assert cache.get("k") == "from disk"
+        assert cache_backends.get_memory(tmp_path).get("k") == serialization.dumps("from disk")
+
+    def test_clear_empties_the_memory_layer(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+        cache.put("k", "value")
+        cache.clear()
+        assert cache.get("k") is None
+
+
+def test_trusted_path_walk_is_memoized_per_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_dir_verdicts", {})
+    for name in ("a.pkl", "b.pkl"):
+        (tmp_path / name).write_bytes(pickle.dumps(name))
+        assert cache.load_pickle(tmp_path / name, root=tmp_path) == name
+    assert list(cache._dir_verdicts) == [(tmp_path.resolve(), tmp_path.resolve())]
@@ -0,0 +1,127 @@
+"""Tests for the shared cache service (``services/cache``) and the
+``HTTPBackend`` client that ``cache`` uses when
+``WHISPERFORGE_CACHE_BACKEND=http``."""
+
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.cache import service as cache_service
+from whisperforge_core import cache, cache_backends, hashing
+
+HEADERS = {"X-API-Key": "dummy"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("SERVICE_TOKEN", "dummy")
+    monkeypatch.setattr(cache_service, "_store", cache_service.ContentStore(tmp_path / "server", budget=0))
+    yield TestClient(cache_service.app)
+    cache_service._store.close()
+
+
+@pytest.fixture
+def remote(client):
+    backend = cache_backends.HTTPBackend("http://testserver", token="dummy")
+    client.headers.update(HEADERS)
+    backend._session = client
+    return backend
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def test_requests_need_the_service_token(client):
+    assert client.post("/entries/get", json={"keys": ["k"]}).status_code == 401
+
+
+def test_batched_put_and_get_round_trip(remote):
+    remote.put_many([("a", b"alpha", "transcribe", 3.0), ("b", b"beta", "llm.outline", 1.0)])
+
+    found = remote.get_many(["a", "b", "missing"])
+
+    assert found == {"a": (b"alpha", 3.0), "b": (b"beta", 1.0)}
+    assert remote.get("missing") is None
+
+
+def test_identical_values_share_one_blob(remote, client):
+    remote.put_many([("k1", b"same output", "llm.wisdom", 0.0), ("k2", b"same output", "llm.wisdom", 0.0)])
+
+    assert remote.usage()["entries"] == 1
+    digest = cache_backends.blob_digest(b"same output")
+    assert client.get(f"/blobs/{digest}").content == b"same output"
+
+
+def test_large_values_are_offered_by_digest_first(remote, client, monkeypatch):
+    monkeypatch.setattr(cache_backends.HTTPBackend, "INLINE_MAX_BYTES", 4)
+    seen = []
+    send = client.request
+
+    def spy(method, url, **kw):
+        seen.append([e.get("data") is not None for e in (kw.get("json") or {}).get("entries", [])])
+        return send(method, url, **kw)
+
+    monkeypatch.setattr(client, "request", spy)
+    remote.put("k1", b"a long value")
+    remote.put("k2", b"a long value")
+
+    # First put: offered without data, told it's missing, re-sent with data.
+    # Second put: the service already has the blob — nothing re-uploaded.
+    assert seen == [[False], [True], [False]]
+    assert remote.get("k2") == b"a long value"
+
+
+def test_mismatched_digest_is_rejected(client):
+    body = {"entries": [{"key": "k", "digest": "0" * 64, "data": _b64(b"x")}]}
+    assert client.post("/entries/put", json=body, headers=HEADERS).status_code == 400
+
+
+def test_evicted_blobs_read_as_misses(remote):
+    remote.put("k", b"value")
+    cache_service.store().prune(max_bytes=0)
+
+    assert remote.get("k") is None
+    assert remote.delete("k") is False
+
+
+def test_cache_module_targets_the_service_by_config(remote, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "local")
+    monkeypatch.setattr(hashing, "CACHE_DIR", tmp_path / "local")
+    monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_BACKEND", "http")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    monkeypatch.setitem(cache_backends._backends, ("http", cache_backends.cache_url()), remote)
+    cache._pending.clear()
+
+    cache.put_many({"k1": "one", "k2": ["two"]}, namespace="llm.social_media")
+    assert cache.get_many(["k1", "k2", "k3"], namespace="llm.social_media") == {"k1": "one", "k2": ["two"]}
+    assert cache.cached_or_compute("k1", lambda: "recomputed") == "one"
+
+    rows = cache.stats()
+    assert rows["llm.social_media"]["hits"] == 2
+    assert rows["llm.social_media"]["misses"] == 1
+    assert not (tmp_path / "local").exists()  # nothing written locally
+
+
+@pytest.mark.parametrize("body", [{}, {"entries": {"k": {}}}, {"entries": {"k": {"data": "%%"}}}, []])
+def test_malformed_lookup_responses_read_as_misses(remote, monkeypatch, body):
+    monkeypatch.setattr(remote, "_call", lambda *a, **k: body)
+    assert remote.get_many(["k"]) == {}
+    assert remote.get("k") is None
+
+
+def test_unreachable_service_degrades_to_misses(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_BACKEND", "http")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_URL", "http://127.0.0.1:9")
+    backend = cache_backends.get_backend(tmp_path)
+    backend.timeout = 0.5
+    try:
+        assert cache.cached_or_compute("k", lambda: "fresh") == "fresh"
+    finally:
+        cache_backends._backends.pop(("http", "http://127.0.0.1:9"), None)
+        cache._pending.clear()
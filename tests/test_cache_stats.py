@@ -0,0 +1,125 @@
+"""Tests for per-namespace cache counters, ``cache.prune`` and the
+``python -m whisperforge_core.cache`` CLI."""
+
+import sqlite3
+
+import pytest
+
+from whisperforge_core import cache, cache_backends, hashing
+from whisperforge_core.cache import __main__ as cli
+
+
+@pytest.fixture(autouse=True)
+def cache_on(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(hashing, "CACHE_DIR", tmp_path)
+    monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    cache._pending.clear()
+    yield
+    cache._pending.clear()
+
+
+def test_hits_misses_and_saved_time_are_counted_per_namespace():
+    cache.cached_or_compute("k1", lambda: "transcript", namespace="transcribe")
+    cache.cached_or_compute("k1", lambda: "unused", namespace="transcribe")
+    cache.cached_or_compute("k1", lambda: "unused", namespace="transcribe")
+    cache.cached_or_compute("k2", lambda: "wisdom", namespace="llm.wisdom_extraction")
+
+    rows = cache.stats()
+
+    assert rows["transcribe"]["hits"] == 2
+    assert rows["transcribe"]["misses"] == 1
+    assert rows["transcribe"]["entries"] == 1
+    assert rows["transcribe"]["bytes_read"] == 2 * rows["transcribe"]["bytes_written"]
+    assert rows["llm.wisdom_extraction"]["misses"] == 1
+    assert rows["llm.wisdom_extraction"]["hits"] == 0
+
+
+def test_a_hit_credits_the_recorded_compute_time(monkeypatch):
+    ticks = iter([10.0, 14.5])
+    monkeypatch.setattr(cache.time, "perf_counter", lambda: next(ticks))
+    cache.cached_or_compute("k", lambda: "slow", namespace="llm.outline")
+    cache.cached_or_compute("k", lambda: "unused", namespace="llm.outline")
+
+    assert cache.stats()["llm.outline"]["saved_s"] == pytest.approx(4.5)
+
+
+def test_counters_survive_a_new_backend_instance(tmp_path):
+    cache.put("k", "v", namespace="rag")
+    cache.get("k", namespace="rag")
+    cache.flush_stats()
+
+    reopened = cache_backends.SQLiteBackend(tmp_path)
+    assert reopened.stats()["rag"]["hits"] == 1
+    reopened.close()
+
+
+def test_stores_created_before_namespaces_are_migrated(tmp_path):
+    conn = sqlite3.connect(tmp_path / cache_backends.DB_NAME)
+    conn.execute(
+        "CREATE TABLE entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+        " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO entries VALUES ('old', x'00', 1, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    store = cache_backends.SQLiteBackend(tmp_path)
+    assert store.get_entry("old") == (b"\x00", 0.0)
+    assert store.stats()[""]["entries"] == 1
+    store.close()
+
+
+def test_prune_drops_stale_then_least_recent_entries(tmp_path, monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_backends, "time", lambda: now["t"])
+    store = cache_backends.SQLiteBackend(tmp_path, budget=0)
+    for key in "abcd":
+        store.put(key, b"x" * 100, namespace="images")
+        now["t"] += 3600
+
+    removed, freed = store.prune(older_than_s=2.5 * 3600, max_bytes=100, batch=1)
+
+    assert (removed, freed) == (3, 300)
+    assert store.get("d") is not None
+    store.close()
+
+
+def test_prune_does_not_block_an_open_reader(tmp_path):
+    store = cache_backends.SQLiteBackend(tmp_path, budget=0)
+    for i in range(20):
+        store.put(str(i), b"x" * 10)
+    reader = sqlite3.connect(tmp_path / cache_backends.DB_NAME, timeout=0)
+    reader.execute("BEGIN")
+    assert reader.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 20
+
+    assert store.prune(max_bytes=0, batch=7)[0] == 20
+    # The reader's snapshot is untouched until it ends its transaction.
+    assert reader.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 20
+    reader.execute("COMMIT")
+    assert reader.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+    reader.close()
+    store.close()
+
+
+@pytest.mark.parametrize("text,seconds", [("90", 90), ("45m", 2700), ("12h", 43200), ("7d", 604800)])
+def test_durations_parse(text, seconds):
+    assert cli.parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text,size", [("500", 500), ("500K", 512000), ("2G", 2 << 30), ("1GiB", 1 << 30)])
+def test_sizes_parse(text, size):
+    assert cli.parse_size(text) == size
+
+
+def test_cli_prints_stats_and_prunes(capsys):
+    cache.put("k", "value", namespace="transcribe")
+    cache.get("k", namespace="transcribe")
+
+    assert cli.main(["stats"]) == 0
+    assert "transcribe" in capsys.readouterr().out
+
+    assert cli.main(["prune", "--max-bytes", "0"]) == 0
+    assert "Removed 1 entries" in capsys.readouterr().out
+    assert cache.get("k") is None
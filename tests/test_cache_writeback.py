@@ -0,0 +1,109 @@
+"""Tests for the write-behind queue between ``cache.put`` and the backend."""
+
+import threading
+
+import pytest
+
+from whisperforge_core import cache, cache_backends, hashing
+
+
+class SlowBackend:
+    """Records writes; each ``put_many`` waits for the test to release it."""
+
+    def __init__(self):
+        self.stored = {}
+        self.gate = threading.Event()
+        self.batches = []
+
+    def put(self, key, data, *, namespace="", compute_s=0.0):
+        self.stored[key] = data
+
+    def record(self, deltas):
+        pass
+
+    def put_many(self, items):
+        self.gate.wait(5)
+        self.batches.append([item[0] for item in items])
+        for key, data, _, _ in items:
+            self.stored[key] = data
+
+
+@pytest.fixture
+def slow():
+    backend = SlowBackend()
+    yield backend
+    backend.gate.set()
+
+
+def test_put_returns_before_the_backend_write_and_reads_see_it(slow):
+    writer = cache_backends.WriteBehind(slow, budget=1000)
+    writer.put("k", b"value", compute_s=2.0)
+
+    assert slow.stored == {}
+    assert writer.get_entry("k") == (b"value", 2.0)
+
+    slow.gate.set()
+    assert writer.flush(timeout=5)
+    assert slow.stored == {"k": b"value"}
+    assert writer.get_entry("k") is None
+    assert writer.size == 0
+
+
+def test_a_full_queue_blocks_the_writer_until_it_drains(slow):
+    writer = cache_backends.WriteBehind(slow, budget=10)
+    writer.put("a", b"x" * 8)
+    done = threading.Event()
+    threading.Thread(target=lambda: (writer.put("b", b"y" * 8), done.set()), daemon=True).start()
+
+    assert not done.wait(0.2)  # backpressure
+    slow.gate.set()
+    assert done.wait(5)
+    assert writer.flush(timeout=5)
+    assert set(slow.stored) == {"a", "b"}
+
+
+def test_values_larger_than_the_queue_are_written_inline(slow):
+    writer = cache_backends.WriteBehind(slow, budget=4)
+    writer.put("big", b"x" * 100)
+    assert slow.stored == {"big": b"x" * 100}
+    assert len(writer) == 0
+
+
+def test_a_failing_backend_drops_the_batch_without_killing_the_thread():
+    class Flaky(SlowBackend):
+        def put_many(self, items):
+            if not self.batches:
+                self.batches.append("failed")
+                raise OSError("disk full")
+            super().put_many(items)
+
+    backend = Flaky()
+    backend.gate.set()
+    writer = cache_backends.WriteBehind(backend, budget=1000)
+    writer.put("lost", b"1")
+    assert writer.flush(timeout=5)
+    writer.put("kept", b"2")
+    assert writer.flush(timeout=5)
+    assert backend.stored == {"kept": b"2"}
+
+
+def test_cache_reads_queued_values_and_flush_persists_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(hashing, "CACHE_DIR", tmp_path)
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    slow = SlowBackend()
+    monkeypatch.setitem(cache_backends._backends, ("sqlite", str(tmp_path)), slow)
+
+    cache.put("k", {"wisdom": "w"})
+    assert cache.get("k") == {"wisdom": "w"}
+    assert cache.get_many(["k"]) == {"k": {"wisdom": "w"}}
+
+    slow.gate.set()
+    cache.flush()
+    assert "k" in slow.stored
+
+
+def test_files_backend_writes_atomically(tmp_path):
+    store = cache_backends.FileBackend(tmp_path)
+    store.put("k", b"data")
+    assert [p.name for p in tmp_path.iterdir()] == ["k.pkl"]
@@ -5,13 +5,14 @@ from datetime import datetime, timezone
 
 import pytest
 
-from whisperforge_core import captures
+from whisperforge_core import captures, hashing
 
 
 @pytest.fixture
 def tmp_captures_dir(tmp_path, monkeypatch):
     root = tmp_path / "captures"
     monkeypatch.setattr(captures, "CAPTURES_DIR", root)
+    monkeypatch.setattr(hashing, "CACHE_DIR", tmp_path / "cache")
     return root
 
 
@@ -120,6 +121,19 @@ def test_import_capture_file_dedupes_by_source_path_and_text_hash(tmp_captures_d
     assert len(captures.list_captures()) == 1
 
 
+def test_import_dedupes_copies_of_the_same_recording(tmp_captures_dir, tmp_path):
+    for name in ("a/meeting.wav", "b/meeting-copy.wav"):
+        path = tmp_path / name
+        path.parent.mkdir()
+        path.write_bytes(b"same recording bytes")
+
+    first = captures.import_capture_file(tmp_path / "a" / "meeting.wav")
+    copy = captures.import_capture_file(tmp_path / "b" / "meeting-copy.wav")
+
+    assert copy.capture_id == first.capture_id
+    assert first.metadata["content_hash"] == hashing.text_digest("same recording bytes")
+
+
 def test_import_capture_folder_ignores_chunks_dotfiles_and_temp_files(tmp_captures_dir, tmp_path):
     folder = tmp_path / "incoming"
     folder.mkdir()
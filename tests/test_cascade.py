@@ -0,0 +1,157 @@
+"""Tests for whisperforge_core.cascade — the local output gate, escalation,
+per-stage stats, and the ``llm.generate`` integration. Providers are fakes."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from whisperforge_core import cascade, cost, llm
+
+TRANSCRIPT = " ".join(
+    ["Taste is leverage when source evidence travels with every handoff we make."] * 20
+)
+GOOD_WISDOM = " ".join(["Taste is leverage; evidence travels with the handoff."] * 12)
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    monkeypatch.delenv("WHISPERFORGE_CASCADE_CHEAP", raising=False)
+    monkeypatch.delenv("WHISPERFORGE_CASCADE_STAGES", raising=False)
+    cascade.reset()
+    cost.reset()
+    yield
+    cascade.reset()
+    cost.reset()
+
+
+POLICY = cascade.CascadePolicy("Anthropic", "claude-haiku-4-5")
+
+
+class TestScore:
+    def test_grounded_stage_passes_on_overlap_and_length(self):
+        verdict = cascade.score("wisdom_extraction", GOOD_WISDOM, {"transcript": TRANSCRIPT})
+        assert verdict.passed, verdict.reasons
+
+    def test_short_and_off_topic_output_fails(self):
+        verdict = cascade.score(
+            "wisdom_extraction", "Cooking pasta requires boiling water.", {"transcript": TRANSCRIPT},
+        )
+        assert not verdict.passed
+        assert any("too short" in r for r in verdict.reasons)
+        assert any("overlap" in r for r in verdict.reasons)
+
+    def test_json_stages_need_their_list_key(self):
+        assert cascade.score("article_fact_check", json.dumps({"flags": []})).passed
+        assert not cascade.score("article_fact_check", "Looks fine to me!").passed
+        assert not cascade.score("chapters", json.dumps({"sections": []})).passed
+
+    def test_article_length_target_comes_from_user_prefix(self):
+        context = {
+            "transcript": TRANSCRIPT,
+            "_user_prefix": "Target length: approximately 1000 words. ",
+        }
+        verdict = cascade.score("article_writing", " ".join([GOOD_WISDOM] * 5), context)
+        assert any("600 words" in r for r in verdict.reasons)
+
+    def test_cleanup_must_keep_roughly_the_input_length(self):
+        context = {"transcript": TRANSCRIPT}
+        assert cascade.score("transcript_cleanup", TRANSCRIPT, context).passed
+        assert not cascade.score("transcript_cleanup", TRANSCRIPT[:200], context).passed
+
+
+class TestCall:
+    def test_passing_draft_is_kept_and_saving_recorded(self):
+        sent = []
+
+        def send(provider, model, route):
+            sent.append((model, route))
+            return GOOD_WISDOM
+
+        out = cascade.call(
+            "wisdom_extraction", "Anthropic", "claude-sonnet-4-5", POLICY, send,
+            lambda: pytest.fail("should not escalate"),
+            context={"transcript": TRANSCRIPT}, estimated_input_tokens=2000,
+        )
+        assert out == GOOD_WISDOM
+        assert sent == [("claude-haiku-4-5", "cascade")]
+        row = cascade.stats()["wisdom_extraction"]
+        assert row["escalations"] == 0 and row["saved_usd"] > 0
+
+    def test_failing_draft_escalates(self):
+        out = cascade.call(
+            "social_media", "Anthropic", "claude-sonnet-4-5", POLICY,
+            lambda *_: "too short", lambda: "strong answer",
+            estimated_input_tokens=500,
+        )
+        assert out == "strong answer"
+        (event,) = cascade.events()
+        assert event.escalated and event.saved_usd < 0
+        assert cascade.stats()["social_media"]["escalation_rate"] == 1.0
+
+    def test_cheap_error_escalates(self):
+        def send(*_):
+            raise RuntimeError("overloaded")
+
+        out = cascade.call("image_prompts", "OpenAI", "gpt-4o", POLICY, send, lambda: "strong")
+        assert out == "strong"
+        assert "cheap model failed" in cascade.events()[0].reasons[0]
+
+
+class TestPolicy:
+    def test_env_policy_and_same_model_is_skipped(self, monkeypatch):
+        monkeypatch.setenv("WHISPERFORGE_CASCADE_CHEAP", "Anthropic:claude-haiku-4-5")
+        monkeypatch.setenv("WHISPERFORGE_CASCADE_STAGES", "social_media")
+        assert cascade.policy_for("social_media", "Anthropic", "claude-sonnet-4-5") is not None
+        assert cascade.policy_for("social_media", "Anthropic", "claude-haiku-4-5") is None
+        assert cascade.policy_for("wisdom_extraction", "Anthropic", "claude-sonnet-4-5") is None
+
+
+def test_generate_escalates_only_failing_stage(monkeypatch):
+    calls = []
+
+    def create(**params):
+        calls.append(params["model"])
+        text = "short" if params["model"] == "claude-haiku-4-5" else "escalated"
+        return MagicMock(
+            content=[MagicMock(text=text)],
+            usage=MagicMock(input_tokens=10, output_tokens=5,
+                            cache_read_input_tokens=0, cache_creation_input_tokens=0),
+        )
+
+    anthropic = MagicMock()
+    anthropic.messages.create.side_effect = create
+    monkeypatch.setattr(llm, "_anthropic", lambda: anthropic)
+    cascade.configure({"social_media": POLICY})
+
+    out = llm.generate(
+        "social_media", {"wisdom": "w", "outline": "o"}, "Anthropic", "claude-sonnet-4-5",
+    )
+
+    assert out == "escalated"
+    assert calls == ["claude-haiku-4-5", "claude-sonnet-4-5"]
+    assert [e.route for e in cost.ledger()] == ["cascade", ""]
+
+
+def test_cascade_answers_get_their_own_semantic_bucket(monkeypatch):
+    from whisperforge_core import semantic_cache
+    from whisperforge_core.rag import embedder
+    buckets = []
+    monkeypatch.setattr(semantic_cache, "enabled", lambda: True)
+    monkeypatch.setattr(embedder, "model_id_hash", lambda: "fake")
+    monkeypatch.setattr(semantic_cache, "lookup", lambda bucket, *a, **k: buckets.append(bucket))
+    monkeypatch.setattr(semantic_cache, "store", lambda *a, **k: None)
+    anthropic = MagicMock()
+    anthropic.messages.create.return_value = MagicMock(
+        content=[MagicMock(text=GOOD_WISDOM)],
+        usage=MagicMock(input_tokens=10, output_tokens=5,
+                        cache_read_input_tokens=0, cache_creation_input_tokens=0),
+    )
+    monkeypatch.setattr(llm, "_anthropic", lambda: anthropic)
+    args = ("wisdom_extraction", {"transcript": TRANSCRIPT}, "Anthropic", "claude-sonnet-4-5")
+
+    llm.generate(*args)
+    cascade.configure({"wisdom_extraction": POLICY})
+    llm.generate(*args)
+
+    assert len(buckets) == 2 and buckets[0] != buckets[1]
@@ -0,0 +1,76 @@
+"""Tests for whisperforge_core.chaptering — vectorized TextTiling boundaries,
+verbatim start quotes/timestamps, and the single naming call. The embedder
+is faked with one direction per topic word so boundaries are known."""
+
+import json
+
+import numpy as np
+
+from whisperforge_core import chaptering, llm
+
+TOPICS = ("garden", "rocket", "violin")
+
+
+def _fake_embed(texts):
+    rows = []
+    for text in texts:
+        v = np.array([text.count(t) for t in TOPICS], dtype=np.float32) + 0.01
+        rows.append(v / np.linalg.norm(v))
+    return np.vstack(rows)
+
+
+def _sentences(topic, n, offset=0):
+    return [
+        f"Sentence {offset + i} keeps talking about the {topic} with plenty of extra "
+        f"filler words so each block is long enough to embed the {topic} signal."
+        for i in range(n)
+    ]
+
+
+def test_boundaries_fall_on_topic_shifts():
+    text = " ".join(_sentences("garden", 12) + _sentences("rocket", 12, 12) + _sentences("violin", 12, 24))
+    chapters = chaptering.segment(text, embed=_fake_embed)
+    assert len(chapters) == 3
+    assert "rocket" not in chapters[0]["text"]
+    assert chapters[1]["start_quote"].startswith("Sentence 12 keeps")
+    assert "rocket" in chapters[1]["text"] and "violin" not in chapters[1]["text"]
+
+
+def test_uniform_transcript_stays_one_chapter():
+    chapters = chaptering.segment(" ".join(_sentences("garden", 30)), embed=_fake_embed)
+    assert len(chapters) == 1
+
+
+def test_segments_supply_start_seconds():
+    segments = [
+        {"start": float(i * 10), "text": s}
+        for i, s in enumerate(_sentences("garden", 10) + _sentences("rocket", 10, 10))
+    ]
+    chapters = chaptering.segment("", segments, embed=_fake_embed)
+    assert [c["start_seconds"] for c in chapters] == [0.0, 100.0]
+
+
+def test_depth_scores_peak_at_valley():
+    depth = chaptering.depth_scores(np.array([0.9, 0.8, 0.2, 0.85, 0.9], dtype=np.float32), window=1)
+    assert int(np.argmax(depth)) == 2
+
+
+def test_generate_chapters_makes_one_naming_call(monkeypatch):
+    from whisperforge_core.rag import embedder
+    monkeypatch.setattr(embedder, "embed", _fake_embed)
+    monkeypatch.delenv("WHISPERFORGE_CHAPTERS_MODE", raising=False)
+    calls = []
+
+    def fake_generate(content_type, context, provider, model, **kwargs):
+        calls.append(content_type)
+        return json.dumps({"chapters": [{"title": "Gardens", "summary": "About gardens."}]})
+
+    monkeypatch.setattr(llm, "generate", fake_generate)
+    text = " ".join(_sentences("garden", 12) + _sentences("rocket", 12, 12))
+    chapters = llm.generate_chapters(text, "Anthropic", "claude-haiku-4-5")
+
+    assert calls == ["chapter_titles"]
+    assert chapters[0]["title"] == "Gardens"
+    # Second chapter was missing from the answer: offline fallback title.
+    assert chapters[1]["title"].startswith("Sentence 12 keeps")
+    assert chapters[1]["start_quote"].startswith("Sentence 12")
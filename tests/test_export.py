@@ -114,6 +114,26 @@ class TestMarkdownRendering:
         assert "fact_check" not in md  # only enabled flags
         assert "2,500" in md         # tokens with commas
 
+    def test_run_metrics_list_cache_use_per_stage(self):
+        md = export.markdown_from_bundle(_bundle(
+            run_metrics={
+                "stages": {
+                    "wisdom_extraction": {"cache_read_tokens": 0, "cache_write_tokens": 4096},
+                    "outline_creation": {"cache_read_tokens": 4096, "cache_write_tokens": 0},
+                    "social_media": {"cache_read_tokens": 0, "cache_write_tokens": 0},
+                },
+            },
+        ))
+        assert "wisdom_extraction 0/4,096" in md
+        assert "outline_creation 4,096/0" in md
+        assert "social_media" not in md
+
+    def test_run_metrics_flag_approximate_answers(self):
+        md = export.markdown_from_bundle(_bundle(
+            run_metrics={"semantic_hits": [{"stage": "wisdom_extraction", "similarity": 0.9812}]},
+        ))
+        assert "Approximate (semantic cache) answers:** wisdom_extraction (0.981)" in md
+
     def test_no_run_metrics_no_section(self):
         md = export.markdown_from_bundle(_bundle())
         assert "## Run metrics" not in md
@@ -0,0 +1,144 @@
+"""Tests for whisperforge_core.grounding — the local fact-check prefilter —
+and its use in ``pipeline.run``. Embeddings are faked; no model loads."""
+
+import numpy as np
+import pytest
+
+from whisperforge_core import grounding, pipeline
+
+TRANSCRIPT = (
+    "We shipped the new onboarding flow in March. Activation went from 20 "
+    "percent to 31 percent after the change. The team credits the shorter "
+    "signup form more than the redesigned welcome email."
+)
+
+
+def fake_embed(texts):
+    """Topic-word counts: texts about the signup form score close."""
+    vocab = ("team", "credits", "signup", "form", "shorter", "email", "revenue")
+    rows = np.array([[t.lower().count(w) for w in vocab] for t in texts], dtype=np.float32)
+    return rows / np.maximum(np.linalg.norm(rows, axis=1, keepdims=True), 1e-12)
+
+
+def no_embed(texts):
+    raise AssertionError("embedder should not be called")
+
+
+class TestSentences:
+    def test_headings_markup_and_fragments_are_skipped(self):
+        article = "# Title\n\n- **We shipped the new onboarding flow** in March.\nShort one.\n"
+        assert grounding.sentences(article) == ["We shipped the new onboarding flow in March."]
+
+
+class TestCheck:
+    def test_verbatim_sentence_is_grounded_without_embedding(self):
+        report = grounding.check(
+            "Activation went from 20 percent to 31 percent after the change.",
+            TRANSCRIPT, embed=no_embed,
+        )
+        (claim,) = report.claims
+        assert claim.grounded and claim.containment == 1.0 and claim.similarity is None
+
+    def test_invented_number_is_never_grounded(self):
+        report = grounding.check(
+            "Activation went from 20 percent to 45 percent after the change.",
+            TRANSCRIPT, embed=no_embed,
+        )
+        assert report.claims[0].missing_numbers == ["45"]
+        assert not report.claims[0].grounded
+
+    def test_paraphrase_is_settled_by_embedding_similarity(self):
+        report = grounding.check(
+            "The team credits the signup form, shorter than before, more than the email.",
+            TRANSCRIPT, embed=fake_embed,
+        )
+        claim = report.claims[0]
+        assert claim.containment < grounding.GROUNDED_CONTAINMENT
+        assert claim.similarity >= grounding.GROUNDED_SIMILARITY and claim.grounded
+        assert claim.passage == 0
+
+    def test_embedder_failure_falls_back_to_shingles(self):
+        def broken(texts):
+            raise OSError("model not downloaded")
+
+        report = grounding.check("Revenue tripled because of the podcast launch.", TRANSCRIPT, embed=broken)
+        assert report.coverage() == {"claims": 1, "grounded": 0, "sent_to_llm": 1, "coverage": 0.0}
+
+    def test_evidence_is_only_the_blocks_matched_to_unverified_claims(self):
+        def broken(texts):
+            raise OSError("model not downloaded")
+
+        filler = " ".join(f"Unrelated aside number {i} about the weather today." for i in range(12))
+        transcript = f"{filler} {TRANSCRIPT} {filler}"
+        report = grounding.check(
+            "Activation went from 20 percent to 45 percent after the change.",
+            transcript, embed=broken,
+        )
+        evidence = report.evidence()
+        assert "Activation went from 20" in evidence
+        assert len(evidence) < len(transcript) / 2
+        assert report.passages[report.claims[0].passage] in evidence
+
+    def test_grounded_claims_contribute_no_evidence(self):
+        report = grounding.check("We shipped the new onboarding flow in March.", TRANSCRIPT, embed=no_embed)
+        assert report.evidence() == ""
+
+
+class TestPipeline:
+    @pytest.fixture
+    def run(self, monkeypatch):
+        from whisperforge_core import llm as llm_mod
+        monkeypatch.setattr(grounding, "_embed_similarity", lambda *a: None)
+        calls = []
+
+        def _run(article, verdict='{"flags":[{"claim":"Revenue tripled","issue":"Not in source."}]}'):
+            def fake_generate(ct, ctx, *a, **k):
+                calls.append((ct, ctx))
+                if ct == "article_writing":
+                    return article
+                if ct == "article_fact_check":
+                    return verdict
+                return ""
+
+            monkeypatch.setattr(llm_mod, "generate", fake_generate)
+            result = pipeline.run(
+                TRANSCRIPT, "Anthropic", "claude-haiku-4-5",
+                cleanup=False, chapters=False, fact_check=True,
+            )
+            return result, dict(calls)
+
+        return _run
+
+    def test_only_unverified_sentences_reach_the_model(self, run):
+        result, calls = run(
+            "We shipped the new onboarding flow in March. "
+            "Revenue tripled because of the podcast launch."
+        )
+        sent = calls["article_fact_check"]
+        assert sent["article"] == "- Revenue tripled because of the podcast launch."
+        assert sent["transcript"] == grounding.check(
+            "Revenue tripled because of the podcast launch.", TRANSCRIPT, embed=no_embed,
+        ).evidence()
+        assert result.fact_check_flags[0]["claim"] == "Revenue tripled"
+        assert result.fact_check_coverage == {
+            "claims": 2, "grounded": 1, "sent_to_llm": 1, "coverage": 0.5,
+            "llm_skipped": False, "llm_failed": False,
+        }
+
+    def test_failed_fact_check_is_not_reported_as_skipped(self, run):
+        result, calls = run(
+            "We shipped the new onboarding flow in March. "
+            "Revenue tripled because of the podcast launch.",
+            verdict=None,
+        )
+        assert "article_fact_check" in calls
+        assert result.fact_check_flags == []
+        assert result.fact_check_coverage["llm_skipped"] is False
+        assert result.fact_check_coverage["llm_failed"] is True
+
+    def test_fully_grounded_article_skips_the_model(self, run):
+        result, calls = run("We shipped the new onboarding flow in March.")
+        assert "article_fact_check" not in calls
+        assert result.fact_check_flags == []
+        assert result.fact_check_coverage["llm_skipped"] is True
+        assert result.fact_check_coverage["llm_failed"] is False
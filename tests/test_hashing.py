@@ -0,0 +1,65 @@
+"""Tests for whisperforge_core.hashing — stat-keyed digest memo and bulk
+hashing."""
+
+import hashlib
+import os
+
+import pytest
+
+from whisperforge_core import hashing
+
+
+@pytest.fixture(autouse=True)
+def tmp_memo(tmp_path, monkeypatch):
+    monkeypatch.setattr(hashing, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.delenv("WHISPERFORGE_HASH_ALGORITHM", raising=False)
+
+
+def _settled(path, data: bytes):
+    """Write ``data`` with an mtime old enough not to count as racy."""
+    path.write_bytes(data)
+    old = path.stat().st_mtime - 60
+    os.utime(path, (old, old))
+    return path
+
+
+def test_digest_matches_hashlib_and_text_digest(tmp_path):
+    path = _settled(tmp_path / "a.wav", b"hello" * 100_000)
+    assert hashing.file_hash(path) == hashlib.sha256(b"hello" * 100_000).hexdigest()
+    assert hashing.file_hash(path) == hashing.text_digest("hello" * 100_000)
+    assert hashing.file_hash(_settled(tmp_path / "empty", b"")) == hashlib.sha256(b"").hexdigest()
+
+
+def test_unchanged_file_is_not_read_again(tmp_path, monkeypatch):
+    path = _settled(tmp_path / "a.wav", b"audio bytes")
+    first = hashing.file_hash(path)
+    monkeypatch.setattr(hashing, "_digest_file", lambda *a: pytest.fail("re-read"))
+    assert hashing.file_hash(path) == first
+
+
+def test_rewritten_file_is_hashed_again(tmp_path):
+    path = _settled(tmp_path / "a.wav", b"take one")
+    first = hashing.file_hash(path)
+    _settled(path, b"take two")
+    assert hashing.file_hash(path) != first
+
+
+def test_fresh_files_are_not_memoized(tmp_path):
+    path = tmp_path / "recording.wav"
+    path.write_bytes(b"still being written")
+    hashing.file_hash(path)
+    assert not (tmp_path / "cache" / hashing.DB_NAME).exists()
+
+
+def test_blake2b_is_selectable(tmp_path, monkeypatch):
+    monkeypatch.setenv("WHISPERFORGE_HASH_ALGORITHM", "blake2b")
+    path = _settled(tmp_path / "a.wav", b"data")
+    assert hashing.file_hash(path) == hashlib.blake2b(b"data", digest_size=32).hexdigest()
+    assert hashing.text_digest("data") == hashing.file_hash(path)
+
+
+def test_hash_files_runs_on_a_pool(tmp_path):
+    paths = [_settled(tmp_path / f"{i}.wav", f"file {i}".encode()) for i in range(6)]
+    result = hashing.hash_files(paths + [tmp_path / "missing.wav"], max_workers=3)
+    assert result[paths[2]] == hashlib.sha256(b"file 2").hexdigest()
+    assert result[tmp_path / "missing.wav"] is None
@@ -0,0 +1,154 @@
+"""Tests for whisperforge_core.hedging — deadline hedges, error failover,
+and the ledger/event bookkeeping. ``send`` is a fake so no network is
+touched; the slow primary is a sleep released by an Event."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from whisperforge_core import cost, hedging, llm
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    monkeypatch.delenv("WHISPERFORGE_HEDGE_SECONDARY", raising=False)
+    monkeypatch.delenv("WHISPERFORGE_HEDGE_STAGES", raising=False)
+    hedging.reset()
+    cost.reset()
+    yield
+    hedging.reset()
+    cost.reset()
+
+
+POLICY = hedging.HedgePolicy("Ollama (local)", "llama3.2", deadline_seconds=0.05)
+
+
+def _send(primary_delay=0.0, primary_error=None, secondary_error=None):
+    release = threading.Event()
+    calls = []
+
+    def send(provider, model, route):
+        calls.append((provider, route))
+        if provider == "Anthropic":
+            if primary_error:
+                raise primary_error
+            release.wait(primary_delay)
+            return "primary"
+        if secondary_error:
+            raise secondary_error
+        return "secondary"
+
+    return send, calls, release
+
+
+class TestCall:
+    def test_fast_primary_never_hedges(self):
+        send, calls, _ = _send()
+        assert hedging.call("wisdom_extraction", "Anthropic", "m", POLICY, send) == "primary"
+        assert calls == [("Anthropic", "")]
+        assert hedging.events() == []
+
+    def test_slow_primary_is_hedged_and_secondary_wins(self):
+        send, calls, release = _send(primary_delay=5)
+        try:
+            out = hedging.call("wisdom_extraction", "Anthropic", "m", POLICY, send)
+        finally:
+            release.set()
+        assert out == "secondary"
+        assert ("Ollama (local)", "hedge") in calls
+        (event,) = hedging.events()
+        assert event.reason == "deadline" and event.winner == "secondary"
+
+    def test_primary_error_fails_over(self):
+        send, calls, _ = _send(primary_error=RuntimeError("529 overloaded"))
+        assert hedging.call("outline_creation", "Anthropic", "m", POLICY, send) == "secondary"
+        assert calls[-1] == ("Ollama (local)", "failover")
+        assert hedging.events()[0].reason == "error"
+
+    def test_both_failing_raises(self):
+        send, _, _ = _send(primary_error=RuntimeError("down"), secondary_error=RuntimeError("off"))
+        with pytest.raises(RuntimeError):
+            hedging.call("outline_creation", "Anthropic", "m", POLICY, send)
+        assert hedging.events()[0].winner == "none"
+
+
+class TestDeadline:
+    def test_default_until_enough_samples_then_p95(self):
+        policy = hedging.HedgePolicy("Ollama (local)", "llama3.2")
+        assert hedging.deadline("Anthropic", "m", "s", policy) == hedging.DEFAULT_DEADLINE_SECONDS
+        for seconds in [3.0] * 18 + [12.0] * 2:
+            hedging.observe("Anthropic", "m", "s", seconds)
+        assert hedging.deadline("Anthropic", "m", "s", policy) == 12.0
+
+    def test_env_policy_limited_to_listed_stages(self, monkeypatch):
+        monkeypatch.setenv("WHISPERFORGE_HEDGE_SECONDARY", "Ollama (local):llama3.2:latest")
+        monkeypatch.setenv("WHISPERFORGE_HEDGE_STAGES", "wisdom_extraction")
+        policy = hedging.policy_for("wisdom_extraction")
+        assert (policy.secondary_provider, policy.secondary_model) == ("Ollama (local)", "llama3.2:latest")
+        assert hedging.policy_for("social_media") is None
+
+
+class TestGenerateIntegration:
+    def test_failover_answer_and_extra_cost_in_ledger(self, monkeypatch):
+        anthropic = MagicMock()
+        anthropic.messages.create.side_effect = RuntimeError("overloaded")
+        monkeypatch.setattr(llm, "_anthropic", lambda: anthropic)
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="from gpt"))]
+        response.usage = MagicMock(prompt_tokens=1000, completion_tokens=100)
+        openai = MagicMock()
+        openai.chat.completions.create.return_value = response
+        monkeypatch.setattr(llm, "_openai", lambda: openai)
+        hedging.configure({"social_media": hedging.HedgePolicy("OpenAI", "gpt-4o-mini")})
+
+        out = llm.generate(
+            "social_media", {"wisdom": "w", "outline": "o"}, "Anthropic", "claude-haiku-4-5",
+        )
+
+        assert out == "from gpt"
+        (entry,) = cost.ledger()
+        assert entry.route == "failover" and entry.stage == "social_media"
+        b = cost.estimate_cost()
+        assert b.hedge_calls == 1
+        assert b.hedge_usd == pytest.approx(b.llm_usd)
+
+    def test_secondary_answers_are_not_cached_as_the_primarys(self, monkeypatch, tmp_path):
+        from whisperforge_core import cache
+        monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+        anthropic = MagicMock()
+        anthropic.messages.create.side_effect = RuntimeError("overloaded")
+        monkeypatch.setattr(llm, "_anthropic", lambda: anthropic)
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="from gpt"))]
+        response.usage = MagicMock(prompt_tokens=10, completion_tokens=10)
+        openai = MagicMock()
+        openai.chat.completions.create.return_value = response
+        monkeypatch.setattr(llm, "_openai", lambda: openai)
+        hedging.configure({"social_media": hedging.HedgePolicy("OpenAI", "gpt-4o-mini")})
+        args = ("social_media", {"wisdom": "w", "outline": "o"}, "Anthropic", "claude-haiku-4-5")
+
+        assert llm.generate(*args) == "from gpt"
+        assert llm.generate(*args) == "from gpt"
+        # Not replayed from the cache: the primary was asked again.
+        assert anthropic.messages.create.call_count == 2
+
+    def test_secondary_is_skipped_when_the_call_overflows_its_window(self, monkeypatch):
+        anthropic = MagicMock()
+        anthropic.messages.create.side_effect = RuntimeError("overloaded")
+        monkeypatch.setattr(llm, "_anthropic", lambda: anthropic)
+        openai = MagicMock()
+        monkeypatch.setattr(llm, "_openai", lambda: openai)
+        monkeypatch.setattr(
+            llm.tokens, "context_window",
+            lambda provider, model: 1000 if model == "gpt-4o-mini" else 200_000,
+        )
+        hedging.configure({"wisdom_extraction": hedging.HedgePolicy("OpenAI", "gpt-4o-mini")})
+
+        out = llm.generate(
+            "wisdom_extraction", {"transcript": "word " * 5000}, "Anthropic", "claude-haiku-4-5",
+        )
+
+        assert out is None
+        openai.chat.completions.create.assert_not_called()
@@ -197,12 +197,14 @@ class TestContextBuilders:
 
 class TestAnthropicPromptCaching:
     """The Anthropic branch splits KB + per-stage prompt into separate system
-    blocks so the KB (long, stable) caches across the 5-stage pipeline."""
+    blocks so the KB (long, stable) caches across the 5-stage pipeline.
+    Stages that re-read the transcript also cache it as a user-content
+    prefix, with the prompt body moved after it."""
 
     def test_kb_and_prompt_are_separate_blocks_with_cache_control_on_kb(self, mock_anthropic):
         llm.generate(
-            "wisdom_extraction",
-            {"transcript": "body"},
+            "social_media",
+            {"wisdom": "w", "outline": "o"},
             "Anthropic",
             "claude-haiku-4-5",
             prompt="stage-specific instructions",
@@ -221,11 +223,125 @@ class TestAnthropicPromptCaching:
 
     def test_no_kb_produces_single_block_no_cache_control(self, mock_anthropic):
         llm.generate(
-            "wisdom_extraction",
-            {"transcript": "body"},
+            "social_media",
+            {"wisdom": "w", "outline": "o"},
             "Anthropic",
             "claude-haiku-4-5",
             prompt="just the prompt",
         )
         system_blocks = mock_anthropic.messages.create.call_args.kwargs["system"]
         assert system_blocks == [{"type": "text", "text": "just the prompt"}]
+
+    def test_transcript_is_a_cached_user_prefix(self, mock_anthropic):
+        llm.generate(
+            "outline_creation",
+            {"transcript": "THE TRANSCRIPT", "wisdom": "THE WISDOM"},
+            "Anthropic", "claude-haiku-4-5",
+            prompt="outline it",
+            knowledge_base={"Voice": "friendly"},
+        )
+        kwargs = mock_anthropic.messages.create.call_args.kwargs
+        # KB alone in the system; the prompt body moved after the transcript.
+        assert len(kwargs["system"]) == 1
+        first, tail = kwargs["messages"][0]["content"]
+        assert first["text"] == "TRANSCRIPT:\nTHE TRANSCRIPT"
+        assert first["cache_control"] == {"type": "ephemeral"}
+        assert "THE WISDOM" in tail["text"] and "outline it" in tail["text"]
+        assert "cache_control" not in tail
+
+    def test_stages_share_identical_prefix_blocks(self, mock_anthropic):
+        ctx = {"transcript": "T", "wisdom": "W", "outline": "O", "article": "A", "critique": "C"}
+        prefixes = []
+        for stage in ("wisdom_extraction", "article_critique", "article_revise", "article_fact_check"):
+            llm.generate(stage, ctx, "Anthropic", "claude-haiku-4-5")
+            content = mock_anthropic.messages.create.call_args.kwargs["messages"][0]["content"]
+            prefixes.append(content[0])
+        assert all(p == prefixes[0] for p in prefixes)
+        critique = mock_anthropic.messages.create.call_args_list[1].kwargs["messages"][0]["content"]
+        assert critique[1]["text"] == "WISDOM:\nW\n\nOUTLINE:\nO"
+        assert critique[1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_breakpoints_are_capped(self, mock_anthropic, monkeypatch):
+        monkeypatch.setattr(llm, "MAX_CACHE_BREAKPOINTS", 2)
+        llm.generate(
+            "article_revise",
+            {"transcript": "T", "wisdom": "W", "outline": "O", "article": "A", "critique": "C"},
+            "Anthropic", "claude-haiku-4-5", knowledge_base={"Voice": "friendly"},
+        )
+        kwargs = mock_anthropic.messages.create.call_args.kwargs
+        marked = [b for b in kwargs["system"] + kwargs["messages"][0]["content"] if "cache_control" in b]
+        assert len(marked) == 2
+
+    def test_cache_usage_is_reported_per_stage(self, mock_anthropic):
+        from whisperforge_core import cost
+        cost.reset()
+        mock_anthropic.messages.create.return_value.usage = MagicMock(
+            input_tokens=10, output_tokens=5,
+            cache_read_input_tokens=900, cache_creation_input_tokens=0,
+        )
+        llm.generate("wisdom_extraction", {"transcript": "T"}, "Anthropic", "claude-haiku-4-5")
+        stages = cost.by_stage()
+        cost.reset()
+        assert list(stages) == ["wisdom_extraction"]
+        assert stages["wisdom_extraction"].cache_read_tokens == 900
+
+
+class TestSharedRagPrefix:
+    def test_kb_block_is_stable_and_pointer_rides_after_transcript(self, mock_anthropic, monkeypatch):
+        from whisperforge_core import rag
+        from whisperforge_core.rag.chunker import Chunk
+
+        shared = Chunk(doc_name="notes", section_path="", text="shared text",
+                       token_count=2, chunk_index=0)
+        prefix = rag.SharedPrefix(user="alice", chunks=[shared], block="SHARED KB BLOCK")
+        monkeypatch.setattr(rag, "retrieve", lambda user, query, stage: [shared])
+
+        for stage in ("wisdom_extraction", "outline_creation"):
+            llm.generate(
+                stage, {"transcript": "T", "wisdom": "W"}, "Anthropic", "claude-haiku-4-5",
+                user="alice", rag_prefix=prefix,
+            )
+        calls = mock_anthropic.messages.create.call_args_list
+        systems = [c.kwargs["system"] for c in calls]
+        assert systems[0] == systems[1] == [{
+            "type": "text", "text": "SHARED KB BLOCK", "cache_control": {"type": "ephemeral"},
+        }]
+        transcript_block, tail = calls[1].kwargs["messages"][0]["content"]
+        assert "cache_control" in transcript_block
+        assert "Knowledge base focus for outline_creation" in tail["text"]
+        assert "cache_control" not in tail
+
+
+class TestGenerateMetadata:
+    @staticmethod
+    def _respond(client, content):
+        client.chat.completions.create.return_value.choices = [
+            MagicMock(message=MagicMock(content=content))
+        ]
+
+    def test_one_fused_call_returns_all_fields(self, mock_openai):
+        self._respond(mock_openai, '{"title": "Taste As Leverage", "summary": "One line.", "tags": ["#Taste", "craft"]}')
+        out = llm.generate_metadata("transcript", tag_context="wisdom", max_tags=5)
+        assert out == {"title": "Taste As Leverage", "summary": "One line.", "tags": ["taste", "craft"]}
+        assert mock_openai.chat.completions.create.call_count == 1
+        kwargs = mock_openai.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"]["json_schema"]["name"] == "content_metadata"
+        assert "ADDITIONAL CONTEXT (for tags):\nwisdom" in kwargs["messages"][1]["content"]
+
+    def test_failed_fused_call_falls_back_per_field(self, monkeypatch):
+        monkeypatch.setattr(llm, "_structured_call", lambda **_kw: None)
+        monkeypatch.setattr(llm, "generate_title", lambda _t: "Fallback Title")
+        monkeypatch.setattr(llm, "generate_summary", lambda _t: "Fallback summary.")
+        monkeypatch.setattr(llm, "generate_tags", lambda _c, max_tags=6: ["fallback"])
+        out = llm.generate_metadata("transcript")
+        assert out == {"title": "Fallback Title", "summary": "Fallback summary.", "tags": ["fallback"]}
+
+    def test_complete_answers_are_cached_by_transcript(self, mock_openai, monkeypatch, tmp_path):
+        from whisperforge_core import cache
+        monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+        self._respond(mock_openai, '{"title": "T", "summary": "S", "tags": ["t"]}')
+        first = llm.generate_metadata("same transcript")
+        second = llm.generate_metadata("same transcript")
+        assert first == second
+        assert mock_openai.chat.completions.create.call_count == 1
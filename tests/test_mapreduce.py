@@ -0,0 +1,129 @@
+"""Tests for the map-reduce long-transcript path.
+
+Patches ``llm.generate`` so we can see exactly which parts went to which
+content_type without touching the network.
+"""
+
+import threading
+
+import pytest
+
+from whisperforge_core import llm, mapreduce, pipeline, tokens
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    recorded = []
+    lock = threading.Lock()
+
+    def fake_generate(content_type, context, provider, model, **kwargs):
+        with lock:
+            recorded.append((content_type, dict(context)))
+        if content_type == "transcript_cleanup":
+            return context["transcript"].upper()
+        if content_type == "wisdom_extraction":
+            return f"wisdom[{context['transcript'][:12]}]"
+        if content_type == "outline_creation":
+            return f"outline[{context['transcript'][:12]}]"
+        if content_type == "wisdom_reduce":
+            return "MERGED WISDOM"
+        if content_type == "outline_reduce":
+            return "MERGED OUTLINE"
+        return "out"
+
+    monkeypatch.setattr(llm, "generate", fake_generate)
+    return recorded
+
+
+def _sentences(n, prefix="s"):
+    return " ".join(f"{prefix}{i} has about eight words in it." for i in range(n))
+
+
+class TestSplit:
+    def test_parts_respect_budget(self):
+        text = _sentences(400)
+        parts = mapreduce.split_transcript(text, budget=300)
+        assert len(parts) > 1
+        assert all(tokens.count(p) <= 300 for p in parts)
+        assert " ".join(parts).split() == text.split()
+
+    def test_segment_boundaries_are_kept(self):
+        segments = [{"text": f"segment {i} " + "word " * 50} for i in range(20)]
+        transcript = " ".join(s["text"].strip() for s in segments)
+        parts = mapreduce.split_transcript(transcript, budget=200, segments=segments)
+        for part in parts:
+            assert part.startswith("segment ")
+
+    def test_chapter_quotes_become_boundaries(self):
+        transcript = ("intro words here. " * 30) + "Now the second topic begins. " + ("more. " * 30)
+        parts = mapreduce.split_transcript(
+            transcript, budget=60,
+            chapters=[{"start_quote": "Now the second topic begins"}],
+        )
+        assert any(p.startswith("Now the second topic begins") for p in parts)
+
+
+class TestCleanup:
+    def test_parts_cleaned_and_stitched_in_order(self, calls):
+        text = _sentences(800)
+        cleaned = mapreduce.cleanup(text, "Anthropic", "claude-haiku-4-5")
+        cleanup_calls = [c for c in calls if c[0] == "transcript_cleanup"]
+        assert len(cleanup_calls) > 1
+        assert cleaned.split() == text.upper().split()
+
+    def test_failed_part_keeps_raw_text(self, monkeypatch):
+        seen = []
+
+        def flaky(content_type, context, provider, model, **kwargs):
+            seen.append(context["transcript"])
+            return None if len(seen) == 1 else context["transcript"].upper()
+
+        monkeypatch.setattr(mapreduce, "MAX_WORKERS", 1)
+        monkeypatch.setattr(llm, "generate", flaky)
+        text = _sentences(800)
+        cleaned = mapreduce.cleanup(text, "Anthropic", "claude-haiku-4-5")
+        assert len(cleaned.split()) == len(text.split())
+        assert seen[0].split()[0] in cleaned
+
+
+class TestExtract:
+    def test_map_then_reduce(self, calls):
+        result = mapreduce.extract(_sentences(2000), "Anthropic", "claude-haiku-4-5")
+        types = [c[0] for c in calls]
+        assert result.parts > 1
+        assert types.count("wisdom_extraction") == result.parts
+        assert types.count("outline_creation") == result.parts
+        assert types.count("wisdom_reduce") == 1
+        assert result.wisdom == "MERGED WISDOM"
+        assert result.outline == "MERGED OUTLINE"
+        reduce_ctx = next(c[1] for c in calls if c[0] == "outline_reduce")
+        assert reduce_ctx["wisdom"] == "MERGED WISDOM"
+        assert "### Part 1 of" in reduce_ctx["partials"]
+
+
+class TestPipelineSwitch:
+    def test_short_transcript_stays_single_shot(self, calls):
+        pipeline.run("short transcript", "Anthropic", "claude-haiku-4-5", chapters=False)
+        types = [c[0] for c in calls]
+        assert "wisdom_reduce" not in types
+        assert types.count("transcript_cleanup") == 1
+
+    def test_threshold_switches_to_map_reduce(self, calls, monkeypatch):
+        monkeypatch.setenv("WHISPERFORGE_MAPREDUCE_TOKENS", "1000")
+        result = pipeline.run(
+            _sentences(2000), "Anthropic", "claude-haiku-4-5", chapters=False,
+        )
+        types = [c[0] for c in calls]
+        assert types.count("transcript_cleanup") > 1
+        assert "wisdom_reduce" in types and "outline_reduce" in types
+        assert result.wisdom == "MERGED WISDOM"
+        assert result.outline == "MERGED OUTLINE"
+
+    def test_never_mode_keeps_single_calls(self, calls):
+        pipeline.run(
+            _sentences(2000), "Anthropic", "claude-haiku-4-5",
+            chapters=False, map_reduce="never",
+        )
+        types = [c[0] for c in calls]
+        assert types.count("transcript_cleanup") == 1
+        assert types.count("wisdom_extraction") == 1
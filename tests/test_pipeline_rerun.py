@@ -0,0 +1,80 @@
+"""Tests for stage reuse in ``pipeline.run`` and ``pipeline.rerun`` — only
+stages downstream of a change are recomputed; the rest come from the
+original run's artifacts."""
+
+import pytest
+
+from whisperforge_core import pipeline, run_artifacts
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    from whisperforge_core import llm as llm_mod
+    monkeypatch.setattr(run_artifacts, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.delenv("WHISPERFORGE_CACHE", raising=False)
+    seen = []
+
+    def fake_generate(ct, ctx, *a, prompt=None, **k):
+        seen.append(ct)
+        return f"{ct} by {prompt or 'default'}"
+
+    monkeypatch.setattr(llm_mod, "generate", fake_generate)
+    return seen
+
+
+OPTIONS = {
+    "provider": "Anthropic", "model": "claude-haiku-4-5",
+    "cleanup": True, "chapters": False, "agentic": True,
+}
+
+
+def _recorded_run(run_id="orig"):
+    run_artifacts.start_run(run_id, {"pipeline": OPTIONS})
+    run_artifacts.write_stage(run_id, "transcription", {"text": "a transcript", "segments": []})
+    return pipeline._run_recorded(run_id, "a transcript", [], OPTIONS, {}, {}, None)
+
+
+def test_prompt_change_recomputes_only_downstream_stages(calls):
+    _recorded_run()
+    calls.clear()
+
+    result = pipeline.rerun("orig", {"prompts": {"social_media": "Punchier."}})
+
+    assert calls == ["social_media"]
+    assert result.social_posts == "social_media by Punchier."
+    assert result.wisdom == "wisdom_extraction by default"
+    assert set(result.reused_stages) == {
+        "cleanup", "wisdom", "outline", "image_prompts", "article_draft", "article_revision",
+    }
+    new_run = [m for m in run_artifacts.list_manifests() if m["run_id"] != "orig"][0]
+    assert new_run["metadata"]["rerun_of"] == "orig"
+    assert new_run["metadata"]["invalidated"] == ["social"]
+    assert new_run["status"] == "completed"
+
+
+def test_setting_change_walks_the_dependency_graph(calls):
+    _recorded_run()
+    calls.clear()
+
+    pipeline.rerun("orig", {"article_length_words": 600})
+
+    assert calls == ["article_writing", "article_critique", "article_revise"]
+
+
+def test_stale_input_hash_is_recomputed_even_if_offered(calls):
+    _recorded_run()
+    calls.clear()
+
+    # Same options, but the KB changed since: every KB-reading stage reruns,
+    # cleanup (which never reads the KB) is still reused.
+    result = pipeline.rerun("orig", knowledge_base={"voice.md": "Write plainly."})
+
+    assert "transcript_cleanup" not in calls
+    assert "wisdom_extraction" in calls
+    assert result.reused_stages == ["cleanup"]
+
+
+def test_unknown_change_is_rejected(calls):
+    _recorded_run()
+    with pytest.raises(ValueError, match="Unsupported rerun changes"):
+        pipeline.rerun("orig", {"temperature": 0.2})
@@ -0,0 +1,90 @@
+"""Tests for ``pipeline.resume`` — finishing a failed run in place from its
+saved stage payloads."""
+
+import pytest
+
+from whisperforge_core import pipeline, run_artifacts, run_memo
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    from whisperforge_core import llm as llm_mod
+    monkeypatch.setattr(run_artifacts, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.delenv("WHISPERFORGE_CACHE", raising=False)
+    state = {"calls": [], "fail": set(), "empty": set()}
+
+    def fake_generate(ct, ctx, *a, **k):
+        state["calls"].append(ct)
+        if ct in state["fail"]:
+            raise RuntimeError("provider overloaded")
+        return "" if ct in state["empty"] else f"{ct} output"
+
+    monkeypatch.setattr(llm_mod, "generate", fake_generate)
+    return state
+
+
+OPTIONS = {
+    "provider": "Anthropic", "model": "claude-haiku-4-5",
+    "cleanup": True, "chapters": False, "agentic": True,
+}
+
+
+def _start(run_id="run-1"):
+    run_artifacts.start_run(run_id, {"pipeline": OPTIONS})
+    run_artifacts.write_stage(run_id, "transcription", {"text": "a transcript", "segments": []})
+    return run_id
+
+
+def test_failed_run_continues_from_the_first_missing_stage(llm):
+    run_id = _start()
+    llm["fail"] = {"social_media"}
+    with pytest.raises(RuntimeError):
+        pipeline._run_recorded(run_id, "a transcript", [], OPTIONS, {}, {}, None)
+    assert run_artifacts.load_manifest(run_id)["status"] == "failed"
+    llm["fail"], llm["calls"] = set(), []
+
+    result = pipeline.resume(run_id)
+
+    assert llm["calls"] == [
+        "social_media", "image_prompts", "article_writing", "article_critique", "article_revise",
+    ]
+    assert result.reused_stages == ["cleanup", "wisdom", "outline"]
+    assert result.wisdom == "wisdom_extraction output"
+    manifest = run_artifacts.load_manifest(run_id)
+    assert manifest["status"] == "completed" and "error" not in manifest
+    assert manifest["metadata"]["resumed"] == 1
+    output = run_artifacts.load_stage_payload(run_id, "session_output")
+    assert output["social_content"] == "social_media output"
+    # Same shape as the session_output a live UI run writes.
+    assert output == pipeline.session_output(result, output["scorecard_summary"])
+    assert output["scorecard_summary"]["advisory"] is True
+    assert run_artifacts.load_stage_payload(run_id, "scorecard") == output["scorecard_summary"]
+    assert run_artifacts.summarize_manifest(manifest)["partial"] is False
+
+
+def test_stage_saved_with_empty_output_is_retried(llm):
+    run_id = _start()
+    llm["empty"] = {"outline_creation"}
+    llm["fail"] = {"social_media"}
+    with pytest.raises(RuntimeError):
+        pipeline._run_recorded(run_id, "a transcript", [], OPTIONS, {}, {}, None)
+    llm["empty"], llm["fail"], llm["calls"] = set(), set(), []
+
+    result = pipeline.resume(run_id)
+
+    assert llm["calls"][0] == "outline_creation"
+    assert result.outline == "outline_creation output"
+    assert result.reused_stages == ["cleanup", "wisdom"]
+
+
+def test_payloads_without_an_input_hash_are_trusted():
+    assert run_memo.usable("wisdom", {"wisdom": "w"}, "abc")
+    assert run_memo.usable("wisdom", {"wisdom": "w", "input_hash": "abc"}, "abc")
+    assert not run_memo.usable("wisdom", {"wisdom": "w", "input_hash": "old"}, "abc")
+    assert not run_memo.usable("wisdom", {"wisdom": None}, "abc")
+    assert not run_memo.usable("wisdom", None, "abc")
+
+
+def test_unknown_run_is_rejected(llm):
+    with pytest.raises(ValueError, match="Unknown run"):
+        pipeline.resume("nope")
@@ -0,0 +1,68 @@
+"""Tests for whisperforge_core.precleanup — the local mechanical cleanup —
+and how ``pipeline.run`` feeds it to (or instead of) the cleanup model."""
+
+import pytest
+
+from whisperforge_core import pipeline, precleanup
+
+
+class TestClean:
+    def test_fillers_are_dropped_with_their_commas(self):
+        out = precleanup.clean("Um, so it was, er, mostly fine, uh.")
+        assert out.text == "so it was, mostly fine."
+        assert out.counts["fillers"] == 3
+
+    def test_words_containing_filler_letters_survive(self):
+        text = "To err is human. Uh-huh, the umbrella era began."
+        assert precleanup.clean(text).text == text
+
+    def test_stutters_and_false_starts(self):
+        out = precleanup.clean("th- the model I think, I think we should ship it.")
+        assert out.text == "the model I think we should ship it."
+        assert out.counts == {"fillers": 0, "stutters": 1, "repeats": 1}
+
+    def test_grammatical_doubles_are_kept(self):
+        text = "We had had enough, and that that was final."
+        assert precleanup.clean(text).text == text
+
+    def test_chunk_seam_duplicate_is_removed(self):
+        seam = "and then the launch moved to the second week of March because"
+        out = precleanup.clean(f"We planned it {seam} {seam} legal asked for more time.")
+        assert out.text == f"We planned it {seam} legal asked for more time."
+        assert out.removed_chars == len(seam) + 1
+        assert out.removed_tokens > 0
+
+    def test_paragraphs_are_preserved(self):
+        assert precleanup.clean("First, um, part.\n\nSecond part.").text == "First, part.\n\nSecond part."
+
+
+class TestPipeline:
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        from whisperforge_core import llm as llm_mod
+        seen = []
+
+        def fake_generate(ct, ctx, *a, **k):
+            seen.append((ct, ctx))
+            return "model cleaned" if ct == "transcript_cleanup" else "out"
+
+        monkeypatch.setattr(llm_mod, "generate", fake_generate)
+        return seen
+
+    def test_cleanup_model_sees_the_locally_cleaned_text(self, calls):
+        result = pipeline.run(
+            "Um, we we shipped it.", "Anthropic", "claude-haiku-4-5", chapters=False,
+        )
+        assert calls[0] == ("transcript_cleanup", {"transcript": "we shipped it."})
+        assert result.cleaned_transcript == "model cleaned"
+        assert result.raw_transcript == "Um, we we shipped it."
+        assert result.precleanup["fillers"] == 1 and result.precleanup["repeats"] == 1
+
+    def test_local_cleanup_skips_the_model(self, calls):
+        result = pipeline.run(
+            "Um, we shipped it.", "Anthropic", "claude-haiku-4-5",
+            cleanup="local", chapters=False,
+        )
+        assert "transcript_cleanup" not in [ct for ct, _ in calls]
+        assert result.cleaned_transcript == "we shipped it."
+        assert calls[0] == ("wisdom_extraction", {"transcript": "we shipped it."})
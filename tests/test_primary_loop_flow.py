@@ -138,6 +138,9 @@ def test_primary_loop_run_then_reopen_restores_output(tmp_path, monkeypatch):
         stage.get("stage") == "session_output"
         for stage in manifest.get("stages", [])
     )
+    session_output = run_artifacts.load_stage_payload(run_id, "session_output")
+    assert session_output["scorecard_summary"]["verdict_label"] == "Ready"
+    assert set(session_output) == set(core_pipeline.session_output(core_pipeline.PipelineResult()))
     assert any(
         item.get("kind") == "notion" and item.get("value") == "https://notion.so/primary-loop"
         for item in manifest.get("exports", [])
@@ -0,0 +1,61 @@
+"""Tests for the pure-numpy IVF index behind ``KBStore.search`` on large
+KBs."""
+
+import numpy as np
+import pytest
+
+from whisperforge_core.rag import ann
+
+
+def _clustered(n=3000, dim=32, centers=40, seed=1):
+    rng = np.random.default_rng(seed)
+    hubs = rng.normal(size=(centers, dim))
+    x = hubs[rng.integers(centers, size=n)] + 0.35 * rng.normal(size=(n, dim))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _exact(vectors, q, k):
+    return set(np.argsort(-(vectors @ q))[:k].tolist())
+
+
+def test_recall_against_brute_force():
+    vectors = _clustered()
+    ivf = ann.build(vectors)
+    hits = 0
+    for q in vectors[:100]:
+        ids, scores = ivf.search(vectors, q, 10, probes=8)
+        assert list(scores) == sorted(scores, reverse=True)
+        hits += len(set(ids.tolist()) & _exact(vectors, q, 10))
+    assert hits / 1000 >= 0.9
+
+
+def test_every_row_lands_in_exactly_one_list():
+    vectors = _clustered(n=500)
+    ivf = ann.build(vectors, lists=16)
+    assert ivf.lists == 16
+    assert sorted(ivf.order.tolist()) == list(range(500))
+    assert ivf.offsets[0] == 0 and ivf.offsets[-1] == 500
+
+
+def test_probing_every_list_is_exact():
+    vectors = _clustered(n=400)
+    ivf = ann.build(vectors)
+    q = vectors[7]
+    ids, _ = ivf.search(vectors, q, 5, probes=ivf.lists)
+    assert set(ids.tolist()) == _exact(vectors, q, 5)
+
+
+def test_persisted_index_is_tied_to_rows_and_version(tmp_path):
+    vectors = _clustered(n=300)
+    ann.build(vectors, version="v1").save(tmp_path)
+
+    loaded = ann.load(tmp_path, rows=300, version="v1")
+    assert loaded is not None and loaded.lists == round(300 ** 0.5)
+    assert ann.load(tmp_path, rows=300, version="v2") is None
+    assert ann.load(tmp_path, rows=301, version="v1") is None
+
+
+@pytest.mark.parametrize("raw,expected", [("", 5000), ("0", 0), ("120", 120), ("junk", 5000)])
+def test_threshold_env(monkeypatch, raw, expected):
+    monkeypatch.setenv("WF_RAG_ANN_THRESHOLD", raw)
+    assert ann.threshold() == expected
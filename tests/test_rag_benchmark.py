@@ -127,3 +127,51 @@ class TestBenchmarkAllStages:
         # Stages match (order preserved from the module dict).
         stages = [r["stage"] for r in rows]
         assert stages == list(STAGE_AUGMENTATIONS.keys())
+
+
+class TestCompareRagLayouts:
+    def test_shared_prefix_is_cheaper_once_cached(self, tmp_path):
+        files = {"style-voice.md": "# Voice\n" + "voice text " * 200}
+        for i in range(8):
+            files[f"topic{i}.md"] = "\n\n".join(
+                f"# Part {j}\n" + f"topic{i} fact{j} " * 80 for j in range(3)
+            )
+        _seed_kb(tmp_path, "gina", files)
+        stage_queries = {
+            stage: f"{stage} query words"
+            for stage in benchmark.retriever_mod.STAGE_AUGMENTATIONS
+        }
+        r = benchmark.compare_rag_layouts(
+            "gina", transcript="a transcript", stage_queries=stage_queries,
+            provider="Anthropic", model="claude-haiku-4-5",
+        )
+        assert r["stages"] == len(stage_queries)
+        assert r["shared"]["chunks"] > 0
+        # Every stage after the first reads the shared prefix from cache.
+        assert r["shared"]["cache_read_tokens"] == r["shared"]["prefix_tokens"] * (r["stages"] - 1)
+        assert r["delta"]["usd_savings"] == round(
+            r["per_stage"]["cost_usd"] - r["shared"]["cost_usd"], 6
+        )
+
+    def test_no_caching_outside_anthropic(self, tmp_path):
+        _seed_kb(tmp_path, "hank", {"v.md": "voice " * 200})
+        r = benchmark.compare_rag_layouts(
+            "hank", transcript="t", provider="OpenAI", model="gpt-4o",
+        )
+        assert r["shared"]["cache_read_tokens"] == 0
+        assert r["per_stage"]["cache_read_tokens"] == 0
+
+
+class TestANNRecall:
+    def test_reports_recall_against_brute_force(self, tmp_path):
+        store.forget()
+        _seed_kb(tmp_path, "alice", {
+            f"doc{i}.txt": " ".join(f"topic{i}-{j}" for j in range(300)) for i in range(6)
+        })
+        r = benchmark.ann_recall("alice", k=3, probes=1000)
+
+        assert r["chunks"] >= 6
+        assert r["engaged"] is False  # far below the default threshold
+        assert r["recall"] == 1.0     # probing every list is exact
+        assert {"lists", "probes", "queries", "exact_ms", "ann_ms", "speedup"} <= set(r)
+        store.forget()
@@ -65,3 +65,48 @@ def test_retrieve_keeps_legacy_chunk_return_shape(patch_env):
 
     assert chunks
     assert all(hasattr(chunk, "doc_name") for chunk in chunks)
+
+
+def _seed_wide_kb(root: Path):
+    kb = root / "prompts" / "alice" / "knowledge_base"
+    kb.mkdir(parents=True)
+    (kb / "voice-style.md").write_text("# Voice\n" + "voice tone style " * 220)
+    for i in range(6):
+        (kb / f"topic-{i}.md").write_text(
+            "\n\n".join(f"# Part {j}\n" + f"topic{i} detail{j} " * 60 for j in range(4))
+        )
+
+
+def test_shared_prefix_is_anchor_then_sorted_union(patch_env):
+    _seed_wide_kb(patch_env)
+
+    prefix = retriever.build_shared_prefix("alice", "a transcript about topics", k=3)
+
+    assert prefix is not None
+    assert retriever._is_voice_doc(prefix.chunks[0])
+    rest = [(c.doc_name, c.chunk_index) for c in prefix.chunks[1:]]
+    assert rest == sorted(rest)
+    # Every stage's own hits are inside the union.
+    for stage in retriever.STAGE_AUGMENTATIONS:
+        for chunk in retriever.retrieve("alice", query="a transcript about topics", stage=stage, k=3):
+            assert (chunk.doc_name, chunk.chunk_index) in prefix.keys()
+    again = retriever.build_shared_prefix("alice", "a transcript about topics", k=3)
+    assert again.block == prefix.block
+
+
+def test_stage_pointer_names_shared_hits_and_inlines_the_rest(patch_env):
+    _seed_wide_kb(patch_env)
+    prefix = retriever.build_shared_prefix("alice", "a transcript about topics", k=3)
+    inside = prefix.chunks[1]
+    outside = retriever.Chunk(
+        doc_name="zz-extra", section_path="", text="only in this stage",
+        token_count=4, chunk_index=0,
+    )
+
+    pointer = retriever.stage_pointer(prefix, [inside, outside], "outline_creation")
+
+    assert "outline_creation" in pointer
+    assert inside.label in pointer
+    assert inside.text.strip() not in pointer
+    assert "only in this stage" in pointer
+    assert retriever.stage_pointer(prefix, [], "outline_creation") == ""
@@ -6,6 +6,7 @@ results are deterministic.
 """
 
 import hashlib
+import json
 import os
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -13,6 +14,7 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
+from whisperforge_core import hashing
 from whisperforge_core.rag import chunker, embedder, store
 from whisperforge_core.rag.chunker import Chunk
 from whisperforge_core.rag.store import KBStore
@@ -156,3 +158,191 @@ class TestReset:
 
         store.reset_user("alice")
         assert not s1.dir.exists()
+
+
+class TestRegistry:
+    @pytest.fixture(autouse=True)
+    def empty_registry(self):
+        store.forget()
+        yield
+        store.forget()
+
+    def test_resident_store_is_reused_without_reloading(self, tmp_path):
+        _seed_kb(tmp_path / "prompts", "alice", {
+            "voice.md": "# Voice\n" + " ".join(f"word{i}" for i in range(200)),
+        })
+        first = store.get_store("alice")
+        with patch.object(KBStore, "_load") as load_spy, \
+                patch.object(KBStore, "_build") as build_spy:
+            assert store.get_store("alice") is first
+            first.search("anything", k=2)
+        assert load_spy.call_count == 0 and build_spy.call_count == 0
+
+    def test_kb_edit_or_delete_swaps_in_a_new_store(self, tmp_path):
+        kb = _seed_kb(tmp_path / "prompts", "alice", {
+            "voice.md": "# Voice\n" + " ".join(f"word{i}" for i in range(200)),
+            "notes.md": " ".join(f"alpha{i}" for i in range(150)),
+        })
+        first = store.get_store("alice")
+        (kb / "notes.md").unlink()
+
+        second = store.get_store("alice")
+
+        assert second is not first
+        assert {c.doc_name for c in second.chunks} == {"voice"}
+        assert {c.doc_name for c in first.chunks} == {"voice", "notes"}  # snapshot kept
+
+    def test_concurrent_callers_share_one_build(self, tmp_path):
+        import threading
+        _seed_kb(tmp_path / "prompts", "alice", {
+            "voice.md": "# Voice\n" + " ".join(f"word{i}" for i in range(200)),
+        })
+        with patch.object(KBStore, "_build", autospec=True, side_effect=KBStore._build) as build_spy:
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(store.get_store("alice")))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert build_spy.call_count == 1
+        assert len({id(s) for s in results}) == 1
+
+    def test_resident_index_is_read_only(self, tmp_path):
+        _seed_kb(tmp_path / "prompts", "alice", {
+            "voice.md": "# Voice\n" + " ".join(f"word{i}" for i in range(200)),
+        })
+        store.get_store("alice")
+        store.forget()
+        loaded = store.get_store("alice")  # from disk this time
+        assert not loaded.index.flags.writeable
+        with pytest.raises(ValueError):
+            loaded.index[0, 0] = 1.0
+
+    def test_reset_user_forgets_the_resident_store(self, tmp_path):
+        _seed_kb(tmp_path / "prompts", "alice", {
+            "voice.md": "# Voice\n" + " ".join(f"word{i}" for i in range(200)),
+        })
+        first = store.get_store("alice")
+        store.reset_user("alice")
+        assert store.get_store("alice") is not first
+
+
+class TestIncrementalBuild:
+    @pytest.fixture
+    def embedded(self, monkeypatch):
+        seen = []
+
+        def counting_embed(texts):
+            seen.extend(texts)
+            return _fake_embed(texts)
+
+        monkeypatch.setattr(embedder, "embed", counting_embed)
+        return seen
+
+    def _files(self):
+        return {
+            "voice.md": "# Voice\n" + " ".join(f"word{i}" for i in range(200))
+                        + "\n# Tone\n" + " ".join(f"tone{i}" for i in range(120)),
+            "notes.txt": " ".join(f"alpha{i}" for i in range(150)),
+        }
+
+    def test_manifest_records_file_hashes_and_chunk_ranges(self, tmp_path, embedded):
+        _seed_kb(tmp_path / "prompts", "alice", self._files())
+        s = KBStore("alice")
+        s.ensure_built()
+        files = json.loads(s._manifest_path().read_text())["files"]
+        assert set(files) == {"notes.txt", "voice.md"}
+        assert files["notes.txt"]["start"] == 0
+        assert files["voice.md"]["end"] == s.chunk_count()
+        assert files["voice.md"]["algorithm"] == hashing.algorithm()
+        assert files["voice.md"]["digest"] == hashing.digest((s.kb_dir / "voice.md").read_bytes())
+
+    def test_switching_hash_algorithm_rechunks_without_reembedding(
+        self, tmp_path, embedded, monkeypatch,
+    ):
+        kb = _seed_kb(tmp_path / "prompts", "alice", self._files())
+        KBStore("alice").ensure_built()
+        embedded.clear()
+
+        monkeypatch.setenv("WHISPERFORGE_HASH_ALGORITHM", "blake2b")
+        (kb / "notes.txt").write_text(self._files()["notes.txt"] + " omega")
+        s = KBStore("alice")
+        s.ensure_built()
+
+        files = json.loads(s._manifest_path().read_text())["files"]
+        assert {f["algorithm"] for f in files.values()} == {"blake2b"}
+        assert len(embedded) == 1 and "omega" in embedded[0]
+
+    def test_editing_one_section_embeds_only_the_changed_chunk(self, tmp_path, embedded):
+        kb = _seed_kb(tmp_path / "prompts", "alice", self._files())
+        KBStore("alice").ensure_built()
+        embedded.clear()
+
+        content = self._files()["voice.md"].replace("tone119", "tone119 edited")
+        (kb / "voice.md").write_text(content)
+        s = KBStore("alice")
+        s.ensure_built()
+
+        assert len(embedded) == 1 and "edited" in embedded[0]
+        # Same chunks, in the same order, as chunking everything afresh
+        assert [c.text for c in s.chunks] == [c.text for c in chunker.chunk_kb_dir(kb)]
+        assert np.allclose(s.index, _fake_embed([c.text for c in s.chunks]))
+
+    def test_deleted_and_added_files(self, tmp_path, embedded):
+        kb = _seed_kb(tmp_path / "prompts", "alice", self._files())
+        KBStore("alice").ensure_built()
+        embedded.clear()
+
+        (kb / "notes.txt").unlink()
+        (kb / "extra.md").write_text(" ".join(f"beta{i}" for i in range(100)))
+        s = KBStore("alice")
+        s.ensure_built()
+
+        assert {c.doc_name for c in s.chunks} == {"voice", "extra"}
+        assert all("beta" in t for t in embedded)
+        assert np.allclose(s.index, _fake_embed([c.text for c in s.chunks]))
+
+
+class TestANN:
+    def _seed(self, tmp_path):
+        _seed_kb(tmp_path / "prompts", "alice", {
+            f"doc{i}.txt": " ".join(f"topic{i}-{j}" for j in range(300)) for i in range(6)
+        })
+
+    def test_search_switches_to_ivf_above_the_threshold(self, tmp_path, monkeypatch):
+        self._seed(tmp_path)
+        monkeypatch.setenv("WF_RAG_ANN_THRESHOLD", "4")
+        s = KBStore("alice")
+        s.ensure_built()
+        assert s.chunk_count() >= 4
+        assert (s.dir / "ann.npz").exists()  # persisted beside index.npy
+
+        with patch.object(store.ann.IVFIndex, "search", wraps=s._ann.search) as ivf_spy:
+            hits = s.search("topic3-5", k=3)
+        assert ivf_spy.called and len(hits) == 3
+
+        with patch.object(store.ann.IVFIndex, "search") as ivf_spy:
+            s.search("topic3-5", k=3, exact=True)
+        assert not ivf_spy.called
+
+    def test_small_kbs_stay_exact(self, tmp_path, monkeypatch):
+        self._seed(tmp_path)
+        monkeypatch.setenv("WF_RAG_ANN_THRESHOLD", "5000")
+        s = KBStore("alice")
+        s.ensure_built()
+        assert s.ann_index() is None
+        assert not (s.dir / "ann.npz").exists()
+
+    def test_reloaded_store_reuses_the_persisted_ann_index(self, tmp_path, monkeypatch):
+        self._seed(tmp_path)
+        monkeypatch.setenv("WF_RAG_ANN_THRESHOLD", "4")
+        KBStore("alice").ensure_built()
+
+        s2 = KBStore("alice")
+        s2.ensure_built()
+        with patch.object(store.ann, "build") as build_spy:
+            assert s2.ann_index() is not None
+        assert not build_spy.called
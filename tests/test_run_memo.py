@@ -0,0 +1,105 @@
+"""Tests for whisperforge_core.run_memo — whole-result replay and stage
+invalidation reports from ``pipeline.run``."""
+
+import pytest
+
+from whisperforge_core import pipeline, run_artifacts, run_memo
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    from whisperforge_core import cache
+    from whisperforge_core import llm as llm_mod
+    monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(run_artifacts, "RUNS_DIR", tmp_path / "runs")
+    seen = []
+
+    def fake_generate(ct, ctx, *a, **k):
+        seen.append(ct)
+        return f"{ct} output"
+
+    monkeypatch.setattr(llm_mod, "generate", fake_generate)
+    return seen
+
+
+def _run(**overrides):
+    options = dict(cleanup=False, chapters=False, prompts=None)
+    options.update(overrides)
+    return pipeline.run("a transcript", "Anthropic", "claude-haiku-4-5", **options)
+
+
+def test_unchanged_run_replays_without_model_calls(calls):
+    first = _run()
+    n = len(calls)
+    checkpoints = []
+
+    second = _run(checkpoint=lambda stage, payload: checkpoints.append(stage))
+
+    assert len(calls) == n
+    assert second.memo == {"hit": True}
+    assert second.article == first.article == "article_writing output"
+    assert checkpoints == ["complete"]
+
+
+def test_changed_prompt_reports_downstream_stages(calls):
+    _run()
+    result = _run(prompts={"social_media": "Shorter posts, please."})
+
+    assert result.memo["hit"] is False
+    assert result.memo["changed"] == ["prompts.social_media"]
+    assert result.memo["invalidated"] == ["social"]
+    # The fresh result is memoized too.
+    assert _run(prompts={"social_media": "Shorter posts, please."}).memo == {"hit": True}
+
+
+def test_invalidation_walks_the_stage_graph():
+    changed, stages = run_memo.invalidated(
+        {"prompts.outline_creation": "a", "settings.agentic": "x"},
+        {"prompts.outline_creation": "b", "settings.agentic": "x"},
+    )
+    assert changed == ["prompts.outline_creation"]
+    assert stages == [
+        "outline", "social", "image_prompts", "article_draft", "article_revision",
+        "persona", "compare", "images", "fact_check",
+    ]
+
+
+def test_memo_is_off_without_caching(calls, monkeypatch):
+    monkeypatch.delenv("WHISPERFORGE_CACHE")
+    _run()
+    n = len(calls)
+    assert _run().memo == {}
+    assert len(calls) == 2 * n
+
+
+def test_failed_stages_are_not_memoized(calls, monkeypatch):
+    from whisperforge_core import llm as llm_mod
+    monkeypatch.setattr(llm_mod, "generate", lambda ct, *a, **k: None if ct == "wisdom_extraction" else "ok")
+    assert _run().wisdom is None
+
+    monkeypatch.setattr(llm_mod, "generate", lambda ct, *a, **k: f"{ct} output")
+    retried = _run()
+    assert retried.memo.get("hit") is not True
+    assert retried.wisdom == "wisdom_extraction output"
+    assert _run().memo == {"hit": True}
+
+
+def test_local_cleanup_that_removes_nothing_is_memoized_and_reused(calls):
+    checkpoints = {}
+    first = _run(cleanup="local", checkpoint=checkpoints.__setitem__)
+    assert first.cleaned_transcript is None and first.precleanup["removed_chars"] == 0
+
+    assert _run(cleanup="local").memo == {"hit": True}
+    resumed = _run(
+        cleanup="local", prompts={"social_media": "Shorter posts, please."},
+        reuse={"cleanup": checkpoints["cleanup"]},
+    )
+    assert "cleanup" in resumed.reused_stages
+
+
+def test_kb_index_is_left_out_when_rag_is_off(monkeypatch):
+    from whisperforge_core.rag import store
+    monkeypatch.setattr(store, "index_version", lambda user: pytest.fail("KB index read"))
+    fp = run_memo.fingerprint("t", settings={"user": "kris", "rag_mode": "never"})
+    assert fp.components["kb_index"] == ""
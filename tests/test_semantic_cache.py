@@ -0,0 +1,184 @@
+"""Tests for whisperforge_core.semantic_cache.
+
+Swaps the sentence-transformer for a bag-of-words hashing embedder so
+near-duplicate texts score close to 1.0 and unrelated texts don't, without
+loading a model.
+"""
+
+import hashlib
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from whisperforge_core import llm, semantic_cache
+from whisperforge_core.rag import embedder
+
+
+def _bow_embed(texts):
+    out = np.zeros((len(texts), 64), dtype=np.float32)
+    for i, t in enumerate(texts):
+        for word in t.lower().split():
+            out[i, hashlib.sha1(word.encode()).digest()[0] % 64] += 1.0
+        out[i] /= np.linalg.norm(out[i]) + 1e-9
+    return out
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setattr(semantic_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(embedder, "embed", _bow_embed)
+    monkeypatch.setattr(embedder, "model_id_hash", lambda: "bowhash")
+    monkeypatch.setenv("WHISPERFORGE_SEMANTIC_CACHE", "1")
+    monkeypatch.delenv("WHISPERFORGE_CACHE", raising=False)
+    semantic_cache.reset_stats()
+
+
+BASE = (
+    "we talked about how the river restoration project brought volunteers "
+    "from three towns together and how the salmon counts doubled after the "
+    "second season of planting native willows along the banks"
+)
+
+
+def _bucket(**overrides):
+    args = dict(
+        content_type="wisdom_extraction", provider="OpenAI", model="gpt-4o",
+        max_tokens=1500, kb_block="", prompt_body="extract wisdom",
+    )
+    args.update(overrides)
+    return semantic_cache.bucket_key(**args)
+
+
+class TestLookup:
+    def test_near_duplicate_is_served(self):
+        bucket = _bucket()
+        semantic_cache.store(bucket, BASE, "stored wisdom", key="k1")
+        hit = semantic_cache.lookup(bucket, "um " + BASE)
+        assert hit is not None
+        assert hit.response == "stored wisdom"
+        assert hit.approximate is True
+        assert hit.matched_key == "k1"
+        assert semantic_cache.audit_log() == [hit]
+
+    def test_unrelated_text_misses(self):
+        bucket = _bucket()
+        semantic_cache.store(bucket, BASE, "stored wisdom")
+        other = (
+            "quarterly revenue projections for the enterprise software "
+            "division depend on renewal rates and churn in the mid market "
+            "segment according to the finance team memo from tuesday"
+        )
+        assert semantic_cache.lookup(bucket, other) is None
+
+    def test_prompt_change_uses_different_bucket(self):
+        semantic_cache.store(_bucket(), BASE, "stored wisdom")
+        assert semantic_cache.lookup(_bucket(prompt_body="new prompt"), BASE) is None
+
+    def test_threshold_env_override(self, monkeypatch):
+        bucket = _bucket()
+        semantic_cache.store(bucket, BASE, "stored wisdom")
+        monkeypatch.setenv("WHISPERFORGE_SEMANTIC_CACHE_THRESHOLD", "1.01")
+        assert semantic_cache.lookup(bucket, "um " + BASE) is None
+
+    def test_one_changed_window_misses_long_input(self):
+        bucket = _bucket()
+        words = " ".join([BASE] * 20).split()[:600]
+        semantic_cache.store(bucket, " ".join(words), "stored")
+        # Same length, same first two windows, third window rewritten.
+        tail_changed = " ".join(words[:400] + [f"unrelated{i}" for i in range(200)])
+        assert semantic_cache.lookup(bucket, tail_changed) is None
+
+    def test_stats_count_hits_and_misses(self):
+        bucket = _bucket()
+        semantic_cache.store(bucket, BASE, "stored")
+        semantic_cache.lookup(bucket, BASE)
+        semantic_cache.lookup(_bucket(model="gpt-4o-mini"), BASE)
+        stats = semantic_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["stores"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_embed_failure_is_a_miss(self, monkeypatch):
+        bucket = _bucket()
+        semantic_cache.store(bucket, BASE, "stored")
+        monkeypatch.setattr(embedder, "embed", MagicMock(side_effect=RuntimeError("offline")))
+        assert semantic_cache.lookup(bucket, BASE) is None
+        assert semantic_cache.stats()["errors"] == 1
+
+    def test_entries_pointing_past_the_vectors_are_skipped(self):
+        bucket = _bucket()
+        semantic_cache.store(bucket, BASE, "stored")
+        entries, vectors = semantic_cache._load_bucket(bucket)
+        # What a reader pairing old entries with compacted vectors would see.
+        semantic_cache._persist(bucket, [{**entries[0], "offset": 5}], vectors)
+        assert semantic_cache.lookup(bucket, BASE) is None
+
+
+class TestGenerateIntegration:
+    def test_second_near_duplicate_call_skips_the_model(self, monkeypatch):
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="fresh wisdom"))]
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+        monkeypatch.setattr(llm, "_openai", lambda: client)
+
+        first = llm.generate("wisdom_extraction", {"transcript": BASE}, "OpenAI", "gpt-4o")
+        second = llm.generate(
+            "wisdom_extraction", {"transcript": "so " + BASE}, "OpenAI", "gpt-4o",
+        )
+        assert first == second == "fresh wisdom"
+        assert client.chat.completions.create.call_count == 1
+        assert semantic_cache.stats()["hits"] == 1
+
+    def test_semantic_hits_never_reach_the_exact_cache(self, monkeypatch, tmp_path):
+        from whisperforge_core import cache
+        monkeypatch.setenv("WHISPERFORGE_CACHE", "1")
+        monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "exact")
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="fresh wisdom"))]
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+        monkeypatch.setattr(llm, "_openai", lambda: client)
+        near = {"transcript": "so " + BASE}
+
+        llm.generate("wisdom_extraction", {"transcript": BASE}, "OpenAI", "gpt-4o")
+        assert llm.generate("wisdom_extraction", near, "OpenAI", "gpt-4o") == "fresh wisdom"
+        assert [h.stage for h in semantic_cache.audit_log()] == ["wisdom_extraction"]
+
+        # With the semantic layer off, the near-duplicate is a real miss.
+        monkeypatch.delenv("WHISPERFORGE_SEMANTIC_CACHE")
+        llm.generate("wisdom_extraction", near, "OpenAI", "gpt-4o")
+        assert client.chat.completions.create.call_count == 2
+
+    def test_pipeline_result_lists_approximate_stages(self, monkeypatch):
+        from whisperforge_core import pipeline
+
+        def fake_generate(ct, ctx, *a, **k):
+            if ct == "social_media":
+                semantic_cache._audit.append(semantic_cache.SemanticHit(
+                    bucket="b", matched_key="k", similarity=0.99, response="posts", stage=ct,
+                ))
+            return f"{ct} output"
+
+        monkeypatch.setattr(llm, "generate", fake_generate)
+        result = pipeline.run("a transcript", "OpenAI", "gpt-4o", cleanup=False, chapters=False)
+
+        assert result.semantic_hits == [{
+            "bucket": "b", "matched_key": "k", "similarity": 0.99,
+            "stage": "social_media", "approximate": True,
+        }]
+
+    def test_disabled_flag_never_embeds(self, monkeypatch):
+        monkeypatch.delenv("WHISPERFORGE_SEMANTIC_CACHE")
+        embed = MagicMock(side_effect=AssertionError("should not embed"))
+        monkeypatch.setattr(embedder, "embed", embed)
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="out"))]
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+        monkeypatch.setattr(llm, "_openai", lambda: client)
+
+        assert llm.generate("wisdom_extraction", {"transcript": BASE}, "OpenAI", "gpt-4o") == "out"
+        embed.assert_not_called()
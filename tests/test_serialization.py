@@ -0,0 +1,121 @@
+"""Tests for whisperforge_core.serialization — the pickle-free encoding
+behind ``cache`` and large run artifacts."""
+
+import json
+import pickle
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from whisperforge_core import cache, run_artifacts, serialization
+
+
+@pytest.fixture(params=["json-zlib", "json-zstd", "msgpack-zlib", "msgpack-zstd"])
+def codec(request, monkeypatch):
+    """Each codec/compressor pairing: ``msgpack`` and ``zstandard`` are used
+    when the pairing names them and hidden otherwise. Returns the header's
+    ``(codec, compression)`` bytes."""
+    name, compressor = request.param.split("-")
+    monkeypatch.setattr(
+        serialization, "msgpack", pytest.importorskip("msgpack") if name == "msgpack" else None,
+    )
+    monkeypatch.setattr(
+        serialization, "zstandard",
+        pytest.importorskip("zstandard") if compressor == "zstd" else None,
+    )
+    return {"json": b"j", "msgpack": b"m"}[name], {"zlib": b"d", "zstd": b"z"}[compressor]
+
+
+def test_round_trip_keeps_types(codec):
+    value = {
+        "text": "ünïcode",
+        "n": [1, 2.5, None, True],
+        "pair": ("a", 1),
+        "tags": {"x"},
+        "raw": b"\x00\x01",
+        "path": Path("/tmp/a.png"),
+        "when": datetime(2026, 10, 19, 12, 30),
+        3: "int key",
+        "nested": {"__wf__": "looks like a tag"},
+    }
+    blob = serialization.dumps(value)
+    assert blob[3:4] == codec[0]
+    assert serialization.loads(blob) == value
+
+
+def test_unsupported_types_are_refused():
+    with pytest.raises(TypeError):
+        serialization.dumps(object())
+
+
+def test_large_values_are_compressed(monkeypatch, codec):
+    monkeypatch.setenv("WHISPERFORGE_COMPRESS_MIN_BYTES", "1024")
+    text = "the same long transcript sentence, again and again. " * 400
+    blob = serialization.dumps(text)
+    assert blob[3:5] == codec[0] + codec[1]
+    assert len(blob) * 5 < len(text)
+    assert serialization.loads(blob) == text
+    assert serialization.dumps("short")[4:5] == b"-"
+
+
+def test_corrupt_blobs_raise_value_error(codec):
+    blob = bytearray(serialization.dumps("x" * 50000))
+    blob[-10:] = b"\x00" * 10
+    with pytest.raises(ValueError):
+        serialization.loads(bytes(blob))
+
+
+def test_large_run_artifacts_are_compressed_and_still_load(tmp_path, monkeypatch, codec):
+    monkeypatch.setattr(run_artifacts, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setenv("WHISPERFORGE_COMPRESS_MIN_BYTES", "4096")
+    run_artifacts.start_run("run-1", {"source": "paste"})
+    article = "A paragraph of the article that repeats itself. " * 2000
+
+    path = run_artifacts.write_stage("run-1", "article_draft", {"article": article})
+
+    assert path.read_bytes()[3:5] == b"j" + codec[1]
+    assert path.stat().st_size * 5 < len(article)
+    assert run_artifacts.load_stage_payload("run-1", "article_draft") == {"article": article}
+    # Small files stay plain, indented JSON.
+    manifest = json.loads(run_artifacts.manifest_path("run-1").read_text())
+    assert manifest["run_id"] == "run-1"
+
+
+def test_cache_stores_no_pickles_and_migrates_old_ones(tmp_path, monkeypatch, codec):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    monkeypatch.setenv("WHISPERFORGE_COMPRESS_MIN_BYTES", "1024")
+    article = "An article paragraph that the cache should shrink. " * 200
+    cache.put("new", {"wisdom": "w", "article": article})
+    cache.flush()
+    assert cache.backend().get("new")[3:5] == codec[0] + codec[1]
+    assert cache.get("new") == {"wisdom": "w", "article": article}
+
+    (tmp_path / "old.pkl").write_bytes(pickle.dumps("legacy value"))
+    assert cache.get("old") == "legacy value"
+    cache.flush()
+    assert serialization.is_encoded(cache.backend().get("old"))
+
+
+_ran = []
+
+
+def _payload(marker):
+    _ran.append(marker)
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (_payload, ("ran",))
+
+
+def test_backend_pickles_are_never_loaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setenv("WHISPERFORGE_CACHE_MEMORY_BYTES", "0")
+    # What a hostile shared-cache client could store under a key.
+    cache.backend().put("evil", pickle.dumps(_Exploit()))
+
+    assert cache.get("evil") is None
+    assert cache.get_many(["evil"]) == {}
+    assert _ran == []
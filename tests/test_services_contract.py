@@ -141,15 +141,20 @@ def test_processing_pipeline_accepts_modern_options_and_returns_full_result(monk
         "article": "article",
         "raw_transcript": "raw",
         "cleaned_transcript": "clean",
+        "precleanup": {},
         "chapters": [{"title": "Intro"}],
         "article_draft": "draft",
         "article_critique": "critique",
         "fact_check_flags": [{"claim": "x", "issue": "y"}],
+        "fact_check_coverage": {},
         "generated_images": [{"path": "/tmp/a.png", "prompt": "p", "succeeded": True}],
         "article_compare": "compare",
         "compare_label": "OpenAI gpt-4o",
         "persona_articles": [{"name": "Direct", "text": "persona"}],
         "songforge": {"lyric_draft": "lyric"},
+        "memo": {},
+        "reused_stages": [],
+        "semantic_hits": [],
     }
 
 
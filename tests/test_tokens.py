@@ -0,0 +1,113 @@
+"""Tests for whisperforge_core.tokens and the pre-call budget in generate.
+
+Forces the heuristic counter (no tiktoken) so expectations are the same
+whether or not the tokenizer is installed.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from whisperforge_core import cost, llm, tokens
+
+
+@pytest.fixture(autouse=True)
+def heuristic(monkeypatch):
+    monkeypatch.setattr(tokens, "tiktoken", None)
+    tokens._encoding.cache_clear()
+    yield
+    tokens._encoding.cache_clear()
+
+
+@pytest.fixture
+def mock_openai(monkeypatch):
+    response = MagicMock()
+    response.choices = [MagicMock(message=MagicMock(content="openai result"))]
+    response.usage = MagicMock(prompt_tokens=1234, completion_tokens=56)
+    client = MagicMock()
+    client.chat.completions.create.return_value = response
+    monkeypatch.setattr(llm, "_openai", lambda: client)
+    cost.reset()
+    yield client
+    cost.reset()
+
+
+class TestCount:
+    def test_empty_is_zero(self):
+        assert tokens.count("") == 0
+        assert tokens.count(None) == 0
+
+    def test_takes_the_more_pessimistic_rule(self):
+        # Short words: the word rule dominates.
+        assert tokens.count("a b c d e f g h i j") == 13
+        # One long run of characters: the char rule dominates.
+        assert tokens.count("a" * 4000) == 1000
+
+    def test_unfetchable_encoding_falls_back_to_the_heuristic(self, monkeypatch):
+        offline = MagicMock()
+        offline.encoding_for_model.side_effect = ConnectionError("no network")
+        offline.get_encoding.side_effect = ConnectionError("no network")
+        monkeypatch.setattr(tokens, "tiktoken", offline)
+        assert tokens.count("a b c d e f g h i j", "gpt-4o") == 13
+        assert tokens.count("a b c d e f g h i j") == 13
+
+
+class TestWindows:
+    def test_every_window_fits_and_covers_the_text(self):
+        text = " ".join(f"word{i}" for i in range(1500))
+        parts = tokens.windows(text, 200)
+        assert len(parts) > 1
+        assert all(tokens.count(p) <= 200 for p in parts)
+        assert " ".join(parts).split() == text.split()
+
+    def test_overlap_repeats_the_tail(self):
+        text = " ".join(f"w{i}" for i in range(600))
+        parts = tokens.windows(text, 100, overlap=20)
+        assert parts[0].split()[-1] in parts[1].split()
+
+
+class TestContextWindow:
+    def test_known_unknown_and_ollama(self, monkeypatch):
+        assert tokens.context_window("OpenAI", "gpt-4") == 8_192
+        assert tokens.context_window("Anthropic", "claude-next") == 200_000
+        monkeypatch.setenv("WHISPERFORGE_OLLAMA_CONTEXT_TOKENS", "4096")
+        assert tokens.context_window(llm.OLLAMA_PROVIDER_LABEL, "llama3") == 4096
+
+
+class TestTrim:
+    def test_keeps_head_and_marks_truncation(self):
+        text = "\n\n".join(f"## Doc {i}\n" + "word " * 200 for i in range(10))
+        trimmed = tokens.trim(text, 600)
+        assert tokens.count(trimmed) <= 600
+        assert trimmed.startswith("## Doc 0")
+        assert trimmed.endswith(tokens.TRUNCATION_NOTE)
+
+    def test_fitting_text_is_untouched(self):
+        assert tokens.trim("short", 100) == "short"
+
+
+class TestGenerateBudget:
+    def test_oversized_legacy_kb_is_trimmed_to_fit(self, mock_openai):
+        kb = {f"doc{i}": "insight " * 2000 for i in range(4)}
+        result = llm.generate(
+            "wisdom_extraction", {"transcript": "short talk"}, "OpenAI", "gpt-4",
+            knowledge_base=kb,
+        )
+        assert result == "openai result"
+        system = mock_openai.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+        assert tokens.TRUNCATION_NOTE in system
+        assert tokens.count(system) < tokens.context_window("OpenAI", "gpt-4")
+
+    def test_transcript_that_cannot_fit_is_refused_before_the_call(self, mock_openai):
+        result = llm.generate(
+            "wisdom_extraction", {"transcript": "word " * 10_000}, "OpenAI", "gpt-4",
+        )
+        assert result is None
+        mock_openai.chat.completions.create.assert_not_called()
+
+    def test_estimate_is_recorded_next_to_actual_usage(self, mock_openai):
+        llm.generate("wisdom_extraction", {"transcript": "short talk"}, "OpenAI", "gpt-4o")
+        (entry,) = cost.ledger()
+        assert entry.input_tokens == 1234
+        assert entry.estimated_input_tokens > 0
+        assert cost.estimate_cost().estimated_input_tokens == entry.estimated_input_tokens
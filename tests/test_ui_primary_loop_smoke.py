@@ -53,9 +53,12 @@ def test_ui_primary_loop_smoke_paste_run_and_artifacts(monkeypatch, tmp_path):
     monkeypatch.setattr(run_artifacts, "RUNS_DIR", tmp_path / "runs")
     monkeypatch.setattr(sidebar_mod, "discover_ollama_models", lambda: {})
     monkeypatch.setattr(pipeline_mod, "_inspect_retrieval", lambda *_a, **_k: None)
-    monkeypatch.setattr(output_mod.llm, "generate_title", lambda _t: "UI Smoke Run")
-    monkeypatch.setattr(output_mod.llm, "generate_summary", lambda _t: "UI smoke summary.")
-    monkeypatch.setattr(output_mod.llm, "generate_tags", lambda _t, max_tags=5: ["ui-smoke"])
+    monkeypatch.setattr(
+        output_mod.llm, "generate_metadata",
+        lambda _t, tag_context="", max_tags=5: {
+            "title": "UI Smoke Run", "summary": "UI smoke summary.", "tags": ["ui-smoke"],
+        },
+    )
 
     def fake_run_pipeline(transcript, provider, model, **kwargs):
         progress = kwargs.get("progress")
@@ -524,6 +524,22 @@ def kb_benchmark() -> None:
                 f"before prompt caching. With Anthropic cache on the stable "
                 f"legacy block, the real-world gap narrows ~10×."
             )
+            try:
+                layouts = bench_mod.compare_rag_layouts(
+                    user, transcript=query, provider=provider, model=model,
+                )
+            except Exception as e:
+                st.warning(f"Layout comparison failed: {e}")
+            else:
+                st.info(
+                    f"**RAG layout:** per-stage blocks "
+                    f"{layouts['per_stage']['tokens']:,} tok · "
+                    f"${layouts['per_stage']['cost_usd']:.5f} → shared prefix "
+                    f"({layouts['shared']['chunks']} chunks) + pointers "
+                    f"{layouts['shared']['tokens']:,} tok · "
+                    f"${layouts['shared']['cost_usd']:.5f}, "
+                    f"{layouts['shared']['cache_read_tokens']:,} read from cache."
+                )
 
     if st.button("Inspect retrieval", use_container_width=True,
                  key="bench_inspect"):
@@ -579,7 +595,8 @@ def run_history() -> None:
         )
         choices = [item["run_id"] for item in summaries if item["run_id"]]
         selected = st.selectbox("Run to reopen", choices, key="run_reopen_select") if choices else None
-        c1, c2 = st.columns(2)
+        summary = next((item for item in summaries if item["run_id"] == selected), {})
+        c1, c2, c3 = st.columns(3)
         with c1:
             if selected and st.button("Reopen output", use_container_width=True, key="reopen_run"):
                 ok = _reopen_run(selected)
@@ -588,6 +605,17 @@ def run_history() -> None:
                 else:
                     st.warning("That run has no saved output stage yet. Partial metadata is visible above.")
         with c2:
+            if (
+                selected and summary.get("status") in ("failed", "running")
+                and st.button("Resume run", use_container_width=True, key="resume_run",
+                              help="Continue from the first stage the run didn't finish, "
+                                   "reusing every saved stage.")
+            ):
+                with st.spinner("Resuming run…"):
+                    ok = _resume_run(selected)
+                if ok:
+                    st.rerun()
+        with c3:
             if selected:
                 run_path = run_artifacts.run_dir(selected)
                 st.link_button("Open artifact folder", run_path.resolve().as_uri(), use_container_width=True)
@@ -633,6 +661,16 @@ def run_history() -> None:
         st.rerun()
 
 
+def _resume_run(run_id: str) -> bool:
+    from whisperforge_core import pipeline
+    try:
+        pipeline.resume(run_id)
+    except Exception as e:
+        st.error(f"Resume failed: {e}")
+        return False
+    return _reopen_run(run_id)
+
+
 def _reopen_run(run_id: str) -> bool:
     output = run_artifacts.load_stage_payload(run_id, "session_output")
     if not output:
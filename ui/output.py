@@ -16,6 +16,7 @@ from typing import Optional
 import streamlit as st
 
 from whisperforge_core import adapters as adapters_mod
+from whisperforge_core import cascade as cascade_mod
 from whisperforge_core import composition_review as review_mod
 from whisperforge_core import cost as cost_mod
 from whisperforge_core import export as export_mod
@@ -231,21 +232,15 @@ def _build_bundle() -> notion.ContentBundle:
     if getattr(s.audio_file, "name", None):
         audio_filename = s.audio_file.name
 
+    # One fused structured call for title + summary + tags (cached by
+    # transcript hash); it falls back to the per-field helpers itself.
     try:
-        title_suffix = llm.generate_title(transcript)
+        metadata = llm.generate_metadata(transcript, tag_context=s.wisdom or "", max_tags=5)
     except Exception:
-        title_suffix = "Untitled"
-    title = f"WHISPER: {title_suffix}"
-    try:
-        summary = llm.generate_summary(transcript)
-    except Exception:
-        summary = "Summary unavailable."
-    try:
-        tags = llm.generate_tags(
-            (transcript or "") + " " + (s.wisdom or ""), max_tags=5,
-        ) or ["whisperforge"]
-    except Exception:
-        tags = ["whisperforge"]
+        metadata = {}
+    title = f"WHISPER: {metadata.get('title') or 'Untitled'}"
+    summary = metadata.get("summary") or "Summary unavailable."
+    tags = metadata.get("tags") or ["whisperforge"]
 
     models_used = []
     if s.ai_provider and s.ai_model:
@@ -346,6 +341,21 @@ def _build_bundle() -> notion.ContentBundle:
         "output_tokens": b.output_tokens,
         "cache_read_tokens": b.cache_read_tokens,
         "cache_write_tokens": b.cache_write_tokens,
+        "hedge_calls": b.hedge_calls,
+        "hedge_usd": round(b.hedge_usd, 6),
+        "cascade": cascade_mod.stats(),
+        "semantic_hits": s.get("semantic_hits") or [],
+        "stages": {
+            stage: {
+                "llm_usd": round(sb.llm_usd, 6),
+                "input_tokens": sb.input_tokens,
+                "output_tokens": sb.output_tokens,
+                "cache_read_tokens": sb.cache_read_tokens,
+                "cache_write_tokens": sb.cache_write_tokens,
+            }
+            for stage, sb in cost_mod.by_stage().items()
+            if stage != "other" or sb.llm_usd
+        },
         "duration_seconds": duration,
         "backend": os.getenv("TRANSCRIPTION_BACKEND", "openai"),
         "flags": {
@@ -18,9 +18,10 @@ import streamlit_antd_components as sac
 
 from whisperforge_core import adapters as adapters_mod
 from whisperforge_core import captures as captures_mod
+from whisperforge_core import pipeline as core_pipeline
+from whisperforge_core import precleanup, run_artifacts
 from whisperforge_core import prompts as prompts_mod
 from whisperforge_core import recipes as recipes_mod
-from whisperforge_core import run_artifacts
 from whisperforge_core import scorecards as scorecards_mod
 from whisperforge_core.logging import get_logger
 
@@ -193,30 +194,15 @@ def _execute_run() -> None:
             def checkpoint_cb(stage: str, payload: dict) -> None:
                 _write_run_stage(s, stage, payload)
 
-            length_map = {"Brief": 500, "Standard": 1500, "Long-form": 3000}
-            article_words = length_map.get(s.article_length, 1500)
+            options = _pipeline_options(pending, s)
             result = adapters.processor.run_pipeline(
                 s.transcription,
-                s.ai_provider, s.ai_model,
+                options.pop("provider"), options.pop("model"),
                 knowledge_base=kb,
-                cleanup=bool(s.cleanup_enabled),
-                chapters=bool(s.chapters_enabled),
                 segments=s.transcription_segments or None,
                 progress=progress_cb,
-                agentic=bool(s.agentic_drafting),
-                fact_check=bool(s.fact_check_enabled),
-                generate_images=bool(s.images_enabled),
-                image_style=s.image_style,
-                image_aspect_ratio=s.image_aspect,
-                image_model=s.image_model,
-                article_length_words=article_words,
-                user=s.selected_user,
-                rag_mode=s.get("rag_mode", "auto"),
-                compare_provider=s.get("compare_provider"),
-                compare_model=s.get("compare_model"),
-                personas=s.get("selected_personas") or None,
-                recipe=s.get("recipe_effective_settings"),
                 checkpoint=checkpoint_cb,
+                **options,
             )
 
             s.wisdom = result.wisdom or ""
@@ -229,29 +215,19 @@ def _execute_run() -> None:
             s.article_critique = result.article_critique
             s.fact_check_flags = result.fact_check_flags or []
             s.fact_check_ran = bool(s.fact_check_enabled)
+            s.fact_check_coverage = result.fact_check_coverage or {}
             s.generated_images = result.generated_images or []
             s.article_compare = result.article_compare
             s.compare_label = result.compare_label
             s.persona_articles = result.persona_articles or []
             s.songforge = result.songforge or {}
+            s.semantic_hits = result.semantic_hits or []
             s.scorecard_summary = _build_scorecard_summary(s)
             s.pipeline_stage_idx = len(_STAGES) - 1
             _write_run_stage(s, "scorecard", s.scorecard_summary)
-            _write_run_stage(s, "session_output", {
-                "wisdom": s.wisdom,
-                "outline": s.outline,
-                "social_content": s.social_content,
-                "image_prompts": s.image_prompts,
-                "article": s.article,
-                "chapters": s.chapters,
-                "fact_check_flags": s.fact_check_flags,
-                "generated_images": s.generated_images,
-                "article_compare": s.article_compare,
-                "compare_label": s.compare_label,
-                "persona_articles": s.persona_articles,
-                "songforge": s.songforge,
-                "scorecard_summary": s.scorecard_summary,
-            })
+            _write_run_stage(
+                s, "session_output", core_pipeline.session_output(result, s.scorecard_summary),
+            )
             _mark_run_status(s, "completed")
             _mark_capture_status(s, "completed")
 
@@ -309,6 +285,8 @@ def _run_metadata(pending, mode: str, s) -> dict:
         "kb_governance_warning": s.get("kb_governance_warning"),
         "provider": s.ai_provider,
         "model": s.ai_model,
+        # Exact run options, so pipeline.rerun / pipeline.resume can replay them.
+        "pipeline": _pipeline_options(pending, s),
         "settings": {
             "cleanup": bool(s.cleanup_enabled),
             "chapters": bool(s.chapters_enabled),
@@ -323,6 +301,35 @@ def _run_metadata(pending, mode: str, s) -> dict:
     }
 
 
+def _pipeline_options(pending, s) -> dict:
+    """``run_pipeline`` keyword arguments for this run, besides the
+    transcript, KB and callbacks."""
+    length_map = {"Brief": 500, "Standard": 1500, "Long-form": 3000}
+    return {
+        "provider": s.ai_provider,
+        "model": s.ai_model,
+        # Dictated text is already clean: local pass only.
+        "cleanup": (
+            "local" if s.cleanup_enabled and pending.source in precleanup.TEXT_SOURCES
+            else bool(s.cleanup_enabled)
+        ),
+        "chapters": bool(s.chapters_enabled),
+        "agentic": bool(s.agentic_drafting),
+        "fact_check": bool(s.fact_check_enabled),
+        "generate_images": bool(s.images_enabled),
+        "image_style": s.image_style,
+        "image_aspect_ratio": s.image_aspect,
+        "image_model": s.image_model,
+        "article_length_words": length_map.get(s.article_length, 1500),
+        "user": s.selected_user,
+        "rag_mode": s.get("rag_mode", "auto"),
+        "compare_provider": s.get("compare_provider"),
+        "compare_model": s.get("compare_model"),
+        "personas": s.get("selected_personas") or None,
+        "recipe": s.get("recipe_effective_settings"),
+    }
+
+
 def _ensure_capture(pending, run_id: str):
     capture_id = getattr(pending, "capture_id", None)
     if capture_id:
@@ -90,6 +90,7 @@ _PER_RUN_DEFAULTS: Dict[str, Any] = {
     "article_critique": None,
     "fact_check_flags": [],
     "fact_check_ran": False,
+    "fact_check_coverage": {},
     "generated_images": [],
     # A/B result + label, set by pipeline.run when compare_provider/model are on
     "article_compare": None,
@@ -98,6 +99,8 @@ _PER_RUN_DEFAULTS: Dict[str, Any] = {
     "persona_articles": [],
     # SongForge creative pack, populated by the SongForge recipe.
     "songforge": {},
+    # Approximate semantic-cache answers — PipelineResult.semantic_hits.
+    "semantic_hits": [],
     # Progress state (drives sac.steps + st.status)
     "pipeline_stage_idx": 0,                     # 0..7 where 7 = done
     "pipeline_stage_label": "",
@@ -9,9 +9,11 @@ on-demand dialogs.
 from __future__ import annotations
 
 import os
+import threading
 
 import streamlit as st
 
+from whisperforge_core import cache
 from whisperforge_core import images as images_mod
 from whisperforge_core import prompts as prompts_mod
 from whisperforge_core.config import LLM_MODELS
@@ -123,6 +125,9 @@ def render() -> None:
             if st.button("⚙ More", use_container_width=True, key="btn_more"):
                 dialogs.generation_settings()
 
+        if cache.enabled():
+            _cache_panel()
+
         # --- Status footer ----------------------------------------------
         # Three tiny status dots — intentionally kept because they're part
         # of the aesthetic the user specifically called out.
@@ -136,3 +141,48 @@ def render() -> None:
             """,
             unsafe_allow_html=True,
         )
+
+
+def _cache_panel() -> None:
+    """Per-namespace cache counters and a prune form. Pruning runs on a
+    background thread — the store stays readable meanwhile — so the
+    sidebar never blocks on it."""
+    from whisperforge_core.cache.__main__ import format_bytes, parse_duration, parse_size
+
+    with st.expander("Cache", expanded=False):
+        rows = cache.stats()
+        if not rows:
+            st.caption("Empty.")
+        for ns in sorted(rows):
+            row = rows[ns]
+            lookups = row.get("hits", 0) + row.get("misses", 0)
+            rate = f"{row.get('hits', 0) / lookups:.0%}" if lookups else "–"
+            st.caption(
+                f"**{ns or 'untagged'}** · {rate} hits · "
+                f"{format_bytes(row.get('stored_bytes', 0))} · "
+                f"{row.get('saved_s', 0):.0f}s saved"
+            )
+        job = st.session_state.get("_cache_prune")
+        if job is not None and job["thread"].is_alive():
+            st.caption("Pruning…")
+            return
+        if job is not None and job.get("result"):
+            removed, freed = job["result"]
+            st.caption(f"Pruned {removed} entries ({format_bytes(freed)}).")
+        older = st.text_input("Unused for", value="30d", key="cache_prune_age")
+        budget = st.text_input("Max size", value="", placeholder="e.g. 1G", key="cache_prune_size")
+        if st.button("Prune", use_container_width=True, key="btn_cache_prune"):
+            try:
+                older_s = parse_duration(older) if older.strip() else None
+                max_bytes = parse_size(budget) if budget.strip() else None
+            except ValueError as e:
+                st.error(str(e))
+                return
+            job = {}
+
+            def _run() -> None:
+                job["result"] = cache.prune(older_than_s=older_s, max_bytes=max_bytes)
+
+            job["thread"] = threading.Thread(target=_run, name="cache-prune", daemon=True)
+            job["thread"].start()
+            st.session_state["_cache_prune"] = job
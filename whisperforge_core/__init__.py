@@ -5,18 +5,25 @@ export, prompt management, capture records, KB audits, caching, and logging. Imp
 Streamlit monolith and the FastAPI microservices — must NOT import streamlit.
 """
 
-from . import adapters, audio, cache, captures, composition_review, config, cost, export, handoff_router, handoffs, history, images, kb_audit, llm, notion, pipeline, prompts, recipes, resurfacing, run_artifacts, run_story, scorecards, songforge
+from . import adapters, audio, batch, cache, cache_backends, captures, cascade, chaptering, composition_review, config, cost, export, grounding, handoff_router, handoffs, hashing, hedging, history, images, kb_audit, llm, mapreduce, notion, pipeline, precleanup, prompts, recipes, resurfacing, run_artifacts, run_memo, run_story, scorecards, semantic_cache, serialization, songforge, tokens
 from . import logging as logging_module
 
 __all__ = [
     "adapters",
     "audio",
+    "batch",
     "cache",
+    "cache_backends",
     "captures",
+    "cascade",
+    "chaptering",
     "composition_review",
     "config",
     "cost",
     "export",
+    "grounding",
+    "hashing",
+    "hedging",
     "history",
     "handoffs",
     "handoff_router",
@@ -24,13 +31,19 @@ __all__ = [
     "kb_audit",
     "llm",
     "logging_module",
+    "mapreduce",
     "notion",
     "pipeline",
+    "precleanup",
     "prompts",
     "recipes",
     "resurfacing",
     "run_artifacts",
+    "run_memo",
     "run_story",
     "scorecards",
+    "semantic_cache",
+    "serialization",
     "songforge",
+    "tokens",
 ]
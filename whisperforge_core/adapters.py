@@ -16,7 +16,7 @@ import json
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Dict, Optional, Protocol
+from typing import Callable, Dict, Optional, Protocol, Union
 
 from . import audio as audio_mod
 from . import llm as llm_mod
@@ -57,7 +57,7 @@ class Processor(Protocol):
         prompts: Optional[Dict[str, str]] = None,
         knowledge_base: Optional[Dict[str, str]] = None,
         progress: Optional[Callable] = None,
-        cleanup: bool = True,
+        cleanup: Union[bool, str] = True,
         chapters: bool = True,
         segments: Optional[list] = None,
         agentic: bool = False,
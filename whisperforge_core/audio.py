@@ -8,7 +8,6 @@ Large files (>20MB) are split into ~25MB chunks (dynamically sized, capped at
 sequentially and concatenated.
 """
 
-import hashlib
 import json
 import math
 import os
@@ -22,7 +21,7 @@ from typing import Any, Callable, List, Optional, Tuple
 from openai import OpenAI
 from pydub import AudioSegment
 
-from . import cache
+from . import cache, hashing
 from .config import (
     CHUNKER,
     DEFAULT_CHUNK_TARGET_MB,
@@ -860,16 +859,19 @@ def transcribe_audio(
 
     Routes small files straight to Whisper and large ones through chunking.
     When WHISPERFORGE_CACHE=1, the result is cached by
-    sha256(audio_bytes) + whisper_model so repeated runs on the same file
-    skip the API call entirely.
+    hash(audio_bytes) + whisper_model so repeated runs on the same file
+    skip the API call entirely; file hashes are memoized per file stat.
     """
     owns_tmp = False
+    # The content hash only keys the cache; skip reading the audio for it
+    # when caching is off.
+    caching = cache.enabled()
     if isinstance(source, (str, Path)):
         audio_path = str(source)
-        content_hash = cache.file_hash(audio_path)
+        content_hash = cache.file_hash(audio_path) if caching else ""
     else:
         # Assume bytes-like (e.g. Streamlit UploadedFile.getvalue())
-        content_hash = hashlib.sha256(source).hexdigest()
+        content_hash = hashing.digest(source) if caching else ""
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
             tmp.write(source)
             audio_path = tmp.name
@@ -891,4 +893,4 @@ def transcribe_audio(
                 except OSError:
                     pass
 
-    return cache.cached_or_compute(key, _compute)
+    return cache.cached_or_compute(key, _compute, namespace="transcribe")
@@ -0,0 +1,618 @@
+"""Offline batch mode for reprocessing a backlog of captures.
+
+Running ``pipeline.run`` over hundreds of transcripts overnight pays
+interactive prices for work nobody is waiting on, one serial call at a time.
+A batch job instead advances every run in lock-step: each *wave* gathers
+the next ready ``generate`` request of every run — cleanup for all of them,
+then wisdom for all of them, and so on — and submits the wave through the
+provider's batch endpoint (Anthropic Message Batches, OpenAI Batch API) at
+half the token price. When a wave's batch ends, its results unblock the
+dependent stages and the next wave is submitted.
+
+Requests are built by ``llm.prepare``, so they are byte-identical to what
+``generate`` would send (same KB block, cache breakpoints and cache key).
+Results are written to the exact cache when WHISPERFORGE_CACHE is on, and
+every stage lands in the run's artifacts under the same stage names
+``pipeline.run`` checkpoints, so the runs show up in history like any other.
+
+State lives in ``run_artifacts``: one manifest per run plus a job file
+holding the in-flight batch ids. A restarted process calls ``advance`` /
+``wait`` with the same ``job_id`` and picks up where it stopped — polling
+batches already submitted rather than paying for them twice.
+
+Providers plug in through ``BatchBackend``; Ollama has no batch endpoint, so
+``InlineBackend`` answers its requests synchronously on submit. Tests use a
+local fake. Out of scope: chapters, map-reduce, personas, comparison
+articles and image generation — run those interactively when needed.
+
+    job_id = batch.start(transcripts, "Anthropic", "claude-haiku-4-5")
+    batch.wait(job_id)              # or call batch.advance(job_id) from cron
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence
+
+from . import cache, llm, precleanup, run_artifacts
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_POLL_SECONDS = 60.0
+# Submissions per (run, stage) before a failing request finishes the stage
+# empty instead of being requeued.
+MAX_ATTEMPTS = 3
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    params: dict
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    text: Optional[str]
+    # Provider usage object as a plain dict (same field names as the
+    # interactive response), or None when the backend doesn't report it.
+    usage: Optional[dict] = None
+    error: str = ""
+
+
+class BatchBackend(Protocol):
+    """One provider's batch endpoint. ``poll`` returns "running", "ended"
+    or "failed"; ``results`` is only called once a batch has ended."""
+
+    def submit(self, requests: List[BatchRequest]) -> str: ...
+
+    def poll(self, batch_id: str) -> str: ...
+
+    def results(self, batch_id: str) -> List[BatchResult]: ...
+
+
+class AnthropicBatchBackend:
+    # https://docs.claude.com/en/docs/build-with-claude/batch-processing
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch = llm._anthropic().messages.batches.create(requests=[
+            {"custom_id": r.custom_id, "params": r.params} for r in requests
+        ])
+        return batch.id
+
+    def poll(self, batch_id: str) -> str:
+        batch = llm._anthropic().messages.batches.retrieve(batch_id)
+        return "ended" if batch.processing_status == "ended" else "running"
+
+    def results(self, batch_id: str) -> List[BatchResult]:
+        out = []
+        for entry in llm._anthropic().messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != "succeeded":
+                out.append(BatchResult(entry.custom_id, None, error=result.type))
+                continue
+            message = result.message
+            usage = getattr(message, "usage", None)
+            out.append(BatchResult(
+                entry.custom_id,
+                message.content[0].text,
+                usage=usage.model_dump() if usage is not None else None,
+            ))
+        return out
+
+
+class OpenAIBatchBackend:
+    # https://platform.openai.com/docs/guides/batch
+    _FAILED = ("failed", "expired", "cancelled")
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        lines = "\n".join(
+            json.dumps({
+                "custom_id": r.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": r.params,
+            })
+            for r in requests
+        )
+        client = llm._openai()
+        upload = client.files.create(
+            file=("whisperforge-batch.jsonl", io.BytesIO(lines.encode("utf-8"))),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> str:
+        status = llm._openai().batches.retrieve(batch_id).status
+        if status == "completed":
+            return "ended"
+        return "failed" if status in self._FAILED else "running"
+
+    def results(self, batch_id: str) -> List[BatchResult]:
+        client = llm._openai()
+        batch = client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return []
+        out = []
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            body = (entry.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if entry.get("error") or not choices:
+                out.append(BatchResult(
+                    entry.get("custom_id", ""), None,
+                    error=str(entry.get("error") or "no choices"),
+                ))
+                continue
+            out.append(BatchResult(
+                entry.get("custom_id", ""),
+                choices[0]["message"].get("content") or "",
+                usage=body.get("usage"),
+            ))
+        return out
+
+
+class InlineBackend:
+    """Runs each request through the chat client on submit. For Ollama,
+    which has no batch endpoint; the job still gets wave scheduling and
+    resumable state. Results are held in memory only, so ``advance``
+    collects a synchronous batch in the same call that submits it; one
+    left behind by a crashed process polls "failed" and is requeued."""
+
+    synchronous = True
+
+    def __init__(self, client: Optional[Callable[[], Any]] = None):
+        self._client = client or llm._ollama
+        self._done: Dict[str, List[BatchResult]] = {}
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch_id = f"inline-{run_artifacts.new_run_id()}"
+        out = []
+        for r in requests:
+            try:
+                response = self._client().chat.completions.create(**r.params)
+            except Exception as e:
+                out.append(BatchResult(r.custom_id, None, error=str(e)))
+                continue
+            usage = getattr(response, "usage", None)
+            out.append(BatchResult(
+                r.custom_id,
+                response.choices[0].message.content or "",
+                usage=usage.model_dump() if usage is not None else None,
+            ))
+        self._done[batch_id] = out
+        return batch_id
+
+    def poll(self, batch_id: str) -> str:
+        return "ended" if batch_id in self._done else "failed"
+
+    def results(self, batch_id: str) -> List[BatchResult]:
+        return self._done.pop(batch_id, [])
+
+
+def backend_for(provider: str) -> BatchBackend:
+    if provider == "Anthropic":
+        return AnthropicBatchBackend()
+    if provider == "OpenAI":
+        return OpenAIBatchBackend()
+    if provider == llm.OLLAMA_PROVIDER_LABEL:
+        return InlineBackend()
+    raise ValueError(f"Unsupported provider: {provider!r}")
+
+
+# --- Stage graph -----------------------------------------------------------
+# Mirrors pipeline.run's generate stages. ``name`` is the run-artifact stage
+# (the same names pipeline.run checkpoints); ``field`` is where the output
+# lands in the run's state. A stage is ready once every stage in ``needs``
+# is done; ``context`` returns None to skip it (e.g. no draft to critique).
+
+
+@dataclass(frozen=True)
+class _Stage:
+    name: str
+    content_type: str
+    field: str
+    needs: Sequence[str]
+    context: Callable[[dict], Optional[dict]]
+    option: str = ""          # job option that enables the stage
+    uses_kb: bool = True
+    article_budget: bool = False
+
+
+def _length_prefix(state: dict) -> str:
+    return (
+        f"Target length: approximately {state['article_length_words']} words. "
+        f"Adjust depth and section count to fit, but never pad with filler.\n\n"
+    )
+
+
+def _sources(state: dict) -> dict:
+    return {
+        "transcript": state["transcript"],
+        "wisdom": state.get("wisdom") or "",
+        "outline": state.get("outline") or "",
+    }
+
+
+_GRAPH: List[_Stage] = [
+    _Stage(
+        "cleanup", "transcript_cleanup", "cleaned_transcript", (),
+        lambda s: {"transcript": precleanup.clean(s["raw_transcript"]).text},
+        option="cleanup", uses_kb=False,
+    ),
+    _Stage(
+        "wisdom", "wisdom_extraction", "wisdom", ("cleanup",),
+        lambda s: {"transcript": s["transcript"]},
+    ),
+    _Stage(
+        "outline", "outline_creation", "outline", ("wisdom",),
+        lambda s: {"transcript": s["transcript"], "wisdom": s.get("wisdom") or ""},
+    ),
+    _Stage(
+        "social", "social_media", "social_posts", ("outline",),
+        lambda s: {"wisdom": s.get("wisdom") or "", "outline": s.get("outline") or ""},
+    ),
+    _Stage(
+        "image_prompts", "image_prompts", "image_prompts", ("outline",),
+        lambda s: {"wisdom": s.get("wisdom") or "", "outline": s.get("outline") or ""},
+    ),
+    _Stage(
+        "article_draft", "article_writing", "article_draft", ("outline",),
+        lambda s: {**_sources(s), "_user_prefix": _length_prefix(s)},
+        article_budget=True,
+    ),
+    _Stage(
+        "article_critique", "article_critique", "article_critique", ("article_draft",),
+        lambda s: {**_sources(s), "article": s["article_draft"]} if s.get("article_draft") else None,
+        option="agentic",
+    ),
+    _Stage(
+        "article_revision", "article_revise", "article_revised", ("article_critique",),
+        lambda s: {
+            **_sources(s),
+            "article": s["article_draft"],
+            "critique": s["article_critique"],
+            "_user_prefix": _length_prefix(s),
+        } if s.get("article_draft") and s.get("article_critique") else None,
+        option="agentic", article_budget=True,
+    ),
+    _Stage(
+        "fact_check", "article_fact_check", "fact_check_raw", ("article_draft", "article_revision"),
+        lambda s: (
+            {"article": _article(s), "transcript": s["transcript"]} if _article(s) else None
+        ),
+        option="fact_check", uses_kb=False,
+    ),
+]
+_BY_NAME = {stage.name: stage for stage in _GRAPH}
+
+
+def _article(state: dict) -> Optional[str]:
+    return state.get("article_revised") or state.get("article_draft")
+
+
+def _enabled(stage: _Stage, options: dict) -> bool:
+    return not stage.option or bool(options.get(stage.option))
+
+
+@dataclass
+class JobStatus:
+    job_id: str
+    runs: int
+    completed: int
+    pending_requests: int
+    batches: List[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.completed == self.runs
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "done": self.done}
+
+
+def start(
+    transcripts: Sequence[str],
+    provider: str,
+    model: str,
+    *,
+    job_id: Optional[str] = None,
+    prompts: Optional[Dict[str, str]] = None,
+    knowledge_base: Optional[Dict[str, str]] = None,
+    user: Optional[str] = None,
+    rag_mode: str = "auto",
+    cleanup: bool = True,
+    agentic: bool = False,
+    fact_check: bool = False,
+    article_length_words: int = 1500,
+) -> str:
+    """Create a batch job with one run per transcript and return its id.
+    Nothing is submitted until ``advance``. ``knowledge_base`` is kept in
+    the job file so a resumed job builds the same KB blocks."""
+    job_id = job_id or f"batch-{run_artifacts.new_run_id()}"
+    options = {
+        "provider": provider,
+        "model": model,
+        "prompts": prompts or {},
+        "knowledge_base": knowledge_base or {},
+        "user": user,
+        "rag_mode": rag_mode,
+        "cleanup": cleanup,
+        "agentic": agentic,
+        "fact_check": fact_check,
+        "article_length_words": article_length_words,
+    }
+    runs = []
+    for i, transcript in enumerate(transcripts):
+        run_id = f"{job_id}-{i:04d}"
+        run_artifacts.start_run(run_id, {
+            "source": "batch",
+            "batch_job": job_id,
+            "provider": provider,
+            "model": model,
+            "settings": {
+                "cleanup": cleanup, "agentic": agentic, "fact_check": fact_check,
+                "batch": True,
+            },
+        })
+        runs.append({"run_id": run_id, "transcript": transcript})
+    run_artifacts.save_batch_job(job_id, {
+        "options": options, "runs": runs, "batches": [],
+    })
+    return job_id
+
+
+def _run_state(run: dict, options: dict) -> dict:
+    """Rebuild a run's state from its stage artifacts."""
+    state: dict = {
+        "raw_transcript": run["transcript"],
+        "transcript": run["transcript"],
+        "article_length_words": options.get("article_length_words", 1500),
+        "done": set(),
+    }
+    for stage in _GRAPH:
+        payload = run_artifacts.load_stage_payload(run["run_id"], stage.name)
+        if not payload:
+            continue
+        state["done"].add(stage.name)
+        state[stage.field] = payload.get("batch_output")
+        if stage.name == "cleanup" and state[stage.field]:
+            state["transcript"] = state[stage.field]
+    return state
+
+
+def _ready(state: dict, options: dict, pending: set) -> List[_Stage]:
+    ready = []
+    for stage in _GRAPH:
+        if stage.name in state["done"] or stage.name in pending or not _enabled(stage, options):
+            continue
+        needs = [n for n in stage.needs if _enabled(_BY_NAME[n], options)]
+        if all(n in state["done"] for n in needs):
+            ready.append(stage)
+    return ready
+
+
+def _finished(state: dict, options: dict) -> bool:
+    return all(s.name in state["done"] for s in _GRAPH if _enabled(s, options))
+
+
+def _payload(stage: _Stage, state: dict, text: Optional[str]) -> dict:
+    """Stage artifact in the shape pipeline.run checkpoints, plus the raw
+    ``batch_output`` the job itself resumes from."""
+    if stage.name == "cleanup":
+        payload = {"raw_transcript": state["raw_transcript"], "cleaned_transcript": text}
+    elif stage.name == "article_draft":
+        payload = {"article": text}
+    elif stage.name == "article_revision":
+        payload = {"article": text or state.get("article_draft"),
+                   "article_critique": state.get("article_critique")}
+    elif stage.name == "fact_check":
+        from .pipeline import _parse_fact_check
+        payload = {"fact_check_flags": _parse_fact_check(text)}
+    else:
+        payload = {stage.field: text}
+    return {**payload, "batch_output": text}
+
+
+def _complete(run: dict, state: dict) -> None:
+    from .pipeline import _parse_fact_check
+    run_artifacts.write_stage(run["run_id"], "complete", {
+        "wisdom": state.get("wisdom"),
+        "outline": state.get("outline"),
+        "social_posts": state.get("social_posts"),
+        "image_prompts": state.get("image_prompts"),
+        "article": _article(state),
+        "chapters": [],
+        "fact_check_flags": _parse_fact_check(state.get("fact_check_raw")),
+    })
+    run_artifacts.mark_status(run["run_id"], "completed")
+
+
+def _finish_stage(run: dict, stage: _Stage, state: dict, text: Optional[str]) -> None:
+    run_artifacts.write_stage(run["run_id"], stage.name, _payload(stage, state, text))
+    state["done"].add(stage.name)
+    state[stage.field] = text
+    if stage.name == "cleanup" and text:
+        state["transcript"] = text
+
+
+def advance(job_id: str, backend: Optional[BatchBackend] = None) -> JobStatus:
+    """One scheduling step: collect results from ended batches, then submit
+    the next wave if nothing is still in flight. Safe to call repeatedly
+    and from a fresh process."""
+    job = run_artifacts.load_batch_job(job_id)
+    if not job:
+        raise ValueError(f"Unknown batch job {job_id!r}")
+    options = job["options"]
+    backend = backend or backend_for(options["provider"])
+    runs = {run["run_id"]: run for run in job["runs"]}
+    states = {run_id: _run_state(run, options) for run_id, run in runs.items()}
+
+    for record in job["batches"]:
+        if record["status"] == "submitted":
+            _collect(job_id, job, record, backend, runs, states)
+
+    in_flight = [b for b in job["batches"] if b["status"] == "submitted"]
+    if not in_flight:
+        requests, metas = _next_wave(options, runs, states)
+        if requests:
+            batch_id = backend.submit(requests)
+            logger.info("batch %s: submitted %d requests as %s", job_id, len(requests), batch_id)
+            job["batches"].append({
+                "batch_id": batch_id,
+                "status": "submitted",
+                "submitted_at": run_artifacts.now_iso(),
+                "requests": metas,
+            })
+            run_artifacts.save_batch_job(job_id, job)
+            if getattr(backend, "synchronous", False):
+                _collect(job_id, job, job["batches"][-1], backend, runs, states)
+            in_flight = [b for b in job["batches"] if b["status"] == "submitted"]
+
+    completed = 0
+    for run_id, state in states.items():
+        if _finished(state, options):
+            completed += 1
+            if not run_artifacts.load_stage_payload(run_id, "complete"):
+                _complete(runs[run_id], state)
+    return JobStatus(
+        job_id=job_id,
+        runs=len(runs),
+        completed=completed,
+        pending_requests=sum(len(b["requests"]) for b in in_flight),
+        batches=[b["batch_id"] for b in job["batches"]],
+    )
+
+
+def _collect(job_id: str, job: dict, record: dict, backend: BatchBackend, runs: dict, states: dict) -> None:
+    """Apply an ended batch's results. A request that failed — alone or
+    with its whole batch (failed, expired, results lost) — is left undone
+    so the next wave requeues it, up to ``MAX_ATTEMPTS`` submissions."""
+    status = backend.poll(record["batch_id"])
+    if status == "running":
+        return
+    options = job["options"]
+    results = (
+        {r.custom_id: r for r in backend.results(record["batch_id"])}
+        if status == "ended" else {}
+    )
+    attempts = job.setdefault("attempts", {})
+    for custom_id, meta in record["requests"].items():
+        result = results.get(custom_id)
+        if result is None or result.error:
+            slot = f"{meta['run_id']}/{meta['stage']}"
+            attempts[slot] = attempts.get(slot, 0) + 1
+            retry = attempts[slot] < MAX_ATTEMPTS
+            logger.warning(
+                "batch %s: %s failed (%s)%s", record["batch_id"], custom_id,
+                result.error if result else status,
+                "; requeued" if retry else f"; giving up after {MAX_ATTEMPTS} attempts",
+            )
+            if retry:
+                continue
+        _apply(options, runs[meta["run_id"]], states[meta["run_id"]], meta, result)
+    record["status"] = status
+    run_artifacts.save_batch_job(job_id, job)
+
+
+def _apply(options: dict, run: dict, state: dict, meta: dict, result: Optional[BatchResult]) -> None:
+    stage = _BY_NAME[meta["stage"]]
+    text = result.text if result is not None and not result.error else None
+    if result is not None and result.usage:
+        llm.record_usage(
+            options["provider"], options["model"], SimpleNamespace(**result.usage),
+            estimated_input_tokens=meta.get("estimated_input_tokens", 0),
+            stage=stage.content_type, route="batch",
+        )
+    if text and cache.enabled():
+        cache.put(meta["key"], text, namespace=f"llm.{stage.content_type}")
+    _finish_stage(run, stage, state, text)
+
+
+def _next_wave(options: dict, runs: dict, states: dict) -> tuple[List[BatchRequest], dict]:
+    """Every run's ready stages, as batch requests. Stages answered by the
+    exact cache, skipped, or too large for the window finish immediately,
+    which can make further stages ready — hence the loop."""
+    requests: List[BatchRequest] = []
+    metas: Dict[str, dict] = {}
+    prefixes: Dict[str, Any] = {}
+    for run_id, run in runs.items():
+        state = states[run_id]
+        queued: set = set()
+        progressed = True
+        while progressed:
+            progressed = False
+            for stage in _ready(state, options, queued):
+                context = stage.context(state)
+                call = _prepare(stage, context, state, options, prefixes, run_id) if context else None
+                if call is None:
+                    _finish_stage(run, stage, state, None)
+                    progressed = True
+                    continue
+                hit = (
+                    cache.get(call.key, namespace=f"llm.{stage.content_type}")
+                    if cache.enabled() else None
+                )
+                if hit is not None:
+                    _finish_stage(run, stage, state, hit)
+                    progressed = True
+                    continue
+                custom_id = f"r{len(metas):05d}-{stage.name}"
+                requests.append(BatchRequest(custom_id, call.params()))
+                metas[custom_id] = {
+                    "run_id": run_id,
+                    "stage": stage.name,
+                    "key": call.key,
+                    "estimated_input_tokens": call.estimated_input_tokens,
+                }
+                queued.add(stage.name)
+    return requests, metas
+
+
+def _prepare(
+    stage: _Stage, context: dict, state: dict, options: dict, prefixes: dict, run_id: str,
+) -> Optional[llm.PreparedCall]:
+    user = options.get("user")
+    rag_prefix = None
+    if stage.uses_kb and user:
+        if run_id not in prefixes:
+            from .pipeline import _shared_rag_prefix
+            prefixes[run_id] = _shared_rag_prefix(user, state["transcript"], options.get("rag_mode", "auto"))
+        rag_prefix = prefixes[run_id]
+    return llm.prepare(
+        stage.content_type, context, options["provider"], options["model"],
+        prompt=(options.get("prompts") or {}).get(stage.content_type),
+        knowledge_base=(options.get("knowledge_base") or None) if stage.uses_kb else None,
+        max_tokens=(
+            max(800, int(state["article_length_words"] * 1.8)) if stage.article_budget else None
+        ),
+        user=user if stage.uses_kb else None,
+        rag_mode=options.get("rag_mode", "auto"),
+        rag_prefix=rag_prefix,
+    )
+
+
+def wait(
+    job_id: str,
+    backend: Optional[BatchBackend] = None,
+    *,
+    poll_seconds: float = DEFAULT_POLL_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> JobStatus:
+    """``advance`` until every run is complete."""
+    while True:
+        status = advance(job_id, backend)
+        if status.done:
+            return status
+        sleep(poll_seconds)
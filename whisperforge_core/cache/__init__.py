@@ -0,0 +1,409 @@
+"""File-hash cache for transcriptions and LLM outputs.
+
+Restored from old_app.py with a safer key: sha256(file_bytes) + model + prompt_hash.
+Keying on the file alone produced stale wisdom when prompts changed.
+
+Disabled by default so runs stay fresh. Enable by setting
+``WHISPERFORGE_CACHE=1`` (or ``true``/``yes``/``on``). Clear with
+``cache.clear()`` or by deleting the ``.cache/`` directory.
+
+Entries live in a ``cache_backends`` store: by default one SQLite file,
+LRU-evicted under ``WHISPERFORGE_CACHE_MAX_BYTES``;
+``WHISPERFORGE_CACHE_BACKEND=files`` keeps the old file-per-key layout.
+Values are encoded by ``serialization`` (type-tagged msgpack/JSON, large
+ones compressed). Backend bytes are never unpickled here: pickled
+``<key>.pkl`` files from older versions are converted by ``FileBackend``
+(and so by ``SQLiteBackend.legacy``) only after the trusted-path check,
+and any other unencoded blob — from SQLite or the shared cache service —
+reads as a miss.
+
+Every entry belongs to a namespace (``transcribe``, ``llm.<content_type>``,
+``llm.metadata``) and records how long it took to compute. Hits,
+misses, bytes moved and compute time saved are counted per namespace and
+reported by ``stats()``, ``python -m whisperforge_core.cache stats`` and
+the sidebar's Cache panel; ``prune()`` trims the store without blocking
+readers.
+
+``put`` only queues the write (see ``cache_backends.WriteBehind``), so a
+stage never waits on the disk or the cache service; ``get`` sees queued
+values, and ``flush()`` persists them (it also runs at exit).
+"""
+
+import atexit
+import hashlib
+import os
+import pickle
+import sqlite3
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from .. import cache_backends, hashing, serialization
+from ..config import CACHE_DIR
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def enabled() -> bool:
+    """True when the WHISPERFORGE_CACHE env flag opts the user in."""
+    return os.getenv("WHISPERFORGE_CACHE", "").lower() in ("1", "true", "yes", "on")
+
+
+def file_hash(path: str | Path) -> str:
+    """Digest of file bytes (see ``hashing``: memoized per file stat, so an
+    unchanged recording is only read once)."""
+    return hashing.file_hash(path)
+
+
+def text_hash(text: str) -> str:
+    return hashing.text_digest(text)
+
+
+def make_key(parts: list[str]) -> str:
+    """Combine components into a cache key."""
+    joined = "||".join(parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def backend():
+    """The configured store for ``CACHE_DIR`` (see ``cache_backends``)."""
+    return cache_backends.get_backend(CACHE_DIR)
+
+
+def get(key: str, *, namespace: Optional[str] = None) -> Optional[Any]:
+    hit = _lookup(key, namespace)
+    return hit[0] if hit is not None else None
+
+
+def _lookup(key: str, namespace: Optional[str]) -> Optional[Tuple[Any, float]]:
+    """(value, compute seconds) for ``key``, counting the hit or miss."""
+    ns = namespace or ""
+    memory = cache_backends.get_memory(CACHE_DIR)
+    entry = memory.get_entry(key) if memory is not None else None
+    if entry is None:
+        entry = _queued(key)
+    if entry is None:
+        try:
+            entry = backend().get_entry(key)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Cache read failed for %s: %s", key[:8], e)
+            entry = None
+        if entry is None:
+            _count(ns, misses=1)
+            return None
+        if memory is not None and serialization.is_encoded(entry[0]):
+            memory.put(key, *entry)
+    data, compute_s = entry
+    if not serialization.is_encoded(data):
+        # Only FileBackend/SQLiteBackend.legacy may unpickle (trusted .pkl
+        # files under the cache root); anything else unencoded, e.g. from
+        # the shared cache service, is a miss rather than code to run.
+        logger.warning("Ignoring unencoded cache entry %s", key[:8])
+        _count(ns, misses=1)
+        return None
+    try:
+        value = serialization.loads(data)
+    except ValueError as e:
+        logger.warning("Cache decode failed for %s: %s", key[:8], e)
+        _count(ns, misses=1)
+        return None
+    _count(ns, hits=1, bytes_read=len(data))
+    return value, compute_s
+
+
+def load_pickle(path: str | Path, *, root: str | Path, label: str = "pickle") -> Optional[Any]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    if not _trusted_pickle_path(path, Path(root), label):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, AttributeError, EOFError, ImportError, ValueError) as e:
+        logger.warning("Pickle read failed for %s: %s", label, e)
+        return None
+
+
+def _trusted_pickle_path(path: Path, root: Path, label: str) -> bool:
+    try:
+        root_resolved = root.resolve()
+        path_resolved = path.resolve()
+        path_resolved.relative_to(root_resolved)
+    except (OSError, ValueError) as e:
+        logger.warning("Refusing %s pickle outside cache root: %s", label, e)
+        return False
+
+    if path.is_symlink():
+        logger.warning("Refusing %s pickle symlink: %s", label, path)
+        return False
+    if _has_shared_write_bits(path_resolved, root_resolved):
+        logger.warning("Refusing %s pickle from group/world-writable cache path: %s", label, path)
+        return False
+    return True
+
+
+def _has_shared_write_bits(path: Path, root: Path) -> bool:
+    try:
+        mode = path.stat().st_mode
+    except OSError:
+        return True
+    if mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return True
+    if path == root or path == path.parent:
+        return False
+    return _shared_dir(path.parent, root)
+
+
+# Directory verdicts for ``_has_shared_write_bits``: every entry under one
+# cache directory shares the same parent chain, so it is walked once per
+# ``TRUSTED_DIR_TTL`` seconds rather than on every read.
+TRUSTED_DIR_TTL = 30.0
+_dir_verdicts: dict[tuple[Path, Path], tuple[float, bool]] = {}
+
+
+def _shared_dir(directory: Path, root: Path) -> bool:
+    now = time.monotonic()
+    memo = _dir_verdicts.get((directory, root))
+    if memo is not None and now - memo[0] < TRUSTED_DIR_TTL:
+        return memo[1]
+    current, shared = directory, False
+    while True:
+        try:
+            mode = current.stat().st_mode
+        except OSError:
+            shared = True
+            break
+        if mode & (stat.S_IWGRP | stat.S_IWOTH):
+            shared = True
+            break
+        if current == root or current == current.parent:
+            break
+        current = current.parent
+    _dir_verdicts[(directory, root)] = (now, shared)
+    return shared
+
+
+def put(key: str, value: Any, *, namespace: Optional[str] = None, compute_s: float = 0.0) -> None:
+    try:
+        data = serialization.dumps(value)
+        memory = cache_backends.get_memory(CACHE_DIR)
+        if memory is not None:
+            memory.put(key, data, compute_s)
+        _store([(key, data, namespace or "", compute_s)])
+        _count(namespace or "", bytes_written=len(data))
+        logger.info("Cache wrote %s (%d bytes)", key[:8], len(data))
+    except (OSError, sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning("Cache write failed for %s: %s", key[:8], e)
+
+
+def _queued(key: str) -> Optional[cache_backends.Entry]:
+    """A value still waiting in the write-behind queue."""
+    writer = cache_backends.get_writer(CACHE_DIR)
+    return writer.get_entry(key) if writer is not None else None
+
+
+def _store(items: list) -> None:
+    """Hand entries to the write-behind queue, or write them now when it's
+    disabled."""
+    writer = cache_backends.get_writer(CACHE_DIR)
+    if writer is not None:
+        writer.put_many(items)
+    else:
+        backend().put_many(items)
+
+
+def flush() -> None:
+    """Persist queued writes and pending counters. Runs at exit."""
+    cache_backends.flush_writers()
+    flush_stats()
+
+
+def clear() -> int:
+    """Remove all cache entries. Returns count removed."""
+    memory = cache_backends.get_memory(CACHE_DIR)
+    if memory is not None:
+        memory.clear()
+    cache_backends.flush_writers()
+    if _no_store(CACHE_DIR):
+        return 0
+    return backend().clear()
+
+
+def _no_store(root: Path) -> bool:
+    """True when nothing has been cached yet: a local store that was never
+    created. The shared service always counts as present."""
+    return cache_backends.backend_kind() != "http" and not Path(root).exists()
+
+
+def get_many(keys: list[str], *, namespace: Optional[str] = None) -> dict[str, Any]:
+    """``get`` for several keys in one backend round trip; misses are
+    absent from the result."""
+    ns = namespace or ""
+    memory = cache_backends.get_memory(CACHE_DIR)
+    entries = {}
+    for key in keys:
+        entry = memory.get_entry(key) if memory is not None else None
+        if entry is None:
+            entry = _queued(key)
+        if entry is not None:
+            entries[key] = entry
+    rest = [key for key in keys if key not in entries]
+    if rest:
+        try:
+            fetched = backend().get_many(rest)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Cache batch read failed: %s", e)
+            fetched = {}
+        for key, entry in fetched.items():
+            if memory is not None and serialization.is_encoded(entry[0]):
+                memory.put(key, *entry)
+        entries.update(fetched)
+    values = {}
+    for key, (data, _) in entries.items():
+        if not serialization.is_encoded(data):
+            logger.warning("Ignoring unencoded cache entry %s", key[:8])
+            continue
+        try:
+            values[key] = serialization.loads(data)
+        except ValueError as e:
+            logger.warning("Cache decode failed for %s: %s", key[:8], e)
+            continue
+        _count(ns, hits=1, bytes_read=len(data))
+    _count(ns, misses=len(keys) - len(values))
+    return values
+
+
+def put_many(values: dict[str, Any], *, namespace: Optional[str] = None) -> None:
+    """``put`` for several values in one backend round trip."""
+    ns = namespace or ""
+    memory = cache_backends.get_memory(CACHE_DIR)
+    items = []
+    for key, value in values.items():
+        try:
+            data = serialization.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning("Cache write skipped for %s: %s", key[:8], e)
+            continue
+        if memory is not None:
+            memory.put(key, data)
+        items.append((key, data, ns, 0.0))
+    if not items:
+        return
+    try:
+        _store(items)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Cache batch write failed: %s", e)
+        return
+    _count(ns, bytes_written=sum(len(item[1]) for item in items))
+
+
+def cached_or_compute(
+    key: str,
+    compute: Callable[[], T],
+    *,
+    namespace: Optional[str] = None,
+) -> T:
+    """If caching is enabled and ``key`` is in cache, return the cached value.
+    Otherwise call ``compute()``, store its result (when non-None/non-empty),
+    and return it. When caching is disabled, this is equivalent to just
+    calling ``compute()`` — zero overhead, zero behavior change.
+
+    ``namespace`` groups the entry for ``stats()``; a hit credits the
+    namespace with the time the original ``compute()`` took."""
+    if not enabled():
+        return compute()
+
+    hit = _lookup(key, namespace)
+    if hit is not None:
+        logger.info("cache HIT %s", key[:8])
+        _count(namespace or "", saved_s=hit[1])
+        return hit[0]
+
+    logger.info("cache MISS %s", key[:8])
+    started = time.perf_counter()
+    value = compute()
+    # Never persist falsy sentinel values — an empty transcript or None LLM
+    # output is almost always an error state, and caching it would wedge the
+    # user into replaying the failure.
+    if value:
+        put(key, value, namespace=namespace, compute_s=time.perf_counter() - started)
+    return value
+
+
+# --- Stats ----------------------------------------------------------------------
+
+# Counter deltas not yet written to the backend. Flushed every
+# ``FLUSH_EVERY`` events and at exit, so a hot path costs a dict update
+# rather than a write transaction.
+FLUSH_EVERY = 50
+_pending: Dict[str, Dict[str, float]] = {}
+_pending_events = 0
+_pending_root: Optional[Path] = None
+_pending_lock = threading.Lock()
+
+
+def _count(namespace: str, **amounts: float) -> None:
+    global _pending_events, _pending_root
+    if _pending_root != CACHE_DIR:
+        flush_stats()  # counters belong to the store they were taken from
+    with _pending_lock:
+        _pending_root = CACHE_DIR
+        row = _pending.setdefault(namespace, dict.fromkeys(cache_backends.STAT_FIELDS, 0))
+        for name, amount in amounts.items():
+            row[name] += amount
+        _pending_events += 1
+        due = _pending_events >= FLUSH_EVERY
+    if due:
+        flush_stats()
+
+
+def flush_stats() -> None:
+    """Write pending counters to the backend."""
+    global _pending_events
+    with _pending_lock:
+        deltas, root = dict(_pending), _pending_root
+        _pending.clear()
+        _pending_events = 0
+    if not deltas or root is None or _no_store(root):
+        return
+    try:
+        cache_backends.get_backend(root).record(deltas)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Cache stats write failed: %s", e)
+
+
+atexit.register(flush)
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """Per-namespace counters (``hits``, ``misses``, ``bytes_read``,
+    ``bytes_written``, ``saved_s``), plus ``entries`` and ``stored_bytes``
+    where the backend tracks them. Entries stored before namespaces existed
+    are reported under ``""``."""
+    flush()
+    if _no_store(CACHE_DIR):
+        return {}
+    try:
+        return backend().stats()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Cache stats read failed: %s", e)
+        return {}
+
+
+def prune(*, older_than_s: Optional[float] = None, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+    """Drop entries unused for ``older_than_s`` seconds, then the least
+    recently used until the store fits ``max_bytes``. Returns (entries,
+    bytes) removed. Safe to run while other threads or processes read."""
+    memory = cache_backends.get_memory(CACHE_DIR)
+    if memory is not None:
+        memory.clear()
+    cache_backends.flush_writers()
+    if _no_store(CACHE_DIR):
+        return 0, 0
+    return backend().prune(older_than_s=older_than_s, max_bytes=max_bytes)
@@ -0,0 +1,83 @@
+"""Inspect and trim the cache from a shell.
+
+    python -m whisperforge_core.cache stats
+    python -m whisperforge_core.cache prune --older-than 30d --max-bytes 1G
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from typing import Optional
+
+from . import prune, stats
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$", re.I)
+_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.I)
+_BYTES = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def parse_duration(text: str) -> float:
+    """``90``, ``45m``, ``12h``, ``7d``, ``2w`` → seconds."""
+    match = _DURATION.match(text)
+    if not match:
+        raise ValueError(f"not a duration: {text!r}")
+    return float(match.group(1)) * _SECONDS[match.group(2).lower()]
+
+
+def parse_size(text: str) -> int:
+    """``500000``, ``500K``, ``200MB``, ``2G``, ``1GiB`` → bytes."""
+    match = _SIZE.match(text)
+    if not match:
+        raise ValueError(f"not a size: {text!r}")
+    return int(float(match.group(1)) * _BYTES[match.group(2).lower()])
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def format_stats(rows: dict) -> str:
+    if not rows:
+        return "Cache is empty."
+    header = f"{'namespace':<24} {'hits':>7} {'misses':>7} {'hit%':>5} {'read':>9} {'written':>9} {'stored':>9} {'saved':>8}"
+    lines = [header, "-" * len(header)]
+    for ns in sorted(rows):
+        row = rows[ns]
+        lookups = row.get("hits", 0) + row.get("misses", 0)
+        rate = f"{row.get('hits', 0) / lookups:.0%}" if lookups else "-"
+        lines.append(
+            f"{ns or '(untagged)':<24} {row.get('hits', 0):>7} {row.get('misses', 0):>7} {rate:>5}"
+            f" {format_bytes(row.get('bytes_read', 0)):>9} {format_bytes(row.get('bytes_written', 0)):>9}"
+            f" {format_bytes(row.get('stored_bytes', 0)):>9} {row.get('saved_s', 0):>7.0f}s"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m whisperforge_core.cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Per-namespace hits, misses, bytes and time saved.")
+    trim = sub.add_parser("prune", help="Remove stale or least-recently-used entries.")
+    trim.add_argument("--older-than", type=parse_duration, help="Drop entries unused this long (e.g. 7d).")
+    trim.add_argument("--max-bytes", type=parse_size, help="Then trim to this size (e.g. 500M).")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        print(format_stats(stats()))
+        return 0
+    if args.older_than is None and args.max_bytes is None:
+        parser.error("prune needs --older-than and/or --max-bytes")
+    removed, freed = prune(older_than_s=args.older_than, max_bytes=args.max_bytes)
+    print(f"Removed {removed} entries ({format_bytes(freed)}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,787 @@
+"""Storage backends for ``whisperforge_core.cache``.
+
+``cache`` owns keys, (de)serialization and the enable flag; a backend only
+maps a key to bytes. Three ship here:
+
+- ``SQLiteBackend`` (default) — one ``cache.sqlite3`` file in WAL mode with
+  a key index, per-entry size and last-access time. Every ``put`` keeps the
+  store under ``WHISPERFORGE_CACHE_MAX_BYTES`` by evicting least-recently
+  used entries. SQLite's own locking makes it safe to share between the
+  Streamlit process, batch workers and services on one host.
+- ``FileBackend`` — the original one-file-per-key directory (still named
+  ``<key>.pkl``), kept for ``WHISPERFORGE_CACHE_BACKEND=files``. No budget,
+  no eviction.
+- ``HTTPBackend`` — a client for the shared cache service
+  (``services/cache``), selected by ``WHISPERFORGE_CACHE_BACKEND=http`` and
+  ``WHISPERFORGE_CACHE_URL``. Every replica in services mode then reads and
+  writes one store. Lookups and writes travel in batches, and values are
+  stored once per content digest, so identical outputs under different keys
+  share a blob and large ones are uploaded only when the service lacks them.
+
+Entries written by ``FileBackend`` are picked up by ``SQLiteBackend`` on
+first read (and the file removed), so switching needs no migration step.
+``<key>.pkl`` files still holding pickles from before ``serialization``
+are re-encoded as they are read, after the trusted-path check; no other
+path unpickles cache bytes.
+
+In front of each sits a per-process ``MemoryLRU`` (bounded by
+``WHISPERFORGE_CACHE_MEMORY_BYTES``): ``cache.get`` checks it first and
+``cache.put`` writes through, so reopening or re-running in one Streamlit
+process is served without touching disk.
+
+Writes reach the backend through a ``WriteBehind`` queue (bounded by
+``WHISPERFORGE_CACHE_WRITE_BEHIND_BYTES``): ``cache.put`` returns as soon
+as the value is queued and a background thread persists it in batches.
+Queued values are readable immediately; a full queue blocks the writer
+until the thread catches up; ``cache.flush`` (also run at exit) drains it.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from time import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import serialization
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+DB_NAME = "cache.sqlite3"
+DEFAULT_MAX_BYTES = 2 << 30  # 2 GiB
+DEFAULT_MEMORY_BYTES = 64 << 20  # 64 MiB
+# Eviction trims to this fraction of the budget so a full store doesn't
+# evict on every single put.
+EVICT_TO = 0.9
+# Last-access times are only rewritten when older than this many seconds:
+# LRU order doesn't need sub-minute precision, and it keeps hot reads from
+# turning into writes.
+ACCESS_RESOLUTION = 60.0
+BUSY_TIMEOUT_S = 10.0
+PRUNE_BATCH = 500
+
+BACKENDS = ("sqlite", "files", "http")
+
+
+def max_bytes() -> int:
+    """Byte budget from ``WHISPERFORGE_CACHE_MAX_BYTES`` (0 = unbounded)."""
+    return _env_bytes("WHISPERFORGE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+
+def _env_bytes(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", name, raw)
+        return default
+
+
+def write_behind_bytes() -> int:
+    """Write-behind queue budget from
+    ``WHISPERFORGE_CACHE_WRITE_BEHIND_BYTES`` (0 = write synchronously)."""
+    return _env_bytes("WHISPERFORGE_CACHE_WRITE_BEHIND_BYTES", DEFAULT_WRITE_BEHIND_BYTES)
+
+
+def memory_bytes() -> int:
+    """In-process layer budget from ``WHISPERFORGE_CACHE_MEMORY_BYTES``
+    (0 = no memory layer)."""
+    return _env_bytes("WHISPERFORGE_CACHE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES)
+
+
+DEFAULT_WRITE_BEHIND_BYTES = 32 << 20  # 32 MiB
+WRITE_BATCH = 64
+
+# (serialized value, seconds the value took to compute)
+Entry = Tuple[bytes, float]
+# (key, serialized value, namespace, compute seconds) — one ``put_many`` item
+Item = Tuple[str, bytes, str, float]
+
+
+class MemoryLRU:
+    """Serialized entries held in process memory, least-recently-used
+    dropped first once their total size passes ``budget`` bytes."""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.size = 0
+        self._entries: OrderedDict[str, Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, data: bytes, compute_s: float = 0.0) -> None:
+        if len(data) > self.budget:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self._entries[key] = (data, compute_s)
+            self.size += len(data)
+            while self.size > self.budget:
+                _, dropped = self._entries.popitem(last=False)
+                self.size -= len(dropped[0])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileBackend:
+    """One ``<key>.pkl`` file per entry under ``root``."""
+
+    name = "files"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        data = self.get(key)
+        return (data, 0.0) if data is not None else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        from .cache import _trusted_pickle_path  # cache imports this module
+        path = self.path(key)
+        if not path.exists() or not _trusted_pickle_path(path, self.root, f"cache {key[:8]}"):
+            return None
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            logger.warning("Cache read failed for %s: %s", key[:8], e)
+            return None
+        if serialization.is_encoded(data):
+            return data
+        return self._migrate(key, data)
+
+    def _migrate(self, key: str, data: bytes) -> Optional[bytes]:
+        """Re-encode a pickle written by an older version. The only place
+        cache bytes are unpickled, and only for a file that passed the
+        trusted-path check under ``root``."""
+        try:
+            data = serialization.dumps(pickle.loads(data))
+        except (pickle.PickleError, AttributeError, EOFError, ImportError, TypeError, ValueError) as e:
+            logger.warning("Legacy pickle read failed for cache %s: %s", key[:8], e)
+            return None
+        try:
+            self.put(key, data)
+        except OSError as e:
+            logger.warning("Cache migration write failed for %s: %s", key[:8], e)
+        return data
+
+    def put(self, key: str, data: bytes, *, namespace: str = "", compute_s: float = 0.0) -> None:
+        # temp file + rename: a reader (or a crash) never sees half an entry
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Entry]:
+        found = {key: self.get_entry(key) for key in keys}
+        return {key: entry for key, entry in found.items() if entry is not None}
+
+    def put_many(self, items: Iterable[Item]) -> None:
+        for key, data, namespace, compute_s in items:
+            self.put(key, data, namespace=namespace, compute_s=compute_s)
+
+    def delete(self, key: str) -> bool:
+        try:
+            self.path(key).unlink()
+            return True
+        except OSError:
+            return False
+
+    def clear(self) -> int:
+        if not self.root.exists():
+            return 0
+        count = 0
+        for path in self.root.glob("*.pkl"):
+            try:
+                path.unlink()
+                count += 1
+            except OSError:
+                pass
+        return count
+
+    # No index to keep counters or access times in: stats live for the
+    # process only, and prune goes by file mtime.
+    def record(self, deltas: Dict[str, Dict[str, float]]) -> None:
+        _merge(self._stats, deltas)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {ns: dict(row) for ns, row in self._stats.items()}
+
+    def prune(self, *, older_than_s: Optional[float] = None, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        if not self.root.exists():
+            return 0, 0
+        files = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob("*.pkl")),
+            key=lambda item: item[0],
+        )
+        total = sum(size for _, size, _ in files)
+        cutoff = time() - older_than_s if older_than_s is not None else None
+        count = freed = 0
+        for mtime, size, path in files:
+            stale = cutoff is not None and mtime < cutoff
+            over = max_bytes is not None and total - freed > max_bytes
+            if not (stale or over):
+                continue
+            if self.delete(path.stem):
+                count += 1
+                freed += size
+        return count, freed
+
+
+STAT_FIELDS = ("hits", "misses", "bytes_read", "bytes_written", "saved_s")
+
+
+def _merge(into: Dict[str, Dict[str, float]], deltas: Dict[str, Dict[str, float]]) -> None:
+    for ns, row in deltas.items():
+        target = into.setdefault(ns, dict.fromkeys(STAT_FIELDS, 0))
+        for name, amount in row.items():
+            target[name] = target.get(name, 0) + amount
+
+
+class SQLiteBackend:
+    """Single-file WAL store with LRU eviction under a byte budget."""
+
+    name = "sqlite"
+
+    def __init__(self, root: Path, *, budget: Optional[int] = None):
+        self.root = Path(root)
+        self.path = self.root / DB_NAME
+        self.budget = max_bytes() if budget is None else budget
+        self.legacy = FileBackend(self.root)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            from .cache import _trusted_pickle_path
+            self.root.mkdir(parents=True, exist_ok=True)
+            fresh = not self.path.exists()
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_S,
+                isolation_level=None, check_same_thread=False,
+            )
+            if fresh:
+                os.chmod(self.path, 0o600)
+            if not _trusted_pickle_path(self.path, self.root, "cache database"):
+                conn.close()
+                raise sqlite3.DatabaseError(f"untrusted cache database {self.path}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " namespace TEXT NOT NULL DEFAULT '', compute_s REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            for column, decl in (("namespace", "TEXT NOT NULL DEFAULT ''"),
+                                 ("compute_s", "REAL NOT NULL DEFAULT 0")):
+                if column not in columns:  # stores created before stats existed
+                    conn.execute(f"ALTER TABLE entries ADD COLUMN {column} {decl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stats ("
+                " namespace TEXT PRIMARY KEY, hits INTEGER NOT NULL DEFAULT 0,"
+                " misses INTEGER NOT NULL DEFAULT 0, bytes_read INTEGER NOT NULL DEFAULT 0,"
+                " bytes_written INTEGER NOT NULL DEFAULT 0, saved_s REAL NOT NULL DEFAULT 0)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute(
+                    "SELECT value, accessed_at, compute_s FROM entries WHERE key = ?", (key,),
+                ).fetchone()
+                if row is not None:
+                    now = time()
+                    if now - row[1] > ACCESS_RESOLUTION:
+                        db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+                    return bytes(row[0]), row[2]
+        except sqlite3.Error as e:
+            logger.warning("Cache read failed for %s: %s", key[:8], e)
+            return None
+        data = self.legacy.get(key)
+        if data is None:
+            return None
+        self.put(key, data)
+        self.legacy.delete(key)
+        return data, 0.0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Entry]:
+        found = {key: self.get_entry(key) for key in keys}
+        return {key: entry for key, entry in found.items() if entry is not None}
+
+    def put(self, key: str, data: bytes, *, namespace: str = "", compute_s: float = 0.0) -> None:
+        self.put_many([(key, data, namespace, compute_s)])
+
+    def put_many(self, items: Iterable[Item]) -> None:
+        """Write several entries in one transaction (and one eviction pass)."""
+        now = time()
+        rows = [
+            (key, sqlite3.Binary(data), len(data), now, now, namespace, compute_s)
+            for key, data, namespace, compute_s in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany(
+                    "INSERT OR REPLACE INTO entries"
+                    " (key, value, size, created_at, accessed_at, namespace, compute_s)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                evicted = self._evict(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if evicted:
+            logger.info("Cache evicted %d entries (%d bytes) to stay under %d bytes", *evicted, self.budget)
+
+    def _evict(self, db: sqlite3.Connection) -> Optional[Tuple[int, int]]:
+        """Drop least-recently-used entries until the store fits the budget.
+        Runs inside ``put``'s write transaction, so concurrent writers
+        never evict the same bytes twice."""
+        if not self.budget:
+            return None
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.budget:
+            return None
+        target = total - int(self.budget * EVICT_TO)
+        freed = count = 0
+        for key, size in db.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall():
+            if freed >= target:
+                break
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            freed += size
+            count += 1
+        return count, freed
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cur = self._db().execute("DELETE FROM entries WHERE key = ?", (key,))
+        return cur.rowcount > 0 or self.legacy.delete(key)
+
+    def clear(self) -> int:
+        count = self.legacy.clear()
+        if not self.path.exists():
+            return count
+        with self._lock:
+            cur = self._db().execute("DELETE FROM entries")
+        return count + max(cur.rowcount, 0)
+
+    def record(self, deltas: Dict[str, Dict[str, float]]) -> None:
+        """Add per-namespace counter deltas (see ``STAT_FIELDS``)."""
+        rows = [
+            (ns, *(row.get(name, 0) for name in STAT_FIELDS))
+            for ns, row in deltas.items()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db().executemany(
+                "INSERT INTO stats (namespace, hits, misses, bytes_read, bytes_written, saved_s)"
+                " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (namespace) DO UPDATE SET"
+                " hits = hits + excluded.hits, misses = misses + excluded.misses,"
+                " bytes_read = bytes_read + excluded.bytes_read,"
+                " bytes_written = bytes_written + excluded.bytes_written,"
+                " saved_s = saved_s + excluded.saved_s",
+                rows,
+            )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Counters per namespace, plus the entries and bytes each holds."""
+        with self._lock:
+            db = self._db()
+            out = {
+                row[0]: dict(zip(STAT_FIELDS, row[1:], strict=True))
+                for row in db.execute(
+                    "SELECT namespace, hits, misses, bytes_read, bytes_written, saved_s FROM stats"
+                )
+            }
+            for ns, entries, size in db.execute(
+                "SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace"
+            ):
+                row = out.setdefault(ns, dict.fromkeys(STAT_FIELDS, 0))
+                row.update(entries=entries, stored_bytes=size)
+        return out
+
+    def prune(
+        self,
+        *,
+        older_than_s: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        batch: int = PRUNE_BATCH,
+    ) -> Tuple[int, int]:
+        """Delete entries not read in ``older_than_s`` seconds, then
+        least-recently-used ones until the store is under ``max_bytes``.
+        Returns (entries, bytes) removed.
+
+        Deletes go ``batch`` rows per short transaction: WAL readers never
+        wait on them, and other writers only ever wait for one batch."""
+        count = freed = 0
+        cutoff = time() - older_than_s if older_than_s is not None else None
+        while True:
+            with self._lock:
+                db = self._db()
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                over = max(total - max_bytes, 0) if max_bytes is not None else 0
+                rows = db.execute(
+                    "SELECT key, size, accessed_at FROM entries ORDER BY accessed_at ASC LIMIT ?",
+                    (batch,),
+                ).fetchall()
+                doomed, need = [], over
+                for key, size, accessed_at in rows:
+                    if (cutoff is not None and accessed_at < cutoff) or need > 0:
+                        doomed.append((key,))
+                        need -= size
+                        freed += size
+                    else:
+                        break
+                if not doomed:
+                    break
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                count += len(doomed)
+            if len(doomed) < len(rows):
+                break
+        with self._lock:
+            self._db().execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return count, freed
+
+    def usage(self) -> Dict[str, int]:
+        """Entry count and stored bytes."""
+        with self._lock:
+            entries, size = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.budget}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class WriteBehind:
+    """Queues writes for ``backend`` and persists them on a background
+    thread, ``WRITE_BATCH`` entries per ``put_many``.
+
+    Queued bytes are capped at ``budget``: ``put`` blocks while the queue
+    is full, and a value larger than the whole budget is written inline.
+    Entries stay visible to ``get_entry`` until the backend has them, and a
+    failed batch is logged and dropped — a lost cache write is a later
+    miss, not an error."""
+
+    def __init__(self, backend, budget: int):
+        self.backend = backend
+        self.budget = budget
+        self.size = 0
+        self._pending: OrderedDict[str, Item] = OrderedDict()
+        self._writing: Dict[str, Item] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        with self._cond:
+            item = self._pending.get(key) or self._writing.get(key)
+        return (item[1], item[3]) if item is not None else None
+
+    def put(self, key: str, data: bytes, *, namespace: str = "", compute_s: float = 0.0) -> None:
+        self.put_many([(key, data, namespace, compute_s)])
+
+    def put_many(self, items: Iterable[Item]) -> None:
+        for item in items:
+            if len(item[1]) > self.budget:
+                self.backend.put(item[0], item[1], namespace=item[2], compute_s=item[3])
+                continue
+            with self._cond:
+                while self.size + len(item[1]) > self.budget:
+                    self._start()
+                    self._cond.wait()  # backpressure: wait for the drain
+                old = self._pending.pop(item[0], None)
+                if old is not None:
+                    self.size -= len(old[1])
+                self._pending[item[0]] = item
+                self.size += len(item[1])
+                self._start()
+                self._cond.notify_all()
+
+    def delete(self, key: str) -> None:
+        with self._cond:
+            old = self._pending.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is persisted. False when
+        ``timeout`` ran out first."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._writing)
+
+    def _start(self) -> None:
+        # Caller holds the lock. The thread is started lazily (and again
+        # after a fork, where it doesn't survive).
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._drain, name="cache-write-behind", daemon=True)
+            self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                while self._pending and len(self._writing) < WRITE_BATCH:
+                    key, item = self._pending.popitem(last=False)
+                    self._writing[key] = item
+                batch = list(self._writing.values())
+            try:
+                self.backend.put_many(batch)
+            except Exception as e:  # never let the drain thread die
+                logger.warning("Cache write-behind dropped %d entries: %s", len(batch), e)
+            with self._cond:
+                for item in batch:
+                    self._writing.pop(item[0], None)
+                    self.size -= len(item[1])
+                self._cond.notify_all()
+
+
+def blob_digest(data: bytes) -> str:
+    """Content address of a serialized value, as the cache service names it."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class HTTPBackend:
+    """Client for the shared cache service (``services/cache/service.py``).
+
+    Requests carry the ``X-API-Key: SERVICE_TOKEN`` header like every other
+    inter-service call. ``requests`` errors are ``OSError`` subclasses, so an
+    unreachable service degrades to cache misses exactly like an unreadable
+    disk; lookups treat a malformed response the same way."""
+
+    name = "http"
+    # Values up to this size are sent with the first put; larger ones are
+    # offered by digest and uploaded only if the service doesn't have them.
+    INLINE_MAX_BYTES = 64 << 10
+
+    def __init__(self, url: str, *, token: Optional[str] = None, timeout: float = 30.0):
+        import requests
+
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+        token = token if token is not None else os.getenv("SERVICE_TOKEN", "")
+        self._session.headers["X-API-Key"] = token or ""
+
+    def _call(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        r = self._session.request(method, f"{self.url}{path}", json=payload, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Entry]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            found = self._call("POST", "/entries/get", {"keys": keys})["entries"]
+            return {
+                key: (base64.b64decode(entry["data"], validate=True), float(entry.get("compute_s") or 0.0))
+                for key, entry in found.items()
+            }
+        except (OSError, KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.warning("Cache service lookup failed for %d key(s): %s", len(keys), e)
+            return {}
+
+    def put(self, key: str, data: bytes, *, namespace: str = "", compute_s: float = 0.0) -> None:
+        self.put_many([(key, data, namespace, compute_s)])
+
+    def put_many(self, items: Iterable[Item]) -> None:
+        items = list(items)
+        if not items:
+            return
+        blobs: Dict[str, bytes] = {}
+        entries: List[dict] = []
+        for key, data, namespace, compute_s in items:
+            digest = blob_digest(data)
+            blobs[digest] = data
+            entry = {"key": key, "digest": digest, "namespace": namespace, "compute_s": compute_s}
+            if len(data) <= self.INLINE_MAX_BYTES:
+                entry["data"] = base64.b64encode(data).decode("ascii")
+            entries.append(entry)
+        missing = set(self._call("POST", "/entries/put", {"entries": entries})["missing"])
+        if missing:
+            retry = [
+                dict(entry, data=base64.b64encode(blobs[entry["digest"]]).decode("ascii"))
+                for entry in entries if entry["digest"] in missing
+            ]
+            self._call("POST", "/entries/put", {"entries": retry})
+
+    def delete(self, key: str) -> bool:
+        return self._call("POST", "/entries/delete", {"keys": [key]})["deleted"] > 0
+
+    def clear(self) -> int:
+        return self._call("POST", "/clear")["removed"]
+
+    def record(self, deltas: Dict[str, Dict[str, float]]) -> None:
+        self._call("POST", "/stats", {"deltas": deltas})
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return self._call("GET", "/stats")["namespaces"]
+
+    def prune(self, *, older_than_s: Optional[float] = None, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        out = self._call("POST", "/prune", {"older_than_s": older_than_s, "max_bytes": max_bytes})
+        return out["removed"], out["freed"]
+
+    def usage(self) -> Dict[str, int]:
+        return self._call("GET", "/usage")
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def cache_url() -> str:
+    return os.getenv("WHISPERFORGE_CACHE_URL", "").strip() or "http://cache:8000"
+
+
+_backends: Dict[Tuple[str, str], object] = {}
+_backends_lock = threading.Lock()
+
+
+def backend_kind(kind: Optional[str] = None) -> str:
+    """``kind`` or ``WHISPERFORGE_CACHE_BACKEND``, validated."""
+    kind = (kind or os.getenv("WHISPERFORGE_CACHE_BACKEND") or "sqlite").strip().lower()
+    if kind not in BACKENDS:
+        logger.warning("Unknown WHISPERFORGE_CACHE_BACKEND=%r; using sqlite", kind)
+        kind = "sqlite"
+    return kind
+
+
+def get_backend(root: Path, kind: Optional[str] = None):
+    """The process-wide backend for ``root`` (one SQLite connection per
+    cache directory; one HTTP session per service URL). ``kind`` defaults
+    to ``WHISPERFORGE_CACHE_BACKEND``."""
+    kind = backend_kind(kind)
+    slot = (kind, cache_url() if kind == "http" else str(Path(root)))
+    with _backends_lock:
+        backend = _backends.get(slot)
+        if backend is None:
+            if kind == "http":
+                backend = HTTPBackend(slot[1])
+            elif kind == "sqlite":
+                backend = SQLiteBackend(root)
+            else:
+                backend = FileBackend(root)
+            _backends[slot] = backend
+    return backend
+
+
+_memory: Dict[str, MemoryLRU] = {}
+_writers: Dict[int, WriteBehind] = {}
+
+
+def get_memory(root: Path) -> Optional[MemoryLRU]:
+    """The process-wide memory layer for ``root``, or ``None`` when
+    ``WHISPERFORGE_CACHE_MEMORY_BYTES=0``."""
+    budget = memory_bytes()
+    if not budget:
+        return None
+    slot = str(Path(root))
+    with _backends_lock:
+        layer = _memory.get(slot)
+        if layer is None or layer.budget != budget:
+            layer = _memory[slot] = MemoryLRU(budget)
+    return layer
+
+
+def get_writer(root: Path) -> Optional[WriteBehind]:
+    """The process-wide write-behind queue for ``root``'s backend, or
+    ``None`` when ``WHISPERFORGE_CACHE_WRITE_BEHIND_BYTES=0``."""
+    budget = write_behind_bytes()
+    if not budget:
+        return None
+    backend = get_backend(root)
+    with _backends_lock:
+        writer = _writers.get(id(backend))
+        if writer is None or writer.backend is not backend:
+            writer = _writers[id(backend)] = WriteBehind(backend, budget)
+        writer.budget = budget
+    return writer
+
+
+def flush_writers(timeout: Optional[float] = None) -> None:
+    """Drain every write-behind queue (``cache.flush`` and exit)."""
+    with _backends_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        if not writer.flush(timeout):
+            logger.warning("Cache write-behind still had %d entries queued at flush", len(writer))
@@ -16,6 +16,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
+from . import hashing
 from .config import CACHE_DIR
 
 CAPTURES_DIR = CACHE_DIR / "captures"
@@ -93,6 +94,7 @@ def create_capture(
     text: Optional[str] = None,
     metadata: Optional[dict[str, Any]] = None,
     capture_id: Optional[str] = None,
+    text_sha256: Optional[str] = None,
 ) -> CaptureRecord:
     capture_id = capture_id or new_capture_id()
     source = normalize_source(source)
@@ -101,14 +103,15 @@ def create_capture(
 
     input_path: Optional[str] = None
     text_excerpt: Optional[str] = None
-    text_sha256: Optional[str] = None
-    if text is not None:
+    if text is None:
+        text_sha256 = None
+    else:
         input_file = path / "input.txt"
         input_file.write_text(text, encoding="utf-8")
         input_path = str(input_file)
         stripped = text.strip()
         text_excerpt = stripped[:320]
-        text_sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        text_sha256 = text_sha256 or hashlib.sha256(text.encode("utf-8")).hexdigest()
 
     record = CaptureRecord(
         capture_id=capture_id,
@@ -124,7 +127,12 @@ def create_capture(
     return record
 
 
-def import_capture_file(path: str | Path, *, source: str = "import_folder") -> CaptureRecord | None:
+def import_capture_file(
+    path: str | Path,
+    *,
+    source: str = "import_folder",
+    content_hash: Optional[str] = None,
+) -> CaptureRecord | None:
     file_path = Path(path)
     if not _is_import_candidate(file_path) or not file_path.is_file():
         return None
@@ -152,8 +160,16 @@ def import_capture_file(path: str | Path, *, source: str = "import_folder") -> C
             title=_default_title(source, file_path.name, text),
             text=text,
             metadata=metadata,
+            text_sha256=text_sha256,
         )
     if suffix in AUDIO_IMPORT_SUFFIXES:
+        # The same recording copied into another folder is a duplicate too.
+        # The digest is memoized per file, so transcribing it later (cache
+        # key) doesn't read the audio again.
+        metadata["content_hash"] = content_hash or hashing.file_hash(file_path)
+        existing = _find_duplicate(content_hash=metadata["content_hash"])
+        if existing:
+            return existing
         return create_capture(
             source=source,
             filename=file_path.name,
@@ -168,8 +184,16 @@ def import_capture_folder(path: str | Path, *, source: str = "import_folder") ->
         raise ValueError(f"import folder does not exist: {folder}")
 
     records: list[CaptureRecord] = []
-    for file_path in sorted(p for p in folder.rglob("*") if p.is_file()):
-        record = import_capture_file(file_path, source=source)
+    files = sorted(p for p in folder.rglob("*") if p.is_file())
+    # Hash every new recording up front on the pool instead of one by one.
+    known = {record.metadata.get("source_path") for record in list_captures(limit=10_000)}
+    hashes = hashing.hash_files(
+        p for p in files
+        if p.suffix.lower() in AUDIO_IMPORT_SUFFIXES and _is_import_candidate(p)
+        and _source_path(p) not in known
+    )
+    for file_path in files:
+        record = import_capture_file(file_path, source=source, content_hash=hashes.get(file_path))
         if record:
             records.append(record)
     return records
@@ -270,12 +294,15 @@ def _find_duplicate(
     *,
     source_path: Optional[str] = None,
     text_sha256: Optional[str] = None,
+    content_hash: Optional[str] = None,
 ) -> CaptureRecord | None:
     for record in list_captures(limit=10_000):
         if source_path and record.metadata.get("source_path") == source_path:
             return record
         if text_sha256 and record.text_sha256 == text_sha256:
             return record
+        if content_hash and record.metadata.get("content_hash") == content_hash:
+            return record
     return None
 
 
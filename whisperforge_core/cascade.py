@@ -0,0 +1,255 @@
+"""Model cascade: cheap-first drafting with escalation for ``llm.generate``.
+
+Every stage used to run on the one selected model, even the ones a small
+model handles fine (social posts, image prompts). With a cascade policy for
+a stage, ``call()`` first sends the request to the policy's cheap model and
+scores the answer locally with ``score()``:
+
+- JSON stages (chapters, fact-check) must parse and carry their list key;
+- every stage must reach a minimum length, and article stages must reach
+  most of the ``Target length: approximately N words`` they were asked for;
+- cleanup must stay close to the input's length (no summarising, no
+  truncation);
+- grounded stages must share vocabulary with the transcript — the same
+  overlap signal ``scorecards`` uses for its grounding dimension.
+
+An output that passes is returned as-is. A failing (or erroring) cheap
+attempt escalates: the request is re-run on the selected model, through
+``hedging`` when a hedge policy exists. Cheap attempts are tagged
+``route="cascade"`` in the cost ledger; every decision lands in
+``events()``, and ``stats()`` rolls them up per stage into escalation rates
+and estimated saved cost (the selected model's price for the accepted
+cheap answers, minus what the cheap attempts cost).
+
+Policies come from ``configure()`` or, for every stage,
+``WHISPERFORGE_CASCADE_CHEAP="<provider>:<model>"`` (e.g.
+``Anthropic:claude-haiku-4-5``), optionally limited with
+``WHISPERFORGE_CASCADE_STAGES=social_media,image_prompts``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from . import cost, scorecards, tokens
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Words below which a stage's output is treated as a failed draft.
+MIN_WORDS: Dict[str, int] = {
+    "wisdom_extraction": 80,
+    "outline_creation": 60,
+    "social_media": 40,
+    "image_prompts": 30,
+    "article_writing": 250,
+    "article_critique": 40,
+    "article_revise": 250,
+    "wisdom_reduce": 80,
+    "outline_reduce": 60,
+}
+# Stages whose output must be a JSON object with this list key.
+JSON_KEYS: Dict[str, str] = {
+    "chapters": "chapters",
+    "chapters_timestamped": "chapters",
+    "chapter_titles": "chapters",
+    "article_fact_check": "flags",
+}
+# Stages that must stay on the transcript's vocabulary, and the minimum
+# ``scorecards`` overlap ratio ("partial source overlap").
+GROUNDED = ("wisdom_extraction", "outline_creation", "article_writing", "article_revise")
+MIN_OVERLAP = 0.08
+# Article stages must reach this share of their requested word count, and
+# cleanup must keep this share of the transcript's words (and not balloon).
+LENGTH_TARGET_SHARE = 0.6
+CLEANUP_RATIO = (0.6, 1.2)
+
+_TARGET_RE = re.compile(r"approximately (\d+) words", re.I)
+
+_lock = threading.Lock()
+_policies: Dict[str, CascadePolicy] = {}
+
+
+@dataclass
+class CascadePolicy:
+    """Cheap model tried first for one stage; the selected model is the
+    escalation target."""
+    cheap_provider: str
+    cheap_model: str
+
+
+@dataclass
+class Verdict:
+    passed: bool
+    reasons: List[str] = field(default_factory=list)
+    signals: dict = field(default_factory=dict)
+
+
+@dataclass
+class CascadeEvent:
+    stage: str
+    cheap: str                  # "provider model"
+    strong: str
+    escalated: bool
+    reasons: List[str]
+    saved_usd: float            # negative when the cheap attempt was wasted
+    at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+_events: List[CascadeEvent] = []
+
+
+def configure(policies: Dict[str, Optional[CascadePolicy]]) -> None:
+    """Set (or, with None, clear) the policy for each stage in ``policies``."""
+    with _lock:
+        for stage, policy in policies.items():
+            if policy is None:
+                _policies.pop(stage, None)
+            else:
+                _policies[stage] = policy
+
+
+def reset() -> None:
+    """Drop configured policies and events (tests)."""
+    with _lock:
+        _policies.clear()
+        _events.clear()
+
+
+def policy_for(stage: str, provider: str = "", model: str = "") -> Optional[CascadePolicy]:
+    """Configured policy for ``stage``, else the env default, else None.
+    None as well when the cheap model *is* the selected model."""
+    with _lock:
+        policy = _policies.get(stage)
+    if policy is None:
+        cheap = os.getenv("WHISPERFORGE_CASCADE_CHEAP", "").strip()
+        if ":" not in cheap:
+            return None
+        stages = [s.strip() for s in os.getenv("WHISPERFORGE_CASCADE_STAGES", "").split(",") if s.strip()]
+        if stages and stage not in stages:
+            return None
+        cheap_provider, cheap_model = (part.strip() for part in cheap.split(":", 1))
+        policy = CascadePolicy(cheap_provider=cheap_provider, cheap_model=cheap_model)
+    if (policy.cheap_provider, policy.cheap_model) == (provider, model):
+        return None
+    return policy
+
+
+def score(stage: str, output: Optional[str], context: Optional[dict] = None) -> Verdict:
+    """Local quality gate for one stage's output. No model calls."""
+    context = context or {}
+    text = (output or "").strip()
+    if not text:
+        return Verdict(False, ["empty output"])
+    signals = scorecards.output_signals(text, context.get("transcript", ""))
+    reasons: List[str] = []
+
+    if stage in JSON_KEYS:
+        key = JSON_KEYS[stage]
+        if not isinstance(_json_list(text, key), list):
+            reasons.append(f"invalid JSON (expected an object with a {key!r} list)")
+
+    minimum = MIN_WORDS.get(stage, 0)
+    target = _TARGET_RE.search(context.get("_user_prefix", ""))
+    if target:
+        minimum = max(minimum, int(int(target.group(1)) * LENGTH_TARGET_SHARE))
+    if signals["words"] < minimum:
+        reasons.append(f"too short ({signals['words']} < {minimum} words)")
+
+    if stage == "transcript_cleanup":
+        source_words = scorecards.output_signals(context.get("transcript", ""))["words"]
+        low, high = CLEANUP_RATIO
+        if source_words and not low <= signals["words"] / source_words <= high:
+            reasons.append(
+                f"cleanup changed length {signals['words']}/{source_words} words"
+            )
+
+    if stage in GROUNDED and context.get("transcript") and signals["overlap"] < MIN_OVERLAP:
+        reasons.append(f"low transcript overlap ({signals['overlap']:.2f})")
+
+    return Verdict(not reasons, reasons, signals)
+
+
+def _json_list(text: str, key: str):
+    if text.startswith("```"):
+        lines = text.splitlines()
+        text = "\n".join(lines[1:-1]) if len(lines) >= 3 else text
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data.get(key) if isinstance(data, dict) else None
+
+
+def call(
+    stage: str,
+    provider: str,
+    model: str,
+    policy: CascadePolicy,
+    send: Callable[[str, str, str], str],
+    escalate: Callable[[], str],
+    *,
+    context: Optional[dict] = None,
+    estimated_input_tokens: int = 0,
+) -> str:
+    """Try ``send(cheap_provider, cheap_model, "cascade")``; return it when
+    ``score`` passes, else return ``escalate()`` (the selected model)."""
+    try:
+        draft = send(policy.cheap_provider, policy.cheap_model, "cascade")
+        verdict = score(stage, draft, context)
+    except Exception as e:
+        draft, verdict = None, Verdict(False, [f"cheap model failed: {e}"])
+
+    out_tokens = tokens.count(draft or "", policy.cheap_model)
+    cheap_usd = cost.price(policy.cheap_provider, policy.cheap_model, estimated_input_tokens, out_tokens)
+    event = CascadeEvent(
+        stage=stage,
+        cheap=f"{policy.cheap_provider} {policy.cheap_model}",
+        strong=f"{provider} {model}",
+        escalated=not verdict.passed,
+        reasons=verdict.reasons,
+        saved_usd=round(
+            cost.price(provider, model, estimated_input_tokens, out_tokens) - cheap_usd
+            if verdict.passed else -cheap_usd,
+            6,
+        ),
+    )
+    with _lock:
+        _events.append(event)
+    if verdict.passed:
+        return draft or ""
+    logger.info(
+        "%s: %s draft failed (%s) — escalating to %s",
+        stage, event.cheap, "; ".join(verdict.reasons), event.strong,
+    )
+    return escalate()
+
+
+def events() -> List[CascadeEvent]:
+    return list(_events)
+
+
+def stats(entries: Optional[List[CascadeEvent]] = None) -> Dict[str, dict]:
+    """Per-stage ``{calls, escalations, escalation_rate, saved_usd}``."""
+    out: Dict[str, dict] = {}
+    for event in _events if entries is None else entries:
+        row = out.setdefault(event.stage, {"calls": 0, "escalations": 0, "saved_usd": 0.0})
+        row["calls"] += 1
+        row["escalations"] += 1 if event.escalated else 0
+        row["saved_usd"] += event.saved_usd
+    for row in out.values():
+        row["escalation_rate"] = round(row["escalations"] / row["calls"], 3)
+        row["saved_usd"] = round(row["saved_usd"], 6)
+    return out
@@ -0,0 +1,210 @@
+"""Local chapter segmentation: embeddings find the boundaries, one LLM call
+names the chapters.
+
+``llm.generate_chapters`` used to send the whole (optionally timestamped)
+transcript to a model just to find topic boundaries. Here the transcript is
+split into sentence blocks (or the ASR segments, when present), embedded
+with ``rag.embedder``, and cut TextTiling-style: the cosine similarity
+between the windows either side of every gap is computed in one vectorized
+pass, each gap gets a depth score (how far it dips below the peaks around
+it), and the deepest valleys become chapter starts. ``start_quote`` and
+``start_seconds`` come straight from the block that opens each chapter, so
+they are verbatim by construction.
+
+The only model call left is ``chapter_titles``: one batched request that
+writes a title and summary for every chapter. If it fails — or there is no
+provider at all — chapters keep heuristic titles taken from their opening
+words, so segmentation works offline.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Blocks are merged sentences/segments of at least this many words; single
+# sentences are too short to embed into a stable topic signal.
+BLOCK_WORDS = 40
+# Chapters span at least this many blocks.
+MIN_CHAPTER_BLOCKS = 2
+# Smoothing window (blocks per side) for the gap similarity.
+WINDOW = 3
+# Valleys shallower than this are within-topic noise, whatever the cutoff.
+MIN_DEPTH = 0.05
+# Same length guidance the chapters prompt gives the model, in words at
+# ~150 spoken words per minute: <3 min -> 2, 3-15 min -> 5, longer -> 10.
+CHAPTER_CAPS = ((450, 2), (2250, 5))
+MAX_CHAPTERS = 10
+QUOTE_WORDS = 10
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class Block:
+    text: str
+    start_seconds: Optional[float] = None
+
+
+def blocks(transcript: str, segments: Optional[list] = None) -> List[Block]:
+    """Sentences (or ASR segments) merged into ~``BLOCK_WORDS`` blocks."""
+    if segments:
+        units = [
+            Block((s.get("text") or "").strip(), float(s.get("start", 0.0)))
+            for s in segments if (s.get("text") or "").strip()
+        ]
+    else:
+        units = [Block(s.strip()) for s in _SENTENCE_RE.split(transcript or "") if s.strip()]
+    out: List[Block] = []
+    for unit in units:
+        if out and len(out[-1].text.split()) < BLOCK_WORDS:
+            out[-1].text = f"{out[-1].text} {unit.text}"
+        else:
+            out.append(Block(unit.text, unit.start_seconds))
+    return out
+
+
+def gap_similarity(embeddings: np.ndarray, window: int = WINDOW) -> np.ndarray:
+    """Cosine similarity between the ``window`` blocks before and after each
+    of the ``n - 1`` gaps, from prefix sums — no per-gap loop."""
+    n = len(embeddings)
+    if n < 2:
+        return np.zeros(0, dtype=np.float32)
+    csum = np.vstack([np.zeros((1, embeddings.shape[1]), dtype=np.float64),
+                      np.cumsum(embeddings, axis=0, dtype=np.float64)])
+    gaps = np.arange(1, n)
+    left = csum[gaps] - csum[np.maximum(gaps - window, 0)]
+    right = csum[np.minimum(gaps + window, n)] - csum[gaps]
+    norms = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+    return (np.einsum("ij,ij->i", left, right) / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def depth_scores(similarity: np.ndarray, window: int = WINDOW) -> np.ndarray:
+    """TextTiling depth: (left peak - s) + (right peak - s), with peaks taken
+    over ``2 * window`` gaps each side."""
+    if similarity.size == 0:
+        return similarity
+    reach = 2 * window
+    padded = np.pad(similarity, reach, mode="constant", constant_values=-np.inf)
+    views = np.lib.stride_tricks.sliding_window_view(padded, reach + 1)
+    left_peak = views[: similarity.size].max(axis=1)
+    right_peak = views[reach:].max(axis=1)
+    return (left_peak - similarity) + (right_peak - similarity)
+
+
+def boundaries(embeddings: np.ndarray, max_chapters: int) -> List[int]:
+    """Indices of the blocks that open a new chapter (excluding block 0)."""
+    n = len(embeddings)
+    if max_chapters < 2 or n < 2 * MIN_CHAPTER_BLOCKS:
+        return []
+    similarity = gap_similarity(embeddings)
+    depth = depth_scores(similarity)
+    # Only local minima of the similarity curve are valleys; the slopes
+    # either side of a real shift would otherwise qualify too.
+    padded = np.pad(similarity, 1, mode="edge")
+    valley = (similarity <= padded[:-2]) & (similarity <= padded[2:])
+    # TextTiling's cutoff: only valleys deeper than mean - std/2 qualify.
+    cutoff = max(float(depth.mean() - depth.std() / 2), MIN_DEPTH)
+    chosen: List[int] = []
+    for gap in np.argsort(-depth, kind="stable"):
+        if depth[gap] < cutoff or len(chosen) == max_chapters - 1:
+            break
+        if not valley[gap]:
+            continue
+        start = int(gap) + 1
+        if start < MIN_CHAPTER_BLOCKS or n - start < MIN_CHAPTER_BLOCKS:
+            continue
+        if any(abs(start - other) < MIN_CHAPTER_BLOCKS for other in chosen):
+            continue
+        chosen.append(start)
+    return sorted(chosen)
+
+
+def chapter_cap(word_count: int) -> int:
+    for limit, cap in CHAPTER_CAPS:
+        if word_count < limit:
+            return cap
+    return MAX_CHAPTERS
+
+
+def segment(
+    transcript: str,
+    segments: Optional[list] = None,
+    *,
+    embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+) -> List[dict]:
+    """Chapters as ``{"start_quote", "start_seconds"?, "text"}`` dicts, no
+    titles yet. ``embed`` defaults to ``rag.embedder.embed``."""
+    parts = blocks(transcript, segments)
+    if not parts:
+        return []
+    if embed is None:
+        from .rag import embedder  # lazy import — sentence-transformers is heavy
+        embed = embedder.embed
+    words = sum(len(b.text.split()) for b in parts)
+    starts = [0] + boundaries(np.asarray(embed([b.text for b in parts])), chapter_cap(words))
+    out = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(parts)
+        chapter = {
+            "start_quote": " ".join(parts[start].text.split()[:QUOTE_WORDS]),
+            "text": " ".join(b.text for b in parts[start:end]),
+        }
+        if parts[start].start_seconds is not None:
+            chapter["start_seconds"] = parts[start].start_seconds
+        out.append(chapter)
+    return out
+
+
+def render_for_titles(chapters: List[dict], excerpt_words: int = 250) -> str:
+    """``chapter_titles`` input: each chapter's opening words, numbered."""
+    return "\n\n".join(
+        f"### Chapter {i}\n{' '.join(c['text'].split()[:excerpt_words])}"
+        for i, c in enumerate(chapters, 1)
+    )
+
+
+def apply_titles(chapters: List[dict], raw: Optional[str]) -> List[dict]:
+    """Merge the ``chapter_titles`` answer into the local chapters. Missing
+    or malformed entries fall back to the chapter's opening words."""
+    named = _parse_titles(raw)
+    out = []
+    for i, chapter in enumerate(chapters):
+        entry = named[i] if i < len(named) else {}
+        words = chapter["text"].split()
+        item = {
+            "title": str(entry.get("title") or "").strip() or " ".join(words[:6]).rstrip(".,;:"),
+            "summary": (
+                str(entry.get("summary") or "").strip()
+                or _SENTENCE_RE.split(chapter["text"], maxsplit=1)[0]
+            ),
+            "start_quote": chapter["start_quote"],
+        }
+        if "start_seconds" in chapter:
+            item["start_seconds"] = chapter["start_seconds"]
+        out.append(item)
+    return out
+
+
+def _parse_titles(raw: Optional[str]) -> List[dict]:
+    text = (raw or "").strip()
+    if text.startswith("```"):
+        lines = text.splitlines()
+        text = "\n".join(lines[1:-1]) if len(lines) >= 3 else text
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return []
+    try:
+        data = json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return []
+    items = data.get("chapters") if isinstance(data, dict) else None
+    return [item for item in items or [] if isinstance(item, dict)]
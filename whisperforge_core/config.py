@@ -151,6 +151,18 @@ DEFAULT_PROMPTS = {
         '"summary":"...", "start_seconds":0.0, "start_quote":"..."}]} with '
         "no preamble, no markdown fences, no commentary."
     ),
+    # Boundaries already found locally (chaptering.py); name each chapter.
+    "chapter_titles": (
+        "Each numbered section below is one chapter of a transcript, in "
+        "order, shown by its opening passage.\n\n"
+        "For every chapter produce:\n"
+        '- "title": a 3-6 word headline\n'
+        '- "summary": one sentence describing what the chapter covers\n\n'
+        "Return exactly one entry per chapter, in the same order. Do NOT "
+        "merge, split or skip chapters.\n\n"
+        'Return ONLY a JSON object: {"chapters": [{"title":"...", '
+        '"summary":"..."}]} with no preamble, no markdown fences, no commentary.'
+    ),
     "wisdom_extraction": (
         "Extract key insights, lessons, and wisdom from the transcript. "
         "Focus on actionable takeaways and profound realizations."
@@ -225,6 +237,26 @@ DEFAULT_PROMPTS = {
         'passage>", "issue": "<why it\'s wrong>"}]}. If nothing to flag, '
         'return {"flags": []}. No preamble, no markdown fences.'
     ),
+    # --- Map-reduce merges for transcripts beyond the context budget ---
+    "wisdom_reduce": (
+        "You are merging wisdom extracted separately from consecutive parts "
+        "of one long transcript.\n\n"
+        "- Combine the parts into a single set of insights in the same format\n"
+        "- Merge duplicates and near-duplicates; keep the most specific phrasing\n"
+        "- Keep insights that appear in only one part — they are not less important\n"
+        "- Preserve the narrative order of the original conversation\n"
+        "- Do NOT invent insights that aren't in the parts\n\n"
+        "Return ONLY the merged wisdom. Do not mention parts or merging."
+    ),
+    "outline_reduce": (
+        "You are merging outlines created separately for consecutive parts "
+        "of one long transcript into a single article outline.\n\n"
+        "- Produce one coherent outline with major sections and subsections\n"
+        "- Follow the order of the transcript parts\n"
+        "- Fold repeated themes into one section instead of repeating them\n"
+        "- Use the merged wisdom to decide emphasis\n\n"
+        "Return ONLY the merged outline. Do not mention parts or merging."
+    ),
     "seo_analysis": (
         "Analyze the content from an SEO perspective and provide optimization "
         "recommendations for better search visibility while maintaining content quality."
@@ -62,6 +62,22 @@ class UsageRecord:
     cache_write_tokens: int = 0
     # For ASR: billed by audio duration, not tokens.
     audio_seconds: float = 0.0
+    # ``tokens.plan`` estimate taken before the call, kept next to the
+    # provider-reported usage so estimator drift is visible.
+    estimated_input_tokens: int = 0
+    # ``generate`` content_type (e.g. "wisdom_extraction"); "" for ad-hoc calls.
+    stage: str = ""
+    # "" for a normal call; "hedge" / "failover" for a secondary request sent
+    # by ``hedging`` — the extra spend hedging costs; "batch" for a result
+    # fetched from a provider batch endpoint by ``batch``; "cascade" for a
+    # cheap-model first attempt sent by ``cascade``.
+    route: str = ""
+
+
+# Batch endpoints (Anthropic Message Batches, OpenAI Batch API) bill every
+# token lane at half the interactive rate.
+BATCH_DISCOUNT = 0.5
+HEDGE_ROUTES = ("hedge", "failover")
 
 
 # Module-level ledger. Callers that want per-run scoping should
@@ -105,6 +121,11 @@ class CostBreakdown:
     output_tokens: int = 0
     cache_read_tokens: int = 0
     cache_write_tokens: int = 0
+    estimated_input_tokens: int = 0
+    hedge_calls: int = 0
+    hedge_usd: float = 0.0  # Spent on hedged/failover secondary requests
+    batch_calls: int = 0
+    batch_savings_usd: float = 0.0  # Batch discount vs. interactive rates
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -134,6 +155,9 @@ def estimate_cost(entries: Optional[List[UsageRecord]] = None) -> CostBreakdown:
             # Unknown model — skip but count tokens so the UI can still show them.
             b.input_tokens += u.input_tokens
             b.output_tokens += u.output_tokens
+            b.estimated_input_tokens += u.estimated_input_tokens
+            b.hedge_calls += 1 if u.route in HEDGE_ROUTES else 0
+            b.batch_calls += 1 if u.route == "batch" else 0
             continue
         in_rate, out_rate = rates
         # Anthropic splits input tokens across three lanes; ``input_tokens``
@@ -157,12 +181,40 @@ def estimate_cost(entries: Optional[List[UsageRecord]] = None) -> CostBreakdown:
         savings = hypothetical - cost
         if savings > 0:
             b.cache_savings_usd += savings
+        if u.route == "batch":
+            b.batch_calls += 1
+            b.batch_savings_usd += cost * (1 - BATCH_DISCOUNT)
+            cost *= BATCH_DISCOUNT
 
         b.llm_usd += cost
         b.total_usd += cost
+        if u.route in HEDGE_ROUTES:
+            b.hedge_calls += 1
+            b.hedge_usd += cost
         b.input_tokens += regular_in
         b.output_tokens += u.output_tokens
         b.cache_read_tokens += cache_read
         b.cache_write_tokens += cache_write
+        b.estimated_input_tokens += u.estimated_input_tokens
 
     return b
+
+
+def price(provider: str, model: str, input_tokens: int, output_tokens: int) -> float:
+    """Interactive USD price of one uncached call; 0.0 for unpriced models."""
+    rates = PRICING.get((provider, model))
+    if not rates:
+        return 0.0
+    return (input_tokens * rates[0] + output_tokens * rates[1]) / 1_000_000
+
+
+def by_stage(entries: Optional[List[UsageRecord]] = None) -> Dict[str, CostBreakdown]:
+    """``estimate_cost`` per ``UsageRecord.stage``, in first-seen order.
+    Untagged calls are grouped under "other". This is where per-stage cache
+    reads/writes show whether the shared transcript prefix is being hit."""
+    if entries is None:
+        entries = _ledger
+    grouped: Dict[str, List[UsageRecord]] = {}
+    for u in entries:
+        grouped.setdefault(u.stage or "other", []).append(u)
+    return {stage: estimate_cost(group) for stage, group in grouped.items()}
@@ -19,7 +19,7 @@ from typing import Optional
 
 from .config import CACHE_DIR
 from .logging import get_logger
-from .notion import ContentBundle
+from .notion import ContentBundle, format_stage_cache
 
 logger = get_logger(__name__)
 
@@ -231,6 +231,15 @@ def markdown_from_bundle(bundle: ContentBundle,
         parts.append(f"- **Cache savings:** {_usd('cache_savings_usd')}  ·  **Calls:** {_i('calls')}  ·  **Duration:** {dur_str}")
         parts.append(f"- **Tokens in/out:** {_i('input_tokens')} / {_i('output_tokens')}  ·  **Cache read/write:** {_i('cache_read_tokens')} / {_i('cache_write_tokens')}")
         parts.append(f"- **Backend:** {m.get('backend') or '—'}  ·  **Flags on:** {flag_line}")
+        stage_line = format_stage_cache(m.get("stages"))
+        if stage_line:
+            parts.append(f"- **Cache read/write by stage:** {stage_line}")
+        approximate = ", ".join(
+            f"{hit.get('stage') or '?'} ({hit.get('similarity', 0):.3f})"
+            for hit in m.get("semantic_hits") or []
+        )
+        if approximate:
+            parts.append(f"- **Approximate (semantic cache) answers:** {approximate}")
         parts.append("")
 
     receipts = _source_receipts(bundle)
@@ -0,0 +1,192 @@
+"""Local grounding prefilter for the fact-check pass.
+
+``article_fact_check`` used to send the whole article to a model, even
+though most of its sentences restate the transcript almost word for word.
+``check()`` splits the article into sentences and scores each one against
+the transcript without any model call:
+
+- **containment** — the share of the sentence's word 3-gram shingles found
+  in a shingle index of the transcript (exact and near-verbatim reuse);
+- **similarity** — the best cosine similarity to a transcript block under
+  ``rag.embedder`` (paraphrase), computed only for sentences the shingles
+  didn't already settle.
+
+A sentence is *grounded* when its containment or its similarity clears the
+threshold and every number it quotes also appears in the transcript —
+invented statistics are the classic fact-check miss, and embeddings are
+blind to them. Everything else is sent on to the model, together with only
+the transcript blocks those sentences matched best (``Report.evidence()``)
+rather than the whole transcript. Headings and fragments shorter than
+``MIN_CLAIM_WORDS`` aren't claims and are skipped.
+
+If the embedder can't load the check degrades to shingles only, which
+just sends more sentences to the model.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from . import chaptering
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+SHINGLE = 3
+MIN_CLAIM_WORDS = 5
+# Sentences at or above either threshold (with all their numbers present in
+# the transcript) count as grounded.
+GROUNDED_CONTAINMENT = 0.6
+GROUNDED_SIMILARITY = 0.8
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:['.,][a-z0-9]+)*")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_MARKUP_RE = re.compile(r"^\s*(?:[-*+>]|\d+[.)])\s+")
+
+
+@dataclass
+class Claim:
+    text: str
+    containment: float
+    similarity: Optional[float] = None   # None: not embedded
+    missing_numbers: List[str] = field(default_factory=list)
+    grounded: bool = False
+    passage: Optional[int] = None        # best-matching transcript block
+
+
+@dataclass
+class Report:
+    claims: List[Claim]
+    passages: List[str] = field(default_factory=list)   # transcript blocks
+
+    @property
+    def unverified(self) -> List[Claim]:
+        return [c for c in self.claims if not c.grounded]
+
+    def coverage(self) -> dict:
+        """``{claims, grounded, sent_to_llm, coverage}`` — recorded with the
+        fact-check flags."""
+        total = len(self.claims)
+        grounded = total - len(self.unverified)
+        return {
+            "claims": total,
+            "grounded": grounded,
+            "sent_to_llm": total - grounded,
+            "coverage": round(grounded / total, 3) if total else 0.0,
+        }
+
+    def evidence(self) -> str:
+        """The transcript blocks matched to unverified claims, in transcript
+        order — what the fact-check model reads instead of the transcript.
+        Empty when no unverified claim matched any block."""
+        picked = sorted({c.passage for c in self.unverified if c.passage is not None})
+        return "\n\n".join(self.passages[i] for i in picked)
+
+    def to_dict(self) -> dict:
+        return {"coverage": self.coverage(), "claims": [asdict(c) for c in self.claims]}
+
+
+def sentences(article: str) -> List[str]:
+    """Article sentences worth checking: markdown headings dropped, list and
+    quote markers stripped, fragments under ``MIN_CLAIM_WORDS`` skipped."""
+    out: List[str] = []
+    for line in (article or "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        line = _MARKUP_RE.sub("", line).replace("**", "").replace("__", "")
+        for sentence in _SENTENCE_RE.split(line):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= MIN_CLAIM_WORDS:
+                out.append(sentence)
+    return out
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _shingles(words: List[str]) -> set:
+    if len(words) < SHINGLE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+
+
+def _numbers(text: str) -> set:
+    return {n.replace(",", "") for n in _NUMBER_RE.findall(text)}
+
+
+def check(
+    article: str,
+    transcript: str,
+    *,
+    embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+) -> Report:
+    """Score every article sentence against ``transcript``. ``embed``
+    defaults to ``rag.embedder.embed``; it is only called when some
+    sentence isn't settled by its shingles."""
+    passages = [b.text for b in chaptering.blocks(transcript)]
+    index = _shingles(_words(transcript))
+    source_numbers = _numbers(transcript)
+    claims = []
+    for text in sentences(article):
+        grams = _shingles(_words(text))
+        claims.append(Claim(
+            text=text,
+            containment=round(len(grams & index) / len(grams), 3) if grams else 0.0,
+            missing_numbers=sorted(_numbers(text) - source_numbers),
+        ))
+
+    # Sentences with missing numbers can't be grounded, but are embedded
+    # anyway so the fact-check sees the passage they paraphrase.
+    pending = [c for c in claims if c.containment < GROUNDED_CONTAINMENT or c.missing_numbers]
+    if pending:
+        _embed_similarity(pending, passages, embed)
+    for c in claims:
+        c.grounded = not c.missing_numbers and (
+            c.containment >= GROUNDED_CONTAINMENT
+            or (c.similarity is not None and c.similarity >= GROUNDED_SIMILARITY)
+        )
+    _nearest_by_words([c for c in claims if not c.grounded and c.passage is None], passages)
+    return Report(claims, passages)
+
+
+def _embed_similarity(claims: List[Claim], passages: List[str], embed) -> None:
+    if not passages:
+        return
+    if embed is None:
+        from .rag import embedder  # lazy import — sentence-transformers is heavy
+        embed = embedder.embed
+    try:
+        vectors = np.asarray(embed([c.text for c in claims] + passages), dtype=np.float32)
+    except Exception as e:
+        logger.info("grounding: embedder unavailable (%s) — shingles only", e)
+        return
+    scores = vectors[: len(claims)] @ vectors[len(claims):].T
+    for claim, row in zip(claims, scores, strict=True):
+        claim.passage = int(row.argmax())
+        claim.similarity = round(float(row[claim.passage]), 3)
+
+
+def _nearest_by_words(claims: List[Claim], passages: List[str]) -> None:
+    """Shingles-only fallback for ``Claim.passage``: the block sharing the
+    most words with the claim, if it shares any."""
+    if not claims or not passages:
+        return
+    vocab = [set(_words(p)) for p in passages]
+    for claim in claims:
+        words = set(_words(claim.text))
+        overlap = [len(words & v) for v in vocab]
+        best = max(range(len(passages)), key=overlap.__getitem__)
+        if overlap[best]:
+            claim.passage = best
+
+
+def render_for_fact_check(report: Report) -> str:
+    """The unverified sentences, one per line, as the fact-check "article"."""
+    return "\n".join(f"- {c.text}" for c in report.unverified)
@@ -0,0 +1,181 @@
+"""Content hashing with a persistent stat-keyed memo.
+
+``cache.file_hash`` used to stream every byte of an audio file through
+sha256 on each ``transcribe_audio`` call — seconds per multi-GB recording,
+spent again on every re-run. Here a file's digest is remembered in
+``hashes.sqlite3`` under the cache dir, keyed by
+``(st_dev, st_ino, st_size, st_mtime_ns, algorithm)``: an untouched file is
+never read twice, and any rewrite changes the key.
+
+New files are hashed through ``mmap`` (no read-buffer copies; hashlib drops
+the GIL while it digests), so ``hash_files`` can fan a folder import out
+over a thread pool.
+
+The algorithm comes from ``WHISPERFORGE_HASH_ALGORITHM``: ``sha256``
+(default — existing cache keys, run memos and capture hashes stay valid),
+``blake2b`` (faster in pure software), or ``blake3`` when the ``blake3``
+package is installed. ``digest``/``text_digest`` use the same algorithm, so
+a file, its bytes and its text content always hash alike.
+
+A digest taken within ``RACY_SECONDS`` of the file's mtime is returned but
+not remembered: the file may still be mid-write inside the same mtime tick.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import time
+from typing import Dict, Iterable, Optional
+
+from .config import CACHE_DIR
+from .logging import get_logger
+
+try:
+    import blake3  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    blake3 = None
+
+logger = get_logger(__name__)
+
+DB_NAME = "hashes.sqlite3"
+ALGORITHMS = ("sha256", "blake2b", "blake3")
+DEFAULT_ALGORITHM = "sha256"
+CHUNK = 8 << 20
+RACY_SECONDS = 2.0
+MAX_WORKERS = min(8, (os.cpu_count() or 2))
+
+_lock = threading.Lock()
+_conns: Dict[str, sqlite3.Connection] = {}
+
+
+def algorithm() -> str:
+    name = os.getenv("WHISPERFORGE_HASH_ALGORITHM", "").strip().lower() or DEFAULT_ALGORITHM
+    if name not in ALGORITHMS or (name == "blake3" and blake3 is None):
+        logger.warning("Hash algorithm %r unavailable; using %s", name, DEFAULT_ALGORITHM)
+        return DEFAULT_ALGORITHM
+    return name
+
+
+def _hasher(name: str):
+    if name == "blake3":
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    if name == "blake2b":
+        return hashlib.blake2b(digest_size=32)
+    return hashlib.sha256()
+
+
+def digest(data: bytes, algo: Optional[str] = None) -> str:
+    h = _hasher(algo or algorithm())
+    h.update(data)
+    return h.hexdigest()
+
+
+def text_digest(text: str, algo: Optional[str] = None) -> str:
+    return digest(text.encode("utf-8"), algo)
+
+
+def _digest_file(path: Path, algo: str) -> str:
+    h = _hasher(algo)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, CHUNK):
+                    h.update(view[offset:offset + CHUNK])
+            finally:
+                view.release()
+    return h.hexdigest()
+
+
+def _db(create: bool = False) -> Optional[sqlite3.Connection]:
+    path = Path(CACHE_DIR) / DB_NAME
+    conn = _conns.get(str(path))
+    if conn is None:
+        if not create and not path.exists():
+            return None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, algorithm TEXT,"
+                " digest TEXT NOT NULL, path TEXT, hashed_at REAL,"
+                " PRIMARY KEY (dev, ino, size, mtime_ns, algorithm))"
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Hash memo unavailable (%s); hashing without it", e)
+            return None
+        _conns[str(path)] = conn
+    return conn
+
+
+def file_hash(path: str | Path, algo: Optional[str] = None) -> str:
+    """Hex digest of the file's bytes, from the memo when its stat key is
+    known."""
+    path = Path(path)
+    algo = algo or algorithm()
+    st = path.stat()
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, algo)
+    row = None
+    with _lock:
+        db = _db()
+        if db is not None:
+            try:
+                row = db.execute(
+                    "SELECT digest FROM hashes WHERE dev = ? AND ino = ? AND size = ?"
+                    " AND mtime_ns = ? AND algorithm = ?", key,
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Hash memo read failed for %s: %s", path.name, e)
+    if row is not None:
+        return row[0]
+    digest = _digest_file(path, algo)
+    now = time()
+    if now - st.st_mtime_ns / 1e9 < RACY_SECONDS:
+        return digest
+    with _lock:
+        db = _db(create=True)
+        if db is not None:
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, digest, str(path), now),
+                )
+            except sqlite3.Error as e:
+                logger.warning("Hash memo write failed for %s: %s", path.name, e)
+    return digest
+
+
+def hash_files(
+    paths: Iterable[str | Path],
+    *,
+    algo: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[Path, Optional[str]]:
+    """Digest many files at once on a thread pool. Unreadable files map to
+    ``None``."""
+    paths = [Path(p) for p in paths]
+    algo = algo or algorithm()
+
+    def _one(path: Path) -> Optional[str]:
+        try:
+            return file_hash(path, algo)
+        except OSError as e:
+            logger.warning("Could not hash %s: %s", path, e)
+            return None
+
+    if len(paths) <= 1:
+        return {p: _one(p) for p in paths}
+    with ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS) as pool:
+        return dict(zip(paths, pool.map(_one, paths), strict=True))
+
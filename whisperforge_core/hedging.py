@@ -0,0 +1,227 @@
+"""Hedged requests and latency-based provider failover for ``llm.generate``.
+
+A stage that hits a slow Anthropic minute just sits there, and a stage whose
+provider errors comes back None. With a routing policy for that stage,
+``call()`` starts the primary request and waits up to a deadline derived
+from the primary's recent p95 latency. If the primary hasn't answered by
+then, a hedged request goes to the policy's secondary (another model, or a
+local Ollama model) and whichever returns first wins. A primary that
+*errors* fails over to the secondary immediately.
+
+The loser is abandoned rather than killed — the provider SDKs can't be
+interrupted from another thread — so its usage still lands in the cost
+ledger when it finishes. Secondary calls are tagged ``route="hedge"`` or
+``route="failover"`` on their ``UsageRecord`` so ``cost.estimate_cost()``
+can report what hedging spent, and every hedge/failover is appended to
+``events()``.
+
+Policies come from ``configure()`` or, for a default secondary on every
+stage, ``WHISPERFORGE_HEDGE_SECONDARY="<provider>:<model>"`` (e.g.
+``Ollama (local):llama3.2``), optionally limited with
+``WHISPERFORGE_HEDGE_STAGES=wisdom_extraction,outline_creation``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Before a (provider, model, stage) has MIN_SAMPLES observations there is no
+# meaningful p95, so the deadline falls back to DEFAULT_DEADLINE_SECONDS.
+DEFAULT_DEADLINE_SECONDS = 30.0
+MIN_DEADLINE_SECONDS = 2.0
+MIN_SAMPLES = 5
+WINDOW = 50
+
+# Shared pool: abandoned losers keep a worker until their HTTP call returns.
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="wf-hedge")
+_lock = threading.Lock()
+_latencies: Dict[Tuple[str, str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=WINDOW))
+_policies: Dict[str, HedgePolicy] = {}
+
+
+@dataclass
+class HedgePolicy:
+    """Routing policy for one stage.
+
+    ``deadline_seconds`` pins the hedge deadline; when None it is the
+    primary's observed ``percentile`` latency (p95 by default)."""
+    secondary_provider: str
+    secondary_model: str
+    deadline_seconds: Optional[float] = None
+    percentile: float = 0.95
+    failover_on_error: bool = True
+
+
+@dataclass
+class HedgeEvent:
+    stage: str
+    reason: str                 # "deadline" | "error"
+    primary: str                # "provider model"
+    secondary: str
+    winner: str                 # "primary" | "secondary" | "none"
+    deadline_seconds: float
+    elapsed_seconds: float
+    at: float = field(default_factory=time.time)
+
+
+_events: List[HedgeEvent] = []
+
+
+def configure(policies: Dict[str, Optional[HedgePolicy]]) -> None:
+    """Set (or, with None, clear) the policy for each stage in ``policies``."""
+    with _lock:
+        for stage, policy in policies.items():
+            if policy is None:
+                _policies.pop(stage, None)
+            else:
+                _policies[stage] = policy
+
+
+def reset() -> None:
+    """Drop configured policies, latency history and events (tests)."""
+    with _lock:
+        _policies.clear()
+        _latencies.clear()
+        _events.clear()
+
+
+def policy_for(stage: str) -> Optional[HedgePolicy]:
+    """Configured policy for ``stage``, else the env default, else None."""
+    with _lock:
+        if stage in _policies:
+            return _policies[stage]
+    secondary = os.getenv("WHISPERFORGE_HEDGE_SECONDARY", "").strip()
+    if ":" not in secondary:
+        return None
+    stages = [s.strip() for s in os.getenv("WHISPERFORGE_HEDGE_STAGES", "").split(",") if s.strip()]
+    if stages and stage not in stages:
+        return None
+    provider, model = (part.strip() for part in secondary.split(":", 1))
+    return HedgePolicy(secondary_provider=provider, secondary_model=model)
+
+
+def observe(provider: str, model: str, stage: str, seconds: float) -> None:
+    """Record one successful call's latency."""
+    with _lock:
+        _latencies[(provider, model, stage)].append(seconds)
+
+
+def deadline(provider: str, model: str, stage: str, policy: HedgePolicy) -> float:
+    if policy.deadline_seconds is not None:
+        return policy.deadline_seconds
+    with _lock:
+        samples = sorted(_latencies.get((provider, model, stage), ()))
+    if len(samples) < MIN_SAMPLES:
+        return DEFAULT_DEADLINE_SECONDS
+    idx = min(len(samples) - 1, int(round(policy.percentile * (len(samples) - 1))))
+    return max(MIN_DEADLINE_SECONDS, samples[idx])
+
+
+def events() -> List[HedgeEvent]:
+    return list(_events)
+
+
+def _timed(fn: Callable[[], str], provider: str, model: str, stage: str) -> Callable[[], str]:
+    def run() -> str:
+        started = time.monotonic()
+        out = fn()
+        observe(provider, model, stage, time.monotonic() - started)
+        return out
+    return run
+
+
+def call(
+    stage: str,
+    provider: str,
+    model: str,
+    policy: HedgePolicy,
+    send: Callable[[str, str, str], str],
+) -> str:
+    """Run ``send(provider, model, route)`` under ``policy``. Returns the
+    first successful result; raises the primary's error only when the
+    secondary fails too (or failover is disabled)."""
+    limit = deadline(provider, model, stage, policy)
+    started = time.monotonic()
+    primary = _pool.submit(_timed(lambda: send(provider, model, ""), provider, model, stage))
+    done, _ = wait([primary], timeout=limit)
+
+    if done:
+        error = primary.exception()
+        if error is None:
+            return primary.result()
+        if not policy.failover_on_error:
+            raise error
+        logger.warning(
+            "%s: %s %s failed (%s) — failing over to %s %s",
+            stage, provider, model, error, policy.secondary_provider, policy.secondary_model,
+        )
+        return _finish(stage, provider, model, policy, "error", limit, started, [
+            ("secondary", _submit_secondary(stage, policy, send, "failover")),
+        ], primary_error=error)
+
+    logger.info(
+        "%s: %s %s exceeded %.1fs — hedging with %s %s",
+        stage, provider, model, limit, policy.secondary_provider, policy.secondary_model,
+    )
+    return _finish(stage, provider, model, policy, "deadline", limit, started, [
+        ("primary", primary),
+        ("secondary", _submit_secondary(stage, policy, send, "hedge")),
+    ])
+
+
+def _submit_secondary(stage: str, policy: HedgePolicy, send, route: str) -> Future:
+    return _pool.submit(_timed(
+        lambda: send(policy.secondary_provider, policy.secondary_model, route),
+        policy.secondary_provider, policy.secondary_model, stage,
+    ))
+
+
+def _finish(
+    stage: str,
+    provider: str,
+    model: str,
+    policy: HedgePolicy,
+    reason: str,
+    limit: float,
+    started: float,
+    racers: List[Tuple[str, Future]],
+    primary_error: Optional[BaseException] = None,
+) -> str:
+    pending = {future: name for name, future in racers}
+    winner, result, last_error = "none", None, primary_error
+    while pending:
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            if future.exception() is None:
+                winner, result = name, future.result()
+                break
+            last_error = future.exception()
+        if winner != "none":
+            break
+    for future in pending:
+        # Not-yet-started work is dropped; a running HTTP call is abandoned.
+        future.cancel()
+
+    event = HedgeEvent(
+        stage=stage, reason=reason,
+        primary=f"{provider} {model}",
+        secondary=f"{policy.secondary_provider} {policy.secondary_model}",
+        winner=winner, deadline_seconds=round(limit, 3),
+        elapsed_seconds=round(time.monotonic() - started, 3),
+    )
+    with _lock:
+        _events.append(event)
+    if result is None:
+        raise last_error or RuntimeError(f"{stage}: primary and secondary both failed")
+    return result
@@ -8,7 +8,7 @@ needed in the frontend container, not in the monolith path.
 """
 
 from pathlib import Path
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, Optional, Union
 
 import requests
 
@@ -80,7 +80,7 @@ class HttpProcessor:
 
     def run_pipeline(self, transcript, provider, model, prompts=None,
                      knowledge_base=None, progress: Optional[Callable] = None,
-                     cleanup: bool = True, chapters: bool = True,
+                     cleanup: Union[bool, str] = True, chapters: bool = True,
                      segments: Optional[list] = None,
                      agentic: bool = False, fact_check: bool = False,
                      generate_images: bool = False,
@@ -144,6 +144,7 @@ class HttpProcessor:
             compare_label=data.get("compare_label"),
             persona_articles=data.get("persona_articles") or [],
             songforge=data.get("songforge") or {},
+            semantic_hits=data.get("semantic_hits") or [],
         )
 
 
@@ -11,14 +11,19 @@ Content types and their expected ``context`` dict keys:
 - ``social_media``       {'wisdom', 'outline'}
 - ``image_prompts``      {'wisdom', 'outline'}
 - ``article_writing``    {'transcript', 'wisdom', 'outline'}
+- ``wisdom_reduce``      {'partials'}
+- ``outline_reduce``     {'partials', 'wisdom'}
 """
 
-from typing import Callable, Dict, Optional
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
 
 from anthropic import Anthropic
 from openai import OpenAI
 
-from . import cache, cost
+from . import cache, cascade, cost, hedging, semantic_cache, tokens
 from .config import ANTHROPIC_API_KEY, DEFAULT_PROMPTS, OLLAMA_BASE_URL, OPENAI_API_KEY
 from .logging import get_logger
 
@@ -28,8 +33,39 @@ logger = get_logger(__name__)
 # (OpenAI-compatible local inference).
 OLLAMA_PROVIDER_LABEL = "Ollama (local)"
 
+# Anthropic allows at most four cache_control breakpoints per request.
+MAX_CACHE_BREAKPOINTS = 4
+
 # --- Context builders per content_type -------------------------------------
 # Each builder receives a dict and returns the user-message body string.
+#
+# Stages that re-read the cleaned transcript open with the same stable
+# segments (``_CACHE_SEGMENTS``) in the same order — transcript first, then
+# wisdom + outline — and put whatever is specific to the stage last. On
+# Anthropic each segment becomes a cache breakpoint, so every stage after
+# the first reads the transcript at the cache-read rate.
+
+
+def _transcript_segment(ctx: dict) -> str:
+    return f"TRANSCRIPT:\n{ctx['transcript']}"
+
+
+def _sources_segment(ctx: dict) -> str:
+    return f"WISDOM:\n{ctx['wisdom']}\n\nOUTLINE:\n{ctx['outline']}"
+
+
+_CACHE_SEGMENTS: Dict[str, Callable[[dict], List[str]]] = {
+    "wisdom_extraction": lambda ctx: [_transcript_segment(ctx)],
+    "outline_creation": lambda ctx: [_transcript_segment(ctx)],
+    "article_critique": lambda ctx: [_transcript_segment(ctx), _sources_segment(ctx)],
+    "article_revise": lambda ctx: [_transcript_segment(ctx), _sources_segment(ctx)],
+    "article_fact_check": lambda ctx: [_transcript_segment(ctx)],
+}
+
+
+def _with_segments(content_type: str, ctx: dict, tail: str) -> str:
+    return "\n\n".join(_CACHE_SEGMENTS[content_type](ctx) + ([tail] if tail else []))
+
 
 _CONTEXT_BUILDERS: Dict[str, Callable[[dict], str]] = {
     # Cleanup stage: the "user content" IS the raw transcript; the prompt
@@ -41,11 +77,12 @@ _CONTEXT_BUILDERS: Dict[str, Callable[[dict], str]] = {
     # Timestamped variant: same deal but the transcript is pre-formatted as
     # [SSSS.S] prefixed lines, one per segment.
     "chapters_timestamped": lambda ctx: ctx["transcript"],
-    "wisdom_extraction": lambda ctx: (
-        f"Here's the transcription to analyze:\n\n{ctx['transcript']}"
-    ),
-    "outline_creation": lambda ctx: (
-        f"TRANSCRIPT:\n{ctx['transcript']}\n\nWISDOM:\n{ctx['wisdom']}"
+    # Local chaptering (see chaptering.py) found the boundaries; the model
+    # only names them. ``chapters`` is the numbered chapter excerpts.
+    "chapter_titles": lambda ctx: ctx["chapters"],
+    "wisdom_extraction": lambda ctx: _with_segments("wisdom_extraction", ctx, ""),
+    "outline_creation": lambda ctx: _with_segments(
+        "outline_creation", ctx, f"WISDOM:\n{ctx['wisdom']}",
     ),
     "social_media": lambda ctx: (
         f"WISDOM:\n{ctx['wisdom']}\n\nOUTLINE:\n{ctx['outline']}"
@@ -58,29 +95,33 @@ _CONTEXT_BUILDERS: Dict[str, Callable[[dict], str]] = {
         + f"TRANSCRIPT EXCERPT:\n{ctx['transcript'][:1000]}...\n\n"
         + f"WISDOM:\n{ctx['wisdom']}\n\nOUTLINE:\n{ctx['outline']}"
     ),
-    # Critique receives the draft + full source context.
-    "article_critique": lambda ctx: (
-        f"DRAFT ARTICLE:\n{ctx['article']}\n\n"
-        f"---\nSOURCE MATERIAL\n---\n"
-        f"TRANSCRIPT:\n{ctx['transcript']}\n\n"
-        f"WISDOM:\n{ctx['wisdom']}\n\nOUTLINE:\n{ctx['outline']}"
+    # Critique receives the full source context, then the draft.
+    "article_critique": lambda ctx: _with_segments(
+        "article_critique", ctx, f"---\nDRAFT ARTICLE\n---\n{ctx['article']}",
     ),
-    # Revise receives draft + critique + source so it can ground changes.
+    # Revise receives source + draft + critique so it can ground changes.
     # The optional ``_user_prefix`` ride-along is how the pipeline injects
-    # the article-length directive without mutating the prompt template.
-    "article_revise": lambda ctx: (
+    # the article-length directive without mutating the prompt template;
+    # it varies per call, so it sits after the cached source segments.
+    "article_revise": lambda ctx: _with_segments(
+        "article_revise", ctx,
         ctx.get("_user_prefix", "")
-        + f"DRAFT ARTICLE:\n{ctx['article']}\n\n"
-        + f"---\nCRITIQUE\n---\n{ctx['critique']}\n\n"
-        + f"---\nSOURCE MATERIAL\n---\n"
-        + f"TRANSCRIPT:\n{ctx['transcript']}\n\n"
-        + f"WISDOM:\n{ctx['wisdom']}\n\nOUTLINE:\n{ctx['outline']}"
+        + f"---\nDRAFT ARTICLE\n---\n{ctx['article']}\n\n"
+        + f"---\nCRITIQUE\n---\n{ctx['critique']}",
     ),
-    # Fact-check reads the article + full transcript (no summaries — need
+    # Fact-check reads the full transcript + article (no summaries — need
     # direct quote-level grounding).
-    "article_fact_check": lambda ctx: (
-        f"ARTICLE:\n{ctx['article']}\n\n"
-        f"---\nSOURCE TRANSCRIPT\n---\n{ctx['transcript']}"
+    "article_fact_check": lambda ctx: _with_segments(
+        "article_fact_check", ctx, f"---\nARTICLE\n---\n{ctx['article']}",
+    ),
+    # Map-reduce merges (see mapreduce.py): ``partials`` is the per-part
+    # output rendered as "### Part i of n" sections, in transcript order.
+    "wisdom_reduce": lambda ctx: (
+        f"PARTIAL WISDOM, ONE SECTION PER TRANSCRIPT PART:\n\n{ctx['partials']}"
+    ),
+    "outline_reduce": lambda ctx: (
+        f"MERGED WISDOM:\n{ctx['wisdom']}\n\n"
+        f"PARTIAL OUTLINES, ONE SECTION PER TRANSCRIPT PART:\n\n{ctx['partials']}"
     ),
 }
 
@@ -91,6 +132,7 @@ _MAX_TOKENS: Dict[str, int] = {
     # at ~10 chapters with full titles/summaries.
     "chapters": 2500,
     "chapters_timestamped": 2500,
+    "chapter_titles": 1200,
     "wisdom_extraction": 1500,
     "outline_creation": 1500,
     "social_media": 1000,
@@ -102,6 +144,9 @@ _MAX_TOKENS: Dict[str, int] = {
     "article_revise": 2500,
     # Fact-check returns a JSON list of flags; small.
     "article_fact_check": 1500,
+    # Reduce calls return one merged wisdom/outline, same size as single-shot.
+    "wisdom_reduce": 1500,
+    "outline_reduce": 1500,
 }
 
 
@@ -167,9 +212,10 @@ def _compose_kb_block(
         no query, or RAG isn't engaging on this KB size).
 
     The block is STABLE across all five stages within one run when using
-    legacy mode (Anthropic prompt cache loves it). RAG mode produces
-    different blocks per stage, sacrificing some cache hits in exchange
-    for ~3-20× cheaper input on large KBs.
+    legacy mode (Anthropic prompt cache loves it). Per-stage RAG blocks
+    differ, sacrificing cache hits in exchange for ~3-20× cheaper input on
+    large KBs; ``pipeline.run`` avoids that trade with a run-wide
+    ``rag.SharedPrefix`` (see ``_compose_shared_kb``).
     """
     # Try RAG when we have what we need.
     if user and query:
@@ -199,6 +245,26 @@ def _compose_kb_block(
     )
 
 
+def _compose_shared_kb(
+    prefix,
+    *,
+    user: str,
+    stage: str,
+    query: str,
+) -> tuple[str, str]:
+    """RAG with a run-wide shared prefix: returns ``(kb_block, pointer)``.
+    ``kb_block`` is the same for every stage (cached); ``pointer`` is the
+    stage's own retrieval rendered as a short section that varies per stage
+    and is placed after the cached prefixes by ``_call``."""
+    from . import rag  # lazy import — sentence-transformers is heavy
+    try:
+        chunks = rag.retrieve(user, query=query, stage=stage)
+    except Exception as e:
+        logger.warning("RAG stage pointer failed (%s) — shared prefix only", e)
+        chunks = []
+    return prefix.block, rag.stage_pointer(prefix, chunks, stage)
+
+
 def _compose_system_prompt(prompt: str, knowledge_base: Optional[Dict[str, str]]) -> str:
     """Merge KB + per-stage prompt into a single system string (for flat
     providers like OpenAI/Ollama that don't support structured system blocks)."""
@@ -209,6 +275,127 @@ def _compose_system_prompt(prompt: str, knowledge_base: Optional[Dict[str, str]]
     return f"{kb}\n\nOriginal Prompt:\n{body}"
 
 
+def _flat_system(kb_block: str, kb_pointer: str, prompt_body: str) -> str:
+    kb = "\n\n".join(part for part in (kb_block, kb_pointer) if part)
+    return f"{kb}\n\nOriginal Prompt:\n{prompt_body}" if kb else prompt_body
+
+
+def _chat_params(
+    model: str, kb_block: str, kb_pointer: str, prompt_body: str,
+    user_content: str, max_tokens: int,
+) -> dict:
+    """Request body for the OpenAI-shaped chat APIs (OpenAI and Ollama)."""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": _flat_system(kb_block, kb_pointer, prompt_body)},
+            {"role": "user", "content": user_content},
+        ],
+        "max_tokens": max_tokens,
+    }
+
+
+def _anthropic_params(
+    model: str,
+    kb_block: str,
+    prompt_body: str,
+    user_content: str,
+    max_tokens: int,
+    *,
+    cached_prefix: Sequence[str] = (),
+    kb_pointer: str = "",
+) -> dict:
+    """Request body for ``messages.create`` (and the Message Batches API).
+
+    The cache prefix runs system -> messages, so everything that is stable
+    across stages goes first and carries a breakpoint: the KB system block,
+    then each shared user segment (transcript, then wisdom + outline). The
+    per-stage prompt body and stage-specific context follow, uncached. With
+    no shared segments the prompt body stays in the system, after the KB.
+    https://docs.claude.com/en/docs/build-with-claude/prompt-caching
+    """
+    system_blocks = []
+    if kb_block:
+        system_blocks.append({
+            "type": "text",
+            "text": kb_block,
+            "cache_control": {"type": "ephemeral"},
+        })
+    if cached_prefix:
+        breakpoints = MAX_CACHE_BREAKPOINTS - len(system_blocks)
+        content: list = []
+        for i, segment in enumerate(cached_prefix):
+            block = {"type": "text", "text": segment}
+            if i < breakpoints:
+                block["cache_control"] = {"type": "ephemeral"}
+            content.append(block)
+        tail = user_content[len("\n\n".join(cached_prefix)):].strip()
+        if kb_pointer:
+            tail = f"{kb_pointer}\n\n{tail}".strip()
+        if prompt_body:
+            tail = f"{tail}\n\n---\nINSTRUCTIONS\n---\n{prompt_body}".strip()
+        if tail:
+            content.append({"type": "text", "text": tail})
+        messages = [{"role": "user", "content": content}]
+    else:
+        if kb_pointer:
+            system_blocks.append({"type": "text", "text": kb_pointer})
+        if prompt_body:
+            system_blocks.append({"type": "text", "text": prompt_body})
+        messages = [{"role": "user", "content": user_content}]
+    return {
+        "model": model,
+        "max_tokens": max_tokens,
+        "system": system_blocks or "",
+        "messages": messages,
+    }
+
+
+def record_usage(
+    provider: str,
+    model: str,
+    usage,
+    *,
+    estimated_input_tokens: int = 0,
+    stage: str = "",
+    route: str = "",
+) -> None:
+    """Ledger entry for one response's ``usage`` object. Anthropic reports
+    ``input_tokens`` plus cache lanes; the chat APIs report prompt and
+    completion tokens. Shared with ``batch``, whose results carry the same
+    usage shapes."""
+    if usage is None:
+        return
+    if provider == "Anthropic":
+        logger.info(
+            "Anthropic usage (%s): in=%s out=%s cache_read=%s cache_write=%s",
+            stage or "-",
+            getattr(usage, "input_tokens", "?"),
+            getattr(usage, "output_tokens", "?"),
+            getattr(usage, "cache_read_input_tokens", 0),
+            getattr(usage, "cache_creation_input_tokens", 0),
+        )
+        cost.record(cost.UsageRecord(
+            provider="Anthropic", model=model,
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            estimated_input_tokens=estimated_input_tokens,
+            stage=stage,
+            route=route,
+        ))
+        return
+    cost.record(cost.UsageRecord(
+        provider=provider, model=model,
+        input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        output_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        estimated_input_tokens=estimated_input_tokens,
+        stage=stage,
+        route=route,
+    ))
+
+
 def _call(
     provider: str,
     model: str,
@@ -216,97 +403,87 @@ def _call(
     prompt_body: str,
     user_content: str,
     max_tokens: int,
+    estimated_input_tokens: int = 0,
+    *,
+    stage: str = "",
+    cached_prefix: Sequence[str] = (),
+    kb_pointer: str = "",
+    route: str = "",
 ) -> str:
+    """One provider call. ``cached_prefix`` lists the stable segments that
+    ``user_content`` opens with (see ``_CACHE_SEGMENTS``); only Anthropic
+    uses them, as cache breakpoints. ``kb_pointer`` is the per-stage part of
+    a shared RAG block and always lands after every cached segment.
+    ``stage`` and ``route`` tag the ledger entry."""
+    tags = {"estimated_input_tokens": estimated_input_tokens, "stage": stage, "route": route}
     if provider == "OpenAI":
-        system_flat = (
-            f"{kb_block}\n\nOriginal Prompt:\n{prompt_body}" if kb_block else prompt_body
-        )
-        response = _openai().chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_flat},
-                {"role": "user", "content": user_content},
-            ],
-            max_tokens=max_tokens,
-        )
-        usage = getattr(response, "usage", None)
-        if usage:
-            cost.record(cost.UsageRecord(
-                provider="OpenAI", model=model,
-                input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
-                output_tokens=getattr(usage, "completion_tokens", 0) or 0,
-            ))
+        response = _openai().chat.completions.create(**_chat_params(
+            model, kb_block, kb_pointer, prompt_body, user_content, max_tokens,
+        ))
+        record_usage("OpenAI", model, getattr(response, "usage", None) or None, **tags)
         return response.choices[0].message.content or ""
 
     if provider == "Anthropic":
-        # Split the system into two blocks: the KB (stable across stages,
-        # cache_control=ephemeral) and the per-stage prompt body (varies,
-        # uncached). With this split, stages 2-5 in a 5-stage pipeline run
-        # read the KB from cache at 0.1x input cost.
-        # https://docs.claude.com/en/docs/build-with-claude/prompt-caching
-        system_blocks = []
-        if kb_block:
-            system_blocks.append({
-                "type": "text",
-                "text": kb_block,
-                "cache_control": {"type": "ephemeral"},
-            })
-        if prompt_body:
-            system_blocks.append({"type": "text", "text": prompt_body})
-        response = _anthropic().messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            system=system_blocks or "",
-            messages=[{"role": "user", "content": user_content}],
-        )
-        usage = getattr(response, "usage", None)
-        if usage is not None:
-            logger.info(
-                "Anthropic usage: in=%s out=%s cache_read=%s cache_write=%s",
-                getattr(usage, "input_tokens", "?"),
-                getattr(usage, "output_tokens", "?"),
-                getattr(usage, "cache_read_input_tokens", 0),
-                getattr(usage, "cache_creation_input_tokens", 0),
-            )
-            cost.record(cost.UsageRecord(
-                provider="Anthropic", model=model,
-                input_tokens=getattr(usage, "input_tokens", 0) or 0,
-                output_tokens=getattr(usage, "output_tokens", 0) or 0,
-                cache_read_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
-                cache_write_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0,
-            ))
+        response = _anthropic().messages.create(**_anthropic_params(
+            model, kb_block, prompt_body, user_content, max_tokens,
+            cached_prefix=cached_prefix, kb_pointer=kb_pointer,
+        ))
+        record_usage("Anthropic", model, getattr(response, "usage", None), **tags)
         return response.content[0].text
 
     if provider == OLLAMA_PROVIDER_LABEL:
         # Ollama speaks the OpenAI chat-completions shape with a flat string
         # system prompt. No caching, but the KB-first ordering gives us
         # prefix-caching-friendly ordering for future runtimes that support it.
-        system_flat = (
-            f"{kb_block}\n\nOriginal Prompt:\n{prompt_body}" if kb_block else prompt_body
-        )
-        response = _ollama().chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_flat},
-                {"role": "user", "content": user_content},
-            ],
-            max_tokens=max_tokens,
-        )
+        response = _ollama().chat.completions.create(**_chat_params(
+            model, kb_block, kb_pointer, prompt_body, user_content, max_tokens,
+        ))
         # Local inference is free — record tokens for the UI breakdown but
         # with provider="Ollama (local)" which has no PRICING entry, so
         # estimate_cost() reports $0 for these.
-        usage = getattr(response, "usage", None)
-        if usage:
-            cost.record(cost.UsageRecord(
-                provider=OLLAMA_PROVIDER_LABEL, model=model,
-                input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
-                output_tokens=getattr(usage, "completion_tokens", 0) or 0,
-            ))
+        record_usage(OLLAMA_PROVIDER_LABEL, model, getattr(response, "usage", None) or None, **tags)
         return response.choices[0].message.content or ""
     raise ValueError(f"Unsupported provider: {provider!r}")
 
 
-def generate(
+@dataclass
+class PreparedCall:
+    """Everything ``generate`` assembles before it reaches a provider: the
+    budgeted KB, prompt and user content, plus the exact-cache ``key``.
+    ``batch`` submits ``params()`` through a provider's batch endpoint and
+    stores the answer under ``key``, so an interactive rerun hits it."""
+    content_type: str
+    provider: str
+    model: str
+    kb_block: str
+    kb_pointer: str
+    prompt_body: str
+    user_content: str
+    cached_prefix: List[str]
+    max_tokens: int
+    estimated_input_tokens: int
+    key: str
+
+    @property
+    def kb_for_key(self) -> str:
+        # The pointer folds into the KB hash only when present, so keys for
+        # calls without a shared RAG prefix are unchanged.
+        return f"{self.kb_block}\n\n{self.kb_pointer}" if self.kb_pointer else self.kb_block
+
+    def params(self) -> dict:
+        """Provider request body, identical to what ``_call`` would send."""
+        if self.provider == "Anthropic":
+            return _anthropic_params(
+                self.model, self.kb_block, self.prompt_body, self.user_content,
+                self.max_tokens, cached_prefix=self.cached_prefix, kb_pointer=self.kb_pointer,
+            )
+        return _chat_params(
+            self.model, self.kb_block, self.kb_pointer, self.prompt_body,
+            self.user_content, self.max_tokens,
+        )
+
+
+def prepare(
     content_type: str,
     context: dict,
     provider: str,
@@ -316,15 +493,10 @@ def generate(
     max_tokens: Optional[int] = None,
     user: Optional[str] = None,
     rag_mode: str = "auto",
-) -> Optional[str]:
-    """Generate a piece of derived content.
-
-    ``prompt`` falls back to DEFAULT_PROMPTS[content_type]. ``max_tokens``
-    falls back to a sensible default per content_type. Returns None on error.
-
-    When WHISPERFORGE_CACHE=1, the result is cached by sha256 of
-    (system_prompt + user_content + provider + model + max_tokens).
-    """
+    rag_prefix=None,
+) -> Optional[PreparedCall]:
+    """Assemble a ``generate`` call without sending it. Same arguments as
+    ``generate``; returns None when the call can't fit the model's window."""
     if content_type not in _CONTEXT_BUILDERS:
         raise ValueError(
             f"Unknown content_type {content_type!r}. "
@@ -333,30 +505,204 @@ def generate(
 
     resolved_prompt = prompt or DEFAULT_PROMPTS.get(content_type, "")
     user_content = _CONTEXT_BUILDERS[content_type](context)
+    cached_prefix = (
+        _CACHE_SEGMENTS[content_type](context) if content_type in _CACHE_SEGMENTS else []
+    )
     # KB block: pass user + stage + query so RAG can engage when configured.
     # When user/query absent we fall back to legacy whole-KB dump inside.
-    kb_block = _compose_kb_block(
-        knowledge_base, user=user, stage=content_type,
-        query=user_content, rag_mode=rag_mode,
-    )
+    kb_pointer = ""
+    if rag_prefix is not None and user:
+        kb_block, kb_pointer = _compose_shared_kb(
+            rag_prefix, user=user, stage=content_type, query=user_content,
+        )
+    else:
+        kb_block = _compose_kb_block(
+            knowledge_base, user=user, stage=content_type,
+            query=user_content, rag_mode=rag_mode,
+        )
     prompt_body = _format_prompt_body(resolved_prompt)
-    tokens = max_tokens or _MAX_TOKENS.get(content_type, 1500)
+    out_tokens = max_tokens or _MAX_TOKENS.get(content_type, 1500)
+
+    # Size the call against the model's window before spending anything.
+    # The KB is the lowest-priority context, so it is trimmed first; if the
+    # prompt + content alone don't fit, refuse rather than fail at the API.
+    budget = tokens.plan(
+        provider, model, kb_block=f"{kb_block}\n\n{kb_pointer}".strip(),
+        prompt_body=prompt_body, user_content=user_content, max_output=out_tokens,
+    )
+    if not budget.fits and kb_block:
+        kb_pointer = ""
+        kb_block = tokens.trim(kb_block, budget.kb_allowance, model)
+        logger.warning(
+            "generate(%s): KB trimmed %d -> %d tokens to fit %s %s (%d-token window)",
+            content_type, budget.kb_tokens, tokens.count(kb_block, model),
+            provider, model, budget.window,
+        )
+        budget.kb_tokens = tokens.count(kb_block, model)
+    if not budget.fits:
+        logger.error(
+            "generate(%s): ~%d input + %d output tokens exceed %s %s's %d-token window",
+            content_type, budget.estimated_input, out_tokens, provider, model, budget.window,
+        )
+        return None
 
-    key = cache.make_key([
-        content_type, provider, model, str(tokens),
-        cache.text_hash(kb_block),
+    call = PreparedCall(
+        content_type=content_type, provider=provider, model=model,
+        kb_block=kb_block, kb_pointer=kb_pointer, prompt_body=prompt_body,
+        user_content=user_content, cached_prefix=list(cached_prefix),
+        max_tokens=out_tokens, estimated_input_tokens=budget.estimated_input, key="",
+    )
+    call.key = cache.make_key([
+        content_type, provider, model, str(out_tokens),
+        cache.text_hash(call.kb_for_key),
         cache.text_hash(prompt_body),
         cache.text_hash(user_content),
     ])
+    return call
+
+
+def generate(
+    content_type: str,
+    context: dict,
+    provider: str,
+    model: str,
+    prompt: Optional[str] = None,
+    knowledge_base: Optional[Dict[str, str]] = None,
+    max_tokens: Optional[int] = None,
+    user: Optional[str] = None,
+    rag_mode: str = "auto",
+    rag_prefix=None,
+) -> Optional[str]:
+    """Generate a piece of derived content.
+
+    ``prompt`` falls back to DEFAULT_PROMPTS[content_type]. ``max_tokens``
+    falls back to a sensible default per content_type. Returns None on error.
+
+    When WHISPERFORGE_CACHE=1, the result is cached by sha256 of
+    (system_prompt + user_content + provider + model + max_tokens).
+
+    Before the call, ``tokens.plan`` checks the assembled input against the
+    model's context window: an oversized KB block is trimmed, and a call
+    that cannot fit without it returns None without reaching the provider.
+
+    ``rag_prefix`` (a ``rag.SharedPrefix`` built once per run) replaces the
+    per-stage RAG block with the run-wide block plus a small stage pointer,
+    so the KB stays cached across stages.
+
+    With a ``hedging`` policy for ``content_type``, a primary that runs past
+    its p95-derived deadline is raced against the policy's secondary, and a
+    primary error fails over to it instead of returning None. The secondary
+    is only sent calls that fit its own context window, and its answers are
+    returned but never cached.
+
+    With a ``cascade`` policy for ``content_type``, the policy's cheap model
+    answers first; only an answer that fails ``cascade.score`` is re-run on
+    ``provider``/``model``.
+
+    When WHISPERFORGE_SEMANTIC_CACHE=1, an exact-cache miss first consults
+    ``semantic_cache`` — a near-duplicate ``user_content`` under the same
+    prompt/model/KB is served from there and recorded in its audit log,
+    but not written to the exact cache.
+    """
+    call = prepare(
+        content_type, context, provider, model, prompt=prompt,
+        knowledge_base=knowledge_base, max_tokens=max_tokens, user=user,
+        rag_mode=rag_mode, rag_prefix=rag_prefix,
+    )
+    if call is None:
+        return None
+    key = call.key
+    user_content = call.user_content
+    cascade_policy = cascade.policy_for(content_type, provider, model)
+    if cascade_policy is not None:
+        # A cascade may answer from the cheap model, so its results are kept
+        # apart from the selected model's.
+        key = cache.make_key([
+            key, "cascade", cascade_policy.cheap_provider, cascade_policy.cheap_model,
+        ])
+
+    semantic_bucket = (
+        semantic_cache.bucket_key(
+            content_type, provider, model, call.max_tokens, call.kb_for_key, call.prompt_body,
+        )
+        if semantic_cache.enabled() else None
+    )
+    if semantic_bucket and cascade_policy is not None:
+        semantic_bucket = cache.make_key([
+            semantic_bucket, "cascade", cascade_policy.cheap_provider, cascade_policy.cheap_model,
+        ])
+
+    # Answers that must not be cached under ``key`` (semantic hits, other
+    # models' answers); see ``_compute``.
+    uncached: Dict[str, str] = {}
 
     def _compute() -> Optional[str]:
+        if semantic_bucket:
+            hit = semantic_cache.lookup(semantic_bucket, user_content, stage=content_type)
+            if hit is not None:
+                # Approximate: served and audited, never stored as this
+                # input's exact answer.
+                uncached["text"] = hit.response
+                return None
+        # (text, route) of every answer, to tell which route the returned
+        # text came from once hedging/cascade have picked one.
+        answered: list = []
+
+        def _send(send_provider: str, send_model: str, route: str) -> str:
+            estimated = call.estimated_input_tokens
+            if (send_provider, send_model) != (provider, model):
+                # The plan above sized the call for the selected model only.
+                fit = tokens.plan(
+                    send_provider, send_model, kb_block=f"{call.kb_block}\n\n{call.kb_pointer}".strip(),
+                    prompt_body=call.prompt_body, user_content=user_content, max_output=call.max_tokens,
+                )
+                if not fit.fits:
+                    raise ValueError(
+                        f"~{fit.estimated_input} input tokens exceed {send_provider} "
+                        f"{send_model}'s {fit.window}-token window"
+                    )
+                estimated = fit.estimated_input
+            out = _call(
+                send_provider, send_model, call.kb_block, call.prompt_body, user_content,
+                call.max_tokens, estimated_input_tokens=estimated,
+                stage=content_type, cached_prefix=call.cached_prefix, kb_pointer=call.kb_pointer,
+                route=route,
+            )
+            answered.append((out, route))
+            return out
+
+        def _selected() -> str:
+            policy = hedging.policy_for(content_type)
+            if policy is not None:
+                return hedging.call(content_type, provider, model, policy, _send)
+            started = time.monotonic()
+            out = _send(provider, model, "")
+            hedging.observe(provider, model, content_type, time.monotonic() - started)
+            return out
+
         try:
-            return _call(provider, model, kb_block, prompt_body, user_content, tokens)
+            if cascade_policy is not None:
+                result = cascade.call(
+                    content_type, provider, model, cascade_policy, _send, _selected,
+                    context=context, estimated_input_tokens=call.estimated_input_tokens,
+                )
+            else:
+                result = _selected()
         except Exception as e:
             logger.error("generate(%s) failed on %s %s: %s", content_type, provider, model, e)
             return None
+        route = next((r for text, r in answered if text is result), "")
+        if route in ("hedge", "failover"):
+            # Another model's answer: fine for this call, but cached under
+            # ``key`` it would be served as the selected model's for good.
+            uncached["text"] = result
+            return None
+        if semantic_bucket and result:
+            semantic_cache.store(semantic_bucket, user_content, result, key=key)
+        return result
 
-    return cache.cached_or_compute(key, _compute)
+    result = cache.cached_or_compute(key, _compute, namespace=f"llm.{content_type}")
+    return result if result is not None else uncached.get("text")
 
 
 # --- Ad-hoc helpers that don't fit the generate() contract -----------------
@@ -491,8 +837,13 @@ def generate_chapters(
     """Segment a transcript into topical chapters.
 
     Returns a list of ``{"title", "summary", "start_quote", "start_seconds"?}``
-    dicts — empty on failure or if the model returned unparseable output. Uses
-    the generate() machinery so it benefits from caching + the active provider.
+    dicts — empty on failure or if the model returned unparseable output.
+
+    By default boundaries are found locally (``chaptering``: embeddings plus
+    TextTiling valleys) and a single ``chapter_titles`` call names every
+    chapter. ``WHISPERFORGE_CHAPTERS_MODE=llm`` — or a local embedder that
+    can't load — uses the older path below, where the model segments the
+    whole transcript. Both go through generate(), so both are cached.
 
     When ``segments`` is provided (shape: the list from
     ``audio.TranscriptionDetails.segments``), the transcript is reformatted
@@ -500,6 +851,11 @@ def generate_chapters(
     variant is used. The model then picks ``start_seconds`` per chapter, which
     flows through to Notion's ``[M:SS]`` / ``[H:MM:SS]`` rendering.
     """
+    if os.getenv("WHISPERFORGE_CHAPTERS_MODE", "local").lower() != "llm":
+        local = _local_chapters(transcript, provider, model, segments)
+        if local is not None:
+            return local
+
     if segments:
         input_text = _format_timestamped_transcript(segments)
         content_type = "chapters_timestamped"
@@ -557,6 +913,28 @@ def generate_chapters(
     return [_coerce(c) for c in chapters if isinstance(c, dict) and c.get("title")]
 
 
+def _local_chapters(
+    transcript: str, provider: str, model: str, segments: Optional[list],
+) -> Optional[list[dict]]:
+    """Local segmentation + one naming call; None when the embedder fails."""
+    from . import chaptering
+    try:
+        found = chaptering.segment(transcript, segments)
+    except Exception as e:
+        logger.warning("local chaptering failed (%s) — asking the model to segment", e)
+        return None
+    if not found:
+        return []
+    raw = generate(
+        "chapter_titles",
+        {"chapters": chaptering.render_for_titles(found)},
+        provider,
+        model,
+        knowledge_base=None,
+    )
+    return chaptering.apply_titles(found, raw)
+
+
 def generate_tags(content: str, max_tags: int = 6) -> list[str]:
     """Up to ``max_tags`` short content tags. Schema-enforced JSON array."""
     result = _structured_call(
@@ -582,3 +960,96 @@ def generate_tags(content: str, max_tags: int = 6) -> list[str]:
     tags = (result or {}).get("tags", [])
     # Defensive: ensure strings + strip any stray hashes/whitespace.
     return [str(t).strip(" #").lower() for t in tags if t][:max_tags]
+
+
+_METADATA_DEFAULTS = {"title": "Audio Transcription", "summary": "Summary of audio content"}
+
+
+def generate_metadata(transcript: str, tag_context: str = "", max_tags: int = 6) -> dict:
+    """Title, one-sentence summary and tags in one schema-enforced call.
+
+    Replaces three ``_structured_call`` round trips (and three transcript
+    uploads) on every save. ``tag_context`` (e.g. the wisdom) is offered to
+    the tagger alongside the transcript. Any field the fused call doesn't
+    deliver is filled by its single-purpose helper, run in parallel. Cached
+    like ``generate`` when WHISPERFORGE_CACHE=1, keyed by the input hashes —
+    but only when the fused call delivered everything, so a degraded answer
+    during an outage isn't replayed forever.
+    Returns ``{"title": str, "summary": str, "tags": list[str]}``."""
+    key = cache.make_key([
+        "metadata", _STRUCTURED_MODEL, str(max_tags),
+        cache.text_hash(transcript[:2000]), cache.text_hash(tag_context[:1000]),
+    ])
+    if cache.enabled():
+        hit = cache.get(key, namespace="llm.metadata")
+        if isinstance(hit, dict):
+            return hit
+    started = time.perf_counter()
+    metadata, complete = _compute_metadata(transcript, tag_context, max_tags)
+    if complete and cache.enabled():
+        cache.put(key, metadata, namespace="llm.metadata", compute_s=time.perf_counter() - started)
+    return metadata
+
+
+def _compute_metadata(transcript: str, tag_context: str, max_tags: int) -> tuple[dict, bool]:
+    user = f"TRANSCRIPT:\n{transcript[:2000]}"
+    if tag_context:
+        user += f"\n\nADDITIONAL CONTEXT (for tags):\n{tag_context[:1000]}"
+    result = _structured_call(
+        schema_name="content_metadata",
+        schema={
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "A clear, descriptive 5-7 word title capturing the main topic.",
+                },
+                "summary": {
+                    "type": "string",
+                    "description": "A single insightful sentence summarizing the key message.",
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": f"Up to {max_tags} short (1-2 word) tags, lowercase, no hashes.",
+                    "minItems": 1,
+                    "maxItems": max_tags,
+                },
+            },
+            "required": ["title", "summary", "tags"],
+            "additionalProperties": False,
+        },
+        system=(
+            "You label content for a publishing archive: a concise 5-7 word "
+            "title, one sharp single-sentence summary, and up to "
+            f"{max_tags} short (1-2 word) lowercase tags with no hashes or duplicates."
+        ),
+        user=user,
+        max_tokens=300,
+    ) or {}
+    metadata = {
+        "title": str(result.get("title") or "").strip(),
+        "summary": str(result.get("summary") or "").strip(),
+        "tags": [str(t).strip(" #").lower() for t in result.get("tags") or [] if t][:max_tags],
+    }
+
+    # Parallel fallback for whatever the fused call didn't deliver.
+    fallbacks = {
+        "title": lambda: generate_title(transcript),
+        "summary": lambda: generate_summary(transcript),
+        "tags": lambda: generate_tags(f"{transcript} {tag_context}".strip(), max_tags=max_tags),
+    }
+    missing = [name for name in fallbacks if not metadata[name]]
+    if missing:
+        logger.warning("fused metadata call incomplete (%s) — falling back", ", ".join(missing))
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            futures = {name: pool.submit(fallbacks[name]) for name in missing}
+        for name, future in futures.items():
+            try:
+                metadata[name] = future.result()
+            except Exception as e:
+                logger.warning("metadata fallback %s failed: %s", name, e)
+    for name, default in _METADATA_DEFAULTS.items():
+        metadata[name] = metadata[name] or default
+    return metadata, not missing
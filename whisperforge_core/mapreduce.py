@@ -0,0 +1,250 @@
+"""Map-reduce cleanup and extraction for transcripts beyond the context budget.
+
+Two failure modes this module removes:
+
+1. **Truncated cleanup.** ``transcript_cleanup`` returns roughly as many
+   tokens as it reads, and its output cap is ``llm._MAX_TOKENS`` (4000).
+   Anything longer came back silently cut off. ``cleanup()`` splits the raw
+   transcript at segment (or paragraph/sentence) boundaries into parts that
+   fit under the cap, cleans them in parallel, and stitches them back in
+   order.
+2. **Whole-transcript extraction.** Above ``WHISPERFORGE_MAPREDUCE_TOKENS``
+   (default 24000), ``extract()`` splits the cleaned transcript at chapter
+   boundaries, runs ``wisdom_extraction`` + ``outline_creation`` per part in
+   parallel, then issues one ``wisdom_reduce`` and one ``outline_reduce``
+   call to merge the partials. Cost and latency grow linearly with length.
+
+Everything goes through ``llm.generate`` so caching, RAG and cost tracking
+behave exactly like the single-shot path.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from . import llm, tokens
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_THRESHOLD_TOKENS = 24000
+# Cleanup parts stay comfortably under the 4000-token cleanup output cap.
+CLEANUP_PART_TOKENS = 3000
+# Extraction parts only need to fit the input window, so they can be larger.
+EXTRACT_PART_TOKENS = 8000
+MAX_WORKERS = 4
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class ExtractionResult:
+    wisdom: Optional[str]
+    outline: Optional[str]
+    parts: int
+    wisdom_parts: List[str] = field(default_factory=list)
+    outline_parts: List[str] = field(default_factory=list)
+
+
+def threshold_tokens() -> int:
+    try:
+        return int(os.getenv("WHISPERFORGE_MAPREDUCE_TOKENS", "") or DEFAULT_THRESHOLD_TOKENS)
+    except ValueError:
+        return DEFAULT_THRESHOLD_TOKENS
+
+
+def should_engage(transcript: str, mode: str = "auto") -> bool:
+    """``mode``: "auto" (token threshold), "always", or "never"."""
+    if mode == "always":
+        return True
+    if mode == "never":
+        return False
+    return tokens.count(transcript) > threshold_tokens()
+
+
+def needs_split_cleanup(transcript: str, mode: str = "auto") -> bool:
+    """Cleanup splits whenever its output would exceed the cleanup cap."""
+    if mode == "never":
+        return False
+    return mode == "always" or tokens.count(transcript) > CLEANUP_PART_TOKENS
+
+
+def _pack(pieces: List[str], budget: int, joiner: str) -> List[str]:
+    """Greedily merge ordered pieces into parts of at most ``budget`` tokens.
+    A single oversized piece is hard-split on word boundaries."""
+    parts: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        size = tokens.count(piece)
+        if size > budget:
+            if current:
+                parts.append(joiner.join(current))
+                current, current_tokens = [], 0
+            parts.extend(tokens.windows(piece, budget))
+            continue
+        if current and current_tokens + size > budget:
+            parts.append(joiner.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += size
+    if current:
+        parts.append(joiner.join(current))
+    return parts
+
+
+def _natural_pieces(text: str) -> tuple[List[str], str]:
+    """Paragraphs when the text has them, otherwise sentences."""
+    paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    if len(paragraphs) > 1:
+        return paragraphs, "\n\n"
+    return _SENTENCE_RE.split(text), " "
+
+
+def split_transcript(
+    transcript: str,
+    *,
+    budget: int,
+    segments: Optional[list] = None,
+    chapters: Optional[list] = None,
+) -> List[str]:
+    """Split at chapter boundaries, then ASR segment boundaries, then
+    paragraphs/sentences — whichever the caller has — packing the pieces
+    into parts of at most ``budget`` tokens."""
+    if chapters:
+        pieces = _split_at_chapters(transcript, chapters)
+        if len(pieces) > 1:
+            return _pack(pieces, budget, "\n\n")
+    if segments:
+        texts = [str(s.get("text") or "").strip() for s in segments]
+        joined = " ".join(t for t in texts if t)
+        # Only trust segments when they actually cover the transcript; a
+        # diarized or post-edited transcript can diverge from them.
+        if joined and len(joined) >= 0.9 * len(transcript.strip()):
+            return _pack(texts, budget, " ")
+    pieces, joiner = _natural_pieces(transcript)
+    return _pack(pieces, budget, joiner)
+
+
+def _split_at_chapters(transcript: str, chapters: list) -> List[str]:
+    lowered = transcript.lower()
+    starts = {0}
+    for chapter in chapters:
+        quote = " ".join(str(chapter.get("start_quote") or "").split()[:8]).lower()
+        if not quote:
+            continue
+        pos = lowered.find(quote)
+        if pos > 0:
+            starts.add(pos)
+    bounds = sorted(starts) + [len(transcript)]
+    return [transcript[a:b] for a, b in zip(bounds[:-1], bounds[1:], strict=True) if transcript[a:b].strip()]
+
+
+def _parallel(fn: Callable[[int, str], Optional[str]], parts: List[str]) -> List[Optional[str]]:
+    if len(parts) == 1:
+        return [fn(0, parts[0])]
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(parts))) as pool:
+        return list(pool.map(fn, range(len(parts)), parts))
+
+
+def cleanup(
+    transcript: str,
+    provider: str,
+    model: str,
+    *,
+    prompt: Optional[str] = None,
+    segments: Optional[list] = None,
+) -> Optional[str]:
+    """Clean ``transcript`` part-by-part. A part whose cleanup fails keeps
+    its raw text, so one flaky call never drops a slice of the transcript.
+    Returns None only when every part failed."""
+    parts = split_transcript(transcript, budget=CLEANUP_PART_TOKENS, segments=segments)
+    logger.info("map-reduce cleanup: %d parts", len(parts))
+
+    def _clean(_i: int, part: str) -> Optional[str]:
+        return llm.generate(
+            "transcript_cleanup", {"transcript": part}, provider, model,
+            prompt=prompt, knowledge_base=None,
+        )
+
+    cleaned = _parallel(_clean, parts)
+    if not any(cleaned):
+        return None
+    return "\n\n".join((c or raw).strip() for c, raw in zip(cleaned, parts, strict=True))
+
+
+def _render_partials(partials: List[Optional[str]]) -> str:
+    return "\n\n".join(
+        f"### Part {i} of {len(partials)}\n{text.strip()}"
+        for i, text in enumerate(partials, 1)
+        if text
+    )
+
+
+def extract(
+    transcript: str,
+    provider: str,
+    model: str,
+    *,
+    prompts: Optional[Dict[str, str]] = None,
+    knowledge_base: Optional[Dict[str, str]] = None,
+    user: Optional[str] = None,
+    rag_mode: str = "auto",
+    rag_prefix=None,
+    chapters: Optional[list] = None,
+    segments: Optional[list] = None,
+) -> ExtractionResult:
+    """Map: wisdom + outline per part, in parallel. Reduce: one merge call
+    per output. A single-part transcript skips the reduce entirely."""
+    prompts = prompts or {}
+    parts = split_transcript(
+        transcript, budget=EXTRACT_PART_TOKENS, segments=segments, chapters=chapters,
+    )
+    logger.info("map-reduce extraction: %d parts", len(parts))
+    kwargs = dict(
+        knowledge_base=knowledge_base, user=user, rag_mode=rag_mode, rag_prefix=rag_prefix,
+    )
+
+    def _map(_i: int, part: str) -> tuple[Optional[str], Optional[str]]:
+        wisdom = llm.generate(
+            "wisdom_extraction", {"transcript": part}, provider, model,
+            prompt=prompts.get("wisdom_extraction"), **kwargs,
+        )
+        outline = llm.generate(
+            "outline_creation", {"transcript": part, "wisdom": wisdom or ""},
+            provider, model, prompt=prompts.get("outline_creation"), **kwargs,
+        )
+        return wisdom, outline
+
+    mapped = _parallel(_map, parts)
+    wisdom_parts = [w for w, _ in mapped]
+    outline_parts = [o for _, o in mapped]
+
+    if len(parts) == 1:
+        return ExtractionResult(
+            wisdom=wisdom_parts[0], outline=outline_parts[0], parts=1,
+            wisdom_parts=[w or "" for w in wisdom_parts],
+            outline_parts=[o or "" for o in outline_parts],
+        )
+
+    wisdom = llm.generate(
+        "wisdom_reduce", {"partials": _render_partials(wisdom_parts)},
+        provider, model, prompt=prompts.get("wisdom_reduce"), **kwargs,
+    ) if any(wisdom_parts) else None
+    outline = llm.generate(
+        "outline_reduce",
+        {"partials": _render_partials(outline_parts), "wisdom": wisdom or ""},
+        provider, model, prompt=prompts.get("outline_reduce"), **kwargs,
+    ) if any(outline_parts) else None
+    return ExtractionResult(
+        wisdom=wisdom, outline=outline, parts=len(parts),
+        wisdom_parts=[w or "" for w in wisdom_parts],
+        outline_parts=[o or "" for o in outline_parts],
+    )
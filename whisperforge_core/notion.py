@@ -11,6 +11,7 @@ from typing import List, Optional
 
 from notion_client import Client
 
+from . import tokens
 from .config import NOTION_API_KEY, NOTION_DATABASE_ID
 from .logging import get_logger
 
@@ -99,7 +100,7 @@ def _toggle_section(label: str, color: str, body: str) -> dict:
 
 
 def estimate_tokens(bundle: ContentBundle) -> int:
-    """Rough token estimate (4 chars/token) plus system-prompt overhead."""
+    """Token estimate via ``tokens.count`` plus system-prompt overhead."""
     total = 0
     for piece in (
         bundle.transcript,
@@ -109,9 +110,8 @@ def estimate_tokens(bundle: ContentBundle) -> int:
         bundle.image_prompts,
         bundle.article,
     ):
-        if piece:
-            total += len(piece) / 4
-    return int(total + 1000)
+        total += tokens.count(piece)
+    return total + 1000
 
 
 def _format_timestamp(seconds: float) -> str:
@@ -135,6 +135,19 @@ def _format_duration(seconds: Optional[float]) -> str:
     return f"{sec}s"
 
 
+def format_stage_cache(stages: Optional[dict]) -> str:
+    """``wisdom_extraction 0/2,048 · outline_creation 2,048/0`` — one
+    read/write pair per stage that touched the cache. Empty when none did."""
+    if not isinstance(stages, dict):
+        return ""
+    pairs = [
+        f"{name} {int(s.get('cache_read_tokens') or 0):,}/{int(s.get('cache_write_tokens') or 0):,}"
+        for name, s in stages.items()
+        if isinstance(s, dict) and (s.get("cache_read_tokens") or s.get("cache_write_tokens"))
+    ]
+    return "  ·  ".join(pairs)
+
+
 def _run_metrics_block(metrics: dict) -> dict:
     """Render a ``Run metrics`` toggle with cost/tokens/flags/duration.
 
@@ -142,6 +155,7 @@ def _run_metrics_block(metrics: dict) -> dict:
       - total_usd, llm_usd, asr_usd, cache_savings_usd (floats)
       - calls, input_tokens, output_tokens, cache_read_tokens,
         cache_write_tokens (ints)
+      - stages (dict[str, dict] — per-stage tokens incl. cache read/write)
       - duration_seconds (float)
       - backend (str — transcription backend id)
       - flags (dict[str, bool] — agentic/fact_check/chapters/images/rag)
@@ -170,6 +184,9 @@ def _run_metrics_block(metrics: dict) -> dict:
         f"**Backend:** {metrics.get('backend') or '—'}  ·  "
         f"**Flags on:** {flag_line}",
     ]
+    stage_line = format_stage_cache(metrics.get("stages"))
+    if stage_line:
+        lines.append(f"**Cache read/write by stage:** {stage_line}")
     body = "\n\n".join(lines)
     return _toggle_section("Run metrics", "gray_background", body)
 
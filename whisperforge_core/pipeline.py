@@ -5,10 +5,12 @@ article) over either a transcript (audio path) or pasted text. UI layers get
 progress via an optional callback instead of hardcoded Streamlit progress bars.
 """
 
-from dataclasses import dataclass
-from typing import Callable, Dict, Optional
+import os
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional, Union
 
-from . import images, llm, songforge
+from . import grounding, images, llm, mapreduce, precleanup, run_memo, semantic_cache, songforge
+from .config import DEFAULT_PROMPTS
 from .logging import get_logger
 
 logger = get_logger(__name__)
@@ -28,6 +30,10 @@ class PipelineResult:
     # so callers can still see what the transcriber actually heard.
     raw_transcript: Optional[str] = None
     cleaned_transcript: Optional[str] = None
+    # What the local pre-cleanup pass removed before the cleanup model saw
+    # the transcript: {"removed_chars", "removed_tokens", "fillers",
+    # "stutters", "repeats"}. Empty when cleanup is off.
+    precleanup: dict = None  # type: ignore[assignment]
     # Topical segmentation with {title, summary, start_quote} per chapter.
     # Empty when chapters=False or the model couldn't produce valid JSON.
     chapters: list = None  # type: ignore[assignment]
@@ -37,6 +43,11 @@ class PipelineResult:
     # Fact-check flags — populated when fact_check=True. Shape:
     # [{"claim": str, "issue": str}]. Empty list means clean.
     fact_check_flags: list = None  # type: ignore[assignment]
+    # Local grounding prefilter summary for the fact-check pass:
+    # {"claims", "grounded", "sent_to_llm", "coverage", "llm_skipped",
+    # "llm_failed"} — skipped when every claim was grounded locally, failed
+    # when the fact-check call returned nothing.
+    fact_check_coverage: dict = None  # type: ignore[assignment]
     # Generated images (populated when generate_images=True). Shape:
     # [{"path": str, "prompt": str, "succeeded": bool, "error": Optional[str]}]
     generated_images: list = None  # type: ignore[assignment]
@@ -51,18 +62,38 @@ class PipelineResult:
     persona_articles: list = None  # type: ignore[assignment]
     # SongForge creative pack. Shape is produced by songforge.build_pack().
     songforge: dict = None  # type: ignore[assignment]
+    # Run-level memo outcome (caching enabled only): {"hit": True} when the
+    # whole result was replayed, else {"hit": False, "changed": [...],
+    # "invalidated": [...]} against the transcript's last memoized run.
+    memo: dict = None  # type: ignore[assignment]
+    # Stages whose output came from ``reuse`` instead of a model call.
+    reused_stages: list = None  # type: ignore[assignment]
+    # Answers served by ``semantic_cache`` for a near-duplicate input rather
+    # than generated: one ``SemanticHit.to_dict()`` per call, with "stage"
+    # (content type), "similarity", "matched_key" and "approximate": True.
+    semantic_hits: list = None  # type: ignore[assignment]
 
     def __post_init__(self):
         if self.chapters is None:
             self.chapters = []
+        if self.precleanup is None:
+            self.precleanup = {}
         if self.fact_check_flags is None:
             self.fact_check_flags = []
+        if self.fact_check_coverage is None:
+            self.fact_check_coverage = {}
         if self.generated_images is None:
             self.generated_images = []
         if self.persona_articles is None:
             self.persona_articles = []
         if self.songforge is None:
             self.songforge = {}
+        if self.memo is None:
+            self.memo = {}
+        if self.reused_stages is None:
+            self.reused_stages = []
+        if self.semantic_hits is None:
+            self.semantic_hits = []
 
 
 _STAGES = [
@@ -81,7 +112,7 @@ def run(
     prompts: Optional[Dict[str, str]] = None,
     knowledge_base: Optional[Dict[str, str]] = None,
     progress: Optional[ProgressCallback] = None,
-    cleanup: bool = True,
+    cleanup: Union[bool, str] = True,
     chapters: bool = True,
     segments: Optional[list] = None,
     agentic: bool = False,
@@ -99,13 +130,17 @@ def run(
     personas: Optional[list[str]] = None,
     recipe: Optional[dict] = None,
     checkpoint: Optional[CheckpointCallback] = None,
+    map_reduce: str = "auto",
+    reuse: Optional[Dict[str, dict]] = None,
 ) -> PipelineResult:
     """Execute the content pipeline.
 
     When ``cleanup`` is True (default), a stage-0 pass strips filler words,
     false starts, and ASR typos from the transcript before downstream stages
     see it. The cleaned text is used for all subsequent stages; the original
-    is preserved on ``PipelineResult.raw_transcript``.
+    is preserved on ``PipelineResult.raw_transcript``. The mechanical part
+    runs locally first (``precleanup``); ``cleanup="local"`` stops there and
+    skips the model — the right call for already-clean text sources.
 
     When ``chapters`` is True (default), a short post-cleanup pass segments
     the transcript into {title, summary, start_quote} chapters. Useful for
@@ -114,9 +149,22 @@ def run(
     ``prompts`` is an optional {content_type: template} override dict (typically
     the user's custom prompts loaded via whisperforge_core.prompts). Missing
     keys fall back to DEFAULT_PROMPTS inside llm.generate().
+
+    ``map_reduce`` ("auto" | "always" | "never") controls the long-transcript
+    path in ``mapreduce``: cleanup splits whenever the transcript would
+    overflow the cleanup output cap, and wisdom + outline switch to
+    per-part extraction with a merge call above
+    ``WHISPERFORGE_MAPREDUCE_TOKENS``.
+
+    Every checkpoint payload carries an ``input_hash`` of what its stage
+    read (prompt, upstream outputs, KB, settings). ``reuse`` maps stage
+    names to earlier payloads; a stage whose hash still matches takes its
+    output from there instead of calling the model (see ``rerun`` and
+    ``resume``).
     """
     prompts = prompts or {}
     result = PipelineResult(raw_transcript=transcript)
+    audit_mark = len(semantic_cache.audit_log())
 
     def _report(frac: float, label: str) -> None:
         if progress:
@@ -124,29 +172,109 @@ def run(
 
     def _checkpoint(stage: str, payload: dict) -> None:
         if checkpoint:
+            if stage in stage_keys:
+                payload = {**payload, "input_hash": stage_keys[stage]}
             checkpoint(stage, payload)
 
+    # Stage reuse: ``_reused`` hashes a stage's inputs (remembered for its
+    # checkpoint) and returns the matching ``reuse`` payload, if any.
+    stage_keys: Dict[str, str] = {}
+    kb_marker = run_memo.kb_marker(knowledge_base, user, rag_mode)
+    # Stages whose empty output is a result, not a failure: local-only
+    # cleanup leaves ``cleaned_transcript`` unset when it removes nothing.
+    empty_ok = {"cleanup"} if cleanup == "local" else set()
+
+    def _reused(stage: str, **inputs) -> Optional[dict]:
+        stage_keys[stage] = run_memo.stage_hash(stage, provider=provider, model=model, **inputs)
+        prior = (reuse or {}).get(stage)
+        if not run_memo.usable(stage, prior, stage_keys[stage], empty_ok=stage in empty_ok):
+            return None
+        result.reused_stages.append(stage)
+        return {k: v for k, v in prior.items() if k != "input_hash"}
+
+    def _prompt(*content_types: str) -> list:
+        return [prompts.get(ct) or DEFAULT_PROMPTS.get(ct, "") for ct in content_types]
+
+    # Run-level memo: an unchanged capture replays its stored result before
+    # any prompt is built or the KB is touched.
+    memo_fp = None
+    if run_memo.enabled():
+        memo_fp = run_memo.fingerprint(
+            transcript,
+            segments=segments,
+            settings={
+                "provider": provider, "model": model, "cleanup": cleanup,
+                "map_reduce": map_reduce, "chapters": chapters, "agentic": agentic,
+                "fact_check": fact_check, "generate_images": generate_images,
+                "image_style": image_style, "image_aspect_ratio": image_aspect_ratio,
+                "image_model": image_model, "article_length_words": article_length_words,
+                "user": user, "rag_mode": rag_mode, "compare_provider": compare_provider,
+                "compare_model": compare_model, "personas": personas,
+            },
+            prompts=prompts,
+            knowledge_base=knowledge_base,
+            recipe=recipe,
+        )
+        stored, changes = run_memo.lookup(memo_fp)
+        if stored is not None:
+            result = run_memo.restore(PipelineResult, stored)
+            result.memo = {"hit": True}
+            _checkpoint("complete", _complete_payload(result))
+            _report(1.0, "Done")
+            return result
+        if changes:
+            logger.info(
+                "run memo: %s changed — invalidates %s",
+                ", ".join(changes["changed"]), ", ".join(changes["invalidated"]),
+            )
+            result.memo = {"hit": False, **changes}
+
     # Stage 0: optional transcript cleanup. ~5% budget. Failure falls back to
     # the raw transcript rather than aborting the whole run.
     if cleanup:
         _report(0.0, "Cleaning transcript...")
-        cleaned = llm.generate(
-            "transcript_cleanup",
-            {"transcript": transcript},
-            provider,
-            model,
-            prompt=prompts.get("transcript_cleanup"),
-            # Cleanup doesn't need the KB — it's mechanical editing,
-            # not stylistic generation. Skipping the KB here also keeps
-            # this call fast and leaves cache-prefix room for stages 1-5.
-            knowledge_base=None,
+        pre = precleanup.clean(transcript)
+        result.precleanup = pre.report()
+        transcript = pre.text
+        prior = _reused(
+            "cleanup", transcript=result.raw_transcript, segments=segments,
+            mode=cleanup, map_reduce=map_reduce, prompt=_prompt("transcript_cleanup"),
         )
+        if prior is not None:
+            cleaned = prior.get("cleaned_transcript")
+        elif cleanup == "local":
+            cleaned = None
+        elif mapreduce.needs_split_cleanup(transcript, mode=map_reduce):
+            # Long transcripts would overflow the cleanup output cap and come
+            # back truncated; clean them part-by-part instead. ASR segments
+            # hold the raw text, so they only guide the split when the
+            # local pass left the transcript untouched.
+            cleaned = mapreduce.cleanup(
+                transcript, provider, model,
+                prompt=prompts.get("transcript_cleanup"),
+                segments=None if pre.removed_chars else segments,
+            )
+        else:
+            cleaned = llm.generate(
+                "transcript_cleanup",
+                {"transcript": transcript},
+                provider,
+                model,
+                prompt=prompts.get("transcript_cleanup"),
+                # Cleanup doesn't need the KB — it's mechanical editing,
+                # not stylistic generation. Skipping the KB here also keeps
+                # this call fast and leaves cache-prefix room for stages 1-5.
+                knowledge_base=None,
+            )
+        if not cleaned and pre.removed_chars:
+            cleaned = pre.text  # local-only, or the model failed
         if cleaned:
             transcript = cleaned
             result.cleaned_transcript = cleaned
         _checkpoint("cleanup", {
             "raw_transcript": result.raw_transcript,
             "cleaned_transcript": result.cleaned_transcript,
+            "precleanup": result.precleanup,
         })
         _report(0.05, "Cleaning transcript...")
 
@@ -157,68 +285,129 @@ def run(
     # runs and each chapter gets a ``start_seconds`` for Notion jump-links.
     if chapters:
         _report(0.05, "Chaptering...")
-        result.chapters = llm.generate_chapters(
-            transcript, provider, model, segments=segments,
+        prior = _reused(
+            "chapters", transcript=transcript, segments=segments,
+            mode=os.getenv("WHISPERFORGE_CHAPTERS_MODE", ""),
+            prompt=_prompt("chapters", "chapters_timestamped", "chapter_titles"),
+        )
+        result.chapters = (
+            prior.get("chapters") or [] if prior is not None
+            else llm.generate_chapters(transcript, provider, model, segments=segments)
         )
         _checkpoint("chapters", {"chapters": result.chapters})
         _report(0.1, "Chaptering...")
 
-    # Stage 1: wisdom (needs transcript)
-    _report(0.1, _STAGES[0][1])
-    result.wisdom = llm.generate(
-        "wisdom_extraction",
-        {"transcript": transcript},
-        provider,
-        model,
-        prompt=prompts.get("wisdom_extraction"),
-        knowledge_base=knowledge_base,
+    # One RAG block for the whole run, so every stage below sends the same
+    # cached KB prefix; each stage's own retrieval rides along as a pointer.
+    # Built on first use, so a run whose KB stages are all reused skips it.
+    shared_prefix: dict = {}
+
+    def _rag_prefix():
+        if "value" not in shared_prefix:
+            shared_prefix["value"] = _shared_rag_prefix(user, transcript, rag_mode)
+        return shared_prefix["value"]
+
+    if mapreduce.should_engage(transcript, mode=map_reduce):
+        # Stages 1-2, map-reduce variant: per-part wisdom + outline in
+        # parallel, split at the chapter boundaries found above, then one
+        # merge call each. Same checkpoints as the single-shot path. Both
+        # come from one extraction, so they are reused together or not at all.
+        _report(0.1, _STAGES[0][1])
+        shared = dict(transcript=transcript, chapters=result.chapters, kb=kb_marker)
+        prior_wisdom = _reused("wisdom", **shared, prompt=_prompt("wisdom_extraction", "wisdom_reduce"))
+        prior_outline = _reused("outline", **shared, prompt=_prompt("outline_creation", "outline_reduce"))
+        if prior_wisdom is not None and prior_outline is not None:
+            result.wisdom, result.outline = prior_wisdom.get("wisdom"), prior_outline.get("outline")
+            parts = prior_wisdom.get("parts") or []
+        else:
+            result.reused_stages = [s for s in result.reused_stages if s not in ("wisdom", "outline")]
+            extraction = mapreduce.extract(
+                transcript, provider, model,
+                prompts=prompts, knowledge_base=knowledge_base,
+                user=user, rag_mode=rag_mode, rag_prefix=_rag_prefix(),
+                chapters=result.chapters, segments=None if cleanup else segments,
+            )
+            result.wisdom, result.outline, parts = extraction.wisdom, extraction.outline, extraction.parts
+        _checkpoint("wisdom", {"wisdom": result.wisdom, "parts": parts})
+        _report(0.2, _STAGES[1][1])
+        _checkpoint("outline", {"outline": result.outline, "parts": parts})
+        _report(0.4, _STAGES[1][1])
+    else:
+        # Stage 1: wisdom (needs transcript)
+        _report(0.1, _STAGES[0][1])
+        prior = _reused(
+            "wisdom", transcript=transcript, kb=kb_marker, prompt=_prompt("wisdom_extraction"),
+        )
+        result.wisdom = prior.get("wisdom") if prior is not None else llm.generate(
+            "wisdom_extraction",
+            {"transcript": transcript},
+            provider,
+            model,
+            prompt=prompts.get("wisdom_extraction"),
+            knowledge_base=knowledge_base,
             user=user,
             rag_mode=rag_mode,
-    )
-    _checkpoint("wisdom", {"wisdom": result.wisdom})
-    _report(0.2, _STAGES[0][1])
-
-    # Stage 2: outline (needs transcript + wisdom)
-    _report(0.2, _STAGES[1][1])
-    result.outline = llm.generate(
-        "outline_creation",
-        {"transcript": transcript, "wisdom": result.wisdom or ""},
-        provider,
-        model,
-        prompt=prompts.get("outline_creation"),
-        knowledge_base=knowledge_base,
+            rag_prefix=_rag_prefix(),
+        )
+        _checkpoint("wisdom", {"wisdom": result.wisdom})
+        _report(0.2, _STAGES[0][1])
+
+        # Stage 2: outline (needs transcript + wisdom)
+        _report(0.2, _STAGES[1][1])
+        prior = _reused(
+            "outline", transcript=transcript, wisdom=result.wisdom, kb=kb_marker,
+            prompt=_prompt("outline_creation"),
+        )
+        result.outline = prior.get("outline") if prior is not None else llm.generate(
+            "outline_creation",
+            {"transcript": transcript, "wisdom": result.wisdom or ""},
+            provider,
+            model,
+            prompt=prompts.get("outline_creation"),
+            knowledge_base=knowledge_base,
             user=user,
             rag_mode=rag_mode,
-    )
-    _checkpoint("outline", {"outline": result.outline})
-    _report(0.4, _STAGES[1][1])
+            rag_prefix=_rag_prefix(),
+        )
+        _checkpoint("outline", {"outline": result.outline})
+        _report(0.4, _STAGES[1][1])
 
     # Stage 3: social (needs wisdom + outline)
     _report(0.4, _STAGES[2][1])
-    result.social_posts = llm.generate(
+    prior = _reused(
+        "social", wisdom=result.wisdom, outline=result.outline, kb=kb_marker,
+        prompt=_prompt("social_media"),
+    )
+    result.social_posts = prior.get("social_posts") if prior is not None else llm.generate(
         "social_media",
         {"wisdom": result.wisdom or "", "outline": result.outline or ""},
         provider,
         model,
         prompt=prompts.get("social_media"),
         knowledge_base=knowledge_base,
-            user=user,
-            rag_mode=rag_mode,
+        user=user,
+        rag_mode=rag_mode,
+        rag_prefix=_rag_prefix(),
     )
     _checkpoint("social", {"social_posts": result.social_posts})
     _report(0.6, _STAGES[2][1])
 
     # Stage 4: image prompts
     _report(0.6, _STAGES[3][1])
-    result.image_prompts = llm.generate(
+    prior = _reused(
+        "image_prompts", wisdom=result.wisdom, outline=result.outline, kb=kb_marker,
+        prompt=_prompt("image_prompts"),
+    )
+    result.image_prompts = prior.get("image_prompts") if prior is not None else llm.generate(
         "image_prompts",
         {"wisdom": result.wisdom or "", "outline": result.outline or ""},
         provider,
         model,
         prompt=prompts.get("image_prompts"),
         knowledge_base=knowledge_base,
-            user=user,
-            rag_mode=rag_mode,
+        user=user,
+        rag_mode=rag_mode,
+        rag_prefix=_rag_prefix(),
     )
     _checkpoint("image_prompts", {"image_prompts": result.image_prompts})
     _report(0.8, _STAGES[3][1])
@@ -230,8 +419,13 @@ def run(
         f"Target length: approximately {article_length_words} words. "
         f"Adjust depth and section count to fit, but never pad with filler.\n\n"
     )
+    article_inputs = dict(
+        transcript=transcript, wisdom=result.wisdom, outline=result.outline,
+        length=article_length_words, kb=kb_marker,
+    )
     _report(0.8, _STAGES[4][1])
-    draft = llm.generate(
+    prior = _reused("article_draft", **article_inputs, prompt=_prompt("article_writing"))
+    draft = prior.get("article") if prior is not None else llm.generate(
         "article_writing",
         {
             "transcript": transcript,
@@ -243,8 +437,9 @@ def run(
         model,
         prompt=prompts.get("article_writing"),
         knowledge_base=knowledge_base,
-            user=user,
-            rag_mode=rag_mode,
+        user=user,
+        rag_mode=rag_mode,
+        rag_prefix=_rag_prefix(),
         max_tokens=article_max_tokens,
     )
     result.article = draft
@@ -257,22 +452,32 @@ def run(
     # and filler that single-shot drafting misses.
     if agentic and draft:
         _report(0.85, "Critiquing draft...")
-        critique = llm.generate(
-            "article_critique",
-            {
-                "article": draft,
-                "transcript": transcript,
-                "wisdom": result.wisdom or "",
-                "outline": result.outline or "",
-            },
-            provider,
-            model,
-            prompt=prompts.get("article_critique"),
-            knowledge_base=knowledge_base,
-            user=user,
-            rag_mode=rag_mode,
+        prior = _reused(
+            "article_revision", **article_inputs, draft=draft,
+            prompt=_prompt("article_critique", "article_revise"),
         )
-        result.article_critique = critique
+        if prior is not None:
+            result.article_critique = prior.get("article_critique")
+            result.article = prior.get("article") or draft
+            critique = None  # already revised
+        else:
+            critique = llm.generate(
+                "article_critique",
+                {
+                    "article": draft,
+                    "transcript": transcript,
+                    "wisdom": result.wisdom or "",
+                    "outline": result.outline or "",
+                },
+                provider,
+                model,
+                prompt=prompts.get("article_critique"),
+                knowledge_base=knowledge_base,
+                user=user,
+                rag_mode=rag_mode,
+                rag_prefix=_rag_prefix(),
+            )
+            result.article_critique = critique
         _report(0.9, "Revising...")
         if critique:
             revised = llm.generate(
@@ -289,12 +494,14 @@ def run(
                 model,
                 prompt=prompts.get("article_revise"),
                 knowledge_base=knowledge_base,
-            user=user,
-            rag_mode=rag_mode,
+                user=user,
+                rag_mode=rag_mode,
+                rag_prefix=_rag_prefix(),
                 max_tokens=article_max_tokens,
             )
             if revised:
                 result.article = revised
+        if critique or prior is not None:
             _checkpoint("article_revision", {
                 "article": result.article,
                 "article_critique": result.article_critique,
@@ -307,8 +514,15 @@ def run(
     if personas and result.article:
         from . import prompts as prompts_mod
         persona_directives = prompts_mod.list_personas(user)
+        prior = _reused(
+            "persona", **article_inputs, prompt=_prompt("article_writing"),
+            personas=[(name, persona_directives.get(name)) for name in personas],
+        )
+        if prior is not None:
+            result.persona_articles = prior.get("persona_articles") or []
+            _checkpoint("persona", prior)
         total = len(personas)
-        for i, name in enumerate(personas, 1):
+        for i, name in enumerate(personas if prior is None else [], 1):
             directive = persona_directives.get(name)
             if not directive:
                 logger.info("skipping unknown persona %r", name)
@@ -337,6 +551,7 @@ def run(
                     max_tokens=article_max_tokens,
                     user=user,
                     rag_mode=rag_mode,
+                    rag_prefix=_rag_prefix(),
                 )
                 if variant:
                     result.persona_articles.append({
@@ -355,8 +570,12 @@ def run(
     # a full fresh pipeline run.
     if compare_provider and compare_model and result.article:
         _report(0.93, "Generating comparison article...")
+        prior = _reused(
+            "compare", **article_inputs, prompt=_prompt("article_writing"),
+            against=[compare_provider, compare_model],
+        )
         try:
-            compare = llm.generate(
+            compare = prior.get("article_compare") if prior is not None else llm.generate(
                 "article_writing",
                 {
                     "transcript": transcript,
@@ -371,6 +590,7 @@ def run(
                 max_tokens=article_max_tokens,
                 user=user,
                 rag_mode=rag_mode,
+                rag_prefix=_rag_prefix(),
             )
             if compare:
                 result.article_compare = compare
@@ -389,8 +609,15 @@ def run(
     # it just consumes whatever image_prompts stage 4 emitted.
     if generate_images and result.image_prompts:
         _report(0.92, "Generating images...")
+        prior = _reused(
+            "images", image_prompts=result.image_prompts, style=image_style,
+            aspect_ratio=image_aspect_ratio, image_model=image_model,
+        )
+        if prior is not None:
+            result.generated_images = prior.get("generated_images") or []
+            _checkpoint("images", {"generated_images": result.generated_images})
         try:
-            prompts_list = images.extract_prompts(result.image_prompts)
+            prompts_list = images.extract_prompts(result.image_prompts) if prior is None else []
             if prompts_list:
                 out_dir = (
                     images.run_output_dir()
@@ -419,32 +646,323 @@ def run(
 
     # Stage 8: optional fact-check pass. Runs against whichever article is
     # current (revised if agentic ran, draft otherwise). Output is
-    # structured JSON so the UI can render a clear flag list.
+    # structured JSON so the UI can render a clear flag list. Sentences the
+    # local grounding prefilter matches to the transcript are left out, and
+    # the model reads only the transcript blocks matched to the rest; if it
+    # grounded nothing, the model sees the article and transcript unchanged.
     if fact_check and result.article:
         _report(0.95, "Fact-checking...")
-        raw = llm.generate(
-            "article_fact_check",
-            {"article": result.article, "transcript": transcript},
-            provider,
-            model,
-            prompt=prompts.get("article_fact_check"),
-            knowledge_base=None,  # fact-check is grounded, not stylistic
+        prior = _reused(
+            "fact_check", article=result.article, transcript=transcript,
+            prompt=_prompt("article_fact_check"),
         )
-        result.fact_check_flags = _parse_fact_check(raw)
-        _checkpoint("fact_check", {"fact_check_flags": result.fact_check_flags})
+        if prior is not None:
+            result.fact_check_flags = prior.get("fact_check_flags") or []
+            result.fact_check_coverage = prior.get("fact_check_coverage") or {}
+        else:
+            report = grounding.check(result.article, transcript)
+            coverage = report.coverage()
+            skipped = bool(coverage["grounded"]) and not report.unverified
+            raw = None
+            if not skipped:
+                filtered = bool(coverage["grounded"])
+                raw = llm.generate(
+                    "article_fact_check",
+                    {
+                        "article": (
+                            grounding.render_for_fact_check(report)
+                            if filtered else result.article
+                        ),
+                        "transcript": (
+                            (report.evidence() or transcript)
+                            if filtered else transcript
+                        ),
+                    },
+                    provider,
+                    model,
+                    prompt=prompts.get("article_fact_check"),
+                    knowledge_base=None,  # fact-check is grounded, not stylistic
+                )
+            result.fact_check_flags = _parse_fact_check(raw)
+            result.fact_check_coverage = {
+                **coverage,
+                "llm_skipped": skipped,
+                "llm_failed": not skipped and raw is None,
+            }
+        if not result.fact_check_coverage.get("llm_failed"):
+            _checkpoint("fact_check", {
+                "fact_check_flags": result.fact_check_flags,
+                "fact_check_coverage": result.fact_check_coverage,
+            })
 
     if _is_songforge_recipe(recipe):
         _report(0.97, "Forging song pack...")
-        result.songforge = songforge.build_pack(
-            result.cleaned_transcript or transcript,
+        source = result.cleaned_transcript or transcript
+        prior = _reused("songforge", transcript=source, knowledge_base=knowledge_base)
+        result.songforge = prior if prior is not None else songforge.build_pack(
+            source,
             knowledge_base,
             title="SongForge creative pack",
         )
         result.article = songforge.render_markdown(result.songforge)
         _checkpoint("songforge", result.songforge)
 
+    result.semantic_hits = [hit.to_dict() for hit in semantic_cache.audit_log()[audit_mark:]]
     _report(1.0, "Done")
-    _checkpoint("complete", {
+    _checkpoint("complete", _complete_payload(result))
+    if memo_fp is not None:
+        run_memo.remember(
+            memo_fp, {**asdict(result), "memo": {}},
+            stages=[stage for stage in stage_keys if stage not in empty_ok],
+        )
+
+    return result
+
+
+# ``run`` keyword arguments a recorded run can be replayed with.
+RUN_OPTIONS = (
+    "provider", "model", "prompts", "cleanup", "chapters", "agentic", "fact_check",
+    "generate_images", "image_style", "image_aspect_ratio", "image_model",
+    "article_length_words", "user", "rag_mode", "compare_provider", "compare_model",
+    "personas", "recipe", "map_reduce",
+)
+
+
+def recorded_options(manifest: dict) -> dict:
+    """``run`` options recorded in a run manifest: the ``pipeline`` block
+    the UI writes, or — for older runs — what its settings summary implies."""
+    metadata = manifest.get("metadata") or {}
+    options = dict(metadata.get("pipeline") or {})
+    if not options:
+        settings = metadata.get("settings") or {}
+        recipe = metadata.get("recipe") or {}
+        options = {
+            "provider": metadata.get("provider"),
+            "model": metadata.get("model"),
+            "user": metadata.get("selected_user"),
+            "cleanup": settings.get("cleanup", True),
+            "chapters": settings.get("chapters", True),
+            "agentic": settings.get("agentic", False),
+            "fact_check": settings.get("fact_check", False),
+            "generate_images": settings.get("images", False),
+            "rag_mode": settings.get("rag_mode", "auto"),
+            "compare_provider": settings.get("compare_provider"),
+            "compare_model": settings.get("compare_model"),
+            "personas": settings.get("personas") or None,
+            "recipe": recipe.get("effective_settings") or None,
+        }
+    if not options.get("provider") or not options.get("model"):
+        raise ValueError(f"Run {manifest.get('run_id')!r} has no recorded provider/model")
+    return {k: v for k, v in options.items() if k in RUN_OPTIONS}
+
+
+def recorded_transcript(run_id: str) -> tuple[str, list]:
+    """(transcript, segments) a recorded run started from."""
+    from . import run_artifacts
+    payload = run_artifacts.load_stage_payload(run_id, "transcription")
+    text = payload.get("text") or run_artifacts.load_stage_payload(run_id, "cleanup").get("raw_transcript")
+    if not text:
+        raise ValueError(f"Run {run_id!r} has no recorded transcript")
+    return text, payload.get("segments") or []
+
+
+def rerun(
+    run_id: str,
+    changes: Optional[dict] = None,
+    *,
+    knowledge_base: Optional[Dict[str, str]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> PipelineResult:
+    """Replay recorded run ``run_id`` with ``changes`` applied, as a new run.
+
+    ``changes`` holds ``run`` keyword arguments; ``prompts`` merges into the
+    recorded overrides, so ``{"prompts": {"social_media": "..."}}`` edits one
+    prompt. The changed inputs are walked down ``run_memo.DEPENDS_ON``;
+    every stage upstream of them is offered to ``run`` for reuse from
+    ``run_id``'s artifacts (and reused only while its input hash still
+    matches). ``knowledge_base`` defaults to the run user's current KB.
+    The new run's manifest records ``rerun_of`` and the invalidated stages.
+    """
+    from . import run_artifacts
+    manifest = run_artifacts.load_manifest(run_id)
+    if not manifest:
+        raise ValueError(f"Unknown run {run_id!r}")
+    changes = dict(changes or {})
+    unknown = sorted(set(changes) - set(RUN_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unsupported rerun changes: {unknown}")
+    before = recorded_options(manifest)
+    after = {**before, **changes}
+    if "prompts" in changes:
+        after["prompts"] = {**(before.get("prompts") or {}), **(changes["prompts"] or {})}
+    transcript, segments = recorded_transcript(run_id)
+    if knowledge_base is None:
+        knowledge_base = _user_knowledge_base(after.get("user"))
+
+    def _components(options: dict) -> dict:
+        return run_memo.fingerprint(
+            transcript, segments=segments,
+            settings={k: options.get(k) for k in run_memo.SETTING_STAGES},
+            prompts=options.get("prompts"), knowledge_base=knowledge_base,
+            recipe=options.get("recipe"),
+        ).components
+
+    _changed, stale = run_memo.invalidated(_components(before), _components(after))
+    reuse = {}
+    for stage in run_memo.STAGES:
+        payload = run_artifacts.load_stage_payload(run_id, stage) if stage not in stale else {}
+        if payload:
+            reuse[stage] = payload
+    new_id = run_artifacts.new_run_id()
+    metadata = {
+        **(manifest.get("metadata") or {}),
+        "pipeline": after,
+        "rerun_of": run_id,
+        "invalidated": stale,
+    }
+    run_artifacts.start_run(new_id, metadata)
+    run_artifacts.write_stage(
+        new_id, "transcription",
+        run_artifacts.load_stage_payload(run_id, "transcription")
+        or {"text": transcript, "segments": segments},
+    )
+    return _run_recorded(new_id, transcript, segments, after, knowledge_base, reuse, progress)
+
+
+def resume(
+    run_id: str,
+    *,
+    knowledge_base: Optional[Dict[str, str]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> PipelineResult:
+    """Finish recorded run ``run_id`` in place after a failure or interrupt.
+
+    The run is replayed with the settings its manifest recorded, offering
+    every stage payload it already wrote for reuse: stages whose input hash
+    still matches come back from disk, so the model is only called from the
+    first missing (or empty) stage on. ``knowledge_base`` defaults to the
+    run user's current KB; if that changed since, the stages reading it are
+    redone too. Checkpoints land in the same run, which ends ``completed``
+    with a ``session_output`` stage (or ``failed`` again, ready for another
+    resume).
+    """
+    from . import run_artifacts
+    manifest = run_artifacts.load_manifest(run_id)
+    if not manifest:
+        raise ValueError(f"Unknown run {run_id!r}")
+    options = recorded_options(manifest)
+    transcript, segments = recorded_transcript(run_id)
+    if knowledge_base is None:
+        knowledge_base = _user_knowledge_base(options.get("user"))
+    reuse = {}
+    for stage in run_memo.STAGES:
+        payload = run_artifacts.load_stage_payload(run_id, stage)
+        if payload:
+            reuse[stage] = payload
+    metadata = manifest.get("metadata") or {}
+    run_artifacts.start_run(run_id, {
+        **metadata,
+        "resumed": int(metadata.get("resumed") or 0) + 1,
+    })
+    result = _run_recorded(run_id, transcript, segments, options, knowledge_base, reuse, progress)
+    # The UI writes these after a live run; Run history reopens from them.
+    summary = _recorded_scorecard(result, options, metadata)
+    run_artifacts.write_stage(run_id, "scorecard", summary)
+    run_artifacts.write_stage(run_id, "session_output", session_output(result, summary))
+    return result
+
+
+def session_output(result: PipelineResult, scorecard_summary: Optional[dict] = None) -> dict:
+    """The ``session_output`` stage payload for a finished run — what Run
+    history reopens. Written by the UI after a live run and by ``resume``."""
+    return {
+        "wisdom": result.wisdom or "",
+        "outline": result.outline or "",
+        "social_content": result.social_posts or "",
+        "image_prompts": result.image_prompts or "",
+        "article": result.article or "",
+        "chapters": result.chapters or [],
+        "fact_check_flags": result.fact_check_flags or [],
+        "fact_check_coverage": result.fact_check_coverage or {},
+        "generated_images": result.generated_images or [],
+        "article_compare": result.article_compare,
+        "compare_label": result.compare_label,
+        "persona_articles": result.persona_articles or [],
+        "songforge": result.songforge or {},
+        "semantic_hits": result.semantic_hits or [],
+        "scorecard_summary": scorecard_summary or {},
+    }
+
+
+def _recorded_scorecard(result: PipelineResult, options: dict, metadata: dict) -> dict:
+    """The advisory scorecard for a resumed run, from what its manifest
+    recorded (the UI builds the same from session state)."""
+    from . import scorecards
+    transcript = result.cleaned_transcript or result.raw_transcript or ""
+    recipe = options.get("recipe") or {}
+    capture = metadata.get("capture") or {}
+    receipts = []
+    if recipe:
+        receipts.append({"source": "Recipe", "name": recipe.get("recipe_name")})
+    if capture:
+        receipts.append({"source": "Capture", "title": capture.get("title")})
+    if transcript:
+        receipts.append({"source": "Transcript", "excerpt": transcript[:240]})
+    return scorecards.build_summary(
+        article=result.article or "",
+        transcript=transcript,
+        wisdom=result.wisdom or "",
+        outline=result.outline or "",
+        social_content=result.social_posts or "",
+        image_prompts=result.image_prompts or "",
+        chapters=result.chapters or [],
+        source_receipts=receipts,
+        fact_check_flags=result.fact_check_flags or [],
+        fact_check_ran=bool(options.get("fact_check")),
+        recipe=(metadata.get("recipe") or {}).get("recipe") or {},
+        recipe_effective_settings=recipe,
+        songforge=result.songforge or {},
+    )
+
+
+def _run_recorded(
+    run_id: str,
+    transcript: str,
+    segments: list,
+    options: dict,
+    knowledge_base: Optional[Dict[str, str]],
+    reuse: Dict[str, dict],
+    progress: Optional[ProgressCallback],
+) -> PipelineResult:
+    """``run`` with checkpoints written to ``run_id``'s artifacts."""
+    from . import run_artifacts
+    options = dict(options)
+    try:
+        result = run(
+            transcript, options.pop("provider"), options.pop("model"),
+            knowledge_base=knowledge_base,
+            segments=segments or None,
+            progress=progress,
+            checkpoint=lambda stage, payload: run_artifacts.write_stage(run_id, stage, payload),
+            reuse=reuse,
+            **options,
+        )
+    except Exception as e:
+        run_artifacts.mark_status(run_id, "failed", error=str(e))
+        raise
+    run_artifacts.mark_status(run_id, "completed")
+    return result
+
+
+def _user_knowledge_base(user: Optional[str]) -> Dict[str, str]:
+    if not user:
+        return {}
+    from . import prompts as prompts_mod
+    return prompts_mod.load_knowledge_base(user)
+
+
+def _complete_payload(result: PipelineResult) -> dict:
+    return {
         "wisdom": result.wisdom,
         "outline": result.outline,
         "social_posts": result.social_posts,
@@ -452,14 +970,30 @@ def run(
         "article": result.article,
         "chapters": result.chapters,
         "fact_check_flags": result.fact_check_flags,
+        "fact_check_coverage": result.fact_check_coverage,
         "generated_images": result.generated_images,
         "article_compare": result.article_compare,
         "compare_label": result.compare_label,
         "persona_articles": result.persona_articles,
         "songforge": result.songforge,
-    })
+        "semantic_hits": result.semantic_hits,
+    }
 
-    return result
+
+def _shared_rag_prefix(user: Optional[str], transcript: str, rag_mode: str):
+    """``rag.SharedPrefix`` for this run, or None when RAG doesn't engage
+    (no user, small KB, ``rag_mode="never"``) or retrieval fails — stages
+    then fall back to ``llm.generate``'s per-stage KB block."""
+    if not user or rag_mode == "never":
+        return None
+    from . import rag  # lazy import — sentence-transformers is heavy
+    try:
+        if not rag.should_engage(user, mode=rag_mode):
+            return None
+        return rag.build_shared_prefix(user, transcript)
+    except Exception as e:
+        logger.warning("shared RAG prefix failed (%s) — per-stage KB blocks", e)
+        return None
 
 
 def _is_songforge_recipe(recipe: Optional[dict]) -> bool:
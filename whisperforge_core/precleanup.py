@@ -0,0 +1,110 @@
+"""Local pre-cleanup: mechanical transcript fixes before ``transcript_cleanup``.
+
+The cleanup model spends most of its tokens re-typing the transcript
+around a handful of mechanical edits. ``clean()`` makes the mechanical ones
+locally, in one linear pass per line:
+
+- **fillers** — standalone "um", "uh", "erm", ... (one compiled regex);
+- **stutters** — cut-off word fragments ("th- the", "I- I");
+- **repeats** — a run of 1 to ``MAX_REPEAT_WORDS`` words said twice in a
+  row, which covers false starts ("I think, I think we") and the text two
+  overlapping ASR chunks both transcribed at their seam. Single-word
+  repeats that are grammatical ("had had", "that that") are kept.
+
+The model then cleans the shorter text. Dictation sources
+(``TEXT_SOURCES``, i.e. Wispr Flow) are already punctuated and edited, so
+the UI runs this pass alone for them (``cleanup="local"``) and skips the
+model call. Pasted text isn't in the set: it is often a raw transcript.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from . import tokens
+
+TEXT_SOURCES = frozenset({"wispr_flow"})
+MAX_REPEAT_WORDS = 40
+KEEP_DOUBLED = frozenset({"had", "that", "is", "do", "very", "no", "bye", "ha", "so"})
+
+_FILLER_RE = re.compile(r"(?:,\s*)?(?<![\w'-])(?:u+[hm]+|erm*|h+m+|a+h+)(?![\w'-]),?", re.I)
+_STUTTER_RE = re.compile(r"\b(\w{1,4})-\s+(?=\1)", re.I)
+_NORM_RE = re.compile(r"[^\w']+")
+_SPACES_RE = re.compile(r"[ \t]{2,}")
+
+
+@dataclass
+class PreCleanup:
+    text: str
+    removed_chars: int = 0
+    removed_tokens: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)  # fillers / stutters / repeats
+
+    def report(self) -> dict:
+        return {
+            "removed_chars": self.removed_chars,
+            "removed_tokens": self.removed_tokens,
+            **self.counts,
+        }
+
+
+def clean(text: str) -> PreCleanup:
+    """Strip fillers, stutters and immediate repeats from ``text``."""
+    counts = {"fillers": 0, "stutters": 0, "repeats": 0}
+    lines = []
+    for original in (text or "").split("\n"):
+        line, fillers = _FILLER_RE.subn(_drop_filler, original)
+        line, stutters = _STUTTER_RE.subn("", line)
+        line, repeats = _drop_repeats(line)
+        counts["fillers"] += fillers
+        counts["stutters"] += stutters
+        counts["repeats"] += repeats
+        lines.append(_SPACES_RE.sub(" ", line).strip() if line != original else line)
+    out = "\n".join(lines)
+    return PreCleanup(
+        text=out,
+        removed_chars=len(text or "") - len(out),
+        removed_tokens=max(tokens.count(text) - tokens.count(out), 0),
+        counts=counts,
+    )
+
+
+def _drop_filler(match: re.Match) -> str:
+    # "human, er, mostly" keeps one comma; "so, um we" and "um, so" keep none.
+    text = match.group(0)
+    return "," if text.startswith(",") and text.endswith(",") else ""
+
+
+def _drop_repeats(line: str) -> tuple[str, int]:
+    words = line.split()
+    if len(words) < 2:
+        return line, 0
+    norm = [_NORM_RE.sub("", w.lower()) for w in words]
+    out: List[str] = []
+    out_norm: List[str] = []
+    removed = 0
+    i = 0
+    while i < len(words):
+        for k in range(min(MAX_REPEAT_WORDS, len(out), len(words) - i), 0, -1):
+            if out_norm[-k] != norm[i]:
+                continue  # cheap first-word check before comparing the run
+            run = norm[i : i + k]
+            if run != out_norm[-k:] or not all(run):
+                continue
+            if k == 1 and run[0] in KEEP_DOUBLED:
+                continue
+            # Keep the first copy's words but the repeat's trailing
+            # punctuation: "I think, I think we" -> "I think we".
+            out[-1] = words[i + k - 1]
+            i += k
+            removed += 1
+            break
+        else:
+            out.append(words[i])
+            out_norm.append(norm[i])
+            i += 1
+    if not removed:
+        return line, 0
+    return " ".join(out), removed
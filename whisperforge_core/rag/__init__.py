@@ -4,16 +4,20 @@ Phase 1: chunker + embedder + store. Pure-Python building blocks, no
 integration into the LLM pipeline yet — that's Phase 2.
 """
 
-from . import benchmark, chunker, embedder, retriever, store
-from .benchmark import benchmark_all_stages, compare_kb_modes
+from . import ann, benchmark, chunker, embedder, retriever, store
+from .benchmark import ann_recall, benchmark_all_stages, compare_kb_modes, compare_rag_layouts
 from .chunker import Chunk, chunk_kb_dir, chunk_file
-from .retriever import RetrievalHit, format_block, inspect, retrieve, should_engage
-from .store import KBStore, reset_user
+from .retriever import (
+    RetrievalHit, SharedPrefix, build_shared_prefix, format_block, inspect, retrieve,
+    should_engage, stage_pointer,
+)
+from .store import KBStore, get_store, reset_user
 
 __all__ = [
-    "benchmark", "chunker", "embedder", "retriever", "store",
+    "ann", "benchmark", "chunker", "embedder", "retriever", "store",
     "Chunk", "chunk_kb_dir", "chunk_file",
-    "KBStore", "reset_user",
+    "KBStore", "get_store", "reset_user",
     "RetrievalHit", "format_block", "inspect", "retrieve", "should_engage",
-    "compare_kb_modes", "benchmark_all_stages",
+    "SharedPrefix", "build_shared_prefix", "stage_pointer",
+    "compare_kb_modes", "benchmark_all_stages", "compare_rag_layouts", "ann_recall",
 ]
@@ -17,27 +17,33 @@ Why no actual LLM calls? Two reasons:
    tool should be.
 
 Returns a compact dict the UI can render directly.
+
+``compare_rag_layouts`` answers the follow-up question for RAG runs: per-
+stage blocks (smallest per call, never cache-shared) vs. one shared prefix
+plus per-stage pointers (bigger once, then read from cache).
+
+``ann_recall`` checks the approximate index large KBs search with: its
+recall@k and latency against brute force over the same vectors.
 """
 
 from __future__ import annotations
 
+from time import perf_counter
 from typing import Dict, List, Optional
 
+import numpy as np
+
+from .. import tokens
 from ..cost import PRICING
 from ..prompts import load_knowledge_base
+from . import ann, embedder
 from . import retriever as retriever_mod
 from .chunker import Chunk
-from .store import KBStore
-
-# Same rough approximation used elsewhere — 4 chars per token is close
-# enough for comparing two KB blocks of the same structure.
-_CHARS_PER_TOKEN = 4
+from .store import KBStore, get_store
 
 
 def _approx_tokens(text: str) -> int:
-    if not text:
-        return 0
-    return max(1, len(text) // _CHARS_PER_TOKEN)
+    return tokens.count(text)
 
 
 def _legacy_kb_text(knowledge_base: Dict[str, str]) -> str:
@@ -169,3 +175,171 @@ def benchmark_all_stages(
         )
         for stage in retriever_mod.STAGE_AUGMENTATIONS
     ]
+
+
+def _layout_cost(blocks: List[str], in_rate: float, caching: bool) -> tuple[int, int, float]:
+    """(tokens, cache_read_tokens, usd) for sending ``blocks`` in order.
+    With caching, a block already sent earlier in the run is a cache read
+    (0.1×) and a new one is a cache write (1.25×) — Anthropic's rules."""
+    seen: set[str] = set()
+    total = read = 0
+    usd = 0.0
+    for block in blocks:
+        n = _approx_tokens(block)
+        total += n
+        if caching and block in seen:
+            read += n
+            usd += n * in_rate * 0.1 / 1_000_000
+        else:
+            usd += n * in_rate * (1.25 if caching else 1.0) / 1_000_000
+        seen.add(block)
+    return total, read, usd
+
+
+def compare_rag_layouts(
+    user: str,
+    *,
+    transcript: str,
+    stage_queries: Optional[Dict[str, str]] = None,
+    provider: str = "Anthropic",
+    model: str = "claude-haiku-4-5",
+) -> dict:
+    """Per-stage RAG blocks vs. one shared prefix + per-stage pointers,
+    across every stage in ``STAGE_AUGMENTATIONS``.
+
+    ``stage_queries`` maps stage -> the query that stage would really send
+    (defaults to the transcript for all). KB tokens only; caching follows
+    Anthropic's read/write multipliers when ``provider`` is Anthropic and
+    ignores its minimum cacheable length.
+
+    Shape::
+
+        {
+            "stages": int, "provider": str, "model": str,
+            "per_stage": {"tokens": int, "cache_read_tokens": int, "cost_usd": float},
+            "shared": {
+                "prefix_tokens": int, "pointer_tokens": int, "chunks": int,
+                "tokens": int, "cache_read_tokens": int, "cost_usd": float,
+            },
+            "delta": {"token_savings": int, "usd_savings": float},
+        }
+    """
+    stage_queries = stage_queries or {}
+    stages = list(retriever_mod.STAGE_AUGMENTATIONS)
+    caching = provider == "Anthropic"
+    in_rate = _input_rate_per_million(provider, model)
+
+    per_stage_chunks: Dict[str, List[Chunk]] = {}
+    for stage in stages:
+        try:
+            per_stage_chunks[stage] = retriever_mod.retrieve(
+                user, query=stage_queries.get(stage, transcript), stage=stage,
+            )
+        except Exception:
+            per_stage_chunks[stage] = []
+    per_blocks = [retriever_mod.format_block(per_stage_chunks[s]) for s in stages]
+    per_tokens, per_read, per_cost = _layout_cost(per_blocks, in_rate, caching)
+
+    try:
+        prefix = retriever_mod.build_shared_prefix(user, transcript, stages=stages)
+    except Exception:
+        prefix = None
+    if prefix is None:
+        shared_tokens = shared_read = prefix_tokens = pointer_tokens = 0
+        shared_cost = 0.0
+    else:
+        pointers = [
+            retriever_mod.stage_pointer(prefix, per_stage_chunks[s], s) for s in stages
+        ]
+        prefix_tokens = _approx_tokens(prefix.block)
+        shared_tokens, shared_read, prefix_cost = _layout_cost(
+            [prefix.block] * len(stages), in_rate, caching,
+        )
+        pointer_tokens = sum(_approx_tokens(p) for p in pointers)
+        shared_tokens += pointer_tokens
+        shared_cost = prefix_cost + pointer_tokens * in_rate / 1_000_000
+
+    return {
+        "stages": len(stages),
+        "provider": provider,
+        "model": model,
+        "per_stage": {
+            "tokens": per_tokens,
+            "cache_read_tokens": per_read,
+            "cost_usd": round(per_cost, 6),
+        },
+        "shared": {
+            "prefix_tokens": prefix_tokens,
+            "pointer_tokens": pointer_tokens,
+            "chunks": len(prefix.chunks) if prefix else 0,
+            "tokens": shared_tokens,
+            "cache_read_tokens": shared_read,
+            "cost_usd": round(shared_cost, 6),
+        },
+        "delta": {
+            "token_savings": per_tokens - shared_tokens,
+            "usd_savings": round(per_cost - shared_cost, 6),
+        },
+    }
+
+
+def ann_recall(
+    user: str,
+    *,
+    k: int = 10,
+    queries: Optional[List[str]] = None,
+    sample: int = 200,
+    probes: Optional[int] = None,
+    seed: int = 0,
+) -> dict:
+    """Recall@k of the IVF index against exact search for ``user``'s KB.
+
+    Queries are ``queries`` (embedded) or, by default, ``sample`` stored
+    chunk vectors — realistic, and free of embedding cost. The IVF index is
+    measured even when the KB is below ``WF_RAG_ANN_THRESHOLD``.
+
+    Shape::
+
+        {
+            "chunks": int, "engaged": bool, "lists": int, "probes": int,
+            "k": int, "queries": int, "recall": float,
+            "exact_ms": float, "ann_ms": float, "speedup": float,
+        }
+    """
+    store = get_store(user)
+    ivf = store.ann_index(force=True)
+    if ivf is None:
+        return {"chunks": 0, "engaged": False, "queries": 0, "recall": 0.0}
+    vectors = store.index
+    if queries:
+        q = embedder.embed(queries)
+    else:
+        rng = np.random.default_rng(seed)
+        q = np.asarray(vectors[rng.choice(len(vectors), min(sample, len(vectors)), replace=False)])
+    probes = min(probes or ann.nprobe(), ivf.lists)
+    k = min(k, len(vectors))
+
+    t0 = perf_counter()
+    exact = []
+    for vec in q:
+        scores = vectors @ vec
+        exact.append(set(np.argpartition(-scores, k - 1)[:k].tolist()))
+    exact_s = perf_counter() - t0
+
+    t0 = perf_counter()
+    approx = [set(ivf.search(vectors, vec, k, probes)[0].tolist()) for vec in q]
+    ann_s = perf_counter() - t0
+
+    found = sum(len(a & e) for a, e in zip(approx, exact, strict=True))
+    return {
+        "chunks": len(vectors),
+        "engaged": bool(ann.threshold()) and len(vectors) >= ann.threshold(),
+        "lists": ivf.lists,
+        "probes": probes,
+        "k": k,
+        "queries": len(q),
+        "recall": round(found / (k * len(q)), 4),
+        "exact_ms": round(1000 * exact_s / len(q), 3),
+        "ann_ms": round(1000 * ann_s / len(q), 3),
+        "speedup": round(exact_s / ann_s, 2) if ann_s else 0.0,
+    }
@@ -10,8 +10,9 @@ Splits each KB doc into retrieval-sized chunks. Two strategies:
    ~500-token windows with 50-token overlap so concepts aren't cut at
    chunk boundaries.
 
-A "token" here is approximated as 1 word ≈ 1.3 tokens. Cheap, model-
-agnostic, accurate enough for retrieval-budget math.
+Token counts come from ``whisperforge_core.tokens`` — the same counter
+``llm.generate`` budgets prompts with, so a 500-token chunk is 500 tokens
+everywhere.
 """
 
 from __future__ import annotations
@@ -21,11 +22,13 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List
 
+from .. import tokens
+
 # Tunables
 TARGET_TOKENS = 500
 OVERLAP_TOKENS = 50
 MIN_CHUNK_TOKENS = 30          # discard chunks below this — they're noise
-WORDS_PER_TOKEN = 1 / 1.3      # so ~650 words ≈ 500 tokens
+WORDS_PER_TOKEN = 1 / tokens.TOKENS_PER_WORD  # plain prose: ~650 words ≈ 500 tokens
 
 
 @dataclass
@@ -46,26 +49,12 @@ class Chunk:
 
 
 def _approx_tokens(text: str) -> int:
-    return max(1, int(len(text.split()) / WORDS_PER_TOKEN))
+    return max(1, tokens.count(text))
 
 
 def _sliding_window(text: str, target: int, overlap: int) -> List[str]:
     """Token-budgeted sliding window over a string. Splits on whitespace."""
-    words = text.split()
-    if not words:
-        return []
-    target_words = max(1, int(target * WORDS_PER_TOKEN))
-    overlap_words = max(0, int(overlap * WORDS_PER_TOKEN))
-    step = max(1, target_words - overlap_words)
-    out = []
-    for start in range(0, len(words), step):
-        window = words[start : start + target_words]
-        if not window:
-            break
-        out.append(" ".join(window))
-        if start + target_words >= len(words):
-            break
-    return out
+    return tokens.windows(text, target, overlap)
 
 
 # Match `# Heading`, `## Heading`, `### Heading` only (avoid `####` H4+).
@@ -3,12 +3,16 @@
 The full plan in ``~/.claude/plans/rag-on-kb.md`` covers the design; this
 module is the integration point that ``llm._compose_kb_block`` plugs into.
 
-Three responsibilities:
+Four responsibilities:
 
 1. **Decide whether to engage** RAG vs. dump-everything (`should_engage`).
 2. **Compose stage-specific queries** (transcript + augmentation string).
 3. **Always-include voice anchor** so the retriever can't accidentally
    drop the user's foundational style doc when topical hits dominate.
+4. **Keep the prompt cache warm** (`build_shared_prefix`): one KB block
+   per run — the anchor plus the union of every stage's hits — so each
+   stage sends the same cached prefix, with only a small per-stage
+   pointer section varying.
 
 Knobs (all env vars; UI controls land in Phase 3):
   - WF_RAG          force on/off — "1"/"true"/"on" or "0"/"false"/"off"
@@ -25,7 +29,7 @@ from typing import Dict, List, Optional
 
 from ..logging import get_logger
 from .chunker import Chunk
-from .store import KBStore
+from .store import get_store
 
 logger = get_logger(__name__)
 
@@ -101,9 +105,7 @@ def should_engage(user: str, mode: str = "auto") -> bool:
         return env
     # Auto: engage when KB is "big enough" to benefit
     try:
-        store = KBStore(user)
-        store.ensure_built()
-        return store.chunk_count() >= AUTO_ENGAGE_THRESHOLD
+        return get_store(user).chunk_count() >= AUTO_ENGAGE_THRESHOLD
     except Exception as e:
         logger.warning("should_engage probe failed for %s: %s", user, e)
         return False
@@ -145,8 +147,7 @@ def inspect(
 
     full_query, aug = _full_query(query, stage)
 
-    store = KBStore(user)
-    store.ensure_built()
+    store = get_store(user)
     if store.chunk_count() == 0:
         return []
 
@@ -239,3 +240,67 @@ def format_block(chunks: List[Chunk]) -> str:
         "or claims that aren't in the source transcript or these excerpts."
     )
     return "\n".join(lines)
+
+
+@dataclass
+class SharedPrefix:
+    """Stage-independent RAG block for one run.
+
+    ``chunks`` is the voice anchor followed by the union of every stage's
+    hits in (doc_name, chunk_index) order, so ``block`` is byte-identical
+    for every stage and caches like the legacy dump — at RAG's size."""
+    user: str
+    chunks: List[Chunk]
+    block: str
+
+    def keys(self) -> set[tuple[str, int]]:
+        return {(c.doc_name, c.chunk_index) for c in self.chunks}
+
+
+def build_shared_prefix(
+    user: str,
+    transcript: str,
+    *,
+    stages: Optional[List[str]] = None,
+    k: int = DEFAULT_TOP_K,
+) -> Optional[SharedPrefix]:
+    """Retrieve for every stage against the transcript up front and merge
+    the hits. Later stage outputs (wisdom, outline, drafts) don't exist yet,
+    so the transcript + stage augmentation stands in as each stage's query;
+    ``stage_pointer`` covers whatever the real per-stage query adds."""
+    anchor: Optional[RetrievalHit] = None
+    union: Dict[tuple[str, int], Chunk] = {}
+    for stage in stages or list(STAGE_AUGMENTATIONS):
+        for hit in inspect(user, query=transcript, stage=stage, k=k):
+            key = (hit.chunk.doc_name, hit.chunk.chunk_index)
+            if hit.role == "voice_anchor" and (anchor is None or hit.score > anchor.score):
+                anchor = hit
+            union.setdefault(key, hit.chunk)
+    if not union:
+        return None
+    ordered = sorted(union.values(), key=lambda c: (c.doc_name, c.chunk_index))
+    if anchor is not None:
+        ordered.remove(anchor.chunk)
+        ordered.insert(0, anchor.chunk)
+    return SharedPrefix(user=user, chunks=ordered, block=format_block(ordered))
+
+
+def stage_pointer(prefix: SharedPrefix, chunks: List[Chunk], stage: Optional[str]) -> str:
+    """Small per-stage section that points at the shared block: labels of the
+    excerpts this stage should lean on, plus the full text of any hit the
+    shared block doesn't already carry."""
+    if not chunks:
+        return ""
+    keys = prefix.keys()
+    inside = [c for c in chunks if (c.doc_name, c.chunk_index) in keys]
+    outside = [c for c in chunks if (c.doc_name, c.chunk_index) not in keys]
+    lines: List[str] = [f"## Knowledge base focus for {stage or 'this step'}"]
+    if inside:
+        lines.append(
+            "Lean most on these excerpts from the knowledge base above: "
+            + "; ".join(c.label for c in inside) + "."
+        )
+    for chunk in outside:
+        lines.append(f"### {chunk.label}")
+        lines.append(chunk.text.strip())
+    return "\n".join(lines)
@@ -1,35 +1,54 @@
 """In-memory vector store with on-disk persistence + mtime invalidation.
 
 Pure numpy + pickle — no FAISS dependency. For Kris's 5-doc KB, brute-
-force cosine over ~50 chunks is sub-millisecond. We can swap to FAISS if
-KBs grow past ~5000 chunks (the plan documents that threshold).
+force cosine over ~50 chunks is sub-millisecond. Past
+``WF_RAG_ANN_THRESHOLD`` chunks (default 5000) ``search`` switches to the
+IVF index in ``ann`` (persisted as ``ann.npz`` beside ``index.npy``).
 
 Store layout on disk::
 
     .cache/rag/<user>/<embed_model_hash>/
         index.npy        # float32 (N, dim), L2-normalized
         chunks.pkl       # list[Chunk] in matching order
-        manifest.json    # {built_at, kb_mtime, chunk_count, model_name}
-
-Invalidation: rebuild whenever any KB file's mtime exceeds ``kb_mtime``
-in the manifest. Cheap stat() call on every ``ensure_built()``.
+        manifest.json    # {built_at, kb_mtime, kb_version, files, chunk_count, model_name}
+
+``files`` maps each KB file to its content ``digest`` (with the
+``algorithm`` that produced it) and its ``[start, end)`` range of rows, so
+a rebuild re-chunks and re-embeds only files whose hash changed (see
+``KBStore._build``).
+
+Invalidation: rebuild whenever ``index_version`` (every KB file's name,
+size and mtime) differs from the manifest's ``kb_version`` — older
+manifests fall back to comparing the newest mtime with ``kb_mtime``.
+Cheap stat() calls on every ``ensure_built()``.
+
+Callers that query repeatedly (the retriever, once per stage) go through
+``get_store``: a process-wide registry keyed by (user, embed model hash)
+that keeps one loaded store resident and only revalidates it with stat
+calls (``index_version``). A changed KB gets a freshly built store swapped
+in; threads still holding the old one keep a consistent snapshot. Resident
+indexes are memory-mapped read-only and files are replaced atomically, so
+one copy is shared by every thread (and, via the page cache, process).
 """
 
 from __future__ import annotations
 
 import json
+import os
 import pickle
+import threading
 from dataclasses import asdict
 from pathlib import Path
 from time import time
-from typing import List
+from typing import Dict, List, Tuple
 
 import numpy as np
 
 from .. import cache as cache_mod
+from .. import hashing
 from ..config import CACHE_DIR, PROMPTS_DIR
 from ..logging import get_logger
-from . import chunker, embedder
+from . import ann, chunker, embedder
 from .chunker import Chunk
 
 logger = get_logger(__name__)
@@ -55,6 +74,22 @@ def _max_kb_mtime(kb_dir: Path) -> float:
     return max(mtimes) if mtimes else 0.0
 
 
+def index_version(user: str) -> str:
+    """Cheap fingerprint of the index ``user``'s KB would be built into:
+    embedding model plus every KB file's name, size and mtime. Stat calls
+    only — nothing is loaded or embedded. Unlike the manifest's
+    ``kb_mtime`` it also changes when a file is deleted."""
+    import hashlib
+    kb_dir = _kb_dir(user)
+    h = hashlib.sha256(embedder.model_id_hash().encode("utf-8"))
+    if kb_dir.exists():
+        for p in sorted(kb_dir.iterdir()):
+            if p.suffix.lower() in {".md", ".txt"} and not p.name.startswith("."):
+                st = p.stat()
+                h.update(f"|{p.name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
 class KBStore:
     """Per-user vector store. Built lazily, persisted to disk, invalidated
     on KB edits.
@@ -73,6 +108,10 @@ class KBStore:
         self.index: np.ndarray | None = None
         self.chunks: List[Chunk] = []
         self._loaded = False
+        self._files: Dict[str, dict] = {}  # manifest "files" of the loaded build
+        self._version = ""  # manifest "kb_version" of the loaded build
+        self._ann: ann.IVFIndex | None = None
+        self._ann_lock = threading.Lock()
 
     # ---- Public API -----------------------------------------------------
 
@@ -83,20 +122,51 @@ class KBStore:
             return
         self._build()
 
-    def search(self, query: str, k: int = 5) -> List[tuple[Chunk, float]]:
+    def search(self, query: str, k: int = 5, *, exact: bool = False) -> List[tuple[Chunk, float]]:
         """Return up to ``k`` (chunk, score) pairs ranked by descending
-        cosine similarity. Score is in [-1, 1]; >0.5 is generally relevant."""
-        self.ensure_built()
+        cosine similarity. Score is in [-1, 1]; >0.5 is generally relevant.
+        Builds on first use; a loaded store is searched as-is (``get_store``
+        decides when it's stale). Large stores answer from the ANN index
+        unless ``exact``."""
+        if not self._loaded:
+            self.ensure_built()
         if self.index is None or len(self.chunks) == 0:
             return []
-        q = embedder.embed([query])             # (1, dim)
-        scores = (self.index @ q.T).flatten()    # (N,)
+        q = embedder.embed([query])[0]          # (dim,)
+        ivf = None if exact else self.ann_index()
+        if ivf is not None:
+            ids, scores = ivf.search(self.index, q, k)
+            return [(self.chunks[i], float(score)) for i, score in zip(ids, scores, strict=True)]
+        scores = self.index @ q                  # (N,)
         # argpartition is O(N), then we sort the top-k slice for stable order
         k = min(k, len(self.chunks))
         top = np.argpartition(-scores, k - 1)[:k]
         top_sorted = top[np.argsort(-scores[top])]
         return [(self.chunks[i], float(scores[i])) for i in top_sorted]
 
+    def ann_index(self, *, force: bool = False) -> ann.IVFIndex | None:
+        """The IVF index for this build — loaded from ``ann.npz`` or built
+        and persisted on first use. ``None`` below the chunk threshold
+        unless ``force``."""
+        if self.index is None or not len(self.chunks):
+            return None
+        limit = ann.threshold()
+        if not force and (not limit or len(self.chunks) < limit):
+            return None
+        with self._ann_lock:
+            if self._ann is None:
+                self._ann = ann.load(self.dir, rows=len(self.chunks), version=self._version)
+            if self._ann is None:
+                t0 = time()
+                self._ann = ann.build(self.index, version=self._version)
+                try:
+                    self._ann.save(self.dir)
+                except OSError as e:
+                    logger.warning("ANN persist failed (%s)", e)
+                logger.info("built ANN index for %s: %d lists over %d chunks in %.2fs",
+                            self.user, self._ann.lists, len(self.chunks), time() - t0)
+            return self._ann
+
     def chunk_count(self) -> int:
         if not self._loaded:
             self.ensure_built()
@@ -116,11 +186,13 @@ class KBStore:
             manifest = json.loads(mp.read_text())
         except (OSError, json.JSONDecodeError):
             return False
+        if "kb_version" in manifest:  # also catches deleted files
+            return manifest["kb_version"] == index_version(self.user)
         return manifest.get("kb_mtime", 0) >= _max_kb_mtime(self.kb_dir) - 1e-3
 
     def _load(self) -> None:
         try:
-            self.index = np.load(self.dir / "index.npy")
+            self.index = np.load(self.dir / "index.npy", mmap_mode="r")
             chunks = cache_mod.load_pickle(
                 self.dir / "chunks.pkl",
                 root=CACHE_DIR,
@@ -129,6 +201,9 @@ class KBStore:
             if chunks is None:
                 raise OSError("KB chunks pickle was missing, unreadable, or untrusted")
             self.chunks = chunks
+            manifest = json.loads(self._manifest_path().read_text())
+            self._files = manifest.get("files") or {}
+            self._version = manifest.get("kb_version", "")
             self._loaded = True
             logger.info("loaded %d KB chunks from %s",
                         len(self.chunks), self.dir)
@@ -137,42 +212,199 @@ class KBStore:
             self._build()
 
     def _build(self) -> None:
+        """(Re)build the index incrementally: files whose content hash
+        matches the previous manifest keep their chunks and vectors; changed
+        and added files are re-chunked, and only chunk texts the previous
+        index never embedded go to the embedder."""
         t0 = time()
-        chunks = chunker.chunk_kb_dir(self.kb_dir)
+        old_files, old_chunks, old_index = self._previous()
+        chunks: List[Chunk] = []
+        rows: List[np.ndarray | None] = []
+        files: Dict[str, dict] = {}
+        reused_files = 0
+        algo = hashing.algorithm()
+        for path in _kb_files(self.kb_dir):
+            digest = hashing.digest(path.read_bytes(), algo)
+            prior = old_files.get(path.name) or {}
+            start = len(chunks)
+            if (
+                prior.get("algorithm") == algo and prior.get("digest") == digest
+                and old_index is not None
+            ):
+                chunks.extend(old_chunks[prior["start"]:prior["end"]])
+                rows.extend(old_index[prior["start"]:prior["end"]])
+                reused_files += 1
+            else:
+                fresh = chunker.chunk_file(path)
+                chunks.extend(fresh)
+                rows.extend([None] * len(fresh))
+            files[path.name] = {
+                "digest": digest, "algorithm": algo, "start": start, "end": len(chunks),
+            }
+        self._files = files
         if not chunks:
             self.chunks, self.index, self._loaded = [], None, True
             return
-        texts = [c.text for c in chunks]
-        index = embedder.embed(texts)
+
+        # Chunk-hash embedding cache: an edited file usually keeps most of
+        # its chunks verbatim, and those vectors are already in the old index.
+        known = _embedding_cache(old_chunks, old_index)
+        missing: Dict[str, str] = {}
+        for i, row in enumerate(rows):
+            if row is None:
+                h = hashing.text_digest(chunks[i].text)
+                if h in known:
+                    rows[i] = known[h]
+                else:
+                    missing.setdefault(h, chunks[i].text)
+        if missing:
+            vectors = embedder.embed(list(missing.values()))
+            fresh_rows = dict(zip(missing, vectors, strict=True))
+            for i, row in enumerate(rows):
+                if row is None:
+                    rows[i] = fresh_rows[hashing.text_digest(chunks[i].text)]
+        index = np.stack(rows).astype(np.float32, copy=False)
+        index.setflags(write=False)
         self.chunks = chunks
         self.index = index
+        self._ann = None
         self._persist()
         self._loaded = True
+        self.ann_index()  # large KBs: build the ANN index now, not mid-stage
         logger.info(
-            "built KB index for %s: %d chunks in %.2fs (model=%s)",
-            self.user, len(chunks), time() - t0, embedder.model_name(),
+            "built KB index for %s: %d chunks (%d/%d files reused, %d embedded) in %.2fs (model=%s)",
+            self.user, len(chunks), reused_files, len(files), len(missing),
+            time() - t0, embedder.model_name(),
         )
 
+    def _previous(self) -> tuple[Dict[str, dict], List[Chunk], np.ndarray | None]:
+        """Files map, chunks and index of the last persisted build — empty
+        when there is none or it doesn't hang together."""
+        empty: tuple = ({}, [], None)
+        if self.index is not None and self.chunks:
+            return self._files, self.chunks, self.index
+        try:
+            manifest = json.loads(self._manifest_path().read_text())
+            index = np.load(self.dir / "index.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return empty
+        chunks = cache_mod.load_pickle(
+            self.dir / "chunks.pkl", root=CACHE_DIR, label=f"KB chunks for {self.user}",
+        )
+        if not chunks or len(chunks) != len(index):
+            return empty
+        files = manifest.get("files") or {}
+        if any(not 0 <= f.get("start", -1) <= f.get("end", -1) <= len(chunks) for f in files.values()):
+            files = {}
+        return files, chunks, index
+
     def _persist(self) -> None:
+        # Each file goes to a temp name and is renamed into place: another
+        # process may have the old index memory-mapped.
         try:
             self.dir.mkdir(parents=True, exist_ok=True)
-            np.save(self.dir / "index.npy", self.index)
-            with open(self.dir / "chunks.pkl", "wb") as f:
+            with _replacing(self.dir / "index.npy") as f:
+                np.save(f, self.index)
+            with _replacing(self.dir / "chunks.pkl") as f:
                 pickle.dump(self.chunks, f)
+            self._version = index_version(self.user)
             manifest = {
                 "built_at": time(),
                 "kb_mtime": _max_kb_mtime(self.kb_dir),
+                "kb_version": self._version,
+                "files": self._files,
                 "chunk_count": len(self.chunks),
                 "model_name": embedder.model_name(),
             }
-            self._manifest_path().write_text(json.dumps(manifest))
+            with _replacing(self._manifest_path()) as f:
+                f.write(json.dumps(manifest).encode("utf-8"))
         except (OSError, pickle.PickleError) as e:
             logger.warning("persist failed (%s)", e)
 
 
+def _kb_files(kb_dir: Path) -> List[Path]:
+    """KB documents in the order ``chunker.chunk_kb_dir`` walks them."""
+    if not kb_dir.exists():
+        return []
+    return [
+        p for p in sorted(kb_dir.iterdir())
+        if p.suffix.lower() in {".md", ".txt"} and not p.name.startswith(".")
+    ]
+
+
+def _embedding_cache(chunks: List[Chunk], index: np.ndarray | None) -> Dict[str, np.ndarray]:
+    """Chunk-text hash -> vector for every row of a previous index."""
+    if index is None:
+        return {}
+    return {hashing.text_digest(c.text): index[i] for i, c in enumerate(chunks)}
+
+
+class _replacing:
+    """Binary file handle that replaces ``path`` atomically on close."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def __enter__(self):
+        self.f = open(self.tmp, "wb")
+        return self.f
+
+    def __exit__(self, exc_type, *_):
+        self.f.close()
+        if exc_type is None:
+            os.replace(self.tmp, self.path)
+        else:
+            self.tmp.unlink(missing_ok=True)
+        return False
+
+
+# Process-wide registry: (user, embed model hash) -> (index_version, store).
+_registry: Dict[Tuple[str, str], Tuple[str, KBStore]] = {}
+_registry_lock = threading.Lock()
+_build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+
+def get_store(user: str) -> KBStore:
+    """The resident, built store for ``user``. Revalidated on every call
+    with stat calls only; rebuilt (or reloaded from disk) when the KB or the
+    embedding model changed. Callers must treat it as read-only."""
+    key = (user, embedder.model_id_hash())
+    version = index_version(user)
+    with _registry_lock:
+        resident = _registry.get(key)
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+    if resident is not None and _current(resident, version, user):
+        return resident[1]
+    with build_lock:  # one loader per key; the others wait and reuse it
+        with _registry_lock:
+            resident = _registry.get(key)
+        if resident is not None and _current(resident, version, user):
+            return resident[1]
+        fresh = KBStore(user)
+        fresh.ensure_built()
+        with _registry_lock:
+            _registry[key] = (version, fresh)
+        return fresh
+
+
+def _current(resident: Tuple[str, KBStore], version: str, user: str) -> bool:
+    store = resident[1]
+    return resident[0] == version and store.dir == _store_dir(user) and store.kb_dir == _kb_dir(user)
+
+
+def forget(user: str | None = None) -> None:
+    """Drop resident stores (one user's, or all). The next ``get_store``
+    reloads from disk."""
+    with _registry_lock:
+        for key in [k for k in _registry if user is None or k[0] == user]:
+            del _registry[key]
+
+
 def reset_user(user: str) -> None:
     """Delete the on-disk index for one user. Forces rebuild next query."""
     import shutil
+    forget(user)
     d = _store_dir(user)
     if d.exists():
         shutil.rmtree(d, ignore_errors=True)
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 import re
 import uuid
 from dataclasses import dataclass, field
@@ -10,6 +9,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
+from . import serialization
 from .config import CACHE_DIR
 
 RUNS_DIR = CACHE_DIR / "runs"
@@ -141,7 +141,7 @@ def load_manifest(run_id: str) -> dict:
     path = manifest_path(run_id)
     if not path.exists():
         return {}
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw = serialization.read_json(path)
     if not isinstance(raw, dict):
         return {}
     return RunManifest.from_dict(raw).to_dict()
@@ -153,13 +153,13 @@ def list_manifests(limit: int = 50) -> list[dict[str, Any]]:
     manifests = []
     for path in RUNS_DIR.glob("*/manifest.json"):
         try:
-            raw = json.loads(path.read_text(encoding="utf-8"))
+            raw = serialization.read_json(path)
             if not isinstance(raw, dict):
                 continue
             manifest = RunManifest.from_dict(raw).to_dict()
             manifest["_path"] = str(path)
             manifests.append(manifest)
-        except (OSError, json.JSONDecodeError):
+        except (OSError, ValueError):
             continue
     manifests.sort(
         key=lambda item: item.get("updated_at") or item.get("created_at") or "",
@@ -204,8 +204,8 @@ def load_stage_payload(run_id: str, stage: str) -> dict[str, Any]:
         if not path.exists():
             return {}
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
+            data = serialization.read_json(path)
+        except (OSError, ValueError):
             return {}
         payload = data.get("payload")
         return payload if isinstance(payload, dict) else {}
@@ -307,14 +307,56 @@ def refresh_capture_metadata(run_id: str, capture_metadata: dict[str, Any] | Non
     _write_json(manifest_path(run_id), manifest)
 
 
+def batch_job_path(job_id: str) -> Path:
+    # Offline batch jobs (see ``batch``) keep their submission state next to
+    # the runs they drive; no manifest.json, so list_manifests skips them.
+    return RUNS_DIR / "_batches" / f"{_slug(job_id)}.json"
+
+
+def load_batch_job(job_id: str) -> dict[str, Any]:
+    path = batch_job_path(job_id)
+    if not path.exists():
+        return {}
+    try:
+        raw = serialization.read_json(path)
+    except (OSError, ValueError):
+        return {}
+    return raw if isinstance(raw, dict) else {}
+
+
+def save_batch_job(job_id: str, job: dict[str, Any]) -> Path:
+    path = batch_job_path(job_id)
+    _write_json(path, {**job, "job_id": job_id, "updated_at": now_iso()})
+    return path
+
+
+def memo_path(transcript_hash: str) -> Path:
+    # Run-level memos (see ``run_memo``) live beside the runs, one file per
+    # transcript; like batch jobs they have no manifest.json.
+    return RUNS_DIR / "_memo" / f"{_slug(transcript_hash)}.json"
+
+
+def load_memo(transcript_hash: str) -> dict[str, Any]:
+    path = memo_path(transcript_hash)
+    if not path.exists():
+        return {}
+    try:
+        raw = serialization.read_json(path)
+    except (OSError, ValueError):
+        return {}
+    return raw if isinstance(raw, dict) else {}
+
+
+def save_memo(transcript_hash: str, memo: dict[str, Any]) -> Path:
+    path = memo_path(transcript_hash)
+    _write_json(path, {**memo, "updated_at": now_iso()})
+    return path
+
+
 def _write_json(path: Path, data: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_name(f".{path.name}.tmp")
-    tmp.write_text(
-        json.dumps(_jsonable(data), indent=2, sort_keys=True) + "\n",
-        encoding="utf-8",
-    )
-    tmp.replace(path)
+    # Indented JSON for small artifacts; large ones (long transcripts and
+    # articles) are compressed — ``serialization.read_json`` reads both.
+    serialization.write_json(path, _jsonable(data))
 
 
 def _slug(value: str) -> str:
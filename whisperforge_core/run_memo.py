@@ -0,0 +1,269 @@
+"""Run-level memo: whole ``PipelineResult``s keyed by everything that
+shapes them.
+
+The per-call cache (``cache.cached_or_compute``) still makes a re-run of an
+unchanged capture rebuild every prompt, retrieve from the KB and do one
+lookup per stage. With caching enabled, ``pipeline.run`` first builds a
+``Fingerprint`` — hashes of the transcript, every run setting, each
+effective prompt, the knowledge-base dict, the KB index version
+(``rag.store.index_version``, stat calls only) and the recipe — and looks
+it up here:
+
+- same fingerprint: the stored result comes back without a single model
+  call or retrieval;
+- same transcript, some inputs changed: the run goes ahead, and
+  ``invalidated()`` names the components that changed and the stages they
+  invalidate, walking ``DEPENDS_ON`` downstream.
+
+Memos live under ``RUNS_DIR/_memo/``, one file per transcript holding its
+``MAX_ENTRIES`` most recent results.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import cache, run_artifacts
+from .config import DEFAULT_PROMPTS
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_ENTRIES = 5
+
+# Pipeline checkpoint stages, in run order, and what each one reads.
+STAGES = (
+    "cleanup", "chapters", "wisdom", "outline", "social", "image_prompts",
+    "article_draft", "article_revision", "persona", "compare", "images",
+    "fact_check", "songforge",
+)
+DEPENDS_ON: Dict[str, Tuple[str, ...]] = {
+    "cleanup": (),
+    "chapters": ("cleanup",),
+    "wisdom": ("cleanup", "chapters"),
+    "outline": ("wisdom",),
+    "social": ("outline",),
+    "image_prompts": ("outline",),
+    "article_draft": ("outline",),
+    "article_revision": ("article_draft",),
+    "persona": ("outline",),
+    "compare": ("outline",),
+    "images": ("image_prompts",),
+    "fact_check": ("article_revision",),
+    "songforge": ("cleanup",),
+}
+# Prompt content type -> the stage that sends it.
+PROMPT_STAGES: Dict[str, Tuple[str, ...]] = {
+    "transcript_cleanup": ("cleanup",),
+    "chapters": ("chapters",),
+    "chapters_timestamped": ("chapters",),
+    "chapter_titles": ("chapters",),
+    "wisdom_extraction": ("wisdom",),
+    "wisdom_reduce": ("wisdom",),
+    "outline_creation": ("outline",),
+    "outline_reduce": ("outline",),
+    "social_media": ("social",),
+    "image_prompts": ("image_prompts",),
+    "article_writing": ("article_draft", "persona", "compare"),
+    "article_critique": ("article_revision",),
+    "article_revise": ("article_revision",),
+    "article_fact_check": ("fact_check",),
+}
+# Run setting -> the first stages it changes.
+SETTING_STAGES: Dict[str, Tuple[str, ...]] = {
+    "provider": STAGES,
+    "model": STAGES,
+    "cleanup": ("cleanup",),
+    "map_reduce": ("cleanup", "wisdom"),
+    "chapters": ("chapters",),
+    "agentic": ("article_revision",),
+    "fact_check": ("fact_check",),
+    "generate_images": ("images",),
+    "image_style": ("images",),
+    "image_aspect_ratio": ("images",),
+    "image_model": ("images",),
+    "article_length_words": ("article_draft", "persona", "compare"),
+    "user": ("wisdom", "persona"),
+    "rag_mode": ("wisdom",),
+    "compare_provider": ("compare",),
+    "compare_model": ("compare",),
+    "personas": ("persona",),
+}
+# Stage -> the payload field an empty value of which means the stage
+# produced nothing (a provider error swallowed into ``None``), so a stored
+# payload without it is retried rather than reused.
+OUTPUTS: Dict[str, str] = {
+    "cleanup": "cleaned_transcript",
+    "chapters": "chapters",
+    "wisdom": "wisdom",
+    "outline": "outline",
+    "social": "social_posts",
+    "image_prompts": "image_prompts",
+    "article_draft": "article",
+    "article_revision": "article",
+    "persona": "persona_articles",
+    "compare": "article_compare",
+    "images": "generated_images",
+}
+OTHER_STAGES: Dict[str, Tuple[str, ...]] = {
+    "transcript": STAGES,
+    "knowledge_base": ("wisdom",),
+    "kb_index": ("wisdom",),
+    "recipe": ("songforge",),
+}
+
+
+@dataclass
+class Fingerprint:
+    transcript: str                          # transcript (+ segments) hash
+    components: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return cache.make_key([self.transcript] + [
+            f"{name}={value}" for name, value in sorted(self.components.items())
+        ])
+
+
+def enabled() -> bool:
+    return cache.enabled()
+
+
+def _hash(value) -> str:
+    return cache.text_hash(json.dumps(value, sort_keys=True, default=str))[:16]
+
+
+def fingerprint(
+    transcript: str,
+    *,
+    segments: Optional[list] = None,
+    settings: Dict[str, object],
+    prompts: Optional[Dict[str, str]] = None,
+    knowledge_base: Optional[Dict[str, str]] = None,
+    recipe: Optional[dict] = None,
+) -> Fingerprint:
+    prompts = prompts or {}
+    components = {f"settings.{name}": _hash(value) for name, value in settings.items()}
+    components.update({
+        f"prompts.{ct}": _hash(prompts.get(ct) or DEFAULT_PROMPTS.get(ct, ""))
+        for ct in PROMPT_STAGES
+    })
+    components["knowledge_base"] = _hash(knowledge_base or {})
+    components["kb_index"] = _kb_index(settings.get("user"), settings.get("rag_mode"))
+    components["recipe"] = _hash(recipe or {})
+    return Fingerprint(transcript=_hash([transcript, segments or []]), components=components)
+
+
+def _kb_index(user, rag_mode) -> str:
+    if not user or rag_mode == "never":
+        return ""
+    try:
+        from .rag import store  # lazy import — sentence-transformers is heavy
+        return store.index_version(str(user))
+    except Exception as e:
+        logger.info("KB index version unavailable (%s)", e)
+        return ""
+
+
+def kb_marker(knowledge_base: Optional[Dict[str, str]], user, rag_mode) -> str:
+    """What a KB-reading stage's output depends on besides its prompt."""
+    return _hash([knowledge_base or {}, _kb_index(user, rag_mode), user, rag_mode])
+
+
+def stage_hash(stage: str, **inputs) -> str:
+    """Content hash of one stage's inputs; stored as the checkpoint's
+    ``input_hash`` and compared when a rerun offers to reuse it."""
+    return _hash({"stage": stage, **inputs})
+
+
+def usable(stage: str, payload: Optional[dict], key: str, *, empty_ok: bool = False) -> bool:
+    """Whether a stored checkpoint ``payload`` can stand in for running
+    ``stage`` with inputs hashing to ``key``. Payloads written before input
+    hashes were recorded are trusted; an empty primary output never is,
+    unless ``empty_ok`` says the stage can't fail (local-only cleanup that
+    found nothing to remove)."""
+    if not payload:
+        return False
+    if "input_hash" in payload and payload["input_hash"] != key:
+        return False
+    return empty_ok or filled(stage, payload)
+
+
+def filled(stage: str, payload: dict) -> bool:
+    """Whether ``payload`` (a checkpoint or a ``PipelineResult`` dict) has
+    ``stage``'s primary output."""
+    output = OUTPUTS.get(stage)
+    return output is None or bool(payload.get(output))
+
+
+def downstream(stages: Iterable[str]) -> List[str]:
+    """``stages`` plus every stage that (transitively) reads them, in run
+    order."""
+    out = set(stages)
+    changed = True
+    while changed:
+        changed = False
+        for stage, needs in DEPENDS_ON.items():
+            if stage not in out and out.intersection(needs):
+                out.add(stage)
+                changed = True
+    return [s for s in STAGES if s in out]
+
+
+def invalidated(old: Dict[str, str], new: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """(changed component names, stages they invalidate)."""
+    changed = sorted(name for name in set(old) | set(new) if old.get(name) != new.get(name))
+    first: set = set()
+    for name in changed:
+        group, _, item = name.partition(".")
+        if group == "settings":
+            first.update(SETTING_STAGES.get(item, STAGES))
+        elif group == "prompts":
+            first.update(PROMPT_STAGES.get(item, STAGES))
+        else:
+            first.update(OTHER_STAGES.get(name, STAGES))
+    return changed, downstream(first)
+
+
+def lookup(fp: Fingerprint):
+    """``(result_dict, None)`` on a hit, ``(None, report)`` when an earlier
+    run of the same transcript had different inputs, ``(None, None)``
+    when this transcript was never memoized."""
+    entries = run_artifacts.load_memo(fp.transcript).get("entries") or []
+    for entry in entries:
+        if entry.get("key") == fp.key and isinstance(entry.get("result"), dict):
+            return entry["result"], None
+    if not entries:
+        return None, None
+    latest = entries[0]
+    changed, stages = invalidated(latest.get("components") or {}, fp.components)
+    return None, {"changed": changed, "invalidated": stages, "previous": latest.get("saved_at")}
+
+
+def remember(fp: Fingerprint, result: dict, stages: Iterable[str] = ()) -> bool:
+    """Store ``result`` under ``fp`` unless one of the ``stages`` that ran
+    came back empty — a provider outage or a missing key must not be
+    replayed as a hit on every later run. Returns whether it was stored."""
+    missing = [stage for stage in stages if not filled(stage, result)]
+    if missing:
+        logger.info("run memo: not storing — %s produced nothing", ", ".join(missing))
+        return False
+    memo = run_artifacts.load_memo(fp.transcript)
+    entries = [e for e in memo.get("entries") or [] if e.get("key") != fp.key]
+    entries.insert(0, {
+        "key": fp.key,
+        "components": fp.components,
+        "result": result,
+        "saved_at": run_artifacts.now_iso(),
+    })
+    run_artifacts.save_memo(fp.transcript, {"entries": entries[:MAX_ENTRIES]})
+    return True
+
+
+def restore(cls, data: dict):
+    """Rebuild a dataclass (``PipelineResult``) from its stored dict,
+    ignoring fields this version doesn't know."""
+    names = {f.name for f in fields(cls)}
+    return cls(**{k: v for k, v in data.items() if k in names})
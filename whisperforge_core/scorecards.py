@@ -40,6 +40,11 @@ def build_summary(**data):
     verdict = _verdict(average, dimensions)
     return {"advisory": True, "blocks_save": False, "average_score": average, "verdict": verdict, "verdict_label": verdict.replace("_", " ").title(), "dimensions": dimensions}
 
+def output_signals(text, source=""):
+    """Cheap per-output signals (the inputs to the voice/grounding dimensions) for gating a single stage's output."""
+    text = str(text or "")
+    return {"words": _word_count(text), "overlap": round(_overlap_ratio(text, str(source or "")), 4), "voice_markers": _has_voice_markers(text)}
+
 def compact_verdict(summary):
     if not isinstance(summary, Mapping):
         return "Scorecard unavailable"
@@ -0,0 +1,302 @@
+"""Semantic response cache for near-duplicate LLM inputs.
+
+The exact-hash cache in ``cache`` misses whenever the user content differs by
+a single filler word — which is exactly what happens when someone re-runs a
+lightly edited paste. This layer embeds ``user_content`` with the RAG
+embedder and serves a stored response when an earlier input in the same
+bucket scores above a cosine-similarity threshold.
+
+A bucket is (content_type, provider, model, max_tokens, KB hash, prompt
+hash, embedder hash): a semantic hit never crosses a prompt edit, a model
+switch, or a KB change. Only the user content is allowed to be "close".
+
+Long inputs are embedded as ~200-word windows rather than one vector.
+MiniLM-class embedders silently truncate at a few hundred word pieces, so a
+single vector would call two transcripts identical whenever their openings
+match. Candidates must have the same window count, and the match score is
+the *minimum* window similarity — one rewritten paragraph is enough to miss.
+
+Opt-in via ``WHISPERFORGE_SEMANTIC_CACHE=1``; tune the cut-off with
+``WHISPERFORGE_SEMANTIC_CACHE_THRESHOLD`` (default 0.97). Served responses
+are appended to an audit log (``audit_log()``) so callers can tell an
+approximate hit from a fresh generation; ``pipeline.run`` copies a run's
+hits onto ``PipelineResult.semantic_hits``. ``llm.generate`` never stores
+a semantic hit in the exact cache, so it can't come back later as an
+exact hit with no audit record.
+
+Store layout on disk — one file, replaced atomically, so a reader never
+pairs entries with the vectors of another write::
+
+    .cache/semantic/<bucket>/bucket.npz
+        vectors          # float32 (total_windows, dim), L2-normalized
+        entries          # JSON: [{key, response, windows, offset, chars, created_at}]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import time
+from typing import List, Optional
+
+import numpy as np
+
+from . import cache
+from .config import CACHE_DIR
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_THRESHOLD = 0.97
+# Window size for long inputs. Comfortably under the 256 word-piece limit of
+# the default MiniLM embedder.
+WINDOW_WORDS = 200
+# Per-bucket cap; oldest entries are dropped first.
+MAX_ENTRIES_PER_BUCKET = 200
+# Candidates whose length differs by more than this ratio are skipped
+# before any vector math — a 30% longer transcript is not a near-duplicate.
+MAX_LENGTH_DRIFT = 0.1
+FILE_NAME = "bucket.npz"
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+
+@dataclass
+class SemanticHit:
+    """One response served from the semantic cache instead of the model."""
+    bucket: str
+    matched_key: str
+    similarity: float
+    response: str
+    stage: str = ""               # content_type of the generate call
+    # Audit flag: the response was generated for *similar*, not identical,
+    # input. Persisted alongside the hit so reviewers can spot it.
+    approximate: bool = True
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("response")
+        return data
+
+
+_audit: List[SemanticHit] = []
+
+
+def enabled() -> bool:
+    """True when WHISPERFORGE_SEMANTIC_CACHE opts the user in."""
+    return os.getenv("WHISPERFORGE_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes", "on")
+
+
+def threshold() -> float:
+    raw = os.getenv("WHISPERFORGE_SEMANTIC_CACHE_THRESHOLD", "")
+    try:
+        value = float(raw) if raw else DEFAULT_THRESHOLD
+    except ValueError:
+        return DEFAULT_THRESHOLD
+    return min(1.0, max(0.0, value))
+
+
+def bucket_key(
+    content_type: str,
+    provider: str,
+    model: str,
+    max_tokens: int,
+    kb_block: str,
+    prompt_body: str,
+) -> str:
+    """Everything except the user content that shapes the response."""
+    from .rag import embedder  # lazy — keeps numpy-only callers light
+
+    return cache.make_key([
+        "semantic", content_type, provider, model, str(max_tokens),
+        cache.text_hash(kb_block),
+        cache.text_hash(prompt_body),
+        embedder.model_id_hash(),
+    ])
+
+
+def _bucket_dir(bucket: str) -> Path:
+    return CACHE_DIR / "semantic" / bucket
+
+
+def _windows(text: str) -> List[str]:
+    words = text.split()
+    return [
+        " ".join(words[i : i + WINDOW_WORDS])
+        for i in range(0, len(words), WINDOW_WORDS)
+    ]
+
+
+def _embed(windows: List[str]) -> Optional[np.ndarray]:
+    from .rag import embedder
+
+    try:
+        return embedder.embed(windows)
+    except Exception as e:
+        # Missing sentence-transformers or an offline model download. The
+        # exact cache still works; this layer just turns itself into a miss.
+        logger.warning("semantic cache embed failed: %s", e)
+        _stats["errors"] += 1
+        return None
+
+
+def _load_bucket(bucket: str) -> tuple[list[dict], Optional[np.ndarray]]:
+    path = _bucket_dir(bucket) / FILE_NAME
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            entries = json.loads(str(data["entries"]))
+            vectors = data["vectors"]
+    except (OSError, KeyError, ValueError):
+        return [], None
+    if not isinstance(entries, list):
+        return [], None
+    return entries, vectors
+
+
+def lookup(
+    bucket: str,
+    user_content: str,
+    *,
+    min_similarity: Optional[float] = None,
+    stage: str = "",
+) -> Optional[SemanticHit]:
+    """Return the closest stored response above the threshold, or None."""
+    windows = _windows(user_content)
+    if not windows:
+        return None
+    entries, vectors = _load_bucket(bucket)
+    chars = len(user_content)
+    total = len(vectors) if vectors is not None else 0
+    candidates = [
+        e for e in entries
+        if e.get("windows") == len(windows)
+        and abs(int(e.get("chars", 0)) - chars) <= MAX_LENGTH_DRIFT * max(chars, 1)
+        and 0 <= int(e.get("offset", -1)) <= total - len(windows)
+    ]
+    if not candidates or vectors is None:
+        _stats["misses"] += 1
+        return None
+
+    query = _embed(windows)
+    if query is None:
+        _stats["misses"] += 1
+        return None
+
+    # (m, w, dim) · (w, dim) → (m, w): per-window cosine for every candidate.
+    w = len(windows)
+    rows = np.stack([vectors[e["offset"] : e["offset"] + w] for e in candidates])
+    if rows.shape[-1] != query.shape[-1]:
+        _stats["misses"] += 1
+        return None
+    scores = np.einsum("mwd,wd->mw", rows, query).min(axis=1)
+    best = int(np.argmax(scores))
+    best_score = float(scores[best])
+    limit = threshold() if min_similarity is None else min_similarity
+    if best_score < limit:
+        _stats["misses"] += 1
+        return None
+
+    _stats["hits"] += 1
+    entry = candidates[best]
+    hit = SemanticHit(
+        bucket=bucket,
+        matched_key=str(entry.get("key", "")),
+        similarity=round(best_score, 6),
+        response=str(entry.get("response", "")),
+        stage=stage,
+    )
+    _audit.append(hit)
+    logger.info(
+        "semantic cache HIT %s (similarity=%.4f, matched %s)",
+        bucket[:8], best_score, hit.matched_key[:8],
+    )
+    return hit
+
+
+def store(bucket: str, user_content: str, response: str, *, key: str = "") -> None:
+    """Remember ``response`` for ``user_content``. Never stores empty output."""
+    windows = _windows(user_content)
+    if not windows or not response:
+        return
+    vecs = _embed(windows)
+    if vecs is None:
+        return
+    with _lock:
+        entries, vectors = _load_bucket(bucket)
+        if vectors is None or (len(vectors) and vectors.shape[-1] != vecs.shape[-1]):
+            entries, vectors = [], np.zeros((0, vecs.shape[-1]), dtype=np.float32)
+        entries.append({
+            "key": key,
+            "response": response,
+            "windows": len(windows),
+            "offset": len(vectors),
+            "chars": len(user_content),
+            "created_at": time(),
+        })
+        vectors = np.concatenate([vectors, vecs.astype(np.float32)])
+        if len(entries) > MAX_ENTRIES_PER_BUCKET:
+            entries, vectors = _compact(entries[-MAX_ENTRIES_PER_BUCKET:], vectors)
+        _persist(bucket, entries, vectors)
+    _stats["stores"] += 1
+
+
+def _compact(entries: list[dict], vectors: np.ndarray) -> tuple[list[dict], np.ndarray]:
+    kept, out = [], []
+    offset = 0
+    for e in entries:
+        out.append(vectors[e["offset"] : e["offset"] + e["windows"]])
+        kept.append({**e, "offset": offset})
+        offset += e["windows"]
+    return kept, np.concatenate(out) if out else vectors[:0]
+
+
+def _persist(bucket: str, entries: list[dict], vectors: np.ndarray) -> None:
+    d = _bucket_dir(bucket)
+    try:
+        d.mkdir(parents=True, exist_ok=True)
+        tmp = d / f".{FILE_NAME}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, vectors=vectors, entries=np.array(json.dumps(entries)))
+        tmp.replace(d / FILE_NAME)
+    except OSError as e:
+        logger.warning("semantic cache write failed for %s: %s", bucket[:8], e)
+
+
+def stats() -> dict:
+    """Hit/miss counters for this process plus the derived hit rate."""
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "lookups": lookups,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
+
+
+def audit_log() -> List[SemanticHit]:
+    """Every response served from the semantic layer this session."""
+    return list(_audit)
+
+
+def reset_stats() -> None:
+    for k in _stats:
+        _stats[k] = 0
+    _audit.clear()
+
+
+def clear() -> int:
+    """Remove every semantic bucket. Returns the number of buckets removed."""
+    import shutil
+
+    root = CACHE_DIR / "semantic"
+    if not root.exists():
+        return 0
+    count = 0
+    for d in root.iterdir():
+        if d.is_dir():
+            shutil.rmtree(d, ignore_errors=True)
+            count += 1
+    return count
@@ -0,0 +1,243 @@
+"""Typed, optionally compressed serialization for cache entries and run
+artifacts.
+
+Replaces pickle in ``cache``: values are encoded as a type-tagged tree
+(JSON-native types as-is; tuples, sets, bytes, paths and datetimes as
+``{"__wf__": <tag>, "v": ...}``), so reading an entry can never execute
+code. The tree is written as msgpack (``msgpack`` is in requirements.txt)
+and as JSON when it is missing.
+
+Payloads of at least ``WHISPERFORGE_COMPRESS_MIN_BYTES`` (default 16 KiB)
+are compressed — zstd via ``zstandard``, zlib when it is missing. The header
+names the codec and compressor, so entries written either way stay readable.
+Long transcripts and articles shrink 5-10x as text; short values skip the
+compressor's fixed cost.
+
+Encoded blobs start with a 5-byte header (``WF``, format version, codec,
+compression). Run artifacts stay plain indented JSON below the threshold so
+they remain readable with any editor; ``read_json`` accepts both forms and
+streams compressed files through the decompressor instead of inflating
+them into a second buffer.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path, PurePath
+from typing import Any, BinaryIO
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MAGIC = b"WF"
+VERSION = b"\x01"
+HEADER_LEN = 5
+DEFAULT_COMPRESS_MIN_BYTES = 16 << 10
+TAG = "__wf__"
+CHUNK = 1 << 16
+
+
+class SerializationError(ValueError):
+    """Raised for blobs that aren't ours or are corrupt."""
+
+
+def compress_min_bytes() -> int:
+    raw = os.getenv("WHISPERFORGE_COMPRESS_MIN_BYTES", "").strip()
+    try:
+        return max(0, int(raw)) if raw else DEFAULT_COMPRESS_MIN_BYTES
+    except ValueError:
+        return DEFAULT_COMPRESS_MIN_BYTES
+
+
+# --- Type tags ---------------------------------------------------------------
+
+def to_tree(value: Any) -> Any:
+    """``value`` as a JSON/msgpack-safe tree. Raises ``TypeError`` for types
+    with no tag — better to skip caching than to store something lossy."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, list):
+        return [to_tree(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and TAG not in value:
+            return {k: to_tree(v) for k, v in value.items()}
+        return {TAG: "dict", "v": [[to_tree(k), to_tree(v)] for k, v in value.items()]}
+    if isinstance(value, tuple):
+        return {TAG: "tuple", "v": [to_tree(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        return {TAG: type(value).__name__, "v": [to_tree(v) for v in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {TAG: "bytes", "v": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, PurePath):
+        return {TAG: "path", "v": str(value)}
+    if isinstance(value, datetime):
+        return {TAG: "datetime", "v": value.isoformat()}
+    raise TypeError(f"cannot serialize {type(value).__name__}")
+
+
+_DECODERS = {
+    "dict": lambda v: {from_tree(k): from_tree(item) for k, item in v},
+    "tuple": lambda v: tuple(from_tree(item) for item in v),
+    "set": lambda v: {from_tree(item) for item in v},
+    "frozenset": lambda v: frozenset(from_tree(item) for item in v),
+    "bytes": lambda v: base64.b64decode(v),
+    "path": Path,
+    "datetime": datetime.fromisoformat,
+}
+
+
+def from_tree(tree: Any) -> Any:
+    if isinstance(tree, list):
+        return [from_tree(v) for v in tree]
+    if isinstance(tree, dict):
+        tag = tree.get(TAG)
+        if tag is not None and set(tree) == {TAG, "v"}:
+            decoder = _DECODERS.get(tag)
+            if decoder is None:
+                raise SerializationError(f"unknown type tag {tag!r}")
+            return decoder(tree["v"])
+        return {k: from_tree(v) for k, v in tree.items()}
+    return tree
+
+
+# --- Blobs ---------------------------------------------------------------------
+
+def dumps(value: Any) -> bytes:
+    """Encode ``value`` with a header; compressed above the threshold."""
+    tree = to_tree(value)
+    if msgpack is not None:
+        codec, body = b"m", msgpack.packb(tree, use_bin_type=True)
+    else:
+        codec, body = b"j", json.dumps(tree, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    compression, body = _compress(body)
+    return MAGIC + VERSION + codec + compression + body
+
+
+def loads(data: bytes) -> Any:
+    if not is_encoded(data):
+        raise SerializationError("missing serialization header")
+    codec, compression = data[3:4], data[4:5]
+    try:
+        body = _decompress(compression, memoryview(data)[HEADER_LEN:])
+    except _corrupt() as e:
+        raise SerializationError(f"corrupt compressed entry: {e}") from e
+    return from_tree(_decode(codec, body))
+
+
+def is_encoded(data: bytes) -> bool:
+    return data[:3] == MAGIC + VERSION and len(data) >= HEADER_LEN
+
+
+def _decode(codec: bytes, body: bytes) -> Any:
+    if codec == b"j":
+        return json.loads(bytes(body))
+    if codec == b"m":
+        if msgpack is None:
+            raise SerializationError("entry is msgpack-encoded but msgpack is not installed")
+        return msgpack.unpackb(bytes(body), raw=False, strict_map_key=False)
+    raise SerializationError(f"unknown codec {codec!r}")
+
+
+def _corrupt() -> tuple:
+    """What a damaged compressed body raises, for each available compressor."""
+    return (zlib.error,) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def _compress(body: bytes) -> tuple[bytes, bytes]:
+    if len(body) < compress_min_bytes():
+        return b"-", body
+    if zstandard is not None:
+        return b"z", zstandard.ZstdCompressor(level=3).compress(body)
+    return b"d", zlib.compress(body, 6)
+
+
+def _decompress(compression: bytes, body) -> bytes:
+    if compression == b"-":
+        return bytes(body)
+    if compression == b"z":
+        if zstandard is None:
+            raise SerializationError("entry is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body)).read()
+    if compression == b"d":
+        return zlib.decompress(body)
+    raise SerializationError(f"unknown compression {compression!r}")
+
+
+# --- JSON files ---------------------------------------------------------------
+
+def write_json(path: Path, data: Any) -> None:
+    """Atomically write ``data`` (already JSON-safe) to ``path``: indented
+    text below the compression threshold, a compressed JSON blob above it."""
+    text = json.dumps(data, indent=2, sort_keys=True) + "\n"
+    body = text.encode("utf-8")
+    if len(body) >= compress_min_bytes():
+        compact = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        compression, packed = _compress(compact)
+        body = MAGIC + VERSION + b"j" + compression + packed
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(body)
+    tmp.replace(path)
+
+
+def read_json(path: Path) -> Any:
+    """Read a file ``write_json`` produced (or any plain JSON file).
+    Raises ``OSError``/``ValueError`` like ``json.loads(path.read_text())``."""
+    with open(path, "rb") as f:
+        head = f.read(HEADER_LEN)
+        if not is_encoded(head):
+            return json.loads(head + f.read())
+        if head[3:4] != b"j":
+            raise SerializationError(f"{path} is not a JSON artifact")
+        try:
+            return json.load(io.TextIOWrapper(_stream(head[4:5], f), encoding="utf-8"))
+        except _corrupt() as e:
+            raise SerializationError(f"corrupt compressed file {path}: {e}") from e
+
+
+def _stream(compression: bytes, f: BinaryIO):
+    if compression == b"-":
+        return f
+    if compression == b"z":
+        if zstandard is None:
+            raise SerializationError("file is zstd-compressed but zstandard is not installed")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f))
+    if compression == b"d":
+        return io.BufferedReader(_ZlibReader(f))
+    raise SerializationError(f"unknown compression {compression!r}")
+
+
+class _ZlibReader(io.RawIOBase):
+    """Inflates a zlib stream chunk by chunk as it is read."""
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._inflate = zlib.decompressobj()
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            chunk = self._f.read(CHUNK)
+            if not chunk:
+                self._buf = self._inflate.flush()
+                break
+            self._buf = self._inflate.decompress(chunk)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
@@ -0,0 +1,223 @@
+"""Token counting and context-window budgeting.
+
+One place for "how many tokens is this?" and "does this call fit?" so the
+KB chunker, the RAG benchmark, Notion's token estimate and ``llm.generate``
+stop guessing differently.
+
+Counting uses ``tiktoken`` (in requirements.txt; exact for OpenAI models, a
+close proxy for Claude and most Ollama models). If it is missing, or its
+encoding files can't be fetched on an offline first run, we fall back to
+``max(words × 1.3, chars / 4)`` — the two rules of thumb the codebase used
+before, taking whichever is more pessimistic so budgets err toward fitting.
+
+``plan()`` sizes one ``generate`` call against the model's context window:
+output tokens are reserved first, the prompt body and user content are
+fixed, and whatever is left (minus a safety margin) is the KB allowance.
+The KB is the lowest-priority context — ``trim()`` cuts it to the allowance
+before anything else is touched. A call that can't fit even with no KB is
+refused up front rather than failing at the provider after earlier stages
+already spent money.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .logging import get_logger
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional; heuristic fallback below
+    tiktoken = None
+
+logger = get_logger(__name__)
+
+TOKENS_PER_WORD = 1.3
+CHARS_PER_TOKEN = 4
+
+# (provider, model) -> context window in tokens. Mirrors cost.PRICING.
+CONTEXT_WINDOWS: Dict[Tuple[str, str], int] = {
+    ("Anthropic", "claude-haiku-4-5"): 200_000,
+    ("Anthropic", "claude-sonnet-4-5"): 200_000,
+    ("Anthropic", "claude-opus-4-5"): 200_000,
+    ("OpenAI", "gpt-4o"): 128_000,
+    ("OpenAI", "gpt-4o-mini"): 128_000,
+    ("OpenAI", "gpt-4-turbo"): 128_000,
+    ("OpenAI", "gpt-4"): 8_192,
+    ("OpenAI", "gpt-3.5-turbo"): 16_385,
+}
+# Fallbacks for models not listed above. Ollama's window depends on the
+# model and its num_ctx; override with WHISPERFORGE_OLLAMA_CONTEXT_TOKENS.
+_PROVIDER_DEFAULTS: Dict[str, int] = {
+    "Anthropic": 200_000,
+    "OpenAI": 128_000,
+}
+DEFAULT_OLLAMA_CONTEXT = 32_768
+DEFAULT_CONTEXT = 8_192
+
+# Heuristic counts can undershoot; keep 5% of the window in reserve.
+SAFETY_MARGIN = 0.05
+# Role markers, message framing and the "Original Prompt:" joiner.
+MESSAGE_OVERHEAD = 32
+
+TRUNCATION_NOTE = "[Knowledge base truncated to fit the model's context window.]"
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: Optional[str]):
+    if tiktoken is None:
+        return None
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+        except Exception as e:  # encoding download failed (offline)
+            logger.info("tokens: tiktoken encoding unavailable (%s) — heuristic counts", e)
+            return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.info("tokens: tiktoken encoding unavailable (%s) — heuristic counts", e)
+        return None
+
+
+def _heuristic(text: str) -> int:
+    return math.ceil(max(len(text.split()) * TOKENS_PER_WORD, len(text) / CHARS_PER_TOKEN))
+
+
+def count(text: Optional[str], model: Optional[str] = None) -> int:
+    """Token count for ``text``. Exact when tiktoken is installed, otherwise
+    the pessimistic word/char heuristic. Empty text is 0 tokens."""
+    if not text:
+        return 0
+    enc = _encoding(model)
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return _heuristic(text)
+
+
+def windows(text: str, target: int, overlap: int = 0) -> List[str]:
+    """Split ``text`` into consecutive windows of at most ``target`` tokens
+    (as measured by ``count``), each starting ``overlap`` tokens before the
+    previous one ended. Windows break on whitespace."""
+    words = text.split()
+    if not words:
+        return []
+    out: List[str] = []
+    start = 0
+    while start < len(words):
+        end = _fit_words(words, start, target)
+        out.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+        back = end
+        while overlap and back - 1 > start and count(" ".join(words[back - 1 : end])) <= overlap:
+            back -= 1
+        start = back if back > start and back < end else end
+    return out
+
+
+def _fit_words(words: List[str], start: int, target: int) -> int:
+    """Largest ``end`` such that words[start:end] fits ``target`` tokens
+    (always at least one word). Binary search — ``count`` is monotonic and
+    every word costs at least one token, so ``end`` never passes
+    ``start + target``."""
+    lo, hi = start + 1, min(len(words), start + max(1, target))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count(" ".join(words[start:mid])) <= target:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def context_window(provider: str, model: str) -> int:
+    """Context window for ``(provider, model)`` in tokens."""
+    if (provider, model) in CONTEXT_WINDOWS:
+        return CONTEXT_WINDOWS[(provider, model)]
+    if provider.startswith("Ollama"):
+        try:
+            return int(os.getenv("WHISPERFORGE_OLLAMA_CONTEXT_TOKENS", "") or DEFAULT_OLLAMA_CONTEXT)
+        except ValueError:
+            return DEFAULT_OLLAMA_CONTEXT
+    return _PROVIDER_DEFAULTS.get(provider, DEFAULT_CONTEXT)
+
+
+@dataclass
+class Budget:
+    """Pre-call token plan for one ``generate`` call."""
+    provider: str
+    model: str
+    window: int
+    max_output: int
+    prompt_tokens: int
+    user_tokens: int
+    kb_tokens: int
+
+    @property
+    def usable(self) -> int:
+        return int(self.window * (1 - SAFETY_MARGIN)) - self.max_output
+
+    @property
+    def estimated_input(self) -> int:
+        return self.prompt_tokens + self.user_tokens + self.kb_tokens + MESSAGE_OVERHEAD
+
+    @property
+    def kb_allowance(self) -> int:
+        """Tokens left for the KB once everything else is placed."""
+        return max(0, self.usable - self.prompt_tokens - self.user_tokens - MESSAGE_OVERHEAD)
+
+    @property
+    def fits(self) -> bool:
+        return self.estimated_input <= self.usable
+
+
+def plan(
+    provider: str,
+    model: str,
+    *,
+    kb_block: str,
+    prompt_body: str,
+    user_content: str,
+    max_output: int,
+) -> Budget:
+    return Budget(
+        provider=provider, model=model,
+        window=context_window(provider, model),
+        max_output=max_output,
+        prompt_tokens=count(prompt_body, model),
+        user_tokens=count(user_content, model),
+        kb_tokens=count(kb_block, model),
+    )
+
+
+def trim(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Keep the head of ``text`` within ``max_tokens``, cutting at the last
+    paragraph (or line) break that fits and appending ``TRUNCATION_NOTE``.
+    Returns "" when not even the note fits."""
+    if count(text, model) <= max_tokens:
+        return text
+    room = max_tokens - count(TRUNCATION_NOTE, model) - 2
+    if room <= 0:
+        return ""
+    words = text.split(" ")
+    lo, hi = 0, min(len(words), room)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count(" ".join(words[:mid]), model) <= room:
+            lo = mid
+        else:
+            hi = mid - 1
+    head = " ".join(words[:lo])
+    for sep in ("\n\n", "\n"):
+        cut = head.rfind(sep)
+        if cut > len(head) // 2:
+            head = head[:cut]
+            break
+    return f"{head.rstrip()}\n\n{TRUNCATION_NOTE}" if head.strip() else ""